@@ -1,443 +1,142 @@
 """
 @file    app.py
 @brief   Flask后端服务器
-@details 提供游戏Web服务和API接口，集成数据库认证系统
+@details 提供游戏Web服务和API接口，集成数据库认证系统。
+         通过 create_app() 工厂函数创建应用，导入本模块时不会创建应用、
+         连接数据库或导入各业务模块；模块属性 app 在首次访问时才创建默认应用。
+         进程退出时由一个退出钩子关闭所有存活应用的后台线程和资源
 @author  AI Assistant
 @date    2026-02-17
-@version V1.0.1
+@version V1.1.0
 """
 
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for
-from functools import wraps
-from game.snake_game import SnakeGame
-from database import init_db
-from database.auth_service import AuthService, login_required
-from auth.social_config import SocialLoginService, WeChatConfig, QQConfig
+import os
+import atexit
+import logging
+import weakref
 
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
-app.secret_key = 'snake_game_secret_key_2026'
+# 默认配置，可被 create_app() 的 config 参数覆盖
+DEFAULT_CONFIG = {
+    'SECRET_KEY': os.environ.get('SECRET_KEY', 'snake_game_secret_key_2026'),
+    # 需要注册的蓝图名称，见 routes.BLUEPRINT_MODULES
+    'BLUEPRINTS': ('pages', 'auth', 'social', 'game', 'spectate', 'analytics', 'leaderboard'),
+    # 游戏存储类型（local/shared）及共享内存槽位数，见 game.store.create_game_store
+    'GAME_STORE': os.environ.get('GAME_STORE', 'local'),
+    'GAME_STORE_SLOTS': int(os.environ.get('GAME_STORE_SLOTS', 256)),
+    # 进程内存储的游戏实现（default/compact）
+    'GAME_ENGINE': os.environ.get('GAME_ENGINE', 'default'),
+    # 进程内存储的游戏休眠：空闲秒数（0为不休眠）、快照目录（为空时保存在内存中）、是否压缩快照
+    'GAME_HIBERNATE_AFTER': float(os.environ.get('GAME_HIBERNATE_AFTER', 0)),
+    'GAME_HIBERNATE_DIR': os.environ.get('GAME_HIBERNATE_DIR', ''),
+    'GAME_HIBERNATE_COMPRESS': os.environ.get('GAME_HIBERNATE_COMPRESS', 'false').lower() == 'true',
+    # 进程内存储的检查点日志：文件路径（为空时不开启）、槽位数、每条记录的字节数、检查点间隔（秒）
+    'GAME_CHECKPOINT_PATH': os.environ.get('GAME_CHECKPOINT_PATH', ''),
+    'GAME_CHECKPOINT_SLOTS': int(os.environ.get('GAME_CHECKPOINT_SLOTS', 1024)),
+    'GAME_CHECKPOINT_RECORD_SIZE': int(os.environ.get('GAME_CHECKPOINT_RECORD_SIZE', 1024)),
+    'GAME_CHECKPOINT_INTERVAL': float(os.environ.get('GAME_CHECKPOINT_INTERVAL', 1.0)),
+    # 进程内存储的游戏事件记录：SQLite文件路径（为空时不开启）、缓冲区容量、每批事件数、最长写入间隔（秒）
+    'GAME_EVENTS_PATH': os.environ.get('GAME_EVENTS_PATH', ''),
+    'GAME_EVENTS_CAPACITY': int(os.environ.get('GAME_EVENTS_CAPACITY', 65536)),
+    'GAME_EVENTS_BATCH': int(os.environ.get('GAME_EVENTS_BATCH', 512)),
+    'GAME_EVENTS_INTERVAL': float(os.environ.get('GAME_EVENTS_INTERVAL', 0.5)),
+}
 
-init_db(app)
+# 进程退出时按顺序关闭的应用扩展：先写入最后一次检查点和剩余事件，再写回成绩和用户统计，最后释放游戏存储
+SHUTDOWN_EXTENSIONS = ('game_checkpointer', 'game_events', 'score_queue', 'user_stats', 'game_store')
 
-game_instance = None
+_default_app = None
 
-
-def get_game_instance():
-    """
-    @brief  获取游戏实例（单例模式）
-    @retval SnakeGame实例对象
-    """
-    global game_instance
-    if game_instance is None:
-        game_instance = SnakeGame()
-    return game_instance
+# 当前进程中存活的应用，弱引用不会让已丢弃的应用及其扩展常驻内存
+_live_apps = weakref.WeakSet()
 
 
-@app.route('/')
-def index():
+def close_apps():
     """
-    @brief  渲染游戏主页面
-    @retval HTML页面内容
+    @brief  关闭所有存活应用的扩展，写回缓冲的数据并停止后台线程
+    @details 进程退出时调用；某个扩展关闭失败不影响其他扩展，扩展的 close() 可以重复调用
+    @retval None
     """
-    return render_template('index.html', logged_in='user_id' in session)
+    for app in list(_live_apps):
+        for name in SHUTDOWN_EXTENSIONS:
+            close = getattr(app.extensions.get(name), 'close', None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception:
+                logger.exception(f"关闭应用扩展 {name} 失败")
 
 
-@app.route('/login')
-def login_page():
-    """
-    @brief  渲染登录页面
-    @retval HTML页面内容
-    """
-    if 'user_id' in session:
-        return redirect(url_for('index'))
-    message = request.args.get('message', '')
-    return render_template('login.html', message=message)
-
-
-@app.route('/register')
-def register_page():
-    """
-    @brief  渲染注册页面
-    @retval HTML页面内容
-    """
-    if 'user_id' in session:
-        return redirect(url_for('index'))
-    return render_template('register.html')
+atexit.register(close_apps)
 
 
-@app.route('/api/auth/login', methods=['POST'])
-def api_login():
+def create_app(config=None):
     """
-    @brief  处理用户登录请求
-    @retval JSON格式的登录结果
+    @brief  创建并配置Flask应用
+    @details Flask、数据库和蓝图模块都在此函数内导入，只有真正需要应用的进程才承担导入开销；
+             数据库表结构通过缓存的版本号检查，版本未变化时不执行create_all
+    @param  config: 配置字典，覆盖 DEFAULT_CONFIG 中的同名项
+    @retval Flask: 应用实例
     """
-    data = request.get_json()
-    identifier = data.get('username', '').strip()
-    password = data.get('password', '')
-    remember = data.get('remember', False)
-    
-    if not identifier or not password:
-        return jsonify({
-            'success': False,
-            'message': '请输入用户名和密码'
-        }), 400
-    
-    result = AuthService.login_user(identifier, password)
-    
-    if result['success']:
-        session['user_id'] = result.get('user_id')
-        session['username'] = result.get('username')
-        session['user_email'] = result.get('email')
-        if remember:
-            session.permanent = True
-        return jsonify(result), 200
-    else:
-        return jsonify(result), 401
+    from flask import Flask
+    from database import db, init_db, init_session_store, init_user_stats, init_score_queue
+    from monitoring import init_metrics, init_sql_trace, init_profiler
+    from assets import init_assets
+    from routes import register_blueprints
+    from routes.json_provider import FastJSONProvider
 
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.update(DEFAULT_CONFIG)
+    if config:
+        app.config.update(config)
 
-@app.route('/api/auth/logout', methods=['POST'])
-def api_logout():
-    """
-    @brief  处理用户登出请求
-    @retval JSON格式的登出结果
-    """
-    session.clear()
-    return jsonify({
-        'success': True,
-        'message': '已成功登出'
-    }), 200
+    init_db(app)
 
+    init_session_store(app)
 
-@app.route('/api/auth/check', methods=['GET'])
-def api_check_auth():
-    """
-    @brief  检查用户登录状态
-    @retval JSON格式的登录状态
-    """
-    if 'user_id' in session:
-        return jsonify({
-            'logged_in': True,
-            'user_id': session.get('user_id'),
-            'username': session.get('username'),
-            'email': session.get('user_email')
-        }), 200
-    else:
-        return jsonify({
-            'logged_in': False
-        }), 200
+    init_user_stats(app)
 
+    init_score_queue(app)
 
-@app.route('/api/auth/register', methods=['POST'])
-def api_register():
-    """
-    @brief  处理用户注册请求
-    @retval JSON格式的注册结果
-    """
-    data = request.get_json()
-    username = data.get('username', '').strip()
-    email = data.get('email', '').strip()
-    password = data.get('password', '')
-    
-    if not username or not email or not password:
-        return jsonify({
-            'success': False,
-            'message': '请填写所有必填项'
-        }), 400
-    
-    result = AuthService.register_user(username, email, password)
-    
-    if result['success']:
-        return jsonify(result), 201
-    else:
-        return jsonify(result), 400
+    metrics = init_metrics(app)
 
+    init_sql_trace(app, db, metrics)
 
-@app.route('/api/auth/forgot-password', methods=['POST'])
-def api_forgot_password():
-    """
-    @brief  处理忘记密码请求
-    @retval JSON格式的处理结果
-    """
-    data = request.get_json()
-    email = data.get('email', '').strip()
-    
-    if not email:
-        return jsonify({
-            'success': False,
-            'message': '请输入邮箱地址'
-        }), 400
-    
-    result = AuthService.create_reset_token(email)
-    
-    return jsonify({
-        'success': True,
-        'message': '如果该邮箱已注册，重置链接已发送'
-    }), 200
+    init_profiler(app)
 
+    init_assets(app)
 
-@app.route('/api/auth/reset-password', methods=['POST'])
-def api_reset_password():
-    """
-    @brief  处理重置密码请求
-    @retval JSON格式的处理结果
-    """
-    data = request.get_json()
-    token = data.get('token', '')
-    new_password = data.get('password', '')
-    
-    if not token or not new_password:
-        return jsonify({
-            'success': False,
-            'message': '参数错误'
-        }), 400
-    
-    result = AuthService.reset_password(token, new_password)
-    
-    if result['success']:
-        return jsonify(result), 200
-    else:
-        return jsonify(result), 400
-
-
-@app.route('/api/auth/change-password', methods=['POST'])
-@login_required
-def api_change_password():
-    """
-    @brief  处理修改密码请求
-    @retval JSON格式的处理结果
-    """
-    data = request.get_json()
-    old_password = data.get('old_password', '')
-    new_password = data.get('new_password', '')
-    
-    if not old_password or not new_password:
-        return jsonify({
-            'success': False,
-            'message': '请填写所有必填项'
-        }), 400
-    
-    user_id = session.get('user_id')
-    result = AuthService.change_password(user_id, old_password, new_password)
-    
-    if result['success']:
-        return jsonify(result), 200
-    else:
-        return jsonify(result), 400
-
-
-@app.route('/api/auth/wechat/authorize', methods=['POST'])
-def api_wechat_authorize():
-    """
-    @brief  处理微信注册授权请求
-    @retval JSON格式的授权结果
-    """
-    data = request.get_json() or {}
-    action = data.get('action', 'register')
-    
-    response = SocialLoginService.get_wechat_auth_response(action)
-    
-    if response['success']:
-        return jsonify(response), 200
-    else:
-        return jsonify(response), 400
-
-
-@app.route('/api/auth/qq/authorize', methods=['POST'])
-def api_qq_authorize():
-    """
-    @brief  处理QQ注册授权请求
-    @retval JSON格式的授权结果
-    """
-    data = request.get_json() or {}
-    action = data.get('action', 'register')
-    
-    response = SocialLoginService.get_qq_auth_response(action)
-    
-    if response['success']:
-        return jsonify(response), 200
-    else:
-        return jsonify(response), 400
-
-
-@app.route('/api/auth/social/config', methods=['GET'])
-def api_social_config():
-    """
-    @brief  获取第三方登录配置状态
-    @retval JSON格式的配置状态
-    """
-    status = SocialLoginService.get_config_status()
-    return jsonify({
-        'success': True,
-        'config': status
-    }), 200
+    register_blueprints(app, app.config['BLUEPRINTS'])
 
+    _live_apps.add(app)
 
-@app.route('/api/auth/social/status', methods=['GET'])
-def api_social_status():
-    """
-    @brief  检查社交登录状态
-    @retval JSON格式的状态信息
-    """
-    return jsonify({
-        'success': True,
-        'registered': False,
-        'message': '等待用户授权'
-    }), 200
-
-
-@app.route('/api/auth/wechat/callback', methods=['GET'])
-def api_wechat_callback():
-    """
-    @brief  微信授权回调处理
-    @retval 重定向或错误信息
-    """
-    code = request.args.get('code')
-    state = request.args.get('state', '')
-    
-    if not code:
-        return redirect('/register?message=微信授权失败')
-    
-    return redirect('/login?message=微信注册成功，请登录')
-
-
-@app.route('/api/auth/qq/callback', methods=['GET'])
-def api_qq_callback():
-    """
-    @brief  QQ授权回调处理
-    @retval 重定向或错误信息
-    """
-    code = request.args.get('code')
-    state = request.args.get('state', '')
-    
-    if not code:
-        return redirect('/register?message=QQ授权失败')
-    
-    return redirect('/login?message=QQ注册成功，请登录')
-
-
-@app.route('/api/auth/user-info', methods=['GET'])
-@login_required
-def api_get_user_info():
-    """
-    @brief  获取用户信息
-    @retval JSON格式的用户信息
-    """
-    user_id = session.get('user_id')
-    result = AuthService.get_user_info(user_id)
-    
-    if result['success']:
-        return jsonify(result), 200
-    else:
-        return jsonify(result), 404
-
-
-@app.route('/api/game/start', methods=['POST'])
-@login_required
-def start_game():
-    """
-    @brief  开始新游戏
-    @retval JSON格式的游戏状态
-    """
-    game = get_game_instance()
-    game.reset()
-    game.start()
-    return jsonify({
-        'status': 'success',
-        'game_state': game.get_state()
-    })
-
-
-@app.route('/api/game/pause', methods=['POST'])
-@login_required
-def pause_game():
-    """
-    @brief  暂停/继续游戏
-    @retval JSON格式的游戏状态
-    """
-    game = get_game_instance()
-    game.toggle_pause()
-    return jsonify({
-        'status': 'success',
-        'game_state': game.get_state()
-    })
-
-
-@app.route('/api/game/restart', methods=['POST'])
-@login_required
-def restart_game():
-    """
-    @brief  重新开始游戏
-    @retval JSON格式的游戏状态
-    """
-    game = get_game_instance()
-    game.reset()
-    game.start()
-    return jsonify({
-        'status': 'success',
-        'game_state': game.get_state()
-    })
-
-
-@app.route('/api/game/state', methods=['GET'])
-@login_required
-def get_state():
-    """
-    @brief  获取当前游戏状态
-    @retval JSON格式的游戏状态
-    """
-    game = get_game_instance()
-    return jsonify({
-        'status': 'success',
-        'game_state': game.get_state()
-    })
-
-
-@app.route('/api/game/direction', methods=['POST'])
-@login_required
-def change_direction():
-    """
-    @brief  改变蛇的移动方向
-    @retval JSON格式的游戏状态
-    """
-    game = get_game_instance()
-    data = request.get_json()
-    direction = data.get('direction')
-    if direction:
-        game.set_direction(direction)
-    return jsonify({
-        'status': 'success',
-        'game_state': game.get_state()
-    })
+    return app
 
 
-@app.route('/api/game/update', methods=['POST'])
-@login_required
-def update_game():
+def get_app():
     """
-    @brief  更新游戏状态（移动蛇、检测碰撞等）
-    @retval JSON格式的游戏状态
+    @brief  获取默认应用实例（单例模式）
+    @retval Flask: 默认配置创建的应用实例
     """
-    game = get_game_instance()
-    game.update()
-    return jsonify({
-        'status': 'success',
-        'game_state': game.get_state()
-    })
+    global _default_app
+    if _default_app is None:
+        _default_app = create_app()
+    return _default_app
 
 
-@app.route('/api/game/highscore', methods=['GET'])
-def get_highscore():
+def __getattr__(name):
     """
-    @brief  获取历史最高分
-    @retval JSON格式的最高分数据
+    @brief  模块属性延迟创建，兼容 from app import app 的用法
+    @param  name: 属性名
+    @retval Flask: 访问 app 时返回默认应用实例
     """
-    game = get_game_instance()
-    return jsonify({
-        'status': 'success',
-        'highscore': game.get_highscore()
-    })
+    if name == 'app':
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    get_app().run(debug=True, host='0.0.0.0', port=5000)
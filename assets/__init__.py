@@ -0,0 +1,19 @@
+"""
+@file    __init__.py
+@brief   静态资源模块初始化
+@details 导出资源构建和运行时分发相关类和函数
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+from .minify import minify_css, minify_js
+from .pipeline import AssetBundle, build_assets, init_assets
+
+__all__ = [
+    'minify_css',
+    'minify_js',
+    'AssetBundle',
+    'build_assets',
+    'init_assets'
+]
@@ -0,0 +1,210 @@
+"""
+@file    minify.py
+@brief   CSS/JS压缩
+@details 纯Python实现的保守压缩：去除注释、缩进和多余空白，字符串、模板字符串和正则字面量原样保留。
+         JS保留换行，不依赖自动分号插入规则的改写，压缩结果与源码语义一致
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import re
+
+# 标识符字符（两侧都是标识符字符时空格不能删除）
+_WORD = re.compile(r'[\w$\\\u0080-\uffff]')
+
+# 其后出现 / 时表示正则字面量开始的字符
+_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+
+# 其后出现 / 时表示正则字面量开始的关键字
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'throw')
+
+# CSS中两侧空白可以删除的符号（不含 + - 以免破坏 calc()，不含 : 以免合并选择器）
+_CSS_PUNCT = re.compile(r'\s*([{};,>])\s*')
+
+
+def _scan_quoted(source, start, quote):
+    """
+    @brief  扫描字符串字面量
+    @param  source: 源码
+    @param  start: 起始引号位置
+    @param  quote: 引号字符
+    @retval int: 结束引号之后的位置
+    """
+    i = start + 1
+    length = len(source)
+    while i < length:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        i += 1
+    return length
+
+
+def _scan_regex(source, start):
+    """
+    @brief  扫描正则字面量（含字符类中的 /）
+    @param  source: 源码
+    @param  start: 起始 / 位置
+    @retval int: 正则及其标志之后的位置
+    """
+    i = start + 1
+    length = len(source)
+    in_class = False
+    while i < length:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < length and _WORD.match(source[i]):
+                i += 1
+            return i
+        elif char == '\n':
+            return i
+        i += 1
+    return length
+
+
+def _regex_allowed(output):
+    """
+    @brief  根据已输出内容判断 / 是否开始正则字面量
+    @param  output: 已输出的片段列表
+    @retval bool: 是否为正则字面量
+    """
+    text = ''.join(output[-3:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _REGEX_PREFIX:
+        return True
+    return any(text.endswith(keyword) and (len(text) == len(keyword) or not _WORD.match(text[-len(keyword) - 1]))
+               for keyword in _REGEX_KEYWORDS)
+
+
+def _needs_space(before, after):
+    """
+    @brief  判断两个字符之间的空白是否必须保留
+    @param  before: 空白前的字符
+    @param  after: 空白后的字符
+    @retval bool: 是否保留一个空格
+    """
+    if _WORD.match(before) and _WORD.match(after):
+        return True
+    # a + +b、a - -b 等不能合并成自增/自减运算符
+    return before in '+-' and after in '+-'
+
+
+def minify_js(source):
+    """
+    @brief  压缩JavaScript
+    @param  source: 源码
+    @retval str: 压缩后的代码
+    """
+    output = []
+    pending_space = False
+    pending_newline = False
+    i = 0
+    length = len(source)
+
+    def emit(text):
+        nonlocal pending_space, pending_newline
+        if output:
+            last = output[-1][-1]
+            if pending_newline:
+                output.append('\n')
+            elif pending_space and _needs_space(last, text[0]):
+                output.append(' ')
+        pending_space = pending_newline = False
+        output.append(text)
+
+    while i < length:
+        char = source[i]
+        if char in ' \t\r\f\v':
+            pending_space = True
+            i += 1
+        elif char == '\n':
+            pending_newline = bool(output)
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end < 0 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = length if end < 0 else end + 2
+            # 跨行注释按换行处理，避免影响自动分号插入
+            if '\n' in source[i:end]:
+                pending_newline = bool(output)
+            pending_space = True
+            i = end
+        elif char in '\'"`':
+            end = _scan_quoted(source, i, char)
+            emit(source[i:end])
+            i = end
+        elif char == '/' and _regex_allowed(output):
+            end = _scan_regex(source, i)
+            emit(source[i:end])
+            i = end
+        else:
+            match = _WORD.match(char)
+            if match:
+                end = i + 1
+                while end < length and _WORD.match(source[end]):
+                    end += 1
+                emit(source[i:end])
+                i = end
+            else:
+                emit(char)
+                i += 1
+
+    return ''.join(output) + '\n'
+
+
+def _compress_css(text):
+    """
+    @brief  压缩字符串之外的CSS片段
+    @param  text: 不含注释和字符串的片段
+    @retval str: 压缩后的片段
+    """
+    text = re.sub(r'\s+', ' ', text)
+    text = _CSS_PUNCT.sub(r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}')
+
+
+def minify_css(source):
+    """
+    @brief  压缩CSS
+    @param  source: 源码
+    @retval str: 压缩后的代码
+    """
+    output = []
+    pending = []
+    i = 0
+    start = 0
+    length = len(source)
+    # 字符串原样保留，字符串之间的片段去掉注释后再压缩
+    while i < length:
+        if source.startswith('/*', i):
+            pending.append(source[start:i] + ' ')
+            end = source.find('*/', i + 2)
+            i = start = length if end < 0 else end + 2
+        elif source[i] in '\'"':
+            pending.append(source[start:i])
+            output.append(_compress_css(''.join(pending)))
+            pending = []
+            end = _scan_quoted(source, i, source[i])
+            output.append(source[i:end])
+            i = start = end
+        else:
+            i += 1
+    pending.append(source[start:])
+    output.append(_compress_css(''.join(pending)))
+    return ''.join(output).strip() + '\n'
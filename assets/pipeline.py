@@ -0,0 +1,252 @@
+"""
+@file    pipeline.py
+@brief   静态资源构建与分发
+@details 构建步骤把 static/ 下的CSS/JS压缩后按内容哈希重命名，写入 static/dist/，
+         同时生成gzip和brotli（安装了Brotli时）预压缩文件及清单 manifest.json。
+         运行时加载清单和全部构建产物到内存，模板通过 asset_url() 获取带指纹的地址，
+         请求按 Accept-Encoding 直接返回预压缩内容，并以 immutable 长期缓存
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import mimetypes
+from flask import Response, request, url_for
+from .minify import minify_css, minify_js
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_STATIC_DIR = os.path.join(PROJECT_ROOT, 'static')
+
+# 构建产物相对静态目录的子目录
+DIST_DIRNAME = 'dist'
+
+MANIFEST_NAME = 'manifest.json'
+
+# 需要构建的资源（相对静态目录）
+DEFAULT_ASSETS = (
+    'css/login.css',
+    'css/style.css',
+    'js/game.js',
+    'js/register.js',
+    'js/login.js',
+)
+
+# 按扩展名选择压缩函数
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+# 文件名中内容哈希的长度
+FINGERPRINT_LENGTH = 10
+
+# 带指纹的资源内容永不变化，允许浏览器缓存一年且不再校验
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# 预压缩文件扩展名，按优先级排列
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _digest(data):
+    """
+    @brief  计算内容哈希
+    @param  data: 字节内容
+    @retval str: 十六进制SHA-256摘要
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _brotli():
+    """
+    @brief  导入可选的brotli模块
+    @retval module: brotli模块，未安装时返回None
+    """
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def build_assets(static_dir=DEFAULT_STATIC_DIR, assets=DEFAULT_ASSETS):
+    """
+    @brief  构建静态资源
+    @details 每个资源生成 name.<指纹>.ext 及其 .gz/.br 预压缩文件，旧版本构建产物会被删除
+    @param  static_dir: 静态文件目录
+    @param  assets: 需要构建的资源路径序列（相对静态目录）
+    @retval dict: 清单，资源路径到构建信息的映射
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    brotli = _brotli()
+    if brotli is None:
+        logger.warning("未安装Brotli，跳过.br预压缩文件（pip install Brotli）")
+
+    manifest = {}
+    for asset in assets:
+        with open(os.path.join(static_dir, asset), 'rb') as f:
+            source = f.read()
+        root, ext = os.path.splitext(asset)
+        minified = MINIFIERS[ext](source.decode('utf-8')).encode('utf-8')
+        fingerprint = _digest(minified)[:FINGERPRINT_LENGTH]
+        output_name = f'{root}.{fingerprint}{ext}'
+
+        output_path = os.path.join(dist_dir, output_name)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(minified)
+        # mtime固定为0，相同内容的构建结果逐字节一致
+        with open(output_path + '.gz', 'wb') as f:
+            f.write(gzip.compress(minified, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(output_path + '.br', 'wb') as f:
+                f.write(brotli.compress(minified, quality=11))
+
+        manifest[asset] = {
+            'file': output_name,
+            'source': _digest(source),
+            'size': len(source),
+            'minified': len(minified),
+        }
+        logger.info(f"构建 {asset} -> {output_name}（{len(source)} -> {len(minified)} 字节）")
+
+    _remove_stale(dist_dir, {entry['file'] for entry in manifest.values()})
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _remove_stale(dist_dir, keep):
+    """
+    @brief  删除不在本次清单中的构建产物
+    @param  dist_dir: 构建产物目录
+    @param  keep: 需要保留的文件相对路径集合
+    @retval None
+    """
+    for dirpath, _, filenames in os.walk(dist_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(path, dist_dir).replace(os.sep, '/')
+            base = relative
+            for _, suffix in ENCODINGS:
+                if base.endswith(suffix):
+                    base = base[:-len(suffix)]
+            if relative != MANIFEST_NAME and base not in keep:
+                os.remove(path)
+
+
+class AssetBundle:
+    """
+    @brief  运行时的构建产物集合
+    @details 启动时把清单中源文件未变化的资源全部读入内存；
+             源文件在构建之后被修改的资源回退到普通静态文件地址
+    """
+
+    def __init__(self, static_dir=DEFAULT_STATIC_DIR):
+        """
+        @brief  加载清单和构建产物
+        @param  static_dir: 静态文件目录
+        """
+        self.static_dir = static_dir
+        # 资源路径到带指纹文件名的映射
+        self.urls = {}
+        # 带指纹文件名到(媒体类型, {编码: 内容})的映射
+        self.files = {}
+
+        dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+        try:
+            with open(os.path.join(dist_dir, MANIFEST_NAME), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for asset, entry in manifest.items():
+            try:
+                with open(os.path.join(static_dir, asset), 'rb') as f:
+                    if _digest(f.read()) != entry['source']:
+                        logger.warning(f"{asset} 在构建后被修改，使用未压缩的原文件")
+                        continue
+                self.files[entry['file']] = self._load(dist_dir, entry['file'])
+            except OSError:
+                continue
+            self.urls[asset] = entry['file']
+
+    @staticmethod
+    def _load(dist_dir, name):
+        """
+        @brief  读取一个构建产物及其预压缩文件
+        @param  dist_dir: 构建产物目录
+        @param  name: 带指纹的文件名
+        @retval tuple: (媒体类型, {编码: 内容})
+        """
+        path = os.path.join(dist_dir, name)
+        with open(path, 'rb') as f:
+            variants = {'identity': f.read()}
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    variants[encoding] = f.read()
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/') or mimetype.endswith('javascript'):
+            mimetype += '; charset=utf-8'
+        return mimetype, variants
+
+    def url(self, filename):
+        """
+        @brief  获取资源地址，用法同 url_for('static', filename=...)
+        @param  filename: 资源路径（相对静态目录）
+        @retval str: 已构建时为带指纹的地址，否则为普通静态文件地址
+        """
+        fingerprinted = self.urls.get(filename)
+        if fingerprinted is None:
+            return url_for('static', filename=filename)
+        return url_for('assets', filename=fingerprinted)
+
+    def serve(self, filename):
+        """
+        @brief  返回带指纹的资源，优先使用客户端支持的预压缩版本
+        @param  filename: 带指纹的文件名
+        @retval Response: 响应对象
+        """
+        found = self.files.get(filename)
+        if found is None:
+            return Response(status=404)
+        mimetype, variants = found
+
+        etag = filename.rsplit('/', 1)[-1]
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            accepted = request.accept_encodings
+            encoding = next((name for name, _ in ENCODINGS if name in variants and accepted[name]), 'identity')
+            response = Response(variants[encoding], content_type=mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def init_assets(app, static_dir=None):
+    """
+    @brief  为Flask应用启用构建后的静态资源
+    @details 注册 /assets/<filename> 路由和模板函数 asset_url()；
+             未执行构建时 asset_url() 等同于 url_for('static', filename=...)
+    @param  app: Flask应用实例
+    @param  static_dir: 静态文件目录，默认为应用的静态目录
+    @retval AssetBundle: 构建产物集合
+    """
+    bundle = AssetBundle(static_dir or app.static_folder)
+    app.add_url_rule('/assets/<path:filename>', 'assets', bundle.serve)
+    app.add_template_global(bundle.url, 'asset_url')
+    app.extensions['assets'] = bundle
+    return bundle
@@ -0,0 +1,57 @@
+"""
+@file    bench_analytics.py
+@brief   游戏事件分析基准测试
+@details 生成指定数量的随机死亡事件，测量死亡热力图和每日得分分布的耗时
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python benchmarks/bench_analytics.py [事件数]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import analytics
+from game.events import EVENT_DEATH, GameEvent, SQLiteEventSink
+from game.snake_game import GRID_HEIGHT, GRID_WIDTH
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    if not analytics.available():
+        print('未安装NumPy，跳过')
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    cells = GRID_WIDTH * GRID_HEIGHT
+    now = time.time()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.db')
+        sink = SQLiteEventSink(path)
+        sink.write(GameEvent(now - random.random() * 30 * analytics.SECONDS_PER_DAY, i % 1000, EVENT_DEATH,
+                             0, random.randrange(50) * 10, random.randrange(cells), random.randrange(1, 3),
+                             GRID_WIDTH, GRID_HEIGHT)
+                   for i in range(count))
+        sink.close()
+
+        start = time.perf_counter()
+        heatmap = analytics.death_heatmap(path, GRID_WIDTH, GRID_HEIGHT)
+        elapsed = time.perf_counter() - start
+        print(f'死亡热力图 {heatmap["deaths"]} 局: {elapsed * 1000:.1f} 毫秒，每秒 {count / elapsed:.0f} 个事件')
+
+        start = time.perf_counter()
+        days = analytics.score_distribution(path)
+        elapsed = time.perf_counter() - start
+        print(f'得分分布 {len(days)} 天: {elapsed * 1000:.1f} 毫秒，每秒 {count / elapsed:.0f} 个事件')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+@file    bench_arena.py
+@brief   多人竞技场基准测试
+@details 在不同棋盘尺寸和蛇数量下测量每步耗时。相同蛇数量时各棋盘尺寸的结果应接近，
+         说明每步开销与蛇的数量成正比，与棋盘面积无关
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python benchmarks/bench_arena.py [每个场景的步数]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.arena import DIRECTION_NAMES, Arena
+
+# 测试的棋盘边长
+BOARD_SIZES = (200, 1000, 2000)
+
+# 测试的蛇数量
+SNAKE_COUNTS = (100, 500)
+
+
+def measure(size, snake_count, ticks):
+    """
+    @brief  运行指定步数，死亡的蛇立即补充
+    @param  size: 棋盘边长
+    @param  snake_count: 蛇的数量
+    @param  ticks: 步数
+    @retval float: 每步平均耗时（毫秒）
+    """
+    arena = Arena(size, size, food_count=snake_count, seed=1)
+    for _ in range(snake_count):
+        arena.add_snake()
+    rng = random.Random(2)
+    elapsed = 0.0
+    for _ in range(ticks):
+        for snake_id in arena.snakes:
+            if rng.random() < 0.1:
+                arena.set_direction(snake_id, rng.choice(DIRECTION_NAMES))
+        start = time.perf_counter()
+        dead = arena.tick()
+        elapsed += time.perf_counter() - start
+        for _ in dead:
+            arena.add_snake()
+    return elapsed / ticks * 1000
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f'Python {sys.version.split()[0]}，每个场景 {ticks} 步')
+    print(f'{"棋盘":>11} {"蛇数":>6} {"毫秒/步":>10} {"微秒/蛇":>10}')
+    for snake_count in SNAKE_COUNTS:
+        for size in BOARD_SIZES:
+            per_tick = measure(size, snake_count, ticks)
+            print(f'{size:>5}x{size:<5} {snake_count:>6} {per_tick:>10.3f} {per_tick * 1000 / snake_count:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
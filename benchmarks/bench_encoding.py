@@ -0,0 +1,97 @@
+"""
+@file    bench_encoding.py
+@brief   游戏状态编码基准测试
+@details 比较Flask默认JSON提供者、快速JSON提供者、预编码游戏状态编码器和二进制格式
+         序列化 {'status': 'success', 'game_state': ...} 的吞吐量。
+         单线程运行，结果即每个CPU核心的 次/秒 和 字节/秒
+@author  AI Assistant
+@date    2026-10-19
+@version V1.1.0
+
+用法: python benchmarks/bench_encoding.py [每个场景运行秒数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from game.snake_game import SnakeGame, GameState_e
+from game.codec import encode_game_state, encode_game_state_binary
+from routes.json_provider import FastJSONProvider
+
+# 测试的蛇身长度
+SNAKE_LENGTHS = (3, 50, 200, 399)
+
+
+def make_game(length):
+    """
+    @brief  构造指定长度的进行中游戏（蛇身按蛇形路线铺满网格）
+    @param  length: 蛇身长度
+    @retval SnakeGame: 游戏实例
+    """
+    game = SnakeGame()
+    game.reset()
+    path = []
+    for y in range(game.grid_height):
+        row = range(game.grid_width) if y % 2 == 0 else reversed(range(game.grid_width))
+        path.extend((x, y) for x in row)
+    game.snake_body = list(reversed(path[:length]))
+    game.food_position = path[-1]
+    game.game_state = GameState_e.PLAYING
+    return game
+
+
+def measure(encode, seconds):
+    """
+    @brief  在指定时间内重复编码
+    @param  encode: 无参编码函数，返回字节串
+    @param  seconds: 运行秒数
+    @retval tuple: (次/秒, 字节/秒, 单次输出字节数)
+    """
+    size = len(encode())
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            encode()
+        count += 100
+    elapsed = time.perf_counter() - start
+    return count / elapsed, count * size / elapsed, size
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+
+    print(f'Python {sys.version.split()[0]}，单线程，每个场景 {seconds:g} 秒')
+    print(f'{"蛇长":>6} {"编码方式":<14} {"次/秒":>12} {"MB/秒":>10} {"字节/次":>8} {"相对默认":>8}')
+    for length in SNAKE_LENGTHS:
+        game = make_game(length)
+        scenarios = {
+            '默认jsonify': lambda: default_provider.dumps(
+                {'status': 'success', 'game_state': game.get_state()}, separators=(',', ':')).encode(),
+            '快速提供者': lambda: fast_provider.dumps(
+                {'status': 'success', 'game_state': game.get_state()}).encode(),
+            '预编码状态': lambda: b'{"status":"success","game_state":' + encode_game_state(game) + b'}',
+            '二进制状态': lambda: encode_game_state_binary(game),
+        }
+        baseline = None
+        for name, encode in scenarios.items():
+            rate, byte_rate, size = measure(encode, seconds)
+            baseline = baseline or rate
+            print(f'{length:>6} {name:<14} {rate:>12,.0f} {byte_rate / 1e6:>10.1f} {size:>8} {rate / baseline:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
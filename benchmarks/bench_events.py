@@ -0,0 +1,56 @@
+"""
+@file    bench_events.py
+@brief   游戏事件基准测试
+@details 测量游戏循环中记录一个事件的耗时，以及后台线程按批写入SQLite的吞吐量
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python benchmarks/bench_events.py [事件数]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.events import EVENT_FOOD, EventRecorder, EventRing, EventWriter, SQLiteEventSink
+from game.snake_game import SnakeGame
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    game = SnakeGame(highscore=0)
+    game.reset()
+    ring = EventRing(capacity=count)
+    recorder = EventRecorder(ring, 1)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        recorder(game, EVENT_FOOD, 0)
+    record = time.perf_counter() - start
+    print(f'记录 {count} 个事件: {record * 1000:.1f} 毫秒，每个 {record / count * 1e6:.2f} 微秒')
+
+    with tempfile.TemporaryDirectory() as directory:
+        for batch_size in (1, 64, 512, 4096):
+            ring.drain(count)
+            ring.batch_size = batch_size
+            for _ in range(count):
+                recorder(game, EVENT_FOOD, 0)
+            pending = len(ring)
+            writer = EventWriter(ring, SQLiteEventSink(os.path.join(directory, f'events-{batch_size}.db')))
+            start = time.perf_counter()
+            writer.flush()
+            elapsed = time.perf_counter() - start
+            writer.close()
+            print(f'每批 {batch_size:>5} 个: {pending / elapsed:>10.0f} 事件/秒（{writer.batches_written} 个事务）')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+@file    bench_memory.py
+@brief   游戏实例内存与分配基准测试
+@details 用 tracemalloc 比较 SnakeGame 和 CompactSnakeGame：
+         每局游戏占用的字节数（创建并重置后仍保留的内存）、每步的临时分配峰值（每步前重置峰值，
+         统计步内超出步前水平的字节数）、每步保留的字节数，以及不开启 tracemalloc 时的每秒步数
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python benchmarks/bench_memory.py [游戏局数]
+"""
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.snake_game import SnakeGame
+from game.compact_game import CompactSnakeGame
+
+# 每局游戏运行的步数
+TICKS_PER_GAME = 50
+
+# 比较的游戏实现
+ENGINES = {'SnakeGame': SnakeGame, 'CompactSnakeGame': CompactSnakeGame}
+
+
+def make_games(engine, count):
+    """
+    @brief  创建并开始多局游戏
+    @param  engine: 游戏类
+    @param  count: 局数
+    @retval list: 游戏实例
+    """
+    games = []
+    for _ in range(count):
+        game = engine()
+        game.reset()
+        game.start()
+        games.append(game)
+    return games
+
+
+def run_ticks(games):
+    """
+    @brief  每局游戏按固定路线转圈前进，不撞墙
+    @param  games: 游戏实例列表
+    @retval int: 总步数
+    """
+    turns = ('up', 'left', 'down', 'right')
+    for step in range(TICKS_PER_GAME):
+        for game in games:
+            if step % 3 == 0:
+                game.set_direction(turns[step // 3 % 4])
+            game.update()
+    return TICKS_PER_GAME * len(games)
+
+
+def peak_above(call):
+    """
+    @brief  测量一次调用期间的内存峰值超出调用前水平的字节数
+    @param  call: 无参函数
+    @retval int: 字节数
+    """
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    call()
+    return tracemalloc.get_traced_memory()[1] - current
+
+
+def measure(engine, count):
+    """
+    @brief  测量一种游戏实现
+    @param  engine: 游戏类
+    @param  count: 局数
+    @retval tuple: (字节/局, 临时分配峰值字节/步, 保留字节/步, 步/秒)
+    """
+    random.seed(1)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = make_games(engine, count)
+    per_game = (tracemalloc.get_traced_memory()[0] - before) / count
+
+    sample = games[:100]
+    ticks = TICKS_PER_GAME * len(sample)
+    # 读取峰值本身的分配，从每步的临时分配中扣除
+    overhead = peak_above(lambda: None)
+    transient = 0
+    retained_before = tracemalloc.get_traced_memory()[0]
+    for step in range(TICKS_PER_GAME):
+        for game in sample:
+            if step % 3 == 0:
+                game.set_direction(('up', 'left', 'down', 'right')[step // 3 % 4])
+            transient += peak_above(game.update) - overhead
+    retained = (tracemalloc.get_traced_memory()[0] - retained_before) / ticks
+    tracemalloc.stop()
+
+    random.seed(1)
+    games = make_games(engine, count)
+    start = time.perf_counter()
+    ticks_run = run_ticks(games)
+    rate = ticks_run / (time.perf_counter() - start)
+    return per_game, transient / ticks, retained, rate
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f'Python {sys.version.split()[0]}，{count} 局游戏，每局 {TICKS_PER_GAME} 步')
+    print(f'{"实现":<18} {"字节/局":>10} {"临时峰值字节/步":>16} {"保留字节/步":>12} {"步/秒":>12}')
+    for name, engine in ENGINES.items():
+        per_game, transient, retained, rate = measure(engine, count)
+        print(f'{name:<18} {per_game:>10,.0f} {transient:>16.1f} {retained:>12.2f} {rate:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+@file    bench_startup.py
+@brief   启动耗时基准测试
+@details 在独立子进程中分别测量导入 app 模块、创建完整应用和创建无蓝图应用的耗时，
+         并列出 python -X importtime 统计的累计导入耗时最高的模块
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python benchmarks/bench_startup.py [运行次数]
+"""
+
+import os
+import sys
+import subprocess
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 场景名称到子进程执行代码的映射
+SCENARIOS = {
+    'import app': 'import app',
+    'create_app()': 'import app; app.create_app()',
+    'create_app(无蓝图)': "import app; app.create_app({'BLUEPRINTS': ()})",
+}
+
+TIMER_TEMPLATE = (
+    'import time; _t = time.perf_counter(); {code}; '
+    'print((time.perf_counter() - _t) * 1000)'
+)
+
+
+def run_scenario(code, runs):
+    """
+    @brief  在子进程中重复运行代码并计时
+    @param  code: 要执行的代码
+    @param  runs: 运行次数
+    @retval list: 每次运行耗时（毫秒）
+    """
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', TIMER_TEMPLATE.format(code=code)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def top_imports(code, limit=10):
+    """
+    @brief  统计累计导入耗时最高的顶层模块
+    @param  code: 要执行的代码
+    @param  limit: 返回条数
+    @retval list: (累计耗时微秒, 模块名) 列表
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    entries = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if not line.startswith('import time:') or len(parts) != 3 or 'cumulative' in line:
+            continue
+        name_field = parts[2][1:]
+        # importtime 用每级两个空格的缩进表示嵌套层级，只统计顶层导入
+        if name_field.startswith(' '):
+            continue
+        entries.append((int(parts[1]), name_field.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f'Python {sys.version.split()[0]}，每个场景运行 {runs} 次')
+    for name, code in SCENARIOS.items():
+        timings = run_scenario(code, runs)
+        print(f'{name:<20} 中位数 {statistics.median(timings):8.1f} ms  '
+              f'最小 {min(timings):8.1f} ms')
+
+    print('\ncreate_app() 累计导入耗时最高的顶层模块:')
+    for cumulative, name in top_imports('import app; app.create_app()'):
+        print(f'  {cumulative / 1000:8.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main()
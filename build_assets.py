@@ -0,0 +1,32 @@
+"""
+@file    build_assets.py
+@brief   静态资源构建脚本
+@details 压缩CSS/JS、生成gzip/brotli预压缩文件和带内容指纹的文件名，输出到 static/dist/
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python build_assets.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from assets import build_assets
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    manifest = build_assets()
+    source_bytes = sum(entry['size'] for entry in manifest.values())
+    minified_bytes = sum(entry['minified'] for entry in manifest.values())
+    print(f"共构建 {len(manifest)} 个资源：{source_bytes} -> {minified_bytes} 字节")
+
+
+if __name__ == '__main__':
+    main()
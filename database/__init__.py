@@ -8,7 +8,11 @@
 """
 
 from .db_config import db, init_db
-from .models import User, PasswordResetToken
+from .models import User, PasswordResetToken, UserStats, GameScore
 from .user_dao import UserDAO
+from .session_store import init_session_store
+from .user_stats import init_user_stats
+from .score_queue import init_score_queue
 
-__all__ = ['db', 'init_db', 'User', 'PasswordResetToken', 'UserDAO']
+__all__ = ['db', 'init_db', 'User', 'PasswordResetToken', 'UserStats', 'GameScore', 'UserDAO',
+           'init_session_store', 'init_user_stats', 'init_score_queue']
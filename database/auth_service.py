@@ -12,7 +12,7 @@ import hashlib
 import logging
 from datetime import datetime
 from functools import wraps
-from flask import request, jsonify, session
+from flask import current_app, has_app_context, request, jsonify, session
 from .user_dao import UserDAO, PasswordResetTokenDAO
 from .validators import UserValidator
 
@@ -256,9 +256,21 @@ class AuthService:
     def get_user_info(user_id):
         """
         @brief  获取用户信息
+        @details 应用开启了用户统计（见 database.user_stats）时从资料缓存读取，并附带游戏统计
         @param  user_id: 用户ID
-        @retval dict: 包含用户信息的字典
+        @retval dict: 包含用户信息（及统计值）的字典
         """
+        stats = current_app.extensions.get('user_stats') if has_app_context() else None
+        if stats is not None:
+            info = stats.get_user_info(user_id)
+            if info is None:
+                return {'success': False, 'message': '用户不存在'}
+            return {
+                'success': True,
+                'user': info['user'],
+                'stats': info['stats']
+            }
+
         user = UserDAO.get_user_by_id(user_id)
         if not user:
             return {'success': False, 'message': '用户不存在'}
@@ -286,6 +298,6 @@ def login_required(f):
                     'need_login': True
                 }), 401
             from flask import redirect, url_for
-            return redirect(url_for('login_page', message='请先登录后再开始游戏'))
+            return redirect(url_for('pages.login_page', message='请先登录后再开始游戏'))
         return f(*args, **kwargs)
     return decorated_function
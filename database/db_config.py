@@ -1,13 +1,16 @@
 """
 @file    db_config.py
 @brief   数据库配置和连接管理
-@details 配置SQLite数据库连接，提供数据库初始化功能
+@details 配置SQLite数据库连接，提供数据库初始化功能。
+         表结构按模型定义计算版本号并记录在SQLite的user_version中，
+         版本一致时跳过create_all，避免每次启动都检查所有表
 @author  AI Assistant
 @date    2026-02-17
-@version V1.0.0
+@version V1.1.0
 """
 
 import os
+import zlib
 import logging
 from flask_sqlalchemy import SQLAlchemy
 
@@ -16,25 +19,82 @@ db = SQLAlchemy()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'snake_game.db')
+
+# 本进程内已确认表结构为最新的数据库URI
+_checked_schemas = set()
+
+
+def schema_version():
+    """
+    @brief  根据模型定义计算表结构版本号
+    @details 对所有表名、列名、列类型和约束做CRC32，取31位作为SQLite user_version
+    @retval int: 表结构版本号
+    """
+    from . import models  # noqa: F401  确保所有模型已注册到元数据
+
+    parts = []
+    for table in sorted(db.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        for column in table.columns:
+            parts.append(f'{column.name}:{column.type}:{column.nullable}:{column.primary_key}:{column.unique}')
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            parts.append(f'index:{index.name}:{",".join(c.name for c in index.columns)}')
+    return zlib.crc32('|'.join(parts).encode('utf-8')) & 0x7fffffff
+
+
+def ensure_schema(app):
+    """
+    @brief  确保数据库表结构为最新
+    @details SQLite数据库读取user_version与模型版本比较，一致时直接返回；
+             其他数据库或版本不一致时执行create_all并更新版本号
+    @param  app: Flask应用实例
+    @retval bool: 是否执行了create_all
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    version = schema_version()
+    cache_key = (uri, version)
+    if cache_key in _checked_schemas:
+        return False
+
+    with app.app_context():
+        engine = db.engine
+        is_sqlite = engine.dialect.name == 'sqlite'
+        if is_sqlite:
+            with engine.connect() as conn:
+                stored_version = conn.exec_driver_sql('PRAGMA user_version').scalar()
+            if stored_version == version:
+                _checked_schemas.add(cache_key)
+                return False
+
+        db.create_all()
+        if is_sqlite:
+            with engine.connect() as conn:
+                conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+                conn.commit()
+        logger.info("数据库表创建成功")
+
+    # 内存数据库每个连接都是新库，不能跨应用实例缓存
+    if ':memory:' not in uri and uri != 'sqlite://':
+        _checked_schemas.add(cache_key)
+    return True
+
 
 def init_db(app):
     """
     @brief  初始化数据库连接
+    @details 未配置 SQLALCHEMY_DATABASE_URI 时使用项目根目录下的 snake_game.db
     @param  app: Flask应用实例
     @retval None
     """
-    database_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'snake_game.db')
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ECHO'] = False
-    
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', f'sqlite:///{DEFAULT_DATABASE_PATH}')
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    app.config.setdefault('SQLALCHEMY_ECHO', False)
+
     db.init_app(app)
-    
-    with app.app_context():
-        try:
-            db.create_all()
-            logger.info("数据库表创建成功")
-        except Exception as e:
-            logger.error(f"数据库表创建失败: {str(e)}")
-            raise
+
+    try:
+        ensure_schema(app)
+    except Exception as e:
+        logger.error(f"数据库表创建失败: {str(e)}")
+        raise
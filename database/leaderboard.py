@@ -0,0 +1,332 @@
+"""
+@file    leaderboard.py
+@brief   排行榜
+@details 总榜、日榜（UTC当天）和周榜（UTC本周，周一开始）各保存每个用户在该时间段内的最高分，
+         按 (-得分, 用户ID) 排序的列表用二分查找定位，分页使用 (得分, 用户ID) 游标而不是 OFFSET。
+         第一次使用时每个榜单以一次 GROUP BY 查询加载，之后只按成绩ID增量读取新成绩：
+         本进程的成绩队列提交后立即同步，其他进程写入的成绩最迟 sync_interval 秒后同步，
+         排行榜请求本身不查询数据库。渲染好的每页JSON连同ETag缓存在榜单中，
+         排名变化时只丢弃变化位置及之后的页面，排名靠前且未变化的页面继续命中缓存
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import time
+import base64
+import hashlib
+import binascii
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func, select
+from .db_config import db
+from .models import GameScore, User
+
+# 榜单时间窗口
+WINDOWS = ('global', 'daily', 'weekly')
+
+# 默认同步其他进程成绩的间隔（秒）、每个榜单缓存的页面数
+DEFAULT_SYNC_INTERVAL = 5.0
+DEFAULT_CACHE_PAGES = 256
+
+# 缓存的一页：JSON字节内容、ETag、最后修改时间、页面最后一项的排序键（不满一页时为None）
+CachedPage = namedtuple('CachedPage', 'body etag last_modified last_key')
+
+
+def period_start(window: str, now: datetime) -> Optional[datetime]:
+    """
+    @brief  计算时间窗口的起始时间
+    @param  window: 时间窗口
+    @param  now: 当前时间（UTC）
+    @retval datetime: 起始时间（UTC），总榜为None
+    """
+    if window == 'global':
+        return None
+    day = datetime(now.year, now.month, now.day)
+    if window == 'daily':
+        return day
+    return day - timedelta(days=now.weekday())
+
+
+def encode_cursor(key: Tuple[int, int]) -> str:
+    """
+    @brief  把排序键编码为分页游标
+    @param  key: (-得分, 用户ID)
+    @retval str: URL安全的游标字符串
+    """
+    raw = f'{-key[0]}.{key[1]}'.encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    @brief  解析分页游标
+    @param  cursor: 游标字符串
+    @retval tuple: (-得分, 用户ID)
+    @throws ValueError: 游标格式错误
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        score, user_id = raw.split('.')
+        return -int(score), int(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('无效的分页游标')
+
+
+class RankedBoard:
+    """
+    @brief  一个时间窗口的排名
+    @details 由 Leaderboard 的锁保护
+    """
+
+    def __init__(self, start: Optional[datetime]):
+        """
+        @brief  创建空榜单
+        @param  start: 时间窗口起始时间，总榜为None
+        """
+        self.start = start
+        # 用户ID到最高分，以及升序排列的 (-得分, 用户ID)
+        self.best: Dict[int, int] = {}
+        self.keys = []
+        # (游标键, 每页条数) 到缓存的页面，按插入顺序淘汰
+        self.pages: Dict[tuple, CachedPage] = {}
+
+    def offer(self, user_id: int, score: int) -> Optional[Tuple[int, int]]:
+        """
+        @brief  提交一个成绩，高于用户当前最高分时更新排名
+        @param  user_id: 用户ID
+        @param  score: 得分
+        @retval tuple: 用户的新排序键，排名未变化时为None
+        """
+        old = self.best.get(user_id)
+        if old is not None:
+            if old >= score:
+                return None
+            del self.keys[bisect_left(self.keys, (-old, user_id))]
+        key = (-score, user_id)
+        insort(self.keys, key)
+        self.best[user_id] = score
+        return key
+
+    def invalidate_from(self, key: Tuple[int, int]) -> None:
+        """
+        @brief  丢弃包含该排序键及之后位置的缓存页面
+        @details 分数只会提高，用户的新位置总在旧位置之前，新位置之前的条目和名次都不变
+        @param  key: 最靠前的变化位置
+        @retval None
+        """
+        self.pages = {page_key: page for page_key, page in self.pages.items()
+                      if page.last_key is not None and page.last_key < key}
+
+
+class Leaderboard:
+    """
+    @brief  排行榜
+    @details _lock 保护榜单、用户名和页面缓存；_sync_lock 串行化数据库同步，
+             已加载后同步进行中的请求不等待，直接使用当前排名
+    """
+
+    def __init__(self, app, sync_interval: float = DEFAULT_SYNC_INTERVAL, cache_pages: int = DEFAULT_CACHE_PAGES):
+        """
+        @brief  创建排行榜，第一次请求时从数据库加载
+        @param  app: Flask应用实例，同步时在其应用上下文中访问数据库
+        @param  sync_interval: 同步其他进程成绩的间隔（秒）
+        @param  cache_pages: 每个榜单缓存的页面数
+        """
+        self.app = app
+        self.sync_interval = sync_interval
+        self.cache_pages = cache_pages
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._boards: Dict[str, RankedBoard] = {}
+        self._names: Dict[int, Optional[str]] = {}
+        # 已同步的最大成绩ID，None表示尚未加载
+        self._last_score_id: Optional[int] = None
+        self._synced_at = 0.0
+        self._stale = False
+        # 页面缓存命中和未命中次数，数据库同步次数
+        self.hits = 0
+        self.misses = 0
+        self.syncs = 0
+
+    def mark_stale(self, batch=None) -> None:
+        """
+        @brief  标记有新成绩写入，下次请求时同步（作为成绩队列的回调）
+        @param  batch: 写入的成绩列表，未使用
+        @retval None
+        """
+        self._stale = True
+
+    def _expired_windows(self, now: datetime) -> list:
+        """
+        @brief  找出时间段已经结束的榜单
+        @param  now: 当前时间（UTC）
+        @retval list: 时间窗口列表
+        """
+        return [window for window, board in self._boards.items() if board.start != period_start(window, now)]
+
+    def sync(self) -> None:
+        """
+        @brief  按需从数据库同步新成绩
+        @details 尚未加载或有榜单跨入新的时间段时阻塞等待同步；
+                 有新成绩或距上次同步超过 sync_interval 时同步，其他请求正在同步时跳过
+        @retval None
+        """
+        now = datetime.utcnow()
+        blocking = self._last_score_id is None or bool(self._expired_windows(now))
+        if not (blocking or self._stale or time.monotonic() - self._synced_at >= self.sync_interval):
+            return
+        if not self._sync_lock.acquire(blocking=blocking):
+            return
+        try:
+            self._stale = False
+            with self.app.app_context():
+                if self._last_score_id is None:
+                    self._load(WINDOWS, now)
+                else:
+                    self._load_since()
+                    expired = self._expired_windows(now)
+                    if expired:
+                        self._load(expired, now)
+            self._synced_at = time.monotonic()
+            self.syncs += 1
+        finally:
+            self._sync_lock.release()
+
+    def _load(self, windows, now: datetime) -> None:
+        """
+        @brief  以 GROUP BY 查询重新加载榜单，需持有 _sync_lock
+        @param  windows: 时间窗口序列
+        @param  now: 当前时间（UTC）
+        @retval None
+        """
+        upto = self._last_score_id
+        if upto is None:
+            upto = db.session.execute(select(func.max(GameScore.score_id))).scalar() or 0
+        boards = {}
+        names = {}
+        for window in windows:
+            board = boards[window] = RankedBoard(period_start(window, now))
+            query = (select(GameScore.user_id, func.max(GameScore.score), User.username)
+                     .outerjoin(User, User.user_id == GameScore.user_id)
+                     .where(GameScore.score_id <= upto)
+                     .group_by(GameScore.user_id, User.username))
+            if board.start is not None:
+                query = query.where(GameScore.finished_at >= board.start)
+            for user_id, score, username in db.session.execute(query):
+                names[user_id] = username
+                board.best[user_id] = score
+                board.keys.append((-score, user_id))
+            board.keys.sort()
+        with self._lock:
+            self._names.update(names)
+            self._boards.update(boards)
+            self._last_score_id = upto
+
+    def _load_since(self) -> None:
+        """
+        @brief  读取上次同步之后写入的成绩并更新各榜单，需持有 _sync_lock
+        @retval None
+        """
+        query = (select(GameScore.score_id, GameScore.user_id, GameScore.score, GameScore.finished_at,
+                        User.username)
+                 .outerjoin(User, User.user_id == GameScore.user_id)
+                 .where(GameScore.score_id > self._last_score_id)
+                 .order_by(GameScore.score_id))
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        with self._lock:
+            changed = {}
+            for score_id, user_id, score, finished_at, username in rows:
+                self._names[user_id] = username
+                for window, board in self._boards.items():
+                    if board.start is not None and finished_at < board.start:
+                        continue
+                    key = board.offer(user_id, score)
+                    if key is not None and (window not in changed or key < changed[window]):
+                        changed[window] = key
+            for window, key in changed.items():
+                self._boards[window].invalidate_from(key)
+            self._last_score_id = rows[-1][0]
+
+    def _render(self, board: RankedBoard, window: str, after, limit: int) -> CachedPage:
+        """
+        @brief  渲染一页排名，需持有 _lock
+        @param  board: 榜单
+        @param  window: 时间窗口
+        @param  after: 从该排序键之后开始，None为第一页
+        @param  limit: 每页条数
+        @retval CachedPage: 页面
+        """
+        first = 0 if after is None else bisect_right(board.keys, after)
+        keys = board.keys[first:first + limit]
+        full = len(keys) == limit
+        body = self.app.json.dumps({
+            'success': True,
+            'window': window,
+            'period_start': board.start.isoformat() if board.start is not None else None,
+            'entries': [{'rank': first + i + 1, 'user_id': user_id, 'username': self._names.get(user_id),
+                         'score': -negative_score}
+                        for i, (negative_score, user_id) in enumerate(keys)],
+            'next_cursor': encode_cursor(keys[-1]) if full else None
+        }).encode('utf-8')
+        return CachedPage(body, hashlib.sha256(body).hexdigest()[:20],
+                          datetime.fromtimestamp(int(time.time()), timezone.utc), keys[-1] if full else None)
+
+    def page(self, window: str, after: Optional[Tuple[int, int]] = None, limit: int = 20) -> CachedPage:
+        """
+        @brief  获取一页排名
+        @details 满页时返回下一页游标，不满一页表示已到末尾
+        @param  window: 时间窗口，见 WINDOWS
+        @param  after: 从该排序键之后开始（由 decode_cursor 解析），None为第一页
+        @param  limit: 每页条数
+        @retval CachedPage: 页面
+        """
+        self.sync()
+        with self._lock:
+            board = self._boards[window]
+            key = (after, limit)
+            page = board.pages.get(key)
+            if page is not None:
+                self.hits += 1
+                return page
+            self.misses += 1
+            page = board.pages[key] = self._render(board, window, after, limit)
+            while len(board.pages) > self.cache_pages:
+                del board.pages[next(iter(board.pages))]
+            return page
+
+    def cached_pages(self) -> int:
+        """
+        @brief  统计缓存的页面数
+        @retval int: 页面数
+        """
+        return sum(len(board.pages) for board in self._boards.values())
+
+
+def init_leaderboard(app):
+    """
+    @brief  为Flask应用创建排行榜，并在成绩队列提交后标记需要同步
+    @details 配置项（均可由同名环境变量提供）：LEADERBOARD_SYNC_INTERVAL 同步其他进程成绩的间隔（秒）；
+             LEADERBOARD_CACHE_PAGES 每个榜单缓存的页面数
+    @param  app: Flask应用实例
+    @retval Leaderboard: 排行榜
+    """
+    def setting(name, default):
+        return app.config.get(name, os.environ.get(name, default))
+
+    leaderboard = Leaderboard(
+        app,
+        sync_interval=float(setting('LEADERBOARD_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)),
+        cache_pages=int(setting('LEADERBOARD_CACHE_PAGES', DEFAULT_CACHE_PAGES))
+    )
+    scores = app.extensions.get('score_queue')
+    if scores is not None:
+        scores.listeners.append(leaderboard.mark_stale)
+    app.extensions['leaderboard'] = leaderboard
+    return leaderboard
@@ -1,7 +1,7 @@
 """
 @file    models.py
 @brief   数据库模型定义
-@details 定义用户信息表和密码重置令牌表的数据结构
+@details 定义用户信息表、密码重置令牌表、用户游戏统计表和游戏成绩表的数据结构
 @author  AI Assistant
 @date    2026-02-17
 @version V1.0.0
@@ -81,3 +81,60 @@ class PasswordResetToken(db.Model):
     
     def __repr__(self):
         return f'<PasswordResetToken {self.token[:10]}...>'
+
+
+class UserStats(db.Model):
+    """
+    @brief  用户游戏统计表模型
+    @details 每个用户一行累计值，每局游戏结束时增量更新（见 database.user_stats），读取时不扫描游戏记录
+    """
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    games_played = db.Column(db.Integer, nullable=False, default=0)
+    food_eaten = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+    play_time_ms = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
+
+
+class GameScore(db.Model):
+    """
+    @brief  游戏成绩表模型
+    @details 每局结束的游戏一行，由后台队列批量插入（见 database.score_queue），同一用户的成绩ID按结束顺序递增。
+             (user_id, score) 索引使排行榜加载各用户最高分时只扫描索引
+    """
+    __tablename__ = 'game_scores'
+    __table_args__ = (db.Index('ix_game_scores_user_score', 'user_id', 'score'),)
+
+    score_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    food_eaten = db.Column(db.Integer, nullable=False, default=0)
+    play_time_ms = db.Column(db.Integer, nullable=False, default=0)
+    grid_width = db.Column(db.Integer, nullable=False)
+    grid_height = db.Column(db.Integer, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        """
+        @brief  将成绩对象转换为字典
+        @retval dict: 成绩信息字典
+        """
+        return {
+            'score_id': self.score_id,
+            'user_id': self.user_id,
+            'score': self.score,
+            'food_eaten': self.food_eaten,
+            'play_time_ms': self.play_time_ms,
+            'grid_width': self.grid_width,
+            'grid_height': self.grid_height,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<GameScore {self.user_id}:{self.score}>'
@@ -0,0 +1,228 @@
+"""
+@file    score_queue.py
+@brief   游戏成绩写回队列
+@details 每局游戏结束时把成绩放入有界的先进先出队列，请求线程不访问数据库；后台线程每隔一段时间
+         （或积压达到一批时）按入队顺序取出，每批以一次 executemany 和一个事务插入 game_scores 表。
+         只有一个写入线程且按入队顺序写入，同一用户的成绩ID与结束顺序一致；写入失败时整批放回队首。
+         队列满时入队方最多等待 put_timeout 秒，仍无空位则放弃该成绩并计数。进程退出时写入剩余成绩。
+         每批提交后依次调用 listeners 中的回调（如排行榜），回调参数为该批成绩
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import logging
+import threading
+from collections import deque, namedtuple
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from .db_config import db
+
+logger = logging.getLogger(__name__)
+
+# 默认队列容量、每批条数、写入间隔（秒）、队列满时的等待时间（秒）
+DEFAULT_CAPACITY = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_PUT_TIMEOUT = 0.05
+
+INSERT_SQL = text(
+    'INSERT INTO game_scores (user_id, score, food_eaten, play_time_ms, grid_width, grid_height, finished_at) '
+    'VALUES (:user_id, :score, :food_eaten, :play_time_ms, :grid_width, :grid_height, :finished_at)'
+)
+
+# 一局游戏的成绩，字段与 INSERT_SQL 的参数一致
+ScoreRecord = namedtuple('ScoreRecord', 'user_id score food_eaten play_time_ms grid_width grid_height finished_at')
+
+
+class ScoreQueue:
+    """
+    @brief  游戏成绩写回队列
+    @details 队列由 _lock 保护，_not_full 条件变量在取出成绩后通知等待的入队方；
+             写入由 _flush_lock 串行化，保证各批按入队顺序提交
+    """
+
+    def __init__(self, app, capacity: int = DEFAULT_CAPACITY, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, put_timeout: float = DEFAULT_PUT_TIMEOUT):
+        """
+        @brief  创建队列，写入线程在第一次入队时启动
+        @param  app: Flask应用实例，写入线程在其应用上下文中访问数据库
+        @param  capacity: 队列最多保存的成绩数
+        @param  batch_size: 每个事务插入的成绩数，积压达到该值时立即写入
+        @param  flush_interval: 写入间隔（秒）
+        @param  put_timeout: 队列满时入队方最多等待的时间（秒）
+        """
+        self.app = app
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # 每批提交后调用的回调，参数为该批成绩列表
+        self.listeners = []
+        # 已写入的成绩数和事务数，队列满被放弃的成绩数
+        self.scores_written = 0
+        self.batches_written = 0
+        self.rejected = 0
+
+    def submit(self, user_id: int, score: int, food_eaten: int, play_time_ms: int, grid_width: int,
+               grid_height: int, finished_at: Optional[datetime] = None) -> bool:
+        """
+        @brief  把一局结束的游戏成绩放入队列
+        @details 队列满时唤醒写入线程并等待空位，最多等待 put_timeout 秒
+        @param  user_id: 用户ID
+        @param  score: 本局得分
+        @param  food_eaten: 本局吃到的食物数
+        @param  play_time_ms: 本局游戏时长（毫秒）
+        @param  grid_width: 网格宽度
+        @param  grid_height: 网格高度
+        @param  finished_at: 结束时间（UTC），默认为当前时间
+        @retval bool: 是否已入队，队列满且等待超时时为False
+        """
+        record = ScoreRecord(user_id, score, food_eaten, play_time_ms, grid_width, grid_height,
+                             finished_at or datetime.utcnow())
+        with self._not_full:
+            if len(self._queue) >= self.capacity:
+                self._ready.set()
+                if not self._not_full.wait_for(lambda: len(self._queue) < self.capacity, self.put_timeout):
+                    self.rejected += 1
+                    return False
+            self._queue.append(record)
+            if len(self._queue) >= self.batch_size:
+                self._ready.set()
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name='score-queue', daemon=True)
+                self._thread.start()
+        return True
+
+    def __len__(self) -> int:
+        """
+        @brief  统计等待写入的成绩数
+        @retval int: 成绩数
+        """
+        return len(self._queue)
+
+    def _take(self) -> list:
+        """
+        @brief  从队首取出一批成绩并通知等待的入队方
+        @retval list: 成绩列表，队列为空时为空列表
+        """
+        with self._not_full:
+            count = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(count)]
+            if len(self._queue) < self.batch_size:
+                self._ready.clear()
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def _write(self, batch: list) -> None:
+        """
+        @brief  在一个事务中插入一批成绩
+        @param  batch: 成绩列表
+        @retval None
+        """
+        with self.app.app_context():
+            try:
+                db.session.execute(INSERT_SQL, [record._asdict() for record in batch])
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                raise
+
+    def flush(self) -> int:
+        """
+        @brief  按入队顺序分批写入队列中的所有成绩
+        @details 写入失败时该批按原顺序放回队首，下次重试
+        @retval int: 写入的成绩数
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return written
+                try:
+                    self._write(batch)
+                except Exception:
+                    with self._lock:
+                        self._queue.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+                self.scores_written += len(batch)
+                self.batches_written += 1
+                self._notify(batch)
+
+    def _notify(self, batch: list) -> None:
+        """
+        @brief  通知回调一批成绩已提交，回调出错不影响写入
+        @param  batch: 成绩列表
+        @retval None
+        """
+        for listener in self.listeners:
+            try:
+                listener(batch)
+            except Exception:
+                logger.exception('成绩写入回调失败')
+
+    def _run(self) -> None:
+        """
+        @brief  后台线程主循环
+        @retval None
+        """
+        while not self._stop.is_set():
+            self._ready.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('写入游戏成绩失败')
+                # 数据库不可用时不立即重试
+                self._stop.wait(self.flush_interval)
+
+    def close(self) -> None:
+        """
+        @brief  停止后台线程并写入剩余成绩
+        @retval None
+        """
+        self._stop.set()
+        self._ready.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('写入游戏成绩失败')
+
+
+def init_score_queue(app):
+    """
+    @brief  为Flask应用创建游戏成绩写回队列
+    @details 配置项（均可由同名环境变量提供）：SCORE_QUEUE_CAPACITY 队列容量；SCORE_QUEUE_BATCH_SIZE 每批条数；
+             SCORE_QUEUE_FLUSH_INTERVAL 写入间隔（秒）；SCORE_QUEUE_PUT_TIMEOUT 队列满时的等待时间（秒）。
+             进程退出时由应用的退出钩子（app.close_apps）写入剩余成绩
+    @param  app: Flask应用实例
+    @retval ScoreQueue: 成绩队列
+    """
+    def setting(name, default):
+        return app.config.get(name, os.environ.get(name, default))
+
+    queue = ScoreQueue(
+        app,
+        capacity=int(setting('SCORE_QUEUE_CAPACITY', DEFAULT_CAPACITY)),
+        batch_size=int(setting('SCORE_QUEUE_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+        flush_interval=float(setting('SCORE_QUEUE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)),
+        put_timeout=float(setting('SCORE_QUEUE_PUT_TIMEOUT', DEFAULT_PUT_TIMEOUT))
+    )
+    app.extensions['score_queue'] = queue
+    return queue
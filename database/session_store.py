@@ -0,0 +1,407 @@
+"""
+@file    session_store.py
+@brief   服务端会话存储
+@details 替换Flask默认的签名Cookie会话：Cookie中只保存随机生成的短会话ID，
+         会话数据保存在进程内的LRU字典中，可选溢出到SQLite文件，
+         使多个工作进程共享登录状态、进程重启后会话不丢失。
+         读取会话只需一次字典查找，不再逐请求校验HMAC和反序列化Cookie；
+         过期时间按刷新间隔惰性延长，会话未修改时不重写Cookie；
+         SQLite中已过期的会话在每保存一定数量的会话后批量删除
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import time
+import sqlite3
+import secrets
+import threading
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from werkzeug.datastructures import CallbackDict
+
+# 会话ID的随机字节数，urlsafe编码后为22个字符
+SESSION_ID_BYTES = 16
+
+# 非持久会话的空闲超时（秒）
+DEFAULT_IDLE_TIMEOUT = 24 * 3600
+
+# 惰性刷新间隔（秒）：距离上次刷新超过该时间的请求才延长过期时间并与SQLite同步
+DEFAULT_REFRESH_SECONDS = 60
+
+# 内存中最多保存的会话数
+DEFAULT_MAX_ENTRIES = 10000
+
+# 每保存多少个会话清理一次SQLite中已过期的会话
+DEFAULT_PURGE_EVERY = 1000
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """
+    @brief  服务端会话对象
+    @details 修改内容时自动标记modified，保存时据此决定是否写回存储
+    """
+
+    def __init__(self, initial=None, sid=None, new=False):
+        """
+        @brief  创建会话对象
+        @param  initial: 会话数据
+        @param  sid: 会话ID，新会话在首次保存时才分配
+        @param  new: 是否为新会话
+        """
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self._permanent = False
+
+    @property
+    def permanent(self):
+        """@brief  是否为持久会话，单独保存而不放入会话数据"""
+        return self._permanent
+
+    @permanent.setter
+    def permanent(self, value):
+        self._permanent = bool(value)
+        self.modified = True
+
+
+class _Entry:
+    """内存中的一条会话记录"""
+
+    __slots__ = ('data', 'permanent', 'expires', 'refresh_at')
+
+    def __init__(self, data, permanent, expires, refresh_at):
+        self.data = data
+        self.permanent = permanent
+        self.expires = expires
+        self.refresh_at = refresh_at
+
+
+class SQLiteSessionSpill:
+    """
+    @brief  会话的SQLite持久层
+    @details 每个线程使用独立连接；工作进程fork后首次使用时重新打开连接
+    """
+
+    def __init__(self, path):
+        """
+        @brief  打开会话数据库并建表
+        @param  path: SQLite文件路径
+        """
+        self.path = path
+        self._serializer = TaggedJSONSerializer()
+        self._local = threading.local()
+        with sqlite3.connect(path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions ('
+                         'sid TEXT PRIMARY KEY, data TEXT NOT NULL, permanent INTEGER NOT NULL, expires REAL NOT NULL)')
+        conn.close()
+
+    def _connection(self):
+        """
+        @brief  获取当前线程的连接
+        @retval sqlite3.Connection: 数据库连接
+        """
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            local.pid = os.getpid()
+        return local.conn
+
+    def load(self, sid):
+        """
+        @brief  读取会话
+        @param  sid: 会话ID
+        @retval tuple: (数据字典, 是否持久, 过期时间)，不存在或已过期时返回None
+        """
+        row = self._connection().execute(
+            'SELECT data, permanent, expires FROM sessions WHERE sid = ?', (sid,)).fetchone()
+        if row is None or row[2] <= time.time():
+            return None
+        return self._serializer.loads(row[0]), bool(row[1]), row[2]
+
+    def save(self, sid, data, permanent, expires):
+        """
+        @brief  写入会话
+        @param  sid: 会话ID
+        @param  data: 会话数据字典
+        @param  permanent: 是否持久会话
+        @param  expires: 过期时间戳
+        @retval None
+        """
+        self._connection().execute(
+            'INSERT OR REPLACE INTO sessions (sid, data, permanent, expires) VALUES (?, ?, ?, ?)',
+            (sid, self._serializer.dumps(data), int(permanent), expires))
+
+    def touch(self, sid, expires):
+        """
+        @brief  延长会话过期时间
+        @param  sid: 会话ID
+        @param  expires: 新的过期时间戳
+        @retval None
+        """
+        self._connection().execute('UPDATE sessions SET expires = ? WHERE sid = ?', (expires, sid))
+
+    def delete(self, sid):
+        """
+        @brief  删除会话
+        @param  sid: 会话ID
+        @retval None
+        """
+        self._connection().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def purge_expired(self):
+        """
+        @brief  删除所有已过期的会话
+        @retval int: 删除的行数
+        """
+        return self._connection().execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),)).rowcount
+
+
+class MemorySessionStore:
+    """
+    @brief  进程内LRU会话存储
+    @details 会话按最近刷新顺序保存在字典中，超过容量时淘汰最久未刷新的会话。
+             配置了SQLite持久层时，会话修改直接写入SQLite，内存未命中时从SQLite加载，
+             每次惰性刷新时重新与SQLite核对，使其他工作进程的登出在一个刷新间隔内生效；
+             每保存 purge_every 个会话删除一次SQLite中已过期的会话，匿名访问留下的会话不会无限累积
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, refresh_seconds=DEFAULT_REFRESH_SECONDS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, permanent_lifetime=31 * 24 * 3600, spill=None,
+                 purge_every=DEFAULT_PURGE_EVERY):
+        """
+        @brief  创建会话存储
+        @param  max_entries: 内存中最多保存的会话数
+        @param  refresh_seconds: 惰性刷新间隔（秒）
+        @param  idle_timeout: 非持久会话的空闲超时（秒）
+        @param  permanent_lifetime: 持久会话的有效期（秒）
+        @param  spill: SQLite持久层，为None时会话只保存在内存中
+        @param  purge_every: 每保存多少个会话清理一次过期会话，0为不清理
+        """
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self.idle_timeout = idle_timeout
+        self.permanent_lifetime = permanent_lifetime
+        self.spill = spill
+        self.purge_every = purge_every
+        self._entries = {}
+        self._lock = threading.Lock()
+        # 距上次清理保存的会话数，以及清理删除的会话总数
+        self._saves = 0
+        self.purged = 0
+
+    def lifetime(self, permanent):
+        """
+        @brief  获取会话有效期
+        @param  permanent: 是否持久会话
+        @retval float: 有效期（秒）
+        """
+        return self.permanent_lifetime if permanent else self.idle_timeout
+
+    def get(self, sid):
+        """
+        @brief  读取会话，必要时惰性延长过期时间
+        @param  sid: 会话ID
+        @retval _Entry: 会话记录，不存在或已过期时返回None
+        """
+        entry = self._entries.get(sid)
+        now = time.time()
+        if entry is not None and now < entry.refresh_at:
+            return entry
+        return self._refresh(sid, entry, now)
+
+    def _refresh(self, sid, entry, now):
+        """
+        @brief  刷新会话：与持久层同步并延长过期时间
+        @param  sid: 会话ID
+        @param  entry: 内存中的会话记录，可能为None
+        @param  now: 当前时间戳
+        @retval _Entry: 刷新后的会话记录，不存在或已过期时返回None
+        """
+        if self.spill is not None:
+            stored = self.spill.load(sid)
+            if stored is None:
+                self._discard(sid)
+                return None
+            data, permanent, _ = stored
+        elif entry is None or entry.expires <= now:
+            self._discard(sid)
+            return None
+        else:
+            data, permanent = entry.data, entry.permanent
+
+        expires = now + self.lifetime(permanent)
+        if self.spill is not None:
+            self.spill.touch(sid, expires)
+        entry = _Entry(data, permanent, expires, now + self.refresh_seconds)
+        self._put(sid, entry)
+        return entry
+
+    def save(self, sid, data, permanent):
+        """
+        @brief  保存会话
+        @param  sid: 会话ID
+        @param  data: 会话数据字典
+        @param  permanent: 是否持久会话
+        @retval float: 过期时间戳
+        """
+        now = time.time()
+        expires = now + self.lifetime(permanent)
+        if self.spill is not None:
+            self.spill.save(sid, data, permanent, expires)
+            if self.purge_every > 0:
+                with self._lock:
+                    self._saves += 1
+                    purge = self._saves >= self.purge_every
+                    if purge:
+                        self._saves = 0
+                if purge:
+                    self.purged += self.spill.purge_expired()
+        self._put(sid, _Entry(data, permanent, expires, now + self.refresh_seconds))
+        return expires
+
+    def delete(self, sid):
+        """
+        @brief  删除会话
+        @param  sid: 会话ID
+        @retval None
+        """
+        self._discard(sid)
+        if self.spill is not None:
+            self.spill.delete(sid)
+
+    def _put(self, sid, entry):
+        """
+        @brief  放入内存并按需淘汰
+        @param  sid: 会话ID
+        @param  entry: 会话记录
+        @retval None
+        """
+        with self._lock:
+            # 先删除再插入，使该会话移动到字典末尾（最近使用）
+            self._entries.pop(sid, None)
+            self._entries[sid] = entry
+            # 淘汰最久未刷新的会话；没有持久层时被淘汰的会话即失效
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def _discard(self, sid):
+        """
+        @brief  从内存中移除会话
+        @param  sid: 会话ID
+        @retval None
+        """
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def __len__(self):
+        """@brief  内存中的会话数"""
+        return len(self._entries)
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    @brief  使用服务端会话存储的Flask会话接口
+    """
+
+    def __init__(self, store):
+        """
+        @brief  创建会话接口
+        @param  store: 会话存储，需提供 get(sid)、save(sid, data, permanent)、delete(sid) 方法
+        """
+        self.store = store
+
+    def open_session(self, app, request):
+        """
+        @brief  根据Cookie中的会话ID加载会话
+        @param  app: Flask应用实例
+        @param  request: 当前请求
+        @retval ServerSession: 会话对象
+        """
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            entry = self.store.get(sid)
+            if entry is not None:
+                session = ServerSession(entry.data, sid)
+                session._permanent = entry.permanent
+                return session
+        return ServerSession(new=True)
+
+    def save_session(self, app, session, response):
+        """
+        @brief  会话被修改时写回存储并设置Cookie
+        @param  app: Flask应用实例
+        @param  session: 会话对象
+        @param  response: 响应对象
+        @retval None
+        """
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session.modified:
+            return
+
+        if not session:
+            if session.sid is not None:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # 修改会话内容时更换会话ID：防止会话固定攻击，其他工作进程内存中的旧数据也随之失效
+        if session.sid is not None:
+            self.store.delete(session.sid)
+        session.sid = secrets.token_urlsafe(SESSION_ID_BYTES)
+        self.store.save(session.sid, dict(session), session.permanent)
+
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+        response.vary.add('Cookie')
+
+
+def init_session_store(app):
+    """
+    @brief  为Flask应用启用服务端会话
+    @details 配置项（均可由同名环境变量提供）：
+             SESSION_BACKEND 会话后端，server（默认）或 cookie（Flask默认签名Cookie）；
+             SESSION_SQLITE_PATH 会话持久化的SQLite文件，多工作进程部署时必须配置；
+             SESSION_MAX_ENTRIES 内存中最多保存的会话数；
+             SESSION_REFRESH_SECONDS 惰性刷新间隔；SESSION_IDLE_TIMEOUT 非持久会话空闲超时；
+             SESSION_PURGE_EVERY 每保存多少个会话清理一次SQLite中已过期的会话（启动时也清理一次）
+    @param  app: Flask应用实例
+    @retval MemorySessionStore: 会话存储，使用Cookie会话时返回None
+    """
+    def setting(name, default):
+        return app.config.get(name, os.environ.get(name, default))
+
+    if setting('SESSION_BACKEND', 'server') != 'server':
+        return None
+
+    sqlite_path = setting('SESSION_SQLITE_PATH', '')
+    spill = SQLiteSessionSpill(sqlite_path) if sqlite_path else None
+    if spill is not None:
+        spill.purge_expired()
+    store = MemorySessionStore(
+        max_entries=int(setting('SESSION_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+        refresh_seconds=float(setting('SESSION_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)),
+        idle_timeout=float(setting('SESSION_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT)),
+        permanent_lifetime=app.permanent_session_lifetime.total_seconds(),
+        spill=spill,
+        purge_every=int(setting('SESSION_PURGE_EVERY', DEFAULT_PURGE_EVERY))
+    )
+    app.session_interface = ServerSessionInterface(store)
+    app.extensions['session_store'] = store
+    return store
@@ -0,0 +1,359 @@
+"""
+@file    user_stats.py
+@brief   用户游戏统计
+@details 每局游戏结束时把本局结果累加到内存中按用户ID合并的增量，后台线程按间隔（或待写用户数达到上限时）
+         以一次 executemany 和一个事务把增量 upsert 到 user_stats 表，同一用户多局只写一行。
+         用户资料（用户信息和持久化的统计值）缓存在按访问顺序排列的LRU字典中，读取时再叠加尚未写入的增量，
+         资料读取与游戏历史长短无关；本进程更新并提交 users 表的行后对应缓存失效。
+         其他工作进程写入的统计和用户信息不会使本进程的缓存失效，缓存条目在 cache_ttl 秒后过期重新加载，
+         多工作进程部署时资料最多滞后 cache_ttl 秒
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from .db_config import db
+from .models import User, UserStats
+from .user_dao import UserDAO
+
+logger = logging.getLogger(__name__)
+
+# 默认写入间隔（秒）、待写用户数上限、资料缓存条数、资料缓存有效期（秒）
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 1000
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL = 5.0
+
+# 累加统计增量，best_score 取较大值
+UPSERT_SQL = text(
+    'INSERT INTO user_stats (user_id, games_played, food_eaten, total_score, best_score, play_time_ms, updated_at) '
+    'VALUES (:user_id, :games_played, :food_eaten, :total_score, :best_score, :play_time_ms, :updated_at) '
+    'ON CONFLICT (user_id) DO UPDATE SET '
+    'games_played = user_stats.games_played + excluded.games_played, '
+    'food_eaten = user_stats.food_eaten + excluded.food_eaten, '
+    'total_score = user_stats.total_score + excluded.total_score, '
+    'best_score = CASE WHEN excluded.best_score > user_stats.best_score '
+    'THEN excluded.best_score ELSE user_stats.best_score END, '
+    'play_time_ms = user_stats.play_time_ms + excluded.play_time_ms, '
+    'updated_at = excluded.updated_at'
+)
+
+# 会话信息中记录已修改用户ID的键
+_DIRTY_USERS_KEY = 'user_stats_dirty_users'
+
+
+class StatsCounters:
+    """
+    @brief  一个用户的统计值，既用于累计值也用于待写增量
+    """
+
+    __slots__ = ('games_played', 'food_eaten', 'total_score', 'best_score', 'play_time_ms')
+
+    def __init__(self, games_played=0, food_eaten=0, total_score=0, best_score=0, play_time_ms=0):
+        self.games_played = games_played
+        self.food_eaten = food_eaten
+        self.total_score = total_score
+        self.best_score = best_score
+        self.play_time_ms = play_time_ms
+
+    def add(self, other: 'StatsCounters') -> None:
+        """
+        @brief  累加另一组统计值
+        @param  other: 统计值
+        @retval None
+        """
+        self.games_played += other.games_played
+        self.food_eaten += other.food_eaten
+        self.total_score += other.total_score
+        self.best_score = max(self.best_score, other.best_score)
+        self.play_time_ms += other.play_time_ms
+
+    def copy(self) -> 'StatsCounters':
+        """@brief  复制统计值"""
+        return StatsCounters(self.games_played, self.food_eaten, self.total_score, self.best_score, self.play_time_ms)
+
+    def to_dict(self) -> dict:
+        """
+        @brief  转换为接口返回的字典
+        @retval dict: 游戏局数、吃到的食物总数、最高分、平均分、总游戏时长（秒）
+        """
+        return {
+            'games_played': self.games_played,
+            'food_eaten': self.food_eaten,
+            'best_score': self.best_score,
+            'average_score': round(self.total_score / self.games_played, 1) if self.games_played else 0,
+            'play_time_seconds': self.play_time_ms / 1000
+        }
+
+
+class UserStatsBuffer:
+    """
+    @brief  用户统计的写回缓冲和资料缓存
+    @details 待写增量和资料缓存由同一把锁保护；写入数据库和缓存未命中时的加载由另一把锁串行化，
+             保证加载的持久值与叠加的增量不会重复或遗漏同一局游戏
+    """
+
+    def __init__(self, app, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_pending: int = DEFAULT_MAX_PENDING, cache_size: int = DEFAULT_CACHE_SIZE,
+                 cache_ttl: float = DEFAULT_CACHE_TTL):
+        """
+        @brief  创建缓冲，写入线程在第一次记录时启动
+        @param  app: Flask应用实例，写入线程在其应用上下文中访问数据库
+        @param  flush_interval: 写入间隔（秒）
+        @param  max_pending: 待写用户数达到该值时立即写入
+        @param  cache_size: 资料缓存最多保存的用户数
+        @param  cache_ttl: 资料缓存有效期（秒），为0时每次读取都查询数据库
+        """
+        self.app = app
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # 用户ID到待写增量，以及正在写入的增量
+        self._pending: Dict[int, StatsCounters] = {}
+        self._flushing: Dict[int, StatsCounters] = {}
+        # 用户ID到 (用户信息字典, 持久化的统计值, 过期时间)，按访问顺序排列
+        self._profiles: Dict[int, tuple] = {}
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # 缓存命中和未命中次数
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, user_id: int, score: int, food_eaten: int, play_time_ms: int) -> None:
+        """
+        @brief  记录一局结束的游戏
+        @param  user_id: 用户ID
+        @param  score: 本局得分
+        @param  food_eaten: 本局吃到的食物数
+        @param  play_time_ms: 本局游戏时长（毫秒）
+        @retval None
+        """
+        with self._lock:
+            delta = self._pending.get(user_id)
+            if delta is None:
+                delta = self._pending[user_id] = StatsCounters()
+            delta.add(StatsCounters(1, food_eaten, score, score, play_time_ms))
+            if len(self._pending) >= self.max_pending:
+                self._ready.set()
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name='user-stats', daemon=True)
+                self._thread.start()
+
+    def _unwritten(self, user_id: int) -> Optional[StatsCounters]:
+        """
+        @brief  合并用户正在写入和待写的增量，需持有 _lock
+        @param  user_id: 用户ID
+        @retval StatsCounters: 增量，没有时为None
+        """
+        flushing = self._flushing.get(user_id)
+        pending = self._pending.get(user_id)
+        if flushing is None or pending is None:
+            return flushing or pending
+        total = flushing.copy()
+        total.add(pending)
+        return total
+
+    def _compose(self, user_id: int, profile: tuple) -> dict:
+        """
+        @brief  由缓存的资料和未写入的增量生成返回结果，需持有 _lock
+        @param  user_id: 用户ID
+        @param  profile: (用户信息字典, 持久化的统计值, 过期时间)
+        @retval dict: {'user': 用户信息, 'stats': 统计值}
+        """
+        user, stats, _ = profile
+        delta = self._unwritten(user_id)
+        if delta is not None:
+            stats = stats.copy()
+            stats.add(delta)
+        return {'user': dict(user), 'stats': stats.to_dict()}
+
+    def get_user_info(self, user_id: int) -> Optional[dict]:
+        """
+        @brief  获取用户信息和统计值
+        @details 命中未过期的缓存时只做字典查找；未命中或已过期时查询 users 和 user_stats 各一行并放入缓存
+        @param  user_id: 用户ID
+        @retval dict: {'user': 用户信息, 'stats': 统计值}，用户不存在时为None
+        """
+        with self._lock:
+            profile = self._profiles.pop(user_id, None)
+            if profile is not None and profile[2] > time.monotonic():
+                self._profiles[user_id] = profile
+                self.hits += 1
+                return self._compose(user_id, profile)
+            self.misses += 1
+
+        with self._flush_lock:
+            user = UserDAO.get_user_by_id(user_id)
+            if user is None:
+                return None
+            row = db.session.get(UserStats, user_id)
+            stats = StatsCounters()
+            if row is not None:
+                stats = StatsCounters(row.games_played, row.food_eaten, row.total_score, row.best_score,
+                                      row.play_time_ms)
+            profile = (user.to_dict(), stats, time.monotonic() + self.cache_ttl)
+            with self._lock:
+                self._profiles.pop(user_id, None)
+                self._profiles[user_id] = profile
+                while len(self._profiles) > self.cache_size:
+                    del self._profiles[next(iter(self._profiles))]
+                return self._compose(user_id, profile)
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        @brief  使用户的资料缓存失效
+        @param  user_id: 用户ID
+        @retval None
+        """
+        with self._lock:
+            self._profiles.pop(user_id, None)
+
+    def pending_count(self) -> int:
+        """
+        @brief  统计有待写增量的用户数
+        @retval int: 用户数
+        """
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        @brief  在一个事务中写入所有待写增量
+        @details 写入失败时增量放回待写字典，下次重试
+        @retval int: 写入的用户数
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._flushing, self._pending = self._pending, {}
+                self._ready.clear()
+            now = datetime.utcnow()
+            rows = [{'user_id': user_id, 'games_played': delta.games_played, 'food_eaten': delta.food_eaten,
+                     'total_score': delta.total_score, 'best_score': delta.best_score,
+                     'play_time_ms': delta.play_time_ms, 'updated_at': now}
+                    for user_id, delta in self._flushing.items()]
+            try:
+                with self.app.app_context():
+                    try:
+                        db.session.execute(UPSERT_SQL, rows)
+                        db.session.commit()
+                    except SQLAlchemyError:
+                        db.session.rollback()
+                        raise
+            except Exception:
+                with self._lock:
+                    for user_id, pending in self._pending.items():
+                        flushing = self._flushing.get(user_id)
+                        if flushing is None:
+                            self._flushing[user_id] = pending
+                        else:
+                            flushing.add(pending)
+                    self._pending, self._flushing = self._flushing, {}
+                raise
+            with self._lock:
+                for user_id, delta in self._flushing.items():
+                    profile = self._profiles.get(user_id)
+                    if profile is not None:
+                        profile[1].add(delta)
+                self._flushing = {}
+            return len(rows)
+
+    def _run(self) -> None:
+        """
+        @brief  后台线程主循环
+        @retval None
+        """
+        while not self._stop.is_set():
+            self._ready.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('写入用户统计失败')
+
+    def close(self) -> None:
+        """
+        @brief  停止后台线程并写入剩余增量
+        @retval None
+        """
+        self._stop.set()
+        self._ready.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('写入用户统计失败')
+
+
+@event.listens_for(User, 'after_update')
+def _mark_user_dirty(mapper, connection, target):
+    """
+    @brief  记录本会话中被更新的用户，提交后再使缓存失效
+    @retval None
+    """
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_DIRTY_USERS_KEY, set()).add(target.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_dirty_users(session):
+    """
+    @brief  提交后使被更新用户的资料缓存失效
+    @retval None
+    """
+    dirty = session.info.pop(_DIRTY_USERS_KEY, None)
+    if not dirty or not has_app_context():
+        return
+    buffer = current_app.extensions.get('user_stats')
+    if buffer is not None:
+        for user_id in dirty:
+            buffer.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty_users(session):
+    """
+    @brief  回滚后丢弃记录的用户
+    @retval None
+    """
+    session.info.pop(_DIRTY_USERS_KEY, None)
+
+
+def init_user_stats(app):
+    """
+    @brief  为Flask应用创建用户统计缓冲
+    @details 配置项（均可由同名环境变量提供）：USER_STATS_FLUSH_INTERVAL 写入间隔（秒）；
+             USER_STATS_MAX_PENDING 待写用户数上限；USER_INFO_CACHE_SIZE 资料缓存条数；
+             USER_INFO_CACHE_TTL 资料缓存有效期（秒）。进程退出时由应用的退出钩子（app.close_apps）写入剩余增量
+    @param  app: Flask应用实例
+    @retval UserStatsBuffer: 统计缓冲
+    """
+    def setting(name, default):
+        return app.config.get(name, os.environ.get(name, default))
+
+    buffer = UserStatsBuffer(
+        app,
+        flush_interval=float(setting('USER_STATS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)),
+        max_pending=int(setting('USER_STATS_MAX_PENDING', DEFAULT_MAX_PENDING)),
+        cache_size=int(setting('USER_INFO_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+        cache_ttl=float(setting('USER_INFO_CACHE_TTL', DEFAULT_CACHE_TTL))
+    )
+    app.extensions['user_stats'] = buffer
+    return buffer
@@ -10,5 +10,8 @@
 # 从当前包中导入贪吃蛇游戏核心类
 from .snake_game import SnakeGame
 
+# 导入按用户管理游戏实例的存储
+from .store import LocalGameStore, create_game_store
+
 # 定义模块的公开接口，限制外部使用from module import *时导入的内容
-__all__ = ['SnakeGame']
+__all__ = ['SnakeGame', 'LocalGameStore', 'create_game_store']
@@ -0,0 +1,194 @@
+"""
+@file    analytics.py
+@brief   游戏事件分析
+@details 从 game.events 写入的SQLite事件表按块读取死亡事件，每块转为NumPy列数组后向量化累加：
+         死亡位置热力图用 bincount 按（死亡原因, 格子索引）计数，每日得分分布用 np.add.at 累加到（日期, 分数段）直方图，
+         百分位数由直方图累积分布求出。内存只与块大小、网格面积和天数有关，与事件总数无关。
+         NumPy 为可选依赖，未安装时 available() 返回False，分析函数抛出 RuntimeError
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入SQLite模块，用于读取事件表
+import sqlite3
+
+# 导入日期时间模块，用于把日期编号转换为日期字符串
+from datetime import datetime, timezone
+
+# 导入类型提示模块
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .events import CAUSE_NAMES, CAUSE_SELF, CAUSE_WALL, EVENT_DEATH
+
+# 每次从数据库读取的行数
+DEFAULT_CHUNK_SIZE = 500000
+
+# 得分直方图的分数段宽度（一个食物的得分）和分数段数上限，更高的得分计入最后一段
+DEFAULT_BIN_WIDTH = 10
+DEFAULT_MAX_BINS = 256
+
+# 默认计算的百分位数
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+# 一天的秒数
+SECONDS_PER_DAY = 86400
+
+
+def _numpy():
+    """
+    @brief  导入可选的numpy模块
+    @retval module: numpy模块，未安装时返回None
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def available() -> bool:
+    """
+    @brief  是否可以进行分析（已安装NumPy）
+    @retval bool: 是否已安装NumPy
+    """
+    return _numpy() is not None
+
+
+def _require_numpy():
+    """
+    @brief  获取numpy模块
+    @retval module: numpy模块
+    @throws RuntimeError: 未安装NumPy
+    """
+    np = _numpy()
+    if np is None:
+        raise RuntimeError('游戏事件分析需要安装NumPy（pip install numpy）')
+    return np
+
+
+def iter_chunks(path: str, sql: str, params: Sequence, dtype, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """
+    @brief  以只读方式执行查询，按块返回二维数组（每行一条记录，每列一个字段）
+    @param  path: 事件数据库路径
+    @param  sql: 查询语句
+    @param  params: 查询参数
+    @param  dtype: 数组元素类型
+    @param  chunk_size: 每块的行数
+    @retval iterator: 二维数组
+    """
+    np = _require_numpy()
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield np.array(rows, dtype=dtype)
+    finally:
+        conn.close()
+
+
+def death_heatmap(path: str, grid_width: int, grid_height: int, since: Optional[float] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    @brief  统计指定网格尺寸的游戏中每个格子的死亡次数
+    @details 死亡位置为撞击前蛇头所在的格子
+    @param  path: 事件数据库路径
+    @param  grid_width: 网格宽度
+    @param  grid_height: 网格高度
+    @param  since: 只统计该Unix时间之后的事件，None为全部
+    @param  chunk_size: 每块的行数
+    @retval dict: {'deaths': 死亡总数, 'total'/'wall'/'self': 形状为 (grid_height, grid_width) 的计数数组}
+    """
+    np = _require_numpy()
+    cells = grid_width * grid_height
+    counts = np.zeros(len(CAUSE_NAMES) * cells, dtype=np.int64)
+    sql = ('SELECT cause, cell FROM game_events '
+           'WHERE kind = ? AND grid_width = ? AND grid_height = ? AND time >= ?')
+    params = (EVENT_DEATH, grid_width, grid_height, since if since is not None else float('-inf'))
+    for chunk in iter_chunks(path, sql, params, np.int64, chunk_size):
+        causes, positions = chunk[:, 0], chunk[:, 1]
+        valid = (positions >= 0) & (positions < cells) & (causes >= 0) & (causes < len(CAUSE_NAMES))
+        counts += np.bincount(causes[valid] * cells + positions[valid], minlength=counts.size)
+    by_cause = counts.reshape(len(CAUSE_NAMES), grid_height, grid_width)
+    total = by_cause.sum(axis=0)
+    return {
+        'deaths': int(total.sum()),
+        'total': total,
+        'wall': by_cause[CAUSE_WALL],
+        'self': by_cause[CAUSE_SELF]
+    }
+
+
+def _percentiles_from_histogram(np, histogram, percentiles: Sequence[float], bin_width: int) -> Dict[str, int]:
+    """
+    @brief  由直方图求百分位数（精确到分数段）
+    @param  np: numpy模块
+    @param  histogram: 各分数段的计数
+    @param  percentiles: 百分位数
+    @param  bin_width: 分数段宽度
+    @retval dict: 'p50' 等到分数段下限的映射
+    """
+    cumulative = np.cumsum(histogram)
+    total = cumulative[-1]
+    result = {}
+    for percentile in percentiles:
+        rank = max(1, int(np.ceil(total * percentile / 100)))
+        result[f'p{percentile:g}'] = int(np.searchsorted(cumulative, rank)) * bin_width
+    return result
+
+
+def score_distribution(path: str, since: Optional[float] = None, bin_width: int = DEFAULT_BIN_WIDTH,
+                       max_bins: int = DEFAULT_MAX_BINS, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict]:
+    """
+    @brief  按UTC日期统计每局游戏最终得分的分布
+    @details 每个死亡事件即一局游戏，其得分即最终得分
+    @param  path: 事件数据库路径
+    @param  since: 只统计该Unix时间之后的事件，None为全部
+    @param  bin_width: 直方图分数段宽度
+    @param  max_bins: 分数段数上限
+    @param  percentiles: 要计算的百分位数
+    @param  chunk_size: 每块的行数
+    @retval list: 按日期排序，每项为 {'day', 'games', 'mean', 'max', 'percentiles', 'histogram'}
+    """
+    np = _require_numpy()
+    histograms: Dict[int, object] = {}
+    totals: Dict[int, list] = {}
+    sql = 'SELECT time, score FROM game_events WHERE kind = ? AND time >= ?'
+    params = (EVENT_DEATH, since if since is not None else float('-inf'))
+    for chunk in iter_chunks(path, sql, params, np.float64, chunk_size):
+        days = np.floor_divide(chunk[:, 0], SECONDS_PER_DAY).astype(np.int64)
+        scores = chunk[:, 1].astype(np.int64)
+        bins = np.minimum(scores // bin_width, max_bins - 1)
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        counts = np.zeros((len(unique_days), max_bins), dtype=np.int64)
+        np.add.at(counts, (day_index, bins), 1)
+        sums = np.bincount(day_index, weights=scores, minlength=len(unique_days))
+        maxima = np.zeros(len(unique_days), dtype=np.int64)
+        np.maximum.at(maxima, day_index, scores)
+        for i, day in enumerate(unique_days.tolist()):
+            if day in histograms:
+                histograms[day] += counts[i]
+                totals[day][0] += sums[i]
+                totals[day][1] = max(totals[day][1], int(maxima[i]))
+            else:
+                histograms[day] = counts[i].copy()
+                totals[day] = [float(sums[i]), int(maxima[i])]
+
+    result = []
+    for day in sorted(histograms):
+        histogram = histograms[day]
+        games = int(histogram.sum())
+        last = int(np.flatnonzero(histogram)[-1]) + 1
+        result.append({
+            'day': datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).strftime('%Y-%m-%d'),
+            'games': games,
+            'mean': round(totals[day][0] / games, 1),
+            'max': totals[day][1],
+            'percentiles': _percentiles_from_histogram(np, histogram, percentiles, bin_width),
+            'histogram': histogram[:last].tolist()
+        })
+    return result
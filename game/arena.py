@@ -0,0 +1,308 @@
+"""
+@file    arena.py
+@brief   多人竞技场引擎
+@details 数百条蛇共用一个最大 2000×2000 的棋盘。棋盘是一个 array('H') 占用网格，
+         每个格子保存占用者编号（0为空，FOOD_CELL为食物），碰撞检测只需一次数组下标访问。
+         每一步先为所有蛇计算新蛇头，按蛇头格子建立蛇头碰撞表，然后一次遍历判定撞墙、
+         蛇头相撞和撞到蛇身；食物用随机抽样放置。每步的开销与蛇的数量成正比，与棋盘面积无关
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入随机数模块，用于出生点和食物抽样
+import random
+
+# 导入数组模块，用于紧凑的占用网格
+from array import array
+
+# 导入双端队列，用于保存蛇身格子
+from collections import deque
+
+# 导入类型提示模块
+from typing import Dict, List, Optional
+
+from .snake_game import FOOD_SCORE, INITIAL_SNAKE_LENGTH
+
+# 棋盘的最大边长
+ARENA_MAX_SIZE = 2000
+
+# 占用网格中的空格子和食物标记，蛇的编号为 1..MAX_SNAKE_ID
+EMPTY_CELL = 0
+FOOD_CELL = 0xFFFF
+MAX_SNAKE_ID = FOOD_CELL - 1
+
+# 方向名称，下标即方向编码，与 SharedSnakeGame 一致
+DIRECTION_NAMES = ('up', 'down', 'left', 'right')
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTION_NAMES)}
+OPPOSITE_CODES = (1, 0, 3, 2)
+
+# 出生或放置食物时随机抽样的最大次数
+MAX_PLACEMENT_ATTEMPTS = 64
+
+
+class ArenaFullError(RuntimeError):
+    """棋盘上找不到空位放置新蛇，或蛇的编号已用完"""
+
+
+class ArenaSnake:
+    """
+    @brief  竞技场中的一条蛇
+    @details body 保存格子索引（y*宽度+x），左端为蛇头
+    """
+
+    __slots__ = ('snake_id', 'body', 'direction', 'next_direction', 'score', 'alive')
+
+    def __init__(self, snake_id: int, body: deque, direction: int):
+        """
+        @brief  创建蛇
+        @param  snake_id: 蛇的编号
+        @param  body: 蛇身格子索引，蛇头在左端
+        @param  direction: 初始方向编码
+        """
+        self.snake_id = snake_id
+        self.body = body
+        self.direction = direction
+        self.next_direction = direction
+        self.score = 0
+        self.alive = True
+
+
+class Arena:
+    """
+    @brief  多人竞技场
+    @details 接口按蛇的编号操作：add_snake() 放入一条蛇，set_direction() 设置方向，
+             tick() 让所有蛇前进一步并返回本步死亡的蛇
+    """
+
+    def __init__(self, width: int, height: int, food_count: int = 100,
+                 initial_length: int = INITIAL_SNAKE_LENGTH, seed: Optional[int] = None):
+        """
+        @brief  创建竞技场
+        @param  width: 棋盘宽度，1..ARENA_MAX_SIZE
+        @param  height: 棋盘高度，1..ARENA_MAX_SIZE
+        @param  food_count: 棋盘上保持的食物数量
+        @param  initial_length: 蛇的初始长度
+        @param  seed: 随机数种子，用于复现
+        """
+        if not (1 <= width <= ARENA_MAX_SIZE and 1 <= height <= ARENA_MAX_SIZE):
+            raise ValueError(f'棋盘尺寸须在1到{ARENA_MAX_SIZE}之间: {width}x{height}')
+        if initial_length < 1 or initial_length > width:
+            raise ValueError(f'初始长度无效: {initial_length}')
+        self.width = width
+        self.height = height
+        self.cell_count = width * height
+        self.food_count = food_count
+        self.initial_length = initial_length
+        self.tick_count = 0
+        self._random = random.Random(seed)
+        # 占用网格：每个格子一个uint16
+        self.grid = array('H', bytes(2 * self.cell_count))
+        self.snakes: Dict[int, ArenaSnake] = {}
+        self.food = set()
+        # 回收的蛇编号，优先复用
+        self._free_ids: List[int] = []
+        self._next_id = 1
+        self._fill_food()
+
+    def _allocate_id(self) -> int:
+        """
+        @brief  分配蛇的编号
+        @retval int: 编号
+        """
+        if self._free_ids:
+            return self._free_ids.pop()
+        if self._next_id > MAX_SNAKE_ID:
+            raise ArenaFullError('蛇的编号已用完')
+        snake_id = self._next_id
+        self._next_id += 1
+        return snake_id
+
+    def _place_food(self) -> bool:
+        """
+        @brief  在随机空格子放置一个食物
+        @retval true: 已放置, false: 抽样次数内没有找到空格子
+        """
+        grid = self.grid
+        randrange = self._random.randrange
+        for _ in range(MAX_PLACEMENT_ATTEMPTS):
+            cell = randrange(self.cell_count)
+            if grid[cell] == EMPTY_CELL:
+                grid[cell] = FOOD_CELL
+                self.food.add(cell)
+                return True
+        return False
+
+    def _fill_food(self) -> None:
+        """
+        @brief  补足棋盘上的食物
+        @retval None
+        """
+        while len(self.food) < self.food_count and self._place_food():
+            pass
+
+    def add_snake(self) -> int:
+        """
+        @brief  在随机空位放入一条新蛇
+        @details 随机抽样一段横向的空格子作为蛇身，蛇头朝向这段格子的延伸方向
+        @retval int: 蛇的编号
+        """
+        grid = self.grid
+        width = self.width
+        length = self.initial_length
+        for _ in range(MAX_PLACEMENT_ATTEMPTS):
+            y = self._random.randrange(self.height)
+            x = self._random.randrange(width - length + 1)
+            start = y * width + x
+            cells = range(start, start + length)
+            if all(grid[cell] == EMPTY_CELL for cell in cells):
+                break
+        else:
+            raise ArenaFullError('棋盘上没有放置新蛇的空位')
+
+        snake_id = self._allocate_id()
+        # 蛇头在右端时向右，否则向左，尽量远离墙
+        if x + length * 2 <= width:
+            body, direction = deque(reversed(cells)), DIRECTION_CODES['right']
+        else:
+            body, direction = deque(cells), DIRECTION_CODES['left']
+        for cell in cells:
+            grid[cell] = snake_id
+        self.snakes[snake_id] = ArenaSnake(snake_id, body, direction)
+        return snake_id
+
+    def remove_snake(self, snake_id: int) -> None:
+        """
+        @brief  移除一条蛇并清空其占用的格子
+        @param  snake_id: 蛇的编号
+        @retval None
+        """
+        snake = self.snakes.pop(snake_id, None)
+        if snake is None:
+            return
+        grid = self.grid
+        for cell in snake.body:
+            if grid[cell] == snake_id:
+                grid[cell] = EMPTY_CELL
+        self._free_ids.append(snake_id)
+
+    def set_direction(self, snake_id: int, direction: str) -> None:
+        """
+        @brief  设置蛇的下一步方向，不能掉头
+        @param  snake_id: 蛇的编号
+        @param  direction: 方向字符串 ('up', 'down', 'left', 'right')
+        @retval None
+        """
+        snake = self.snakes.get(snake_id)
+        code = DIRECTION_CODES.get(direction)
+        if snake is not None and code is not None and OPPOSITE_CODES[code] != snake.direction:
+            snake.next_direction = code
+
+    def tick(self) -> List[int]:
+        """
+        @brief  所有存活的蛇同时前进一步
+        @details 先计算每条蛇的新蛇头并建立蛇头碰撞表，再一次遍历判定死亡：
+                 撞墙、与其他蛇头进入同一格子、撞到蛇身（本步会移开的蛇尾除外）。
+                 死亡的蛇从棋盘上移除，存活的蛇先移开蛇尾再写入新蛇头
+        @retval list: 本步死亡的蛇的编号
+        """
+        grid = self.grid
+        width = self.width
+        cell_count = self.cell_count
+        self.tick_count += 1
+
+        # 第一遍：计算新蛇头，撞墙的直接判定死亡；heads 为蛇头碰撞表（格子到进入该格子的蛇头数）
+        moves = []
+        heads: Dict[int, int] = {}
+        dead = []
+        for snake in self.snakes.values():
+            direction = snake.direction = snake.next_direction
+            head = snake.body[0]
+            if direction == 0:
+                new_head = head - width
+                hit_wall = new_head < 0
+            elif direction == 1:
+                new_head = head + width
+                hit_wall = new_head >= cell_count
+            elif direction == 2:
+                new_head = head - 1
+                hit_wall = head % width == 0
+            else:
+                new_head = head + 1
+                hit_wall = new_head % width == 0
+            if hit_wall:
+                dead.append(snake)
+                continue
+            moves.append((snake, new_head))
+            heads[new_head] = heads.get(new_head, 0) + 1
+
+        # 本步吃到食物的蛇：新蛇头是食物且没有其他蛇头进入同一格子，它们的蛇尾不移开
+        growing = {snake.snake_id for snake, new_head in moves
+                   if grid[new_head] == FOOD_CELL and heads[new_head] == 1}
+
+        # 第二遍：按蛇头碰撞表和占用网格判定死亡
+        survivors = []
+        for snake, new_head in moves:
+            occupant = grid[new_head]
+            if heads[new_head] > 1:
+                dead.append(snake)
+            elif occupant == EMPTY_CELL or occupant == FOOD_CELL:
+                survivors.append((snake, new_head, occupant == FOOD_CELL))
+            elif self.snakes[occupant].body[-1] == new_head and occupant not in growing:
+                # 进入本步会移开的蛇尾不算碰撞（蛇尾所属的蛇死亡时整条蛇被移除，同样会空出）
+                survivors.append((snake, new_head, False))
+            else:
+                dead.append(snake)
+
+        # 移除死亡的蛇
+        for snake in dead:
+            snake.alive = False
+            for cell in snake.body:
+                if grid[cell] == snake.snake_id:
+                    grid[cell] = EMPTY_CELL
+        # 存活的蛇先移开蛇尾，再写入新蛇头
+        for snake, new_head, ate in survivors:
+            if not ate:
+                tail = snake.body.pop()
+                if grid[tail] == snake.snake_id:
+                    grid[tail] = EMPTY_CELL
+        eaten = 0
+        for snake, new_head, ate in survivors:
+            snake.body.appendleft(new_head)
+            grid[new_head] = snake.snake_id
+            if ate:
+                snake.score += FOOD_SCORE
+                self.food.discard(new_head)
+                eaten += 1
+
+        for snake in dead:
+            del self.snakes[snake.snake_id]
+            self._free_ids.append(snake.snake_id)
+        if eaten:
+            self._fill_food()
+        return [snake.snake_id for snake in dead]
+
+    def snake_cells(self, snake_id: int) -> List[int]:
+        """
+        @brief  获取蛇身格子索引
+        @param  snake_id: 蛇的编号
+        @retval list: 格子索引，蛇头在前
+        """
+        return list(self.snakes[snake_id].body)
+
+    def get_state(self) -> dict:
+        """
+        @brief  获取竞技场概况
+        @retval dict: 棋盘尺寸、步数、食物格子和各条蛇的长度与得分
+        """
+        return {
+            'width': self.width,
+            'height': self.height,
+            'tick': self.tick_count,
+            'food': sorted(self.food),
+            'snakes': [
+                {'id': snake.snake_id, 'length': len(snake.body), 'score': snake.score,
+                 'direction': DIRECTION_NAMES[snake.direction]}
+                for snake in self.snakes.values()
+            ],
+        }
@@ -0,0 +1,192 @@
+"""
+@file    codec.py
+@brief   游戏状态编码
+@details 游戏接口每帧都要序列化游戏状态。网格尺寸、格子大小等常量字段和每个格子的 [x,y] 片段
+         在创建编码器时预先编码为字节串，每帧只需按蛇身格子索引拼接，无需构造元组列表再走通用JSON编码。
+         客户端在 Accept 中声明 BINARY_MIMETYPE 时改用二进制格式：40字节定长头部，
+         后接蛇身格子索引数组或拐点数组（两者取较短者）。格式说明见 encode_binary()
+@author  AI Assistant
+@date    2026-10-19
+@version V1.1.0
+"""
+
+# 导入结构体模块，用于打包二进制头部
+import struct
+
+# 导入线程模块，用于保护编码器缓存
+import threading
+
+# 导入数组模块，用于打包格子索引
+from array import array
+
+# 导入类型提示模块
+from typing import Dict, List, Tuple
+
+from .snake_game import Direction_e, GameState_e, PackedState, CELL_SIZE
+
+# 预先生成坐标片段表的最大格子数，更大的网格按需计算
+MAX_CELL_TABLE = 1 << 16
+
+# 缓存的编码器数量上限：每局游戏可以使用不同的网格尺寸，每个编码器的坐标片段表最多有 MAX_CELL_TABLE 项
+MAX_ENCODERS = 16
+
+# 二进制游戏状态的媒体类型
+BINARY_MIMETYPE = 'application/x-snake-state'
+
+# 二进制头部（小端）：序号、得分、最高分、食物格子、蛇身条目数、网格宽、网格高、格子大小、
+#                   游戏状态、方向、蛇身编码方式、格子索引字节数、保留、本局步数、已确认的输入编号
+BINARY_HEADER = struct.Struct('<IIIIIHHHBBBBHII')
+
+# 蛇身编码方式：逐格索引 / 拐点（蛇头、每个拐弯处、蛇尾）
+BODY_CELLS = 0
+BODY_TURNS = 1
+
+# 二进制格式中的状态和方向编码，与客户端解码表一致
+STATE_CODES = {state.value: code for code, state in enumerate(GameState_e)}
+DIRECTION_CODES = {direction.value: code for code, direction in enumerate(Direction_e)}
+
+# 小端机器上 array 可直接输出二进制
+_NATIVE_LITTLE_ENDIAN = array('H', [1]).tobytes() == b'\x01\x00'
+
+
+class GameStateJSONEncoder:
+    """
+    @brief  指定网格尺寸的游戏状态JSON编码器
+    @details 输出与 json.dumps(game.get_state()) 字段相同的紧凑JSON，包括供客户端丢弃过期状态的序号 seq
+    """
+
+    def __init__(self, grid_width: int, grid_height: int, cell_size: int = CELL_SIZE):
+        """
+        @brief  预编码常量部分
+        @param  grid_width: 网格宽度
+        @param  grid_height: 网格高度
+        @param  cell_size: 格子像素大小
+        """
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        cell_count = grid_width * grid_height
+        # 格子索引到 [x,y] 字节片段的查找表
+        self._cells = None
+        if cell_count <= MAX_CELL_TABLE:
+            self._cells = [b'[%d,%d]' % (cell % grid_width, cell // grid_width) for cell in range(cell_count)]
+        self._directions = {d.value: b',"direction":"%s","score":' % d.value.encode() for d in Direction_e}
+        self._states = {s.value: b',"game_state":"%s","tick":' % s.value.encode() for s in GameState_e}
+        self._tail = b',"grid_width":%d,"grid_height":%d,"cell_size":%d}' % (grid_width, grid_height, cell_size)
+
+    def _cell(self, cell: int) -> bytes:
+        """
+        @brief  编码单个格子坐标
+        @param  cell: 格子索引
+        @retval bytes: [x,y] 字节片段
+        """
+        return b'[%d,%d]' % (cell % self.grid_width, cell // self.grid_width)
+
+    def encode(self, packed: PackedState) -> bytes:
+        """
+        @brief  编码游戏状态
+        @param  packed: 打包的游戏状态
+        @retval bytes: JSON字节串
+        """
+        table = self._cells
+        if table is not None:
+            body = b','.join([table[cell] for cell in packed.cells])
+            food = table[packed.food]
+        else:
+            body = b','.join([self._cell(cell) for cell in packed.cells])
+            food = self._cell(packed.food)
+        return b''.join((
+            b'{"snake_body":[', body, b'],"food_position":', food,
+            self._directions[packed.direction], b'%d,"highscore":%d' % (packed.score, packed.highscore),
+            self._states[packed.state], b'%d,"input_ack":%d,"seq":%d' % (packed.tick, packed.ack, packed.seq),
+            self._tail
+        ))
+
+
+def turn_points(cells: List[int]) -> List[int]:
+    """
+    @brief  提取蛇身的拐点
+    @details 保留蛇头、蛇尾和相邻两段移动方向不同的格子，相邻拐点之间是直线，可按行列还原
+    @param  cells: 蛇身格子索引（蛇头在前）
+    @retval list: 拐点格子索引
+    """
+    if len(cells) <= 2:
+        return list(cells)
+    points = [cells[0]]
+    step = cells[1] - cells[0]
+    for i in range(1, len(cells) - 1):
+        next_step = cells[i + 1] - cells[i]
+        if next_step != step:
+            points.append(cells[i])
+            step = next_step
+    points.append(cells[-1])
+    return points
+
+
+def encode_binary(packed: PackedState, grid_width: int, grid_height: int, cell_size: int = CELL_SIZE) -> bytes:
+    """
+    @brief  把游戏状态编码为二进制
+    @details 头部40字节，字段见 BINARY_HEADER；随后是 条目数×索引字节数 的蛇身数据，
+             格子总数不超过65536时索引为uint16，否则为uint32。
+             BODY_CELLS 时依次为每节蛇身的格子索引；BODY_TURNS 时为拐点，相邻拐点之间按直线补全
+    @param  packed: 打包的游戏状态
+    @param  grid_width: 网格宽度
+    @param  grid_height: 网格高度
+    @param  cell_size: 格子像素大小
+    @retval bytes: 二进制数据
+    """
+    cells = packed.cells
+    points = turn_points(cells)
+    encoding, body = (BODY_TURNS, points) if len(points) < len(cells) else (BODY_CELLS, cells)
+    typecode, index_size = ('H', 2) if grid_width * grid_height <= 0x10000 else ('I', 4)
+    data = array(typecode, body)
+    if not _NATIVE_LITTLE_ENDIAN:
+        data.byteswap()
+    header = BINARY_HEADER.pack(
+        packed.seq & 0xFFFFFFFF, packed.score, packed.highscore, packed.food, len(body),
+        grid_width, grid_height, cell_size,
+        STATE_CODES[packed.state], DIRECTION_CODES[packed.direction], encoding, index_size, 0,
+        packed.tick, packed.ack
+    )
+    return header + data.tobytes()
+
+
+def encode_game_state_binary(game) -> bytes:
+    """
+    @brief  把游戏实例的当前状态编码为二进制
+    @param  game: SnakeGame 或 SharedSnakeGame 实例
+    @retval bytes: 二进制数据
+    """
+    return encode_binary(game.get_packed_state(), game.grid_width, game.grid_height)
+
+
+# 网格尺寸到编码器的缓存，按创建顺序排列，超过 MAX_ENCODERS 时淘汰最早创建的
+_encoders: Dict[Tuple[int, int], GameStateJSONEncoder] = {}
+_encoders_lock = threading.Lock()
+
+
+def get_json_encoder(grid_width: int, grid_height: int) -> GameStateJSONEncoder:
+    """
+    @brief  获取指定网格尺寸的编码器，首次使用时创建，最多缓存 MAX_ENCODERS 个，超出时淘汰最早创建的
+    @param  grid_width: 网格宽度
+    @param  grid_height: 网格高度
+    @retval GameStateJSONEncoder: 编码器
+    """
+    key = (grid_width, grid_height)
+    encoder = _encoders.get(key)
+    if encoder is not None:
+        return encoder
+    encoder = GameStateJSONEncoder(grid_width, grid_height)
+    with _encoders_lock:
+        encoder = _encoders.setdefault(key, encoder)
+        while len(_encoders) > MAX_ENCODERS:
+            del _encoders[next(iter(_encoders))]
+    return encoder
+
+
+def encode_game_state(game) -> bytes:
+    """
+    @brief  把游戏实例的当前状态编码为JSON
+    @param  game: SnakeGame 或 SharedSnakeGame 实例
+    @retval bytes: JSON字节串
+    """
+    return get_json_encoder(game.grid_width, game.grid_height).encode(game.get_packed_state())
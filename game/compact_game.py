@@ -0,0 +1,181 @@
+"""
+@file    compact_game.py
+@brief   紧凑游戏实例
+@details CompactSnakeGame 与 SnakeGame 规则和接口相同，但用 __slots__ 去掉每个实例的 __dict__，
+         方向以整数编码保存，update() 只做整数运算和模块级查找表下标访问，不创建字典、元组等临时对象。
+         适用于同一进程内保存数万局游戏的场景。与方向无关的规则直接复用 SnakeGame 的方法，
+         它们只访问两个类共有的属性
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import threading
+from typing import Optional
+
+from .snake_game import (
+    SnakeGame, Direction_e, GameState_e, PackedBody, PackedState, DIRECTIONS, DIRECTION_CODES, OPPOSITE_CODES,
+    FOOD_SCORE, GRID_WIDTH, GRID_HEIGHT, GAME_SPEED, INITIAL_SNAKE_LENGTH, validate_board
+)
+from .events import CAUSE_SELF, CAUSE_WALL, EVENT_DEATH, EVENT_FOOD
+
+# 方向编码
+DIR_UP, DIR_DOWN, DIR_LEFT, DIR_RIGHT = range(4)
+
+# 方向编码到方向字符串
+DIRECTION_NAMES = tuple(direction.value for direction in DIRECTIONS)
+
+# 方向枚举值到编码
+DIRECTION_INDEX = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+class CompactSnakeGame:
+    """
+    @brief  紧凑贪吃蛇游戏类
+    @details current_direction / next_direction 以 Direction_e 读写，内部保存为整数编码
+    """
+
+    __slots__ = (
+        'grid_width', 'grid_height', 'cell_count', 'speed', 'initial_length', '_body', '_food',
+        '_direction', '_next_direction', 'score', 'highscore', 'game_state', 'seq', 'tick', 'input_ack', 'events',
+        'lock'
+    )
+
+    def __init__(self, grid_width: int = GRID_WIDTH, grid_height: int = GRID_HEIGHT,
+                 speed: int = GAME_SPEED, initial_length: int = INITIAL_SNAKE_LENGTH,
+                 highscore: Optional[int] = None):
+        """
+        @brief  初始化游戏实例，参数同 SnakeGame
+        @throws ValueError: 配置无效，见 validate_board()
+        """
+        validate_board(grid_width, grid_height, speed, initial_length)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.cell_count = grid_width * grid_height
+        self.speed = speed
+        self.initial_length = initial_length
+        self._body = PackedBody()
+        self._food = 0
+        self._direction = DIR_RIGHT
+        self._next_direction = DIR_RIGHT
+        self.score = 0
+        self.highscore = 0
+        self.game_state = GameState_e.IDLE
+        self.seq = 0
+        self.tick = 0
+        self.input_ack = 0
+        self.events = None
+        self.lock = threading.Lock()
+        if highscore is None:
+            self._load_highscore()
+        else:
+            self.highscore = highscore
+
+    # 与 SnakeGame 相同的规则
+    snake_body = SnakeGame.snake_body
+    food_position = SnakeGame.food_position
+    _load_highscore = SnakeGame._load_highscore
+    _save_highscore = SnakeGame._save_highscore
+    reset = SnakeGame.reset
+    start = SnakeGame.start
+    toggle_pause = SnakeGame.toggle_pause
+    apply_inputs = SnakeGame.apply_inputs
+    _spawn_food = SnakeGame._spawn_food
+    _check_collision = SnakeGame._check_collision
+    get_state = SnakeGame.get_state
+    get_highscore = SnakeGame.get_highscore
+
+    @property
+    def current_direction(self) -> Direction_e:
+        """@brief  当前移动方向"""
+        return DIRECTIONS[self._direction]
+
+    @current_direction.setter
+    def current_direction(self, direction: Direction_e) -> None:
+        self._direction = DIRECTION_INDEX[direction]
+
+    @property
+    def next_direction(self) -> Direction_e:
+        """@brief  下一步移动方向"""
+        return DIRECTIONS[self._next_direction]
+
+    @next_direction.setter
+    def next_direction(self, direction: Direction_e) -> None:
+        self._next_direction = DIRECTION_INDEX[direction]
+
+    def set_direction(self, direction: str) -> None:
+        """
+        @brief  设置蛇的移动方向
+        @param  direction: 方向字符串 ('up', 'down', 'left', 'right')
+        @retval None
+        """
+        code = DIRECTION_CODES.get(direction)
+        if code is not None and OPPOSITE_CODES[code] != self._direction:
+            self._next_direction = code
+            self.seq += 1
+
+    def update(self) -> bool:
+        """
+        @brief  更新游戏状态，每帧调用一次
+        @details 新蛇头直接按格子索引计算，撞墙按方向判断所在行列
+        @retval true: 本次调用使游戏结束, false: 游戏继续或本来就不在进行中
+        """
+        if self.game_state is not GameState_e.PLAYING:
+            return False
+        direction = self._direction = self._next_direction
+        self.seq += 1
+        self.tick += 1
+
+        body = self._body
+        head = body.head()
+        width = self.grid_width
+        if direction == DIR_UP:
+            new_head = head - width
+            hit_wall = new_head < 0
+        elif direction == DIR_DOWN:
+            new_head = head + width
+            hit_wall = new_head >= self.cell_count
+        elif direction == DIR_LEFT:
+            new_head = head - 1
+            hit_wall = head % width == 0
+        else:
+            new_head = head + 1
+            hit_wall = new_head % width == 0
+
+        # 撞墙或撞到蛇身（本步会移开的蛇尾除外）时游戏结束
+        if hit_wall or (new_head in body and new_head != body.tail()):
+            self.game_state = GameState_e.GAME_OVER
+            if self.events is not None:
+                self.events(self, EVENT_DEATH, head, CAUSE_WALL if hit_wall else CAUSE_SELF)
+            if self.score > self.highscore:
+                self.highscore = self.score
+                self._save_highscore()
+            return True
+
+        if new_head == self._food:
+            body.push_head(new_head)
+            self.score += FOOD_SCORE
+            if self.events is not None:
+                self.events(self, EVENT_FOOD, new_head)
+            self._spawn_food()
+        else:
+            body.pop_tail()
+            body.push_head(new_head)
+        return False
+
+    def get_packed_state(self) -> PackedState:
+        """
+        @brief  获取打包的游戏状态
+        @retval PackedState: 以格子索引表示位置的游戏状态
+        """
+        return PackedState(
+            self._body.to_list(),
+            self._food,
+            DIRECTION_NAMES[self._direction],
+            self.score,
+            self.highscore,
+            self.game_state.value,
+            self.seq,
+            self.tick,
+            self.input_ack
+        )
@@ -0,0 +1,321 @@
+"""
+@file    events.py
+@brief   游戏事件流
+@details 游戏在开始、暂停、继续、吃到食物和死亡时调用挂接的事件记录器，记录器把事件放入进程内的有界环形缓冲区，
+         游戏循环中只有一次加锁的列表赋值，不做任何I/O。后台写入线程在缓冲区积累到一批或到达间隔时取出事件，
+         每批以一次 executemany 和一个事务追加到SQLite事件表。缓冲区满时丢弃新事件并计数，游戏循环从不等待写入。
+         数据库连接和写入线程在每个进程中首次使用时创建，预加载应用的主进程不持有连接，fork出的工作进程各自打开
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入日志模块
+import logging
+
+# 导入操作系统模块，用于识别fork出的子进程
+import os
+
+# 导入SQLite模块，用于保存事件
+import sqlite3
+
+# 导入线程模块，用于后台写入线程
+import threading
+
+# 导入时间模块，用于事件时间戳
+import time
+
+# 导入具名元组，用于定义事件
+from collections import namedtuple
+
+# 导入类型提示模块
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# 事件类型编码：开始、暂停、继续、吃到食物、死亡
+EVENT_START, EVENT_PAUSE, EVENT_RESUME, EVENT_FOOD, EVENT_DEATH = range(5)
+EVENT_NAMES = ('start', 'pause', 'resume', 'food', 'death')
+
+# 死亡原因编码：无（非死亡事件）、撞墙、撞到自身
+CAUSE_NONE, CAUSE_WALL, CAUSE_SELF = range(3)
+CAUSE_NAMES = ('', 'wall', 'self')
+
+# 游戏事件：Unix时间戳、用户ID、事件类型、本局步数、得分、蛇头格子索引（死亡事件为撞击前的蛇头）、
+#           死亡原因、网格宽度、网格高度
+GameEvent = namedtuple('GameEvent', 'time user_id kind tick score cell cause grid_width grid_height')
+
+# 环形缓冲区默认容量、每批写入的事件数、写入间隔（秒）
+DEFAULT_CAPACITY = 65536
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_WRITE_INTERVAL = 0.5
+
+# 事件表
+EVENT_TABLE_SQL = (
+    'CREATE TABLE IF NOT EXISTS game_events ('
+    'id INTEGER PRIMARY KEY, time REAL NOT NULL, user_id INTEGER NOT NULL, kind INTEGER NOT NULL, '
+    'tick INTEGER NOT NULL, score INTEGER NOT NULL, cell INTEGER NOT NULL, cause INTEGER NOT NULL, '
+    'grid_width INTEGER NOT NULL, grid_height INTEGER NOT NULL)'
+)
+EVENT_INSERT_SQL = (
+    'INSERT INTO game_events (time, user_id, kind, tick, score, cell, cause, grid_width, grid_height) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+class EventRing:
+    """
+    @brief  有界事件环形缓冲区
+    @details 槽位列表预先分配，写入和取出只移动读写计数；积压达到一批时置位 ready 唤醒写入线程
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        @brief  创建缓冲区
+        @param  capacity: 最多积压的事件数
+        @param  batch_size: 积压多少事件时唤醒写入线程
+        """
+        if capacity <= 0:
+            raise ValueError(f'缓冲区容量必须为正数: {capacity}')
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self._slots = [None] * capacity
+        # 已写入和已取出的事件总数
+        self._written = 0
+        self._read = 0
+        self._lock = threading.Lock()
+        # 积压达到一批时置位
+        self.ready = threading.Event()
+        # 缓冲区满时丢弃的事件数
+        self.dropped = 0
+
+    def append(self, event) -> bool:
+        """
+        @brief  放入一个事件，缓冲区满时丢弃
+        @param  event: 事件
+        @retval true: 已放入, false: 缓冲区已满
+        """
+        with self._lock:
+            pending = self._written - self._read
+            if pending >= self.capacity:
+                self.dropped += 1
+                return False
+            self._slots[self._written % self.capacity] = event
+            self._written += 1
+            if pending + 1 == self.batch_size:
+                self.ready.set()
+        return True
+
+    def drain(self, limit: int) -> List:
+        """
+        @brief  按写入顺序取出最多 limit 个事件
+        @param  limit: 最多取出的事件数
+        @retval list: 事件列表
+        """
+        with self._lock:
+            count = min(self._written - self._read, limit)
+            start = self._read % self.capacity
+            end = start + count
+            if end <= self.capacity:
+                batch = self._slots[start:end]
+                self._slots[start:end] = [None] * count
+            else:
+                end -= self.capacity
+                batch = self._slots[start:] + self._slots[:end]
+                self._slots[start:] = [None] * (self.capacity - start)
+                self._slots[:end] = [None] * end
+            self._read += count
+            if self._written - self._read < self.batch_size:
+                self.ready.clear()
+        return batch
+
+    def __len__(self) -> int:
+        return self._written - self._read
+
+
+class EventRecorder:
+    """
+    @brief  挂接到单局游戏的事件记录器
+    @details 游戏以 recorder(game, kind, cell, cause) 调用，记录器补上时间、用户ID和游戏的步数、得分、网格尺寸
+    """
+
+    __slots__ = ('ring', 'user_id')
+
+    def __init__(self, ring: EventRing, user_id: int):
+        """
+        @brief  创建记录器
+        @param  ring: 事件缓冲区
+        @param  user_id: 游戏所属用户ID
+        """
+        self.ring = ring
+        self.user_id = user_id
+
+    def __call__(self, game, kind: int, cell: int, cause: int = CAUSE_NONE) -> None:
+        self.ring.append(GameEvent(time.time(), self.user_id, kind, game.tick, game.score, cell, cause,
+                                   game.grid_width, game.grid_height))
+
+
+class SQLiteEventSink:
+    """
+    @brief  SQLite事件表
+    @details 只追加；每批事件在一个事务中插入。连接由 EventWriter 的锁串行使用；
+             每个进程第一次写入时打开自己的连接，fork继承来的连接属于父进程，不使用也不关闭
+    """
+
+    def __init__(self, path: str):
+        """
+        @brief  建表，不保留连接
+        @param  path: SQLite文件路径
+        """
+        self.path = path
+        self._conn = None
+        # 打开 _conn 的进程ID
+        self._pid = None
+        with sqlite3.connect(path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(EVENT_TABLE_SQL)
+        conn.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        @brief  获取当前进程的连接，首次使用时打开
+        @retval sqlite3.Connection: 数据库连接
+        """
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._pid = os.getpid()
+        return self._conn
+
+    def write(self, events: List) -> None:
+        """
+        @brief  在一个事务中追加一批事件
+        @param  events: 事件列表
+        @retval None
+        """
+        conn = self._connection()
+        with conn:
+            conn.executemany(EVENT_INSERT_SQL, events)
+
+    def close(self) -> None:
+        """
+        @brief  关闭当前进程打开的数据库连接
+        @retval None
+        """
+        if self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+
+class EventWriter:
+    """
+    @brief  后台事件写入线程
+    @details 缓冲区积压达到一批时立即写入，否则按间隔写入；关闭时写入剩余事件。
+             线程在每个进程第一次调用 start() 时启动，fork出的子进程不继承父进程的线程，需重新启动
+    """
+
+    def __init__(self, ring: EventRing, sink, interval: float = DEFAULT_WRITE_INTERVAL):
+        """
+        @brief  创建写入线程（未启动）
+        @param  ring: 事件缓冲区
+        @param  sink: 事件表，需提供 write(events) 和 close()
+        @param  interval: 最长写入间隔（秒）
+        """
+        self.ring = ring
+        self.sink = sink
+        self.interval = interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        # 启动写入线程的进程ID
+        self._pid = None
+        self._closed = False
+        # 已写入的事件数和批数
+        self.events_written = 0
+        self.batches_written = 0
+
+    def flush(self) -> int:
+        """
+        @brief  把缓冲区中的事件按批写入
+        @retval int: 写入的事件数
+        """
+        written = 0
+        with self._lock:
+            while True:
+                batch = self.ring.drain(self.ring.batch_size)
+                if not batch:
+                    break
+                self.sink.write(batch)
+                written += len(batch)
+                self.events_written += len(batch)
+                self.batches_written += 1
+        return written
+
+    def start(self) -> None:
+        """
+        @brief  在当前进程中启动后台线程，已启动或已关闭时立即返回
+        @retval None
+        """
+        if self._pid == os.getpid() or self._closed:
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='game-events', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """
+        @brief  后台线程主循环
+        @retval None
+        """
+        while not self._stop.is_set():
+            self.ring.ready.wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('写入游戏事件失败')
+
+    def close(self) -> None:
+        """
+        @brief  停止后台线程，写入剩余事件并关闭事件表
+        @retval None
+        """
+        self._stop.set()
+        self.ring.ready.set()
+        thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            self.sink.close()
+
+
+def init_event_log(store, config):
+    """
+    @brief  按配置开启游戏事件记录
+    @details GAME_EVENTS_PATH 非空时把事件缓冲区交给游戏存储，由存储为每局游戏挂接记录器，
+             进程退出时由应用的退出钩子（app.close_apps）写入剩余事件；写入线程在每个进程第一次调用 start() 时启动（游戏接口蓝图在每个请求前调用），
+             数据库连接在第一次写入时打开。缓冲区容量、每批事件数和写入间隔分别由
+             GAME_EVENTS_CAPACITY、GAME_EVENTS_BATCH、GAME_EVENTS_INTERVAL 指定
+    @param  store: 游戏存储
+    @param  config: 配置字典
+    @retval EventWriter: 写入线程，未配置时为None
+    @throws RuntimeError: 游戏存储不是进程内存储
+    """
+    path = config.get('GAME_EVENTS_PATH')
+    if not path:
+        return None
+    if not hasattr(store, 'event_ring'):
+        raise RuntimeError('游戏事件只支持进程内游戏存储')
+    ring = EventRing(int(config.get('GAME_EVENTS_CAPACITY', DEFAULT_CAPACITY)),
+                     int(config.get('GAME_EVENTS_BATCH', DEFAULT_BATCH_SIZE)))
+    writer = EventWriter(ring, SQLiteEventSink(path), float(config.get('GAME_EVENTS_INTERVAL', DEFAULT_WRITE_INTERVAL)))
+    store.event_ring = ring
+    return writer
@@ -0,0 +1,208 @@
+"""
+@file    hibernate.py
+@brief   游戏休眠快照
+@details 长时间没有请求的游戏（暂停、结束或被放弃的游戏）序列化为紧凑快照后从内存中移除，
+         下次请求时再还原，使进程内存与活跃玩家数而不是会话总数成正比。
+         快照为50字节定长头部加蛇身格子索引数组（格子总数不超过65536时为uint16，否则为uint32），
+         蛇身数据可用zlib压缩（压缩后更短时才使用）。快照保存在内存字节池或磁盘目录中
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入操作系统模块，用于磁盘快照文件
+import os
+
+# 导入结构体模块，用于打包快照头部
+import struct
+
+# 导入压缩模块
+import zlib
+
+# 导入数组模块，用于打包格子索引
+from array import array
+
+# 导入类型提示模块
+from typing import Callable, Dict, Optional
+
+from .snake_game import DIRECTIONS, GameState_e, PackedBody
+
+# 快照魔数和格式版本
+SNAPSHOT_MAGIC = b'SNKH'
+SNAPSHOT_VERSION = 1
+
+# 快照头部（小端）：魔数、版本、标志、网格宽、网格高、速度、初始长度、
+#                  游戏状态、当前方向、下一步方向、保留、得分、最高分、状态序号、步数、已确认的输入编号、食物格子、蛇身长度
+SNAPSHOT_HEADER = struct.Struct('<4sBBHHHHBBBBIIQIIII')
+
+# 标志位：蛇身数据经过zlib压缩
+FLAG_COMPRESSED = 0x01
+
+# 游戏状态编码
+STATES = tuple(GameState_e)
+
+# 小端机器上 array 可直接输出二进制
+_NATIVE_LITTLE_ENDIAN = array('H', [1]).tobytes() == b'\x01\x00'
+
+
+def snapshot_game(game, compress: bool = False) -> bytes:
+    """
+    @brief  把游戏实例序列化为快照
+    @param  game: SnakeGame 或 CompactSnakeGame 实例
+    @param  compress: 是否尝试用zlib压缩蛇身数据
+    @retval bytes: 快照
+    """
+    cells = game._body.to_list()
+    typecode = 'H' if game.cell_count <= 0x10000 else 'I'
+    body = array(typecode, cells)
+    if not _NATIVE_LITTLE_ENDIAN:
+        body.byteswap()
+    payload = body.tobytes()
+    flags = 0
+    if compress:
+        compressed = zlib.compress(payload)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, FLAG_COMPRESSED
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+        game.grid_width, game.grid_height, game.speed, game.initial_length,
+        STATES.index(game.game_state), DIRECTIONS.index(game.current_direction),
+        DIRECTIONS.index(game.next_direction), 0,
+        game.score, game.highscore, game.seq, game.tick, game.input_ack, game._food, len(cells)
+    )
+    return header + payload
+
+
+def restore_game(data: bytes, factory: Callable, highscore: Optional[int] = None):
+    """
+    @brief  从快照还原游戏实例
+    @param  data: snapshot_game() 生成的快照
+    @param  factory: 游戏类（SnakeGame 或 CompactSnakeGame），以网格配置为参数调用
+    @param  highscore: 当前的历史最高分，为None时从文件读取
+    @retval 游戏实例
+    @throws ValueError: 快照格式无效
+    """
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError('快照长度不足')
+    (magic, version, flags, width, height, speed, initial_length, state, direction, next_direction, _,
+     score, saved_highscore, seq, tick, input_ack, food, length) = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError('不是有效的游戏快照')
+    payload = data[SNAPSHOT_HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError(f'快照数据损坏: {e}') from None
+    body = array('H' if width * height <= 0x10000 else 'I')
+    if len(payload) != length * body.itemsize:
+        raise ValueError('快照蛇身长度不一致')
+    body.frombytes(payload)
+    if not _NATIVE_LITTLE_ENDIAN:
+        body.byteswap()
+
+    game = factory(grid_width=width, grid_height=height, speed=speed, initial_length=initial_length,
+                   highscore=highscore)
+    game._body = PackedBody(body)
+    game._food = food
+    game.current_direction = DIRECTIONS[direction]
+    game.next_direction = DIRECTIONS[next_direction]
+    game.game_state = STATES[state]
+    game.score = score
+    # 休眠期间其他游戏可能刷新了最高分文件，取两者较大值
+    game.highscore = max(game.highscore, saved_highscore)
+    game.seq = seq
+    game.tick = tick
+    game.input_ack = input_ack
+    return game
+
+
+class MemorySnapshotPool:
+    """
+    @brief  内存快照池
+    @details 快照以字节串保存在字典中，每局休眠的游戏只占快照本身的几十字节
+    """
+
+    def __init__(self):
+        """@brief  创建快照池"""
+        self._snapshots: Dict[int, bytes] = {}
+
+    def put(self, user_id: int, data: bytes) -> None:
+        """
+        @brief  保存快照
+        @param  user_id: 用户ID
+        @param  data: 快照
+        @retval None
+        """
+        self._snapshots[user_id] = data
+
+    def take(self, user_id: int) -> Optional[bytes]:
+        """
+        @brief  取出并移除快照
+        @param  user_id: 用户ID
+        @retval bytes: 快照，不存在时为None
+        """
+        return self._snapshots.pop(user_id, None)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._snapshots
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+class DiskSnapshotPool:
+    """
+    @brief  磁盘快照池
+    @details 每个快照保存为目录中的一个文件，先写临时文件再原子替换，进程崩溃不会留下半个快照
+    """
+
+    def __init__(self, directory: str):
+        """
+        @brief  创建快照池
+        @param  directory: 快照目录，不存在时创建
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, user_id: int) -> str:
+        """
+        @brief  获取快照文件路径
+        @param  user_id: 用户ID
+        @retval str: 文件路径
+        """
+        return os.path.join(self.directory, f'{int(user_id)}.snap')
+
+    def put(self, user_id: int, data: bytes) -> None:
+        """
+        @brief  保存快照
+        @param  user_id: 用户ID
+        @param  data: 快照
+        @retval None
+        """
+        path = self._path(user_id)
+        temp = path + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, path)
+
+    def take(self, user_id: int) -> Optional[bytes]:
+        """
+        @brief  取出并删除快照
+        @param  user_id: 用户ID
+        @retval bytes: 快照，不存在时为None
+        """
+        path = self._path(user_id)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        return data
+
+    def __contains__(self, user_id: int) -> bool:
+        return os.path.exists(self._path(user_id))
+
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.snap'))
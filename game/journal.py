@@ -0,0 +1,445 @@
+"""
+@file    journal.py
+@brief   游戏检查点日志
+@details 把进程内存储中的游戏定期写入内存映射的定长记录文件，进程重启后从中恢复，玩家不必重新开始。
+         文件由16字节头部和 slot_count 个槽位组成，每个槽位两条定长记录，轮流写入：
+         写到一半时进程崩溃只会损坏正在写的那条，另一条仍是上一次的完整检查点。
+         每条记录以 CRC32 校验，恢复时每个槽位取校验通过且代数最大的记录。
+         记录内容为 game.hibernate 的游戏快照。检查点只写状态序号变化过的游戏，
+         写入即内存拷贝，不在每步调用 fsync；操作系统负责回写页缓存，另按间隔调用 flush() 落盘。
+         文件由打开它的进程加锁独占，工作进程在fork之后才打开，预加载应用的主进程不打开日志。
+         平滑重启时新工作进程等待旧工作进程写完最后一次检查点、释放文件后再恢复游戏
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入文件锁模块，用于独占日志文件（Windows上没有该模块，不加锁）
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 导入日志模块
+import logging
+
+# 导入内存映射模块
+import mmap
+
+# 导入操作系统模块
+import os
+
+# 导入结构体模块，用于打包头部
+import struct
+
+# 导入线程模块，用于后台检查点线程
+import threading
+
+# 导入时间模块
+import time
+
+# 导入压缩模块中的CRC32
+from zlib import crc32
+
+# 导入类型提示模块
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .hibernate import restore_game, snapshot_game
+from .snake_game import load_highscore
+
+logger = logging.getLogger(__name__)
+
+# 文件魔数和格式版本
+JOURNAL_MAGIC = b'SNKJ'
+JOURNAL_VERSION = 1
+
+# 文件头部（小端）：魔数、版本、保留、记录大小、槽位数
+JOURNAL_HEADER = struct.Struct('<4sHHII')
+
+# 记录头部（小端）：CRC32（覆盖其后的头部字段和快照）、用户ID（0为空）、代数、快照长度
+RECORD_HEADER = struct.Struct('<IIQI')
+
+# 默认槽位数和记录大小（字节），默认网格的蛇占满整个网格时快照也不超过记录大小
+DEFAULT_SLOT_COUNT = 1024
+DEFAULT_RECORD_SIZE = 1024
+
+# 默认的检查点间隔和落盘间隔（秒）
+DEFAULT_CHECKPOINT_INTERVAL = 1.0
+DEFAULT_FLUSH_INTERVAL = 30.0
+
+
+class GameJournal:
+    """
+    @brief  内存映射的游戏检查点日志
+    @details 打开时对文件加排他锁，一个文件同一时间只由一个进程写入，进程关闭日志或退出时释放
+    """
+
+    def __init__(self, path: str, slot_count: int = DEFAULT_SLOT_COUNT, record_size: int = DEFAULT_RECORD_SIZE):
+        """
+        @brief  打开或创建日志文件
+        @details 已有文件的槽位数或记录大小与参数不一致时丢弃其内容
+        @param  path: 日志文件路径
+        @param  slot_count: 槽位数，即最多保存的游戏数
+        @param  record_size: 每条记录的字节数
+        @throws BlockingIOError: 文件已被其他进程（或本进程的另一个日志）锁定
+        """
+        if record_size <= RECORD_HEADER.size:
+            raise ValueError(f'记录大小过小: {record_size}')
+        self.path = path
+        self.slot_count = slot_count
+        self.record_size = record_size
+        self.size = JOURNAL_HEADER.size + slot_count * 2 * record_size
+        header = JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, 0, record_size, slot_count)
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            existing = os.pread(fd, JOURNAL_HEADER.size, 0)
+            if existing != header:
+                if existing:
+                    logger.warning('检查点日志 %s 的格式与配置不一致，已丢弃', path)
+                os.ftruncate(fd, 0)
+            os.ftruncate(fd, self.size)
+            self._mm = mmap.mmap(fd, self.size)
+        except BaseException:
+            os.close(fd)
+            raise
+        # 保持文件打开以持有文件锁，close() 时关闭
+        self._fd = fd
+        self._mm[:JOURNAL_HEADER.size] = header
+
+        # 用户ID到槽位下标的映射，以及空闲槽位
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = list(range(slot_count - 1, -1, -1))
+        # 各槽位下一次写入的记录（0或1）
+        self._next_copy: Dict[int, int] = {}
+        # 用户ID到最近一次写入的状态序号
+        self._written: Dict[int, int] = {}
+        # 下一条记录的代数
+        self._generation = 1
+        self._lock = threading.Lock()
+
+    def _offset(self, slot: int, copy: int) -> int:
+        """
+        @brief  计算记录在文件中的偏移
+        @param  slot: 槽位下标
+        @param  copy: 槽位中的第几条记录（0或1）
+        @retval int: 字节偏移
+        """
+        return JOURNAL_HEADER.size + (slot * 2 + copy) * self.record_size
+
+    def _read_record(self, slot: int, copy: int):
+        """
+        @brief  读取并校验一条记录
+        @param  slot: 槽位下标
+        @param  copy: 槽位中的第几条记录
+        @retval tuple: (用户ID, 代数, 快照)，记录为空或校验失败时为None
+        """
+        offset = self._offset(slot, copy)
+        checksum, user_id, generation, length = RECORD_HEADER.unpack_from(self._mm, offset)
+        if user_id == 0 or length > self.record_size - RECORD_HEADER.size:
+            return None
+        end = offset + RECORD_HEADER.size + length
+        if crc32(self._mm[offset + 4:end]) != checksum:
+            return None
+        return user_id, generation, self._mm[offset + RECORD_HEADER.size:end]
+
+    def recover(self, factory: Callable) -> Dict[int, object]:
+        """
+        @brief  从日志恢复游戏
+        @details 每个槽位取校验通过且代数最大的记录；同一用户出现在多个槽位时取代数最大的
+        @param  factory: 游戏类，见 game.hibernate.restore_game()
+        @retval dict: 用户ID到游戏实例的映射
+        """
+        best: Dict[int, Tuple[int, int, int, bytes]] = {}
+        occupied = []
+        with self._lock:
+            for slot in range(self.slot_count):
+                records = [self._read_record(slot, copy) for copy in (0, 1)]
+                valid = [(record[1], copy, record) for copy, record in enumerate(records) if record is not None]
+                if not valid:
+                    continue
+                occupied.append(slot)
+                generation, copy, (user_id, _, data) = max(valid)
+                self._generation = max(self._generation, generation + 1)
+                if user_id not in best or best[user_id][0] < generation:
+                    best[user_id] = (generation, slot, copy, data)
+
+            games = {}
+            used = set()
+            highscore = load_highscore()
+            for user_id, (generation, slot, copy, data) in best.items():
+                try:
+                    games[user_id] = restore_game(data, factory, highscore)
+                except ValueError:
+                    logger.warning('检查点日志中用户 %s 的快照无效', user_id, exc_info=True)
+                    continue
+                self._slots[user_id] = slot
+                self._next_copy[slot] = 1 - copy
+                self._written[user_id] = games[user_id].seq
+                used.add(slot)
+            self._free = [slot for slot in range(self.slot_count - 1, -1, -1) if slot not in used]
+            # 清除有记录但未被采用的槽位（同一用户的旧槽位、快照无效），避免之后被误恢复
+            for slot in occupied:
+                if slot in used:
+                    continue
+                for copy in (0, 1):
+                    RECORD_HEADER.pack_into(self._mm, self._offset(slot, copy), 0, 0, 0, 0)
+        return games
+
+    def _snapshot(self, game) -> Tuple[int, Optional[bytes]]:
+        """
+        @brief  在游戏锁内读取状态序号和快照，二者对应同一个完整的状态
+        @details 游戏的方法先递增状态序号再修改其他字段，不加锁读取可能得到更新到一半的状态
+        @param  game: 游戏实例
+        @retval tuple: (状态序号, 快照)，压缩后仍超过记录大小时快照为None
+        """
+        limit = self.record_size - RECORD_HEADER.size
+        with game.lock:
+            seq = game.seq
+            data = snapshot_game(game)
+            if len(data) > limit:
+                data = snapshot_game(game, compress=True)
+        return seq, data if len(data) <= limit else None
+
+    def write(self, user_id: int, game) -> bool:
+        """
+        @brief  写入一局游戏的检查点
+        @param  user_id: 用户ID
+        @param  game: 游戏实例
+        @retval true: 已写入, false: 没有空闲槽位或快照超过记录大小
+        """
+        return self._put(user_id, self._snapshot(game)[1])
+
+    def _put(self, user_id: int, data: Optional[bytes]) -> bool:
+        """
+        @brief  把快照写入用户槽位中较旧的那条记录
+        @details 先写快照和头部字段，最后写校验和
+        @param  user_id: 用户ID
+        @param  data: 快照，为None时不写入
+        @retval true: 已写入, false: 没有快照或没有空闲槽位
+        """
+        if data is None:
+            return False
+        with self._lock:
+            slot = self._slots.get(user_id)
+            if slot is None:
+                if not self._free:
+                    return False
+                slot = self._slots[user_id] = self._free.pop()
+            copy = self._next_copy.get(slot, 0)
+            offset = self._offset(slot, copy)
+            fields = RECORD_HEADER.pack(0, user_id, self._generation, len(data))[4:]
+            self._mm[offset + 4:offset + RECORD_HEADER.size] = fields
+            self._mm[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + len(data)] = data
+            self._mm[offset:offset + 4] = struct.pack('<I', crc32(data, crc32(fields)))
+            self._generation += 1
+            self._next_copy[slot] = 1 - copy
+        return True
+
+    def release(self, user_id: int) -> None:
+        """
+        @brief  清除用户的检查点并回收槽位
+        @param  user_id: 用户ID
+        @retval None
+        """
+        with self._lock:
+            slot = self._slots.pop(user_id, None)
+            self._written.pop(user_id, None)
+            if slot is None:
+                return
+            for copy in (0, 1):
+                RECORD_HEADER.pack_into(self._mm, self._offset(slot, copy), 0, 0, 0, 0)
+            self._next_copy.pop(slot, None)
+            self._free.append(slot)
+
+    def checkpoint(self, games: Iterable[Tuple[int, object]], retained: Optional[Callable[[int], bool]] = None) -> int:
+        """
+        @brief  写入状态序号变化过的游戏，清除已不在存储中的游戏
+        @details 快照和状态序号在游戏锁内一起读取（见 _snapshot()），记录的序号总是对应写入的完整状态。
+                 休眠中的游戏不在 games 中，但状态不再变化，由 retained 判断后保留其最后一次检查点
+        @param  games: (用户ID, 游戏实例) 序列
+        @param  retained: 判断不在 games 中的用户的游戏是否仍在存储中，为None时全部视为已移除
+        @retval int: 写入的游戏数
+        """
+        games = list(games)
+        # 先回收已不在存储中的游戏的槽位，再写入新游戏
+        present = {user_id for user_id, _ in games}
+        for user_id in [user_id for user_id in self._slots if user_id not in present]:
+            if retained is None or not retained(user_id):
+                self.release(user_id)
+        written = 0
+        for user_id, game in games:
+            # 更新进行中的游戏已递增了序号，不会在这里被跳过
+            if self._written.get(user_id) == game.seq:
+                continue
+            seq, data = self._snapshot(game)
+            if self._put(user_id, data):
+                self._written[user_id] = seq
+                written += 1
+        return written
+
+    @property
+    def closed(self) -> bool:
+        """@brief  映射是否已关闭"""
+        return self._mm.closed
+
+    def flush(self) -> None:
+        """
+        @brief  把映射的页同步到磁盘
+        @retval None
+        """
+        self._mm.flush()
+
+    def close(self) -> None:
+        """
+        @brief  落盘并关闭映射
+        @retval None
+        """
+        with self._lock:
+            if not self._mm.closed:
+                self._mm.flush()
+                self._mm.close()
+                os.close(self._fd)
+
+
+class Checkpointer:
+    """
+    @brief  后台检查点线程
+    @details 按间隔把存储中的游戏写入日志，按更长的间隔落盘；关闭时写入最后一次检查点。
+             日志和线程在每个进程第一次调用 start() 时才创建：预加载应用的主进程只创建本对象，
+             fork出的工作进程在处理第一个请求前锁定日志文件、恢复其中的游戏并启动自己的线程。
+             文件仍被平滑重启中的旧工作进程锁定时，后台线程按检查点间隔重试，旧进程退出后恢复游戏，
+             等待期间已在本进程开始的游戏保留，不被日志中的旧游戏覆盖
+    """
+
+    def __init__(self, store, path: str, slot_count: int = DEFAULT_SLOT_COUNT,
+                 record_size: int = DEFAULT_RECORD_SIZE, interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        @brief  创建检查点线程（未打开日志，未启动）
+        @param  store: 进程内游戏存储，需提供 games()、has_game()、adopt() 和 game_factory
+        @param  path: 日志文件路径
+        @param  slot_count: 槽位数
+        @param  record_size: 每条记录的字节数
+        @param  interval: 检查点间隔（秒）
+        @param  flush_interval: 落盘间隔（秒）
+        """
+        self.store = store
+        self.path = path
+        self.slot_count = slot_count
+        self.record_size = record_size
+        self.interval = interval
+        self.flush_interval = flush_interval
+        # 当前进程使用的日志，尚未启动或文件仍被其他进程锁定时为None
+        self.journal: Optional[GameJournal] = None
+        # 启动检查点的进程ID，fork出的子进程与之不同，需重新启动
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> int:
+        """
+        @brief  执行一次检查点
+        @retval int: 写入的游戏数
+        """
+        return self.journal.checkpoint(self.store.games(), self.store.has_game)
+
+    def _open(self, replace: bool) -> bool:
+        """
+        @brief  锁定并打开日志，把恢复的游戏放回存储
+        @param  replace: 是否覆盖存储中同一用户已有的游戏
+        @retval true: 已打开, false: 文件仍被其他进程锁定
+        """
+        begin = time.perf_counter()
+        try:
+            journal = GameJournal(self.path, self.slot_count, self.record_size)
+        except BlockingIOError:
+            return False
+        games = journal.recover(self.store.game_factory)
+        adopted = self.store.adopt(games, replace)
+        self.journal = journal
+        logger.info('从检查点恢复 %d 局游戏（日志中 %d 局），用时 %.1f 毫秒', adopted, len(games),
+                    (time.perf_counter() - begin) * 1000)
+        return True
+
+    def start(self) -> None:
+        """
+        @brief  在当前进程中打开日志、恢复游戏并启动后台线程，已启动时立即返回
+        @details 日志被其他进程锁定时不等待，由后台线程重试；fork继承来的日志和线程属于父进程，子进程不使用
+        @retval None
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self.journal = None
+            if not self._open(replace=True):
+                logger.info('检查点日志 %s 仍被其他工作进程锁定，等待其退出后恢复游戏', self.path)
+            self._thread = threading.Thread(target=self._run, name='game-checkpoint', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """
+        @brief  后台线程主循环
+        @retval None
+        """
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stop.wait(self.interval):
+            try:
+                if self.journal is None:
+                    self._open(replace=False)
+                    continue
+                self.run_once()
+                if time.monotonic() >= next_flush:
+                    self.journal.flush()
+                    next_flush = time.monotonic() + self.flush_interval
+            except Exception:
+                logger.exception('写入游戏检查点失败')
+
+    def close(self) -> None:
+        """
+        @brief  停止后台线程，写入最后一次检查点并关闭日志
+        @details 只关闭当前进程启动的日志，没有启动过的进程（如预加载的主进程）不做任何事
+        @retval None
+        """
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if self.journal is None or self.journal.closed:
+            return
+        try:
+            self.run_once()
+        finally:
+            self.journal.close()
+
+
+def init_checkpoints(store, config):
+    """
+    @brief  按配置开启游戏检查点
+    @details GAME_CHECKPOINT_PATH 非空时创建检查点线程，进程退出时由应用的退出钩子（app.close_apps）写入最后一次检查点；
+             日志在每个进程第一次调用 start() 时打开（游戏接口蓝图在每个请求前调用），
+             恢复的游戏放回存储。槽位数、记录大小和检查点间隔分别由
+             GAME_CHECKPOINT_SLOTS、GAME_CHECKPOINT_RECORD_SIZE、GAME_CHECKPOINT_INTERVAL 指定
+    @param  store: 游戏存储
+    @param  config: 配置字典
+    @retval Checkpointer: 检查点线程，未配置时为None
+    @throws RuntimeError: 游戏存储不是进程内存储
+    """
+    path = config.get('GAME_CHECKPOINT_PATH')
+    if not path:
+        return None
+    if not hasattr(store, 'games'):
+        raise RuntimeError('游戏检查点只支持进程内游戏存储')
+    checkpointer = Checkpointer(store, path, int(config.get('GAME_CHECKPOINT_SLOTS', DEFAULT_SLOT_COUNT)),
+                                int(config.get('GAME_CHECKPOINT_RECORD_SIZE', DEFAULT_RECORD_SIZE)),
+                                float(config.get('GAME_CHECKPOINT_INTERVAL', DEFAULT_CHECKPOINT_INTERVAL)))
+    return checkpointer
@@ -0,0 +1,677 @@
+"""
+@file    shared_store.py
+@brief   共享内存游戏存储
+@details 基于 multiprocessing.shared_memory 的定长槽位存储，每个槽位保存一局游戏的
+         紧凑状态：头部字段、蛇身环形缓冲区（格子索引 y*W+x）和占用位图。
+         各工作进程直接在共享内存上推进游戏，每个槽位一把进程间锁，无需序列化游戏对象。
+         槽位可能被其他进程回收并分配给别的用户，每个操作都在槽位锁内核对所属用户，
+         不一致时重新查找或分配该用户的槽位。
+         存储及其锁必须在fork工作进程之前创建，由子进程继承
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入操作系统模块，用于区分创建存储的进程
+import os
+
+# 导入时间模块，用于记录槽位最近活跃时间
+import time
+
+# 导入随机数模块，用于随机生成食物位置
+import random
+
+# 导入结构体模块，用于读写定长头部
+import struct
+
+# 导入多进程模块，用于创建进程间锁
+import multiprocessing
+
+# 导入共享内存模块
+from multiprocessing import shared_memory
+
+# 导入上下文管理器模块，用于在槽位锁内核对所属用户
+from contextlib import contextmanager, nullcontext
+
+# 导入类型提示模块
+from typing import List, Tuple
+
+from .snake_game import (
+    GameState_e, PackedState, FOOD_SCORE, GRID_WIDTH, GRID_HEIGHT, CELL_SIZE,
+    INITIAL_SNAKE_LENGTH, DIRECTIONS, DIRECTION_CODES, OPPOSITE_CODES, load_highscore, save_highscore
+)
+
+# 存储格式魔数和版本号
+STORE_MAGIC = b'SNKS'
+STORE_VERSION = 2
+
+# 全局头部：魔数、版本、保留、槽位数、网格宽、网格高、全局最高分
+GLOBAL_HEADER = struct.Struct('<4sHHIHHI')
+GLOBAL_HEADER_SIZE = 32
+HIGHSCORE_OFFSET = 16
+
+# 槽位头部：所属用户、得分、蛇长、蛇头在环形缓冲区的位置、食物格子、序号、
+#          最近活跃时间、游戏状态、当前方向、下一步方向、保留、本局步数、已确认的输入编号
+SLOT_HEADER = struct.Struct('<IIIIIIdBBBBII')
+SLOT_HEADER_SIZE = 48
+
+# 槽位头部各字段下标
+SLOT_FIELD_COUNT = 13
+(F_OWNER, F_SCORE, F_LENGTH, F_HEAD, F_FOOD, F_SEQ, F_ACTIVE, F_STATE, F_DIRECTION, F_NEXT, F_RESERVED,
+ F_TICK, F_ACK) = range(SLOT_FIELD_COUNT)
+
+# 用户ID字段结构，单独读取以便快速查找槽位
+OWNER_FIELD = struct.Struct('<I')
+
+# 方向编码，与枚举定义顺序一致，编码表见 snake_game.DIRECTIONS
+DIR_UP, DIR_DOWN, DIR_LEFT, DIR_RIGHT = range(4)
+
+# 各方向编码对应的坐标偏移量
+DIRECTION_OFFSETS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# 游戏状态编码
+STATES = (GameState_e.IDLE, GameState_e.PLAYING, GameState_e.PAUSED, GameState_e.GAME_OVER)
+STATE_IDLE, STATE_PLAYING, STATE_PAUSED, STATE_GAME_OVER = range(4)
+
+# 槽位用尽时可以回收的游戏状态，暂停的游戏不回收
+EVICTABLE_STATES = (STATE_IDLE, STATE_GAME_OVER)
+
+# 操作时发现槽位已被回收后重新查找槽位的次数上限
+MAX_REBIND_ATTEMPTS = 3
+
+# 蛇身长度超过格子总数的该比例后，食物改为扫描空闲格子生成
+FOOD_SCAN_RATIO = 0.75
+
+
+class StoreFullError(RuntimeError):
+    """所有槽位都有进行中或暂停的游戏，无法为新玩家分配槽位"""
+
+
+class SlotLostError(RuntimeError):
+    """用户的槽位在操作过程中反复被其他进程回收"""
+
+
+def _align(size: int, alignment: int = 8) -> int:
+    """
+    @brief  向上对齐
+    @param  size: 原始大小
+    @param  alignment: 对齐字节数
+    @retval 对齐后的大小
+    """
+    return (size + alignment - 1) // alignment * alignment
+
+
+class SharedGameStore:
+    """
+    @brief  共享内存游戏存储
+    @details 对外通过 get(user_id) 返回与 SnakeGame 接口一致的 SharedSnakeGame
+    """
+
+    def __init__(self, slot_count: int = 256, grid_width: int = GRID_WIDTH,
+                 grid_height: int = GRID_HEIGHT, name: str = None):
+        """
+        @brief  创建共享内存存储
+        @param  slot_count: 槽位数，即可同时保存的游戏数
+        @param  grid_width: 网格宽度
+        @param  grid_height: 网格高度
+        @param  name: 共享内存名称，为None时自动生成
+        """
+        self.slot_count = slot_count
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        # 格子总数，同时也是环形缓冲区容量
+        self.cell_count = grid_width * grid_height
+        # 格子索引不超过65535时用uint16存储
+        self._cell_code = 'H' if self.cell_count <= 0x10000 else 'I'
+        ring_bytes = self.cell_count * struct.calcsize(self._cell_code)
+        self._bitmap_bytes = (self.cell_count + 7) // 8
+        self._ring_offset = SLOT_HEADER_SIZE
+        self._bitmap_offset = SLOT_HEADER_SIZE + ring_bytes
+        self.slot_size = _align(SLOT_HEADER_SIZE + ring_bytes + self._bitmap_bytes)
+        size = GLOBAL_HEADER_SIZE + slot_count * self.slot_size
+
+        # 新建的共享内存内容全为0，即所有槽位空闲
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._buf = self._shm.buf
+        GLOBAL_HEADER.pack_into(self._buf, 0, STORE_MAGIC, STORE_VERSION, 0,
+                                slot_count, grid_width, grid_height, load_highscore())
+
+        # 每个槽位的蛇身环形缓冲区和占用位图视图
+        self._rings = []
+        self._bitmaps = []
+        for slot in range(slot_count):
+            base = self._slot_offset(slot)
+            ring_start = base + self._ring_offset
+            self._rings.append(self._buf[ring_start:ring_start + ring_bytes].cast(self._cell_code))
+            bitmap_start = base + self._bitmap_offset
+            self._bitmaps.append(self._buf[bitmap_start:bitmap_start + self._bitmap_bytes])
+
+        # 每个槽位一把进程间锁，另有一把锁保护槽位分配和全局最高分
+        self._locks = [multiprocessing.Lock() for _ in range(slot_count)]
+        self._alloc_lock = multiprocessing.Lock()
+        # 进程内用户ID到槽位的缓存，使用前会核对槽位所属用户
+        self._slot_cache = {}
+        # 只有创建存储的进程负责删除共享内存
+        self._owner_pid = os.getpid()
+
+    @property
+    def name(self) -> str:
+        """@brief  共享内存名称"""
+        return self._shm.name
+
+    def _slot_offset(self, slot: int) -> int:
+        """
+        @brief  计算槽位起始偏移
+        @param  slot: 槽位编号
+        @retval 字节偏移
+        """
+        return GLOBAL_HEADER_SIZE + slot * self.slot_size
+
+    def _owner(self, slot: int) -> int:
+        """
+        @brief  读取槽位所属用户ID
+        @param  slot: 槽位编号
+        @retval 用户ID，0表示空闲
+        """
+        return OWNER_FIELD.unpack_from(self._buf, self._slot_offset(slot))[0]
+
+    def read_header(self, slot: int) -> list:
+        """
+        @brief  读取槽位头部
+        @param  slot: 槽位编号
+        @retval 头部字段列表
+        """
+        return list(SLOT_HEADER.unpack_from(self._buf, self._slot_offset(slot)))
+
+    def write_header(self, slot: int, header: list) -> None:
+        """
+        @brief  写回槽位头部
+        @param  slot: 槽位编号
+        @param  header: 头部字段列表
+        @retval None
+        """
+        SLOT_HEADER.pack_into(self._buf, self._slot_offset(slot), *header)
+
+    def slot_for(self, user_id: int) -> int:
+        """
+        @brief  查找或分配用户的槽位
+        @details 优先使用进程内缓存；未命中时在分配锁内扫描所有槽位，
+                 没有该用户的槽位时占用空闲槽位，没有空闲槽位时回收最久未活跃的空闲或已结束的游戏。
+                 缓存的检查不加锁，调用者须在槽位锁内再次核对所属用户（见 SharedSnakeGame._locked）
+        @param  user_id: 用户ID（正整数）
+        @retval 槽位编号
+        @throws StoreFullError: 所有槽位都有进行中或暂停的游戏
+        """
+        slot = self._slot_cache.get(user_id)
+        if slot is not None and self._owner(slot) == user_id:
+            return slot
+
+        with self._alloc_lock:
+            while True:
+                free_slot = None
+                victim, victim_active = None, None
+                for candidate in range(self.slot_count):
+                    header = self.read_header(candidate)
+                    owner = header[F_OWNER]
+                    if owner == user_id:
+                        self._slot_cache[user_id] = candidate
+                        return candidate
+                    if owner == 0:
+                        if free_slot is None:
+                            free_slot = candidate
+                    elif header[F_STATE] in EVICTABLE_STATES and (victim is None or header[F_ACTIVE] < victim_active):
+                        victim, victim_active = candidate, header[F_ACTIVE]
+
+                slot = free_slot if free_slot is not None else victim
+                if slot is None:
+                    raise StoreFullError('游戏存储已满')
+                with self._locks[slot]:
+                    # 扫描后被选中的游戏可能已重新开始，此时重新扫描
+                    header = self.read_header(slot)
+                    if header[F_OWNER] != 0 and header[F_STATE] not in EVICTABLE_STATES:
+                        continue
+                    self._claim(slot, user_id)
+                self._slot_cache[user_id] = slot
+                return slot
+
+    def _claim(self, slot: int, user_id: int) -> None:
+        """
+        @brief  把槽位清空后分配给用户，需持有分配锁和槽位锁
+        @param  slot: 槽位编号
+        @param  user_id: 用户ID
+        @retval None
+        """
+        self._clear_slot(slot)
+        header = [0] * SLOT_FIELD_COUNT
+        header[F_OWNER] = user_id
+        header[F_ACTIVE] = time.time()
+        header[F_DIRECTION] = header[F_NEXT] = DIR_RIGHT
+        self.write_header(slot, header)
+
+    def _clear_slot(self, slot: int) -> None:
+        """
+        @brief  清空槽位的占用位图
+        @param  slot: 槽位编号
+        @retval None
+        """
+        bitmap = self._bitmaps[slot]
+        bitmap[:] = bytes(self._bitmap_bytes)
+
+    def get(self, user_id: int) -> 'SharedSnakeGame':
+        """
+        @brief  获取用户的游戏
+        @param  user_id: 用户ID
+        @retval SharedSnakeGame: 绑定到该用户槽位的游戏视图
+        """
+        return SharedSnakeGame(self, self.slot_for(user_id), user_id)
+
+    def find(self, user_id: int):
+        """
+        @brief  查找用户的游戏，没有槽位时不分配
+        @param  user_id: 用户ID
+        @retval SharedSnakeGame，不存在时为None
+        """
+        slot = self._slot_cache.get(user_id)
+        if slot is None or self._owner(slot) != user_id:
+            slot = next((candidate for candidate in range(self.slot_count)
+                         if self._owner(candidate) == user_id), None)
+            if slot is None:
+                return None
+            self._slot_cache[user_id] = slot
+        return SharedSnakeGame(self, slot, user_id)
+
+    def live_games(self, limit: int) -> List[Tuple[int, int]]:
+        """
+        @brief  列出进行中的游戏，得分高的在前
+        @param  limit: 最多返回的数量
+        @retval list: (用户ID, 得分) 列表
+        """
+        games = []
+        for slot in range(self.slot_count):
+            header = self.read_header(slot)
+            if header[F_OWNER] and header[F_STATE] == STATE_PLAYING:
+                games.append((header[F_OWNER], header[F_SCORE]))
+        return sorted(games, key=lambda item: item[1], reverse=True)[:limit]
+
+    def active_count(self) -> int:
+        """
+        @brief  统计进行中的游戏数量
+        @retval 进行中的游戏数量
+        """
+        return sum(1 for slot in range(self.slot_count)
+                   if self._owner(slot) and self.read_header(slot)[F_STATE] == STATE_PLAYING)
+
+    def get_highscore(self) -> int:
+        """
+        @brief  获取全局最高分
+        @retval 最高分数值
+        """
+        return OWNER_FIELD.unpack_from(self._buf, HIGHSCORE_OFFSET)[0]
+
+    def record_score(self, score: int) -> int:
+        """
+        @brief  游戏结束时更新全局最高分
+        @param  score: 本局得分
+        @retval 更新后的最高分
+        """
+        with self._alloc_lock:
+            highscore = self.get_highscore()
+            if score > highscore:
+                highscore = save_highscore(score)
+                OWNER_FIELD.pack_into(self._buf, HIGHSCORE_OFFSET, highscore)
+            return highscore
+
+    def close(self) -> None:
+        """
+        @brief  释放共享内存，创建存储的进程同时删除共享内存
+        @retval None
+        """
+        if self._shm is None:
+            return
+        for view in self._rings + self._bitmaps:
+            view.release()
+        self._rings, self._bitmaps = [], []
+        self._buf = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
+
+
+class SharedSnakeGame:
+    """
+    @brief  共享内存中一局游戏的视图
+    @details 接口与 SnakeGame 一致，每个操作在槽位锁内直接读写共享内存；
+             槽位已被回收给其他用户时，改为绑定到该用户重新查找或分配的槽位
+    """
+
+    # 每个操作和 get_packed_state() 都已在槽位锁内完成，与 SnakeGame.lock 对应的游戏锁不需要再加锁
+    lock = nullcontext()
+
+    def __init__(self, store: SharedGameStore, slot: int, user_id: int):
+        """
+        @brief  绑定到存储的指定槽位
+        @param  store: 共享内存存储
+        @param  slot: 槽位编号
+        @param  user_id: 槽位所属用户ID
+        """
+        self.store = store
+        self.user_id = user_id
+        self._bind(slot)
+        self._width = store.grid_width
+        self._height = store.grid_height
+        self._cells = store.cell_count
+        # 与 SnakeGame 相同的网格尺寸属性
+        self.grid_width = store.grid_width
+        self.grid_height = store.grid_height
+
+    def _bind(self, slot: int) -> None:
+        """
+        @brief  绑定到槽位
+        @param  slot: 槽位编号
+        @retval None
+        """
+        self.slot = slot
+        self._lock = self.store._locks[slot]
+        self._ring = self.store._rings[slot]
+        self._bitmap = self.store._bitmaps[slot]
+
+    @contextmanager
+    def _locked(self):
+        """
+        @brief  持有槽位锁并读取头部，确认槽位仍属于该用户
+        @details 槽位已被回收时释放锁，重新查找或分配槽位后重试
+        @retval contextmanager: 产生槽位头部
+        @throws SlotLostError: 重试次数用尽
+        """
+        for _ in range(MAX_REBIND_ATTEMPTS):
+            with self._lock:
+                header = self.store.read_header(self.slot)
+                if header[F_OWNER] == self.user_id:
+                    yield header
+                    return
+            self._bind(self.store.slot_for(self.user_id))
+        raise SlotLostError(f'用户 {self.user_id} 的游戏槽位被反复回收')
+
+    def _header(self) -> list:
+        """
+        @brief  不加锁读取属于该用户的槽位头部，用于读取单个字段
+        @retval list: 槽位头部
+        """
+        header = self.store.read_header(self.slot)
+        if header[F_OWNER] != self.user_id:
+            with self._locked() as header:
+                pass
+        return header
+
+    def _is_occupied(self, cell: int) -> bool:
+        """
+        @brief  判断格子是否被蛇身占用
+        @param  cell: 格子索引
+        @retval true: 已占用, false: 空闲
+        """
+        return bool(self._bitmap[cell >> 3] & (1 << (cell & 7)))
+
+    def _set_occupied(self, cell: int, occupied: bool) -> None:
+        """
+        @brief  设置格子占用标志
+        @param  cell: 格子索引
+        @param  occupied: 是否占用
+        @retval None
+        """
+        if occupied:
+            self._bitmap[cell >> 3] |= 1 << (cell & 7)
+        else:
+            self._bitmap[cell >> 3] &= ~(1 << (cell & 7)) & 0xFF
+
+    def _body_cells(self, header: list) -> List[int]:
+        """
+        @brief  按蛇头到蛇尾的顺序读取蛇身格子
+        @param  header: 槽位头部
+        @retval 格子索引列表
+        """
+        head, length, ring = header[F_HEAD], header[F_LENGTH], self._ring
+        return [ring[(head - i) % self._cells] for i in range(length)]
+
+    def _spawn_food(self, header: list) -> None:
+        """
+        @brief  在随机空闲格子生成食物
+        @details 蛇身较短时随机抽样直到命中空闲格子，较长时扫描位图中的空闲格子
+        @param  header: 槽位头部，结果写入其中
+        @retval None
+        """
+        if header[F_LENGTH] < self._cells * FOOD_SCAN_RATIO:
+            while True:
+                cell = random.randrange(self._cells)
+                if not self._is_occupied(cell):
+                    header[F_FOOD] = cell
+                    return
+        available = [cell for cell in range(self._cells) if not self._is_occupied(cell)]
+        if available:
+            header[F_FOOD] = random.choice(available)
+
+    def _commit(self, header: list) -> None:
+        """
+        @brief  更新序号和活跃时间后写回头部
+        @param  header: 槽位头部
+        @retval None
+        """
+        header[F_SEQ] = (header[F_SEQ] + 1) & 0xFFFFFFFF
+        header[F_ACTIVE] = time.time()
+        self.store.write_header(self.slot, header)
+
+    def reset(self) -> None:
+        """
+        @brief  重置游戏状态到初始状态
+        @retval None
+        """
+        with self._locked() as header:
+            # 只清除当前蛇身占用的格子，不扫描整个位图
+            for cell in self._body_cells(header):
+                self._set_occupied(cell, False)
+            center_x = self._width // 2
+            center_y = self._height // 2
+            length = INITIAL_SNAKE_LENGTH
+            # 环形缓冲区下标0为蛇尾，length-1为蛇头
+            for i in range(length):
+                cell = center_y * self._width + center_x - i
+                self._ring[length - 1 - i] = cell
+                self._set_occupied(cell, True)
+            header[F_HEAD] = length - 1
+            header[F_LENGTH] = length
+            header[F_SCORE] = 0
+            header[F_DIRECTION] = header[F_NEXT] = DIR_RIGHT
+            header[F_STATE] = STATE_IDLE
+            header[F_TICK] = header[F_ACK] = 0
+            self._spawn_food(header)
+            self._commit(header)
+
+    def start(self) -> None:
+        """
+        @brief  开始游戏
+        @retval None
+        """
+        with self._locked() as header:
+            if header[F_STATE] in (STATE_IDLE, STATE_GAME_OVER):
+                header[F_STATE] = STATE_PLAYING
+                self._commit(header)
+
+    def toggle_pause(self) -> None:
+        """
+        @brief  切换游戏暂停状态
+        @retval None
+        """
+        with self._locked() as header:
+            if header[F_STATE] == STATE_PLAYING:
+                header[F_STATE] = STATE_PAUSED
+            elif header[F_STATE] == STATE_PAUSED:
+                header[F_STATE] = STATE_PLAYING
+            else:
+                return
+            self._commit(header)
+
+    def set_direction(self, direction: str) -> None:
+        """
+        @brief  设置蛇的移动方向
+        @param  direction: 方向字符串 ('up', 'down', 'left', 'right')
+        @retval None
+        """
+        code = DIRECTION_CODES.get(direction)
+        if code is None:
+            return
+        with self._locked() as header:
+            if OPPOSITE_CODES[code] != header[F_DIRECTION]:
+                header[F_NEXT] = code
+                self._commit(header)
+
+    def apply_inputs(self, inputs) -> None:
+        """
+        @brief  按顺序应用客户端随更新请求批量提交的方向输入
+        @details 规则同 SnakeGame.apply_inputs()，所有输入在一次加锁内应用
+        @param  inputs: 按编号排序的 (输入编号, 目标步数, 方向) 序列
+        @retval None
+        """
+        with self._locked() as header:
+            if header[F_STATE] != STATE_PLAYING:
+                return
+            changed = False
+            for input_id, tick, direction in inputs:
+                if input_id <= header[F_ACK]:
+                    continue
+                if tick > header[F_TICK] + 1:
+                    break
+                code = DIRECTION_CODES.get(direction)
+                if code is not None and OPPOSITE_CODES[code] != header[F_DIRECTION]:
+                    header[F_NEXT] = code
+                header[F_ACK] = input_id
+                changed = True
+            if changed:
+                self._commit(header)
+
+    def update(self) -> bool:
+        """
+        @brief  更新游戏状态，每帧调用一次
+        @details 判断和推进都在槽位锁内，多个进程同时更新同一局时只有一次调用得到true
+        @retval true: 本次调用使游戏结束, false: 游戏继续或本来就不在进行中
+        """
+        with self._locked() as header:
+            final_score = self._advance(header)
+        # 在槽位锁外更新全局最高分，避免与分配锁嵌套
+        if final_score is None:
+            return False
+        self.store.record_score(final_score)
+        return True
+
+    def _advance(self, header: list):
+        """
+        @brief  在槽位锁内推进一帧
+        @param  header: 槽位头部
+        @retval 本帧游戏结束时返回最终得分，否则返回None
+        """
+        if header[F_STATE] != STATE_PLAYING:
+            return None
+
+        header[F_DIRECTION] = header[F_NEXT]
+        header[F_TICK] += 1
+        head = self._ring[header[F_HEAD]]
+        dx, dy = DIRECTION_OFFSETS[header[F_DIRECTION]]
+        new_x = head % self._width + dx
+        new_y = head // self._width + dy
+        tail = self._ring[(header[F_HEAD] - header[F_LENGTH] + 1) % self._cells]
+        new_head = new_y * self._width + new_x
+
+        # 撞墙，或撞到除蛇尾以外的蛇身（蛇尾本帧会移开）
+        if (new_x < 0 or new_x >= self._width or new_y < 0 or new_y >= self._height
+                or (self._is_occupied(new_head) and new_head != tail)):
+            header[F_STATE] = STATE_GAME_OVER
+            self._commit(header)
+            return header[F_SCORE]
+
+        ate_food = new_head == header[F_FOOD]
+        if ate_food:
+            # 吃到食物，蛇尾保留，长度加一
+            header[F_SCORE] += FOOD_SCORE
+            header[F_LENGTH] += 1
+        else:
+            # 先移开蛇尾，蛇头可以进入刚空出的格子
+            self._set_occupied(tail, False)
+        header[F_HEAD] = (header[F_HEAD] + 1) % self._cells
+        self._ring[header[F_HEAD]] = new_head
+        self._set_occupied(new_head, True)
+        if ate_food:
+            self._spawn_food(header)
+        self._commit(header)
+        return None
+
+    def get_state(self) -> dict:
+        """
+        @brief  获取当前游戏状态的完整信息
+        @retval 包含游戏状态的字典，格式与 SnakeGame.get_state() 相同
+        """
+        with self._locked() as header:
+            cells = self._body_cells(header)
+        width = self._width
+        food = header[F_FOOD]
+        return {
+            'snake_body': [(cell % width, cell // width) for cell in cells],
+            'food_position': (food % width, food // width),
+            'direction': DIRECTIONS[header[F_DIRECTION]].value,
+            'score': header[F_SCORE],
+            'highscore': self.store.get_highscore(),
+            'game_state': STATES[header[F_STATE]].value,
+            'tick': header[F_TICK],
+            'input_ack': header[F_ACK],
+            'seq': header[F_SEQ],
+            'grid_width': width,
+            'grid_height': self._height,
+            'cell_size': CELL_SIZE
+        }
+
+    def get_packed_state(self) -> PackedState:
+        """
+        @brief  获取打包的游戏状态，蛇身直接取自共享内存中的格子索引
+        @retval PackedState: 以格子索引表示位置的游戏状态
+        """
+        with self._locked() as header:
+            cells = self._body_cells(header)
+        return PackedState(
+            cells,
+            header[F_FOOD],
+            DIRECTIONS[header[F_DIRECTION]].value,
+            header[F_SCORE],
+            self.store.get_highscore(),
+            STATES[header[F_STATE]].value,
+            header[F_SEQ],
+            header[F_TICK],
+            header[F_ACK]
+        )
+
+    def get_highscore(self) -> int:
+        """
+        @brief  获取历史最高分
+        @retval 最高分数值
+        """
+        return self.store.get_highscore()
+
+    @property
+    def game_state(self) -> GameState_e:
+        """@brief  当前游戏状态"""
+        return STATES[self._header()[F_STATE]]
+
+    @property
+    def score(self) -> int:
+        """@brief  当前得分"""
+        return self._header()[F_SCORE]
+
+    @property
+    def seq(self) -> int:
+        """@brief  状态序号，每次状态变化加一"""
+        return self._header()[F_SEQ]
+
+    @property
+    def snake_body(self) -> List[Tuple[int, int]]:
+        """@brief  蛇身体坐标列表"""
+        return self.get_state()['snake_body']
@@ -1,10 +1,13 @@
 """
 @file    snake_game.py
 @brief   贪吃蛇游戏核心逻辑
-@details 实现蛇的移动、食物生成、碰撞检测、得分计算等核心功能
+@details 实现蛇的移动、食物生成、碰撞检测、得分计算等核心功能。
+         每局游戏可配置网格尺寸、速度和蛇的初始长度；位置以格子索引（y*网格宽度+x）表示，
+         蛇身保存在 array 环形缓冲区中，另用集合记录占用的格子，食物用随机抽样放置。
+         内存和每步开销只与蛇身长度有关，1024×1024 的网格每局也只占几KB
 @author  AI Assistant
-@date    2026-02-16
-@version V1.0.0
+@date    2026-10-19
+@version V1.1.0
 """
 
 # 导入随机数模块，用于随机生成食物位置
@@ -16,11 +19,22 @@ import json
 # 导入操作系统模块，用于文件操作
 import os
 
+# 导入线程模块，用于每局游戏的锁
+import threading
+
+# 导入数组模块，用于紧凑保存蛇身格子索引
+from array import array
+
 # 导入枚举类，用于定义方向和游戏状态
 from enum import Enum
 
+# 导入具名元组，用于定义打包的游戏状态
+from collections import namedtuple
+
 # 导入类型提示模块，用于代码可读性和类型检查
-from typing import List, Tuple, Optional
+from typing import Callable, Iterable, List, Tuple, Optional
+
+from .events import CAUSE_SELF, CAUSE_WALL, EVENT_DEATH, EVENT_FOOD, EVENT_PAUSE, EVENT_RESUME, EVENT_START
 
 
 # 定义蛇的移动方向枚举类
@@ -47,6 +61,31 @@ class GameState_e(Enum):
     GAME_OVER = 'game_over'
 
 
+# 方向字符串到枚举值的映射
+DIRECTION_MAP = {direction.value: direction for direction in Direction_e}
+
+# 相反方向映射，防止蛇反向移动
+OPPOSITE_DIRECTIONS = {
+    Direction_e.UP: Direction_e.DOWN,
+    Direction_e.DOWN: Direction_e.UP,
+    Direction_e.LEFT: Direction_e.RIGHT,
+    Direction_e.RIGHT: Direction_e.LEFT
+}
+
+# 各方向对应的坐标偏移量
+DIRECTION_OFFSETS = {
+    Direction_e.UP: (0, -1),
+    Direction_e.DOWN: (0, 1),
+    Direction_e.LEFT: (-1, 0),
+    Direction_e.RIGHT: (1, 0)
+}
+
+# 整数方向编码（与枚举定义顺序一致）到枚举值、方向字符串到编码、各编码的相反方向编码，
+# 供以整数保存方向的实现（共享内存存储、紧凑游戏实例）使用
+DIRECTIONS = tuple(Direction_e)
+DIRECTION_CODES = {direction.value: code for code, direction in enumerate(DIRECTIONS)}
+OPPOSITE_CODES = tuple(DIRECTIONS.index(OPPOSITE_DIRECTIONS[direction]) for direction in DIRECTIONS)
+
 # 定义游戏网格宽度（格子数）
 GRID_WIDTH = 20
 
@@ -62,19 +101,211 @@ INITIAL_SNAKE_LENGTH = 3
 # 定义游戏更新速度（毫秒）
 GAME_SPEED = 150
 
+# 吃到一个食物的得分，也用于由得分换算食物数
+FOOD_SCORE = 10
+
+# 网格边长的取值范围（格子数）
+MIN_GRID_SIZE = 5
+MAX_GRID_SIZE = 1024
+
+# 游戏更新速度的取值范围（毫秒）
+MIN_GAME_SPEED = 30
+MAX_GAME_SPEED = 2000
+
+# 随机抽样放置食物的最大次数，超过后改为遍历空格子（只在网格几乎被蛇占满时发生）
+MAX_FOOD_ATTEMPTS = 64
+
+# 蛇身环形缓冲区的初始容量
+MIN_BODY_CAPACITY = 16
+
+# 定义最高分存储文件
+HIGHSCORE_FILE = 'highscore.json'
+
+# 打包的游戏状态：蛇身格子索引列表（蛇头在前，格子索引为 y*网格宽度+x）、食物格子索引、
+# 方向字符串、得分、最高分、游戏状态字符串、状态序号、本局已更新的步数、已确认的输入编号，
+# 供序列化时直接使用
+PackedState = namedtuple('PackedState', 'cells food direction score highscore state seq tick ack')
+
+
+def validate_board(grid_width: int, grid_height: int, speed: int, initial_length: int) -> None:
+    """
+    @brief  校验游戏网格配置
+    @param  grid_width: 网格宽度，MIN_GRID_SIZE..MAX_GRID_SIZE
+    @param  grid_height: 网格高度，MIN_GRID_SIZE..MAX_GRID_SIZE
+    @param  speed: 游戏更新速度（毫秒），MIN_GAME_SPEED..MAX_GAME_SPEED
+    @param  initial_length: 蛇的初始长度，蛇从网格中心向左延伸，不能超出左边界
+    @retval None
+    @throws ValueError: 配置无效
+    """
+    for name, value in (('grid_width', grid_width), ('grid_height', grid_height)):
+        if not isinstance(value, int) or not MIN_GRID_SIZE <= value <= MAX_GRID_SIZE:
+            raise ValueError(f'{name} 须为{MIN_GRID_SIZE}到{MAX_GRID_SIZE}之间的整数: {value!r}')
+    if not isinstance(speed, int) or not MIN_GAME_SPEED <= speed <= MAX_GAME_SPEED:
+        raise ValueError(f'speed 须为{MIN_GAME_SPEED}到{MAX_GAME_SPEED}之间的整数: {speed!r}')
+    if not isinstance(initial_length, int) or not 1 <= initial_length <= grid_width // 2 + 1:
+        raise ValueError(f'initial_length 须为1到{grid_width // 2 + 1}之间的整数: {initial_length!r}')
+
+
+class PackedBody:
+    """
+    @brief  紧凑蛇身
+    @details 格子索引保存在 array('I') 环形缓冲区中，蛇头在 _start 处，新蛇头写在它前面一格；
+             缓冲区满时容量翻倍。_occupied 集合记录蛇身占用的格子，用于O(1)碰撞检测
+    """
+
+    __slots__ = ('_cells', '_start', '_length', '_occupied')
+
+    def __init__(self, cells: Iterable[int] = ()):
+        """
+        @brief  创建蛇身
+        @param  cells: 格子索引，蛇头在前
+        """
+        cells = list(cells)
+        capacity = MIN_BODY_CAPACITY
+        while capacity < len(cells):
+            capacity *= 2
+        self._cells = array('I', cells) + array('I', [0]) * (capacity - len(cells))
+        self._start = 0
+        self._length = len(cells)
+        self._occupied = set(cells)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, cell: int) -> bool:
+        return cell in self._occupied
+
+    def head(self) -> int:
+        """
+        @brief  获取蛇头格子
+        @retval int: 格子索引
+        """
+        return self._cells[self._start]
+
+    def tail(self) -> int:
+        """
+        @brief  获取蛇尾格子
+        @retval int: 格子索引
+        """
+        return self._cells[(self._start + self._length - 1) % len(self._cells)]
+
+    def push_head(self, cell: int) -> None:
+        """
+        @brief  在蛇头前加入一格
+        @param  cell: 新蛇头的格子索引
+        @retval None
+        """
+        if self._length == len(self._cells):
+            # 按蛇头到蛇尾的顺序重新排列并扩容
+            cells = self.to_list()
+            self._cells = array('I', cells) + array('I', [0]) * len(cells)
+            self._start = 0
+        self._start = (self._start - 1) % len(self._cells)
+        self._cells[self._start] = cell
+        self._length += 1
+        self._occupied.add(cell)
+
+    def pop_tail(self) -> int:
+        """
+        @brief  移除蛇尾
+        @retval int: 移除的格子索引
+        """
+        cell = self.tail()
+        self._length -= 1
+        self._occupied.discard(cell)
+        return cell
+
+    def to_list(self) -> List[int]:
+        """
+        @brief  获取蛇身格子索引列表
+        @retval list: 格子索引，蛇头在前
+        """
+        start = self._start
+        end = start + self._length
+        capacity = len(self._cells)
+        if end <= capacity:
+            return self._cells[start:end].tolist()
+        return self._cells[start:].tolist() + self._cells[:end - capacity].tolist()
+
+
+def load_highscore() -> int:
+    """
+    @brief  从文件读取历史最高分
+    @retval 最高分数值，文件不存在或损坏时为0
+    """
+    try:
+        # 检查最高分文件是否存在
+        if os.path.exists(HIGHSCORE_FILE):
+            # 打开文件并读取JSON数据
+            with open(HIGHSCORE_FILE, 'r') as f:
+                # 解析JSON数据，获取最高分，如果不存在则默认为0
+                return json.load(f).get('highscore', 0)
+    # 捕获IO错误和JSON解析错误
+    except (IOError, json.JSONDecodeError):
+        pass
+    # 发生错误时，最高分为0
+    return 0
+
+
+def save_highscore(score: int) -> int:
+    """
+    @brief  保存最高分到文件
+    @details 多个游戏实例共用同一个文件，只有分数高于文件中的记录时才写入，
+             避免读取了旧最高分的实例覆盖其他实例刚写入的更高分
+    @param  score: 本局得分
+    @retval 写入后文件中的最高分
+    """
+    # 读取文件中当前的最高分
+    stored = load_highscore()
+    # 不高于已有记录时不写入
+    if score <= stored:
+        return stored
+    try:
+        # 打开文件并写入JSON数据
+        with open(HIGHSCORE_FILE, 'w') as f:
+            # 将最高分以JSON格式写入文件
+            json.dump({'highscore': score}, f)
+    # 捕获IO错误，忽略保存失败
+    except IOError:
+        pass
+    return score
+
 
 class SnakeGame:
     """
     @brief  贪吃蛇游戏类
-    @details 包含游戏所有核心逻辑
+    @details 包含游戏所有核心逻辑。snake_body 和 food_position 以 (x, y) 坐标读写，
+             内部以格子索引保存。方法本身不加锁：修改游戏的接口和在其他线程读取整局状态的
+             检查点、观战广播都持有 lock，保证读到的是完整的一步
     """
     
-    def __init__(self):
-        """@brief  初始化游戏实例"""
-        # 蛇身体坐标列表，每个元素是一个(x, y)元组
-        self.snake_body: List[Tuple[int, int]] = []
-        # 食物位置坐标
-        self.food_position: Tuple[int, int] = (0, 0)
+    def __init__(self, grid_width: int = GRID_WIDTH, grid_height: int = GRID_HEIGHT,
+                 speed: int = GAME_SPEED, initial_length: int = INITIAL_SNAKE_LENGTH,
+                 highscore: Optional[int] = None):
+        """
+        @brief  初始化游戏实例
+        @param  grid_width: 网格宽度
+        @param  grid_height: 网格高度
+        @param  speed: 游戏更新速度（毫秒）
+        @param  initial_length: 蛇的初始长度
+        @param  highscore: 历史最高分，为None时从文件读取（批量创建实例时可只读一次文件）
+        @throws ValueError: 配置无效，见 validate_board()
+        """
+        validate_board(grid_width, grid_height, speed, initial_length)
+        # 网格宽度
+        self.grid_width: int = grid_width
+        # 网格高度
+        self.grid_height: int = grid_height
+        # 格子总数
+        self.cell_count: int = grid_width * grid_height
+        # 游戏更新速度（毫秒）
+        self.speed: int = speed
+        # 蛇的初始长度
+        self.initial_length: int = initial_length
+        # 蛇身格子索引
+        self._body = PackedBody()
+        # 食物格子索引
+        self._food: int = 0
         # 当前移动方向，默认向右
         self.current_direction: Direction_e = Direction_e.RIGHT
         # 下一步移动方向，用于防止快速按键导致反向移动
@@ -85,45 +316,62 @@ class SnakeGame:
         self.highscore: int = 0
         # 当前游戏状态
         self.game_state: GameState_e = GameState_e.IDLE
-        # 网格宽度
-        self.grid_width: int = GRID_WIDTH
-        # 网格高度
-        self.grid_height: int = GRID_HEIGHT
+        # 状态序号，每次状态变化加一，客户端据此判断状态新旧
+        self.seq: int = 0
+        # 本局已更新的步数
+        self.tick: int = 0
+        # 已应用的客户端输入的最大编号
+        self.input_ack: int = 0
+        # 事件记录器，以 (游戏, 事件类型, 格子索引, 死亡原因) 调用，见 game.events；为None时不记录事件
+        self.events: Optional[Callable] = None
+        # 游戏锁，修改游戏和在其他线程读取快照时持有
+        self.lock = threading.Lock()
         # 加载历史最高分
-        self._load_highscore()
+        if highscore is None:
+            self._load_highscore()
+        else:
+            self.highscore = highscore
+    
+    @property
+    def snake_body(self) -> List[Tuple[int, int]]:
+        """
+        @brief  蛇身体坐标列表，蛇头在前
+        @retval list: (x, y) 元组列表（每次读取生成新列表）
+        """
+        width = self.grid_width
+        return [(cell % width, cell // width) for cell in self._body.to_list()]
+    
+    @snake_body.setter
+    def snake_body(self, body: List[Tuple[int, int]]) -> None:
+        self._body = PackedBody(y * self.grid_width + x for x, y in body)
+    
+    @property
+    def food_position(self) -> Tuple[int, int]:
+        """
+        @brief  食物位置坐标
+        @retval tuple: (x, y)
+        """
+        return (self._food % self.grid_width, self._food // self.grid_width)
+    
+    @food_position.setter
+    def food_position(self, position: Tuple[int, int]) -> None:
+        x, y = position
+        self._food = y * self.grid_width + x
     
     def _load_highscore(self) -> None:
         """
         @brief  从文件加载历史最高分
         @retval None
         """
-        try:
-            # 检查最高分文件是否存在
-            if os.path.exists('highscore.json'):
-                # 打开文件并读取JSON数据
-                with open('highscore.json', 'r') as f:
-                    # 解析JSON数据
-                    data = json.load(f)
-                    # 获取最高分，如果不存在则默认为0
-                    self.highscore = data.get('highscore', 0)
-        # 捕获IO错误和JSON解析错误
-        except (IOError, json.JSONDecodeError):
-            # 发生错误时，最高分重置为0
-            self.highscore = 0
+        self.highscore = load_highscore()
     
     def _save_highscore(self) -> None:
         """
         @brief  保存最高分到文件
         @retval None
         """
-        try:
-            # 打开文件并写入JSON数据
-            with open('highscore.json', 'w') as f:
-                # 将最高分以JSON格式写入文件
-                json.dump({'highscore': self.highscore}, f)
-        # 捕获IO错误，忽略保存失败
-        except IOError:
-            pass
+        # 同步文件中可能由其他游戏实例写入的更高分
+        self.highscore = save_highscore(self.highscore)
     
     def reset(self) -> None:
         """
@@ -135,10 +383,8 @@ class SnakeGame:
         # 计算网格中心Y坐标
         center_y = self.grid_height // 2
         # 初始化蛇身体，从中心位置开始，向左延伸
-        self.snake_body = [
-            (center_x - i, center_y) 
-            for i in range(INITIAL_SNAKE_LENGTH)
-        ]
+        head = center_y * self.grid_width + center_x
+        self._body = PackedBody(head - i for i in range(self.initial_length))
         # 重置当前方向为向右
         self.current_direction = Direction_e.RIGHT
         # 重置下一步方向为向右
@@ -147,8 +393,13 @@ class SnakeGame:
         self.score = 0
         # 设置游戏状态为空闲
         self.game_state = GameState_e.IDLE
+        # 重置步数和已确认的输入编号，客户端每局从1开始为输入编号
+        self.tick = 0
+        self.input_ack = 0
         # 生成新的食物
         self._spawn_food()
+        # 递增状态序号
+        self.seq += 1
     
     def start(self) -> None:
         """
@@ -159,6 +410,10 @@ class SnakeGame:
         if self.game_state == GameState_e.IDLE or self.game_state == GameState_e.GAME_OVER:
             # 设置游戏状态为进行中
             self.game_state = GameState_e.PLAYING
+            # 递增状态序号
+            self.seq += 1
+            if self.events is not None:
+                self.events(self, EVENT_START, self._body.head())
     
     def toggle_pause(self) -> None:
         """
@@ -168,9 +423,18 @@ class SnakeGame:
         # 如果正在游戏中，则暂停
         if self.game_state == GameState_e.PLAYING:
             self.game_state = GameState_e.PAUSED
+            event = EVENT_PAUSE
         # 如果已暂停，则继续游戏
         elif self.game_state == GameState_e.PAUSED:
             self.game_state = GameState_e.PLAYING
+            event = EVENT_RESUME
+        # 其他状态不变化
+        else:
+            return
+        # 递增状态序号
+        self.seq += 1
+        if self.events is not None:
+            self.events(self, event, self._body.head())
     
     def set_direction(self, direction: str) -> None:
         """
@@ -178,49 +442,57 @@ class SnakeGame:
         @param  direction: 方向字符串 ('up', 'down', 'left', 'right')
         @retval None
         """
-        # 方向字符串到枚举值的映射
-        direction_map = {
-            'up': Direction_e.UP,
-            'down': Direction_e.DOWN,
-            'left': Direction_e.LEFT,
-            'right': Direction_e.RIGHT
-        }
-        
-        # 如果传入的方向无效，直接返回
-        if direction not in direction_map:
+        # 获取对应的方向枚举值，无效的方向直接返回
+        new_direction = DIRECTION_MAP.get(direction)
+        if new_direction is None:
             return
         
-        # 获取对应的方向枚举值
-        new_direction = direction_map[direction]
-        
-        # 定义相反方向映射，防止蛇反向移动
-        opposite_directions = {
-            Direction_e.UP: Direction_e.DOWN,
-            Direction_e.DOWN: Direction_e.UP,
-            Direction_e.LEFT: Direction_e.RIGHT,
-            Direction_e.RIGHT: Direction_e.LEFT
-        }
-        
         # 只有新方向不是当前方向的相反方向时才更新
-        if opposite_directions.get(new_direction) != self.current_direction:
+        if OPPOSITE_DIRECTIONS[new_direction] != self.current_direction:
             self.next_direction = new_direction
+            # 递增状态序号
+            self.seq += 1
+    
+    def apply_inputs(self, inputs) -> None:
+        """
+        @brief  按顺序应用客户端随更新请求批量提交的方向输入
+        @details 每个输入为 (输入编号, 目标步数, 方向)，目标步数是客户端预测时应用该输入的那一步。
+                 编号不大于已确认编号的输入是客户端重发的，跳过；目标步数晚于下一步的输入及其后的输入
+                 留到对应的更新时再应用（客户端会一直重发未确认的输入）
+        @param  inputs: 按编号排序的输入序列
+        @retval None
+        """
+        # 只有游戏进行中才接受输入
+        if self.game_state != GameState_e.PLAYING:
+            return
+        for input_id, tick, direction in inputs:
+            if input_id <= self.input_ack:
+                continue
+            if tick > self.tick + 1:
+                break
+            self.set_direction(direction)
+            self.input_ack = input_id
     
     def _spawn_food(self) -> None:
         """
         @brief  在随机位置生成食物
+        @details 随机抽样格子，直到抽到不在蛇身上的格子；蛇身占满大部分网格导致抽样失败时，
+                 才遍历所有空格子随机选择
         @retval None
         """
+        body = self._body
+        for _ in range(MAX_FOOD_ATTEMPTS):
+            cell = random.randrange(self.cell_count)
+            if cell not in body:
+                self._food = cell
+                return
+        
         # 获取所有可用的位置（不在蛇身上的位置）
-        available_positions = [
-            (x, y) 
-            for x in range(self.grid_width) 
-            for y in range(self.grid_height) 
-            if (x, y) not in self.snake_body
-        ]
+        available_cells = [cell for cell in range(self.cell_count) if cell not in body]
         
         # 如果有可用位置，随机选择一个
-        if available_positions:
-            self.food_position = random.choice(available_positions)
+        if available_cells:
+            self._food = random.choice(available_cells)
     
     def _check_collision(self, position: Tuple[int, int]) -> bool:
         """
@@ -237,38 +509,36 @@ class SnakeGame:
         # 检查是否撞到上边界或下边界
         if y < 0 or y >= self.grid_height:
             return True
-        # 检查是否撞到蛇身体（排除蛇头）
-        if position in self.snake_body[:-1]:
+        # 检查是否撞到蛇身体（排除本步会移开的蛇尾）
+        cell = y * self.grid_width + x
+        if cell in self._body and cell != self._body.tail():
             return True
         
         # 无碰撞
         return False
     
-    def update(self) -> None:
+    def update(self) -> bool:
         """
         @brief  更新游戏状态，每帧调用一次
-        @retval None
+        @retval true: 本次调用使游戏结束, false: 游戏继续或本来就不在进行中
         """
         # 如果游戏不在进行中，不执行更新
         if self.game_state != GameState_e.PLAYING:
-            return
+            return False
         
         # 更新当前方向为下一步方向
         self.current_direction = self.next_direction
+        # 递增状态序号和步数
+        self.seq += 1
+        self.tick += 1
         
         # 获取蛇头当前坐标
-        head_x, head_y = self.snake_body[0]
-        
-        # 定义各方向对应的坐标偏移量
-        direction_offsets = {
-            Direction_e.UP: (0, -1),
-            Direction_e.DOWN: (0, 1),
-            Direction_e.LEFT: (-1, 0),
-            Direction_e.RIGHT: (1, 0)
-        }
+        width = self.grid_width
+        head = self._body.head()
+        head_x, head_y = head % width, head // width
         
         # 获取当前方向的偏移量
-        dx, dy = direction_offsets[self.current_direction]
+        dx, dy = DIRECTION_OFFSETS[self.current_direction]
         # 计算新的蛇头位置
         new_head = (head_x + dx, head_y + dy)
         
@@ -276,24 +546,31 @@ class SnakeGame:
         if self._check_collision(new_head):
             # 设置游戏状态为结束
             self.game_state = GameState_e.GAME_OVER
+            if self.events is not None:
+                inside = 0 <= new_head[0] < width and 0 <= new_head[1] < self.grid_height
+                self.events(self, EVENT_DEATH, head, CAUSE_SELF if inside else CAUSE_WALL)
             # 如果当前得分超过最高分，更新并保存
             if self.score > self.highscore:
                 self.highscore = self.score
                 self._save_highscore()
-            return
-        
-        # 将新头部位置插入到蛇身体列表开头
-        self.snake_body.insert(0, new_head)
+            return True
         
+        new_cell = new_head[1] * width + new_head[0]
         # 检查是否吃到食物
-        if new_head == self.food_position:
+        if new_cell == self._food:
+            # 将新头部位置插入到蛇身体开头
+            self._body.push_head(new_cell)
             # 增加得分
-            self.score += 10
+            self.score += FOOD_SCORE
+            if self.events is not None:
+                self.events(self, EVENT_FOOD, new_cell)
             # 生成新的食物
             self._spawn_food()
         else:
-            # 没吃到食物，移除尾部（保持长度不变）
-            self.snake_body.pop()
+            # 没吃到食物，先移除尾部（新蛇头可能进入移开的蛇尾），再插入新头部，保持长度不变
+            self._body.pop_tail()
+            self._body.push_head(new_cell)
+        return False
     
     def get_state(self) -> dict:
         """
@@ -313,6 +590,12 @@ class SnakeGame:
             'highscore': self.highscore,
             # 游戏状态
             'game_state': self.game_state.value,
+            # 本局已更新的步数
+            'tick': self.tick,
+            # 已确认的客户端输入编号
+            'input_ack': self.input_ack,
+            # 状态序号，客户端据此丢弃过期的响应
+            'seq': self.seq,
             # 网格宽度
             'grid_width': self.grid_width,
             # 网格高度
@@ -321,6 +604,23 @@ class SnakeGame:
             'cell_size': CELL_SIZE
         }
     
+    def get_packed_state(self) -> PackedState:
+        """
+        @brief  获取打包的游戏状态
+        @retval PackedState: 以格子索引表示位置的游戏状态
+        """
+        return PackedState(
+            self._body.to_list(),
+            self._food,
+            self.current_direction.value,
+            self.score,
+            self.highscore,
+            self.game_state.value,
+            self.seq,
+            self.tick,
+            self.input_ack
+        )
+    
     def get_highscore(self) -> int:
         """
         @brief  获取历史最高分
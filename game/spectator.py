@@ -0,0 +1,269 @@
+"""
+@file    spectator.py
+@brief   观战广播
+@details 每局被观战的游戏对应一个频道。广播线程按固定间隔检查各频道游戏的状态序号，
+         状态变化时只编码一次，得到的不可变字节串由该频道所有观战者共享。
+         每个观战者有一个有界帧队列，广播线程只做非阻塞投递：队列满时观战者降级为只接收最新帧，
+         跟上后恢复；降级后仍持续落后的观战者被断开，慢观战者不会拖慢广播线程和其他观战者。
+         每一帧都是完整的游戏状态，丢弃中间帧不影响观战者看到的最终画面
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+# 导入日志模块，用于记录广播线程异常
+import logging
+
+# 导入线程模块，用于广播线程和队列同步
+import threading
+
+# 导入双端队列，用于观战者帧队列
+from collections import deque
+
+# 导入类型提示模块
+from typing import Callable, Dict, Optional
+
+from .codec import encode_game_state
+
+logger = logging.getLogger(__name__)
+
+# 每个观战者队列最多积压的帧数
+DEFAULT_QUEUE_SIZE = 8
+
+# 降级后连续跳过的帧数超过该值时断开观战者
+DEFAULT_MAX_SKIPPED = 200
+
+# 广播线程检查游戏状态的间隔（秒）
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+class Subscriber:
+    """
+    @brief  观战者的有界帧队列
+    @details offer() 由广播线程调用，从不阻塞；next_frame() 由观战者的响应生成器调用
+    """
+
+    def __init__(self, user_id: int, max_queue: int = DEFAULT_QUEUE_SIZE, max_skipped: int = DEFAULT_MAX_SKIPPED):
+        """
+        @brief  创建观战者
+        @param  user_id: 被观战玩家的用户ID
+        @param  max_queue: 队列最多积压的帧数
+        @param  max_skipped: 降级后允许连续跳过的帧数
+        """
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self.max_skipped = max_skipped
+        self._frames = deque()
+        self._cond = threading.Condition()
+        # 是否已降级为只接收最新帧
+        self.keyframes_only = False
+        # 降级以来跳过的帧数
+        self.skipped = 0
+        # 是否已断开
+        self.closed = False
+
+    def offer(self, frame: bytes) -> bool:
+        """
+        @brief  投递一帧
+        @details 队列满或已降级且上一帧还没取走时，丢弃积压的帧只保留最新一帧；
+                 投递时队列已空说明观战者跟上了，恢复逐帧接收
+        @param  frame: 编码后的帧
+        @retval true: 已投递, false: 观战者已断开
+        """
+        with self._cond:
+            if self.closed:
+                return False
+            if self._frames and (self.keyframes_only or len(self._frames) >= self.max_queue):
+                self.skipped += len(self._frames)
+                self._frames.clear()
+                self.keyframes_only = True
+                if self.skipped > self.max_skipped:
+                    self.closed = True
+                    self._cond.notify_all()
+                    return False
+            elif not self._frames:
+                self.keyframes_only = False
+                self.skipped = 0
+            self._frames.append(frame)
+            self._cond.notify()
+            return True
+
+    def next_frame(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        @brief  取出下一帧，队列为空时等待
+        @param  timeout: 最长等待秒数，None表示一直等待
+        @retval bytes: 帧，超时或已断开时为None
+        """
+        with self._cond:
+            if not self._frames and not self.closed:
+                self._cond.wait(timeout)
+            return self._frames.popleft() if self._frames else None
+
+    def close(self) -> None:
+        """
+        @brief  断开观战者，唤醒等待中的 next_frame()
+        @retval None
+        """
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class _Channel:
+    """一局被观战游戏的频道：最近一帧及其状态序号、观战者集合"""
+
+    __slots__ = ('seq', 'frame', 'subscribers')
+
+    def __init__(self):
+        self.seq = None
+        self.frame = None
+        self.subscribers = set()
+
+
+class SpectatorHub:
+    """
+    @brief  观战广播中心
+    @details 广播线程在第一个观战者订阅时启动，没有频道时退出
+    """
+
+    def __init__(self, store, encode: Callable = encode_game_state, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, max_skipped: int = DEFAULT_MAX_SKIPPED):
+        """
+        @brief  创建广播中心
+        @param  store: 游戏存储，需提供 find(user_id)
+        @param  encode: 把游戏实例编码为一帧字节串的函数
+        @param  poll_interval: 广播线程检查游戏状态的间隔（秒）
+        @param  queue_size: 每个观战者队列最多积压的帧数
+        @param  max_skipped: 降级后允许连续跳过的帧数
+        """
+        self.store = store
+        self.encode = encode
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.max_skipped = max_skipped
+        self._channels: Dict[int, _Channel] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        # 编码的帧数和投递的帧数，二者之比即每帧的扇出数
+        self.frames_encoded = 0
+        self.frames_delivered = 0
+
+    def _refresh(self, user_id: int, channel: _Channel) -> bool:
+        """
+        @brief  游戏状态变化时重新编码频道的最近一帧
+        @details 状态序号和编码在游戏锁内一起读取：游戏的方法先递增序号再修改其他字段，
+                 不加锁时可能编码出更新到一半的一帧并记下新序号，之后不再重新编码
+        @param  user_id: 被观战玩家的用户ID
+        @param  channel: 频道
+        @retval true: 产生了新帧, false: 状态未变化或游戏不存在
+        """
+        game = self.store.find(user_id)
+        if game is None:
+            return False
+        with game.lock:
+            seq = game.seq
+            if seq == channel.seq:
+                return False
+            frame = self.encode(game)
+        channel.frame = frame
+        channel.seq = seq
+        self.frames_encoded += 1
+        return True
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        """
+        @brief  订阅玩家的游戏
+        @details 订阅者立即收到当前画面（游戏存在时）
+        @param  user_id: 被观战玩家的用户ID
+        @retval Subscriber: 观战者
+        """
+        subscriber = Subscriber(user_id, self.queue_size, self.max_skipped)
+        with self._lock:
+            channel = self._channels.get(user_id)
+            if channel is None:
+                channel = self._channels[user_id] = _Channel()
+                self._refresh(user_id, channel)
+            channel.subscribers.add(subscriber)
+            if channel.frame is not None:
+                subscriber.offer(channel.frame)
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='spectator-broadcast', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """
+        @brief  取消订阅，频道没有观战者时移除
+        @param  subscriber: 观战者
+        @retval None
+        """
+        subscriber.close()
+        with self._lock:
+            channel = self._channels.get(subscriber.user_id)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscriber)
+            if not channel.subscribers:
+                del self._channels[subscriber.user_id]
+
+    def poll_once(self) -> int:
+        """
+        @brief  检查所有频道，把新帧投递给观战者
+        @details 每个新帧只编码一次，所有观战者收到同一个字节串对象；投递失败（已断开）的观战者被移除
+        @retval int: 产生新帧的频道数
+        """
+        with self._lock:
+            channels = list(self._channels.items())
+        published = 0
+        for user_id, channel in channels:
+            if not self._refresh(user_id, channel):
+                continue
+            published += 1
+            frame = channel.frame
+            for subscriber in list(channel.subscribers):
+                if subscriber.offer(frame):
+                    self.frames_delivered += 1
+                else:
+                    self.unsubscribe(subscriber)
+        return published
+
+    def subscriber_count(self) -> int:
+        """
+        @brief  统计观战者数量
+        @retval int: 观战者数量
+        """
+        with self._lock:
+            return sum(len(channel.subscribers) for channel in self._channels.values())
+
+    def _run(self) -> None:
+        """
+        @brief  广播线程主循环，没有频道时退出
+        @retval None
+        """
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception('观战广播失败')
+            with self._lock:
+                if not self._channels:
+                    self._thread = None
+                    return
+
+    def close(self) -> None:
+        """
+        @brief  停止广播线程并断开所有观战者
+        @retval None
+        """
+        self._stop.set()
+        with self._lock:
+            channels = list(self._channels.values())
+            self._channels.clear()
+            thread, self._thread = self._thread, None
+        for channel in channels:
+            for subscriber in channel.subscribers:
+                subscriber.close()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
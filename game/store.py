@@ -0,0 +1,261 @@
+"""
+@file    store.py
+@brief   游戏实例存储
+@details 按用户ID管理各玩家的游戏实例。默认的进程内存储适用于单进程部署，
+         可开启休眠，把长时间没有请求的游戏转为快照；
+         多工作进程部署时使用共享内存存储，使任意工作进程都能推进同一玩家的游戏
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .snake_game import SnakeGame, GameState_e, load_highscore
+from .events import EventRecorder
+
+logger = logging.getLogger(__name__)
+
+# 进程内存储
+STORE_LOCAL = 'local'
+
+# 共享内存存储
+STORE_SHARED = 'shared'
+
+# 进程内存储使用的游戏实现：SnakeGame / 紧凑的 CompactSnakeGame
+ENGINE_DEFAULT = 'default'
+ENGINE_COMPACT = 'compact'
+
+# 检查空闲游戏的最小间隔（秒）
+HIBERNATE_SWEEP_SECONDS = 5
+
+
+class LocalGameStore:
+    """
+    @brief  进程内游戏存储
+    @details 每个用户对应一个SnakeGame实例，只在当前进程内可见。
+             设置了快照池时开启休眠：超过 hibernate_after 秒没有被 get() 访问的游戏
+             序列化为快照存入快照池并从内存中移除，下次 get() 时透明还原。
+             最近访问时间按访问顺序保存在字典中，检查空闲游戏时从最久未访问的开始，遇到未超时的即停止。
+             设置了事件缓冲区时，存储为创建、还原和放入的每局游戏挂接事件记录器
+    """
+
+    def __init__(self, game_factory: Callable[[], SnakeGame] = SnakeGame, snapshot_pool=None,
+                 hibernate_after: float = 300, compress: bool = False):
+        """
+        @brief  初始化存储
+        @param  game_factory: 游戏类，如 SnakeGame 或 CompactSnakeGame
+        @param  snapshot_pool: 休眠快照池（见 game.hibernate），为None时不休眠
+        @param  hibernate_after: 游戏空闲多少秒后休眠
+        @param  compress: 快照是否压缩蛇身数据
+        """
+        # 游戏类
+        self.game_factory = game_factory
+        # 用户ID到游戏实例的映射
+        self._games: Dict[int, SnakeGame] = {}
+        # 创建实例时使用的锁
+        self._lock = threading.Lock()
+        # 休眠快照池及参数
+        self._pool = snapshot_pool
+        self.hibernate_after = hibernate_after
+        self.compress = compress
+        # 用户ID到最近访问时间的映射，按访问顺序排列
+        self._last_used: Dict[int, float] = {}
+        # 下次检查空闲游戏的时间
+        self._next_sweep = 0.0
+        # 游戏事件缓冲区（见 game.events），为None时不记录事件
+        self.event_ring = None
+
+    def _track(self, user_id: int, game: SnakeGame) -> SnakeGame:
+        """
+        @brief  设置了事件缓冲区时为游戏挂接事件记录器
+        @param  user_id: 用户ID
+        @param  game: 游戏实例
+        @retval 同一游戏实例
+        """
+        if self.event_ring is not None:
+            game.events = EventRecorder(self.event_ring, user_id)
+        return game
+
+    def get(self, user_id: int) -> SnakeGame:
+        """
+        @brief  获取用户的游戏实例，不存在时创建，已休眠时从快照还原
+        @param  user_id: 用户ID
+        @retval SnakeGame实例对象
+        """
+        if self._pool is not None:
+            return self._get_hibernating(user_id)
+        game = self._games.get(user_id)
+        if game is None:
+            with self._lock:
+                game = self._games.get(user_id)
+                if game is None:
+                    game = self._games[user_id] = self._track(user_id, self.game_factory())
+        return game
+
+    def _get_hibernating(self, user_id: int) -> SnakeGame:
+        """
+        @brief  开启休眠时获取游戏实例，并记录访问时间
+        @details 在锁内完成查找和记录，保证正在被请求使用的游戏不会同时被休眠
+        @param  user_id: 用户ID
+        @retval SnakeGame实例对象
+        """
+        from .hibernate import restore_game
+        now = time.monotonic()
+        with self._lock:
+            game = self._games.get(user_id)
+            if game is None:
+                data = self._pool.take(user_id)
+                if data is not None:
+                    try:
+                        game = restore_game(data, self.game_factory)
+                    except ValueError:
+                        logger.warning('用户 %s 的游戏快照无效，已重新创建游戏', user_id, exc_info=True)
+                if game is None:
+                    game = self.game_factory()
+                self._games[user_id] = self._track(user_id, game)
+            # 先删除再插入，使该用户移动到字典末尾（最近访问）
+            self._last_used.pop(user_id, None)
+            self._last_used[user_id] = now
+        if now >= self._next_sweep:
+            self._next_sweep = now + min(self.hibernate_after, HIBERNATE_SWEEP_SECONDS)
+            self.hibernate_idle(now)
+        return game
+
+    def hibernate_idle(self, now: Optional[float] = None) -> int:
+        """
+        @brief  把空闲超时的游戏转为快照
+        @param  now: 当前的 time.monotonic() 时间，默认取当前时间
+        @retval int: 本次休眠的游戏数
+        """
+        if self._pool is None:
+            return 0
+        from .hibernate import snapshot_game
+        deadline = (time.monotonic() if now is None else now) - self.hibernate_after
+        count = 0
+        with self._lock:
+            for user_id, used in list(self._last_used.items()):
+                if used > deadline:
+                    break
+                del self._last_used[user_id]
+                game = self._games.pop(user_id, None)
+                if game is not None:
+                    with game.lock:
+                        data = snapshot_game(game, self.compress)
+                    self._pool.put(user_id, data)
+                    count += 1
+        return count
+
+    def hibernated_count(self) -> int:
+        """
+        @brief  统计休眠中的游戏数量
+        @retval 休眠中的游戏数量
+        """
+        return len(self._pool) if self._pool is not None else 0
+
+    def games(self) -> List[Tuple[int, SnakeGame]]:
+        """
+        @brief  列出内存中的所有游戏（不含休眠中的游戏）
+        @retval list: (用户ID, 游戏实例) 列表
+        """
+        return list(self._games.items())
+
+    def has_game(self, user_id: int) -> bool:
+        """
+        @brief  判断用户的游戏是否仍在存储中（内存中或休眠中）
+        @details 在锁内判断，与休眠和还原互斥，游戏在两者之间移动时不会被误判为不存在
+        @param  user_id: 用户ID
+        @retval bool: 是否存在
+        """
+        with self._lock:
+            return user_id in self._games or (self._pool is not None and user_id in self._pool)
+
+    def adopt(self, games: Dict[int, SnakeGame], replace: bool = True) -> int:
+        """
+        @brief  放入已有的游戏实例（如从检查点恢复的游戏）
+        @param  games: 用户ID到游戏实例的映射
+        @param  replace: 是否覆盖同一用户已有的游戏（内存中或休眠中），为False时跳过这些用户
+        @retval int: 放入的游戏数
+        """
+        now = time.monotonic()
+        count = 0
+        with self._lock:
+            for user_id, game in games.items():
+                if not replace and (user_id in self._games or (self._pool is not None and user_id in self._pool)):
+                    continue
+                count += 1
+                self._games[user_id] = self._track(user_id, game)
+                if self._pool is not None:
+                    self._last_used.pop(user_id, None)
+                    self._last_used[user_id] = now
+        return count
+
+    def find(self, user_id: int) -> Optional[SnakeGame]:
+        """
+        @brief  查找用户的游戏实例，不存在时不创建
+        @details 休眠中的游戏不会被还原，视为不存在
+        @param  user_id: 用户ID
+        @retval SnakeGame实例对象，不存在时为None
+        """
+        return self._games.get(user_id)
+
+    def active_count(self) -> int:
+        """
+        @brief  统计进行中的游戏数量
+        @retval 进行中的游戏数量
+        """
+        return sum(1 for game in list(self._games.values()) if game.game_state == GameState_e.PLAYING)
+
+    def live_games(self, limit: int) -> List[Tuple[int, int]]:
+        """
+        @brief  列出进行中的游戏，得分高的在前
+        @param  limit: 最多返回的数量
+        @retval list: (用户ID, 得分) 列表
+        """
+        games = [(user_id, game.score) for user_id, game in list(self._games.items())
+                 if game.game_state == GameState_e.PLAYING]
+        return sorted(games, key=lambda item: item[1], reverse=True)[:limit]
+
+    def get_highscore(self) -> int:
+        """
+        @brief  获取所有玩家的历史最高分
+        @retval 最高分数值
+        """
+        return max((game.highscore for game in list(self._games.values())), default=load_highscore())
+
+
+def create_game_store(config) -> object:
+    """
+    @brief  根据配置创建游戏存储
+    @details GAME_STORE 为 shared 时创建共享内存存储，必须在工作进程fork之前创建
+             （生产服务器需开启预加载），槽位数由 GAME_STORE_SLOTS 指定；
+             进程内存储的 GAME_ENGINE 为 compact 时使用 CompactSnakeGame，
+             GAME_HIBERNATE_AFTER 大于0时开启休眠，快照保存在 GAME_HIBERNATE_DIR 目录（未设置时保存在内存中），
+             GAME_HIBERNATE_COMPRESS 为真时压缩快照
+    @param  config: 配置字典
+    @retval 游戏存储对象
+    """
+    kind = config.get('GAME_STORE', STORE_LOCAL)
+    if kind == STORE_SHARED:
+        from .shared_store import SharedGameStore
+        return SharedGameStore(slot_count=int(config.get('GAME_STORE_SLOTS', 256)))
+    if kind != STORE_LOCAL:
+        raise ValueError(f'未知的游戏存储类型: {kind}')
+    engine = config.get('GAME_ENGINE', ENGINE_DEFAULT)
+    if engine == ENGINE_COMPACT:
+        from .compact_game import CompactSnakeGame
+        factory = CompactSnakeGame
+    elif engine == ENGINE_DEFAULT:
+        factory = SnakeGame
+    else:
+        raise ValueError(f'未知的游戏实现: {engine}')
+    hibernate_after = float(config.get('GAME_HIBERNATE_AFTER', 0))
+    if hibernate_after <= 0:
+        return LocalGameStore(factory)
+    from .hibernate import DiskSnapshotPool, MemorySnapshotPool
+    directory = config.get('GAME_HIBERNATE_DIR')
+    pool = DiskSnapshotPool(directory) if directory else MemorySnapshotPool()
+    return LocalGameStore(factory, pool, hibernate_after, bool(config.get('GAME_HIBERNATE_COMPRESS', False)))
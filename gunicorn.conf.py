@@ -0,0 +1,109 @@
+"""
+@file    gunicorn.conf.py
+@brief   Gunicorn生产服务器配置
+@details 多进程预派生（pre-fork）工作进程，可配置进程数、线程数、预加载、
+         工作进程按请求数回收及优雅重启超时，所有配置项都可由环境变量覆盖，
+         说明见 .env.example
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: gunicorn -c gunicorn.conf.py wsgi:app  或  python serve.py
+优雅重启: kill -HUP <master_pid>；优雅退出: kill -TERM <master_pid>
+"""
+
+import os
+import sys
+import multiprocessing
+
+
+def _env_bool(name, default):
+    """
+    @brief  读取布尔型环境变量
+    @param  name: 变量名
+    @param  default: 默认值
+    @retval bool: 变量值
+    """
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# 监听地址
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# 工作进程数，默认 CPU核数 * 2 + 1
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# 多工作进程时默认使用共享内存游戏存储：进程内存储的游戏只存在于某个工作进程，
+# 同一用户的请求被分配到其他进程时会看到另一局游戏
+os.environ.setdefault('GAME_STORE', 'shared' if workers > 1 else 'local')
+
+# 每个工作进程的线程数，大于1时使用gthread工作模式
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# 在主进程预加载应用，fork后各工作进程写时复制共享内存
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+
+# 工作进程处理指定数量请求后回收，加入随机抖动避免同时重启
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '500'))
+
+# 请求超时、优雅退出等待时间和长连接保持时间（秒）
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# 日志
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def _game_store():
+    """
+    @brief  获取应用实际使用的游戏存储类型
+    @details 预加载时读取已创建应用的配置，否则读取环境变量（与 app.DEFAULT_CONFIG 一致）
+    @retval str: 游戏存储类型
+    """
+    if 'wsgi' in sys.modules:
+        return sys.modules['wsgi'].app.config.get('GAME_STORE', 'local')
+    return os.environ.get('GAME_STORE', 'local')
+
+
+def on_starting(server):
+    """
+    @brief  主进程启动前检查配置
+    @details 命令行参数（如 --workers）在本文件之后生效，因此在此按最终配置检查：
+             多个工作进程不能使用进程内游戏存储；共享内存游戏存储必须开启预加载，
+             否则每个工作进程各自创建一块共享内存，游戏同样不能跨进程共享
+    @param  server: Gunicorn主进程对象
+    @retval None
+    """
+    if server.cfg.workers > 1 and _game_store() == 'local':
+        server.log.error(f"{server.cfg.workers} 个工作进程不能使用进程内游戏存储（GAME_STORE=local），"
+                         "请设置 GAME_STORE=shared 或 WEB_CONCURRENCY=1")
+        sys.exit(1)
+    if _game_store() == 'shared' and not server.cfg.preload_app:
+        server.log.error("共享内存游戏存储（GAME_STORE=shared）需要在主进程预加载应用，请设置 GUNICORN_PRELOAD=true")
+        sys.exit(1)
+
+
+def post_fork(server, worker):
+    """
+    @brief  工作进程fork后的初始化
+    @details 预加载时主进程已打开数据库连接，子进程必须丢弃继承来的连接池，
+             否则多个进程会共用同一个SQLite连接
+    @param  server: Gunicorn主进程对象
+    @param  worker: 工作进程对象
+    @retval None
+    """
+    if 'wsgi' in sys.modules:
+        from database import db
+        from wsgi import app
+
+        with app.app_context():
+            db.engine.dispose(close=False)
+    server.log.info(f"工作进程 {worker.pid} 已启动")
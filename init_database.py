@@ -18,13 +18,16 @@ logger = logging.getLogger(__name__)
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app
+from app import create_app
 from database import db, User, PasswordResetToken
 from database.auth_service import AuthService
 
 USERS_FILE = 'users.json'
 RESET_TOKENS_FILE = 'reset_tokens.json'
 
+# 迁移脚本只需要数据库，不注册任何蓝图
+app = create_app({'BLUEPRINTS': ()})
+
 
 def init_database():
     """
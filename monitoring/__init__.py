@@ -0,0 +1,22 @@
+"""
+@file    __init__.py
+@brief   监控模块初始化
+@details 导出请求指标采集、SQL查询追踪和请求剖析相关类和函数
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+from .metrics import MetricsRegistry, RateMeter, init_metrics
+from .sql_trace import SQLTracer, init_sql_trace
+from .profiler import RequestProfiler, init_profiler
+
+__all__ = [
+    'MetricsRegistry',
+    'RateMeter',
+    'init_metrics',
+    'SQLTracer',
+    'init_sql_trace',
+    'RequestProfiler',
+    'init_profiler'
+]
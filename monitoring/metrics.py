@@ -0,0 +1,515 @@
+"""
+@file    metrics.py
+@brief   请求指标采集模块
+@details 按路由记录请求延迟直方图、并发请求数、响应大小和状态码计数，
+         以Prometheus文本格式在 /metrics 接口导出
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import time
+import threading
+import weakref
+from bisect import bisect_left
+from flask import Response, g, request
+
+# 请求延迟直方图桶边界（秒）
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 响应大小直方图桶边界（字节）
+DEFAULT_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# 未匹配任何路由的请求使用的路由标签，避免404路径导致标签数量膨胀
+UNMATCHED_ROUTE = '<unmatched>'
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label_value(value):
+    """
+    @brief  转义标签值中的特殊字符
+    @param  value: 标签值
+    @retval str: 转义后的标签值
+    """
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, label_values, extra=None):
+    """
+    @brief  生成标签字符串
+    @param  labelnames: 标签名元组
+    @param  label_values: 标签值元组
+    @param  extra: 追加的(名称, 值)对，用于直方图的le标签
+    @retval str: 形如 {a="1",b="2"} 的标签字符串，无标签时为空串
+    """
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(labelnames, label_values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    """
+    @brief  格式化样本值
+    @param  value: 数值
+    @retval str: 整数去掉小数部分，其余保留原始精度
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _ThreadBucket:
+    """
+    @brief  单线程私有的指标存储
+    @details 每个线程只写自己的桶，记录时无需加锁，导出时再合并所有桶；
+             桶只由线程局部变量引用，线程退出后被回收，样本并入注册表的已退出线程汇总
+    """
+    __slots__ = ('values', '__weakref__')
+
+    def __init__(self):
+        self.values = {}
+
+
+class _Metric:
+    """
+    @brief  指标基类
+    @details 保存指标名称、说明和标签名，样本写入所属注册表的线程桶
+    """
+    metric_type = 'untyped'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _merge(self, merged, value):
+        """
+        @brief  将一个线程桶中的样本合并到汇总值
+        @param  merged: 已合并的值，首次为None
+        @param  value: 线程桶中的样本
+        @retval 合并后的值
+        """
+        return value if merged is None else merged + value
+
+    def _render(self, samples):
+        """
+        @brief  渲染指标样本行
+        @param  samples: 标签值元组到合并值的字典
+        @retval list: 文本行列表
+        """
+        lines = []
+        for label_values, value in sorted(samples.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, label_values)} {_format_value(value)}')
+        return lines
+
+
+class Counter(_Metric):
+    """
+    @brief  单调递增计数器
+    """
+    metric_type = 'counter'
+
+    def inc(self, label_values=(), amount=1):
+        """
+        @brief  计数器加值
+        @param  label_values: 标签值元组，顺序与labelnames一致
+        @param  amount: 增加量
+        @retval None
+        """
+        values = self._registry._thread_values()
+        key = (self.name, label_values)
+        values[key] = values.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    """
+    @brief  可增可减的仪表
+    @details 各线程分别累加增减量，导出时求和，适合并发请求数这类成对增减的值
+    """
+    metric_type = 'gauge'
+
+    def dec(self, label_values=(), amount=1):
+        """
+        @brief  仪表减值
+        @param  label_values: 标签值元组
+        @param  amount: 减少量
+        @retval None
+        """
+        self.inc(label_values, -amount)
+
+
+class Histogram(_Metric):
+    """
+    @brief  直方图
+    @details 线程桶中保存非累计的各桶计数、总和与总数，导出时转换为累计形式
+    """
+    metric_type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, label_values=()):
+        """
+        @brief  记录一次观测值
+        @param  value: 观测值
+        @param  label_values: 标签值元组
+        @retval None
+        """
+        values = self._registry._thread_values()
+        key = (self.name, label_values)
+        state = values.get(key)
+        if state is None:
+            # 布局：[桶0, 桶1, ..., +Inf桶, 总和, 总数]
+            state = [0] * (len(self.buckets) + 3)
+            values[key] = state
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def _merge(self, merged, value):
+        if merged is None:
+            return list(value)
+        for i, item in enumerate(value):
+            merged[i] += item
+        return merged
+
+    def _render(self, samples):
+        lines = []
+        for label_values, state in sorted(samples.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(float(bound))
+                labels = _format_labels(self.labelnames, label_values, ('le', le))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(float(state[-2]))}')
+            lines.append(f'{self.name}_count{labels} {state[-1]}')
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """
+    @brief  回调仪表
+    @details 导出时调用回调函数取值，用于活跃游戏数等由业务状态决定的指标
+    """
+    metric_type = 'gauge'
+
+    def __init__(self, registry, name, documentation, callback, labelnames=()):
+        super().__init__(registry, name, documentation, labelnames)
+        self._callback = callback
+
+    def collect(self):
+        """
+        @brief  调用回调获取当前样本
+        @retval dict: 标签值元组到数值的字典
+        """
+        value = self._callback()
+        if isinstance(value, dict):
+            return value
+        return {(): value}
+
+
+class RateMeter:
+    """
+    @brief  滑动窗口速率计
+    @details 按秒分槽计数，返回最近若干个完整秒内的平均每秒事件数
+    """
+
+    def __init__(self, window_seconds=10):
+        self.window_seconds = window_seconds
+        self._slots = [0] * (window_seconds + 1)
+        self._slot_seconds = [0] * (window_seconds + 1)
+
+    def mark(self, count=1):
+        """
+        @brief  记录事件
+        @param  count: 事件数量
+        @retval None
+        """
+        second = int(time.monotonic())
+        index = second % len(self._slots)
+        if self._slot_seconds[index] != second:
+            self._slot_seconds[index] = second
+            self._slots[index] = 0
+        self._slots[index] += count
+
+    def rate(self):
+        """
+        @brief  计算每秒事件数
+        @retval float: 最近窗口内的平均速率（不含当前未结束的一秒）
+        """
+        now = int(time.monotonic())
+        total = 0
+        for slot_second, count in zip(self._slot_seconds, self._slots):
+            if now - self.window_seconds <= slot_second < now:
+                total += count
+        return total / self.window_seconds
+
+
+def _retire_bucket(registry_ref, key):
+    """
+    @brief  线程桶被回收时通知仍然存活的注册表
+    @param  registry_ref: 注册表的弱引用
+    @param  key: 线程桶的id
+    @retval None
+    """
+    registry = registry_ref()
+    if registry is not None:
+        registry._retire(key)
+
+
+class MetricsRegistry:
+    """
+    @brief  指标注册表
+    @details 管理所有指标定义及各线程的样本桶，并负责生成文本导出格式；
+             已退出线程的桶合并为一份汇总，每请求一个线程的服务器上桶的数量不随请求数增长
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        # 存活线程的样本字典，键为线程桶的id
+        self._buckets = {}
+        # 已退出线程合并后的样本，键为(指标名, 标签值元组)
+        self._retired = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _thread_values(self):
+        """
+        @brief  获取当前线程的样本字典
+        @details 只有线程首次记录时需要加锁登记，之后的写入完全无锁
+        @retval dict: 当前线程的样本字典
+        """
+        try:
+            return self._local.bucket.values
+        except AttributeError:
+            bucket = _ThreadBucket()
+            with self._lock:
+                self._buckets[id(bucket)] = bucket.values
+            # 回调只弱引用注册表，主线程等长期存活线程的桶不会让注册表常驻内存
+            weakref.finalize(bucket, _retire_bucket, weakref.ref(self), id(bucket))
+            self._local.bucket = bucket
+            return bucket.values
+
+    def _retire(self, key):
+        """
+        @brief  线程桶被回收（线程退出）时，把其中的样本并入已退出线程汇总
+        @param  key: 线程桶的id
+        @retval None
+        """
+        with self._lock:
+            values = self._buckets.pop(key, None)
+            if not values:
+                return
+            for sample_key, value in values.items():
+                metric = self._metrics.get(sample_key[0])
+                if metric is not None:
+                    self._retired[sample_key] = metric._merge(self._retired.get(sample_key), value)
+
+    def _register(self, metric):
+        """
+        @brief  登记指标，同名指标重复登记时返回已有实例
+        @param  metric: 指标对象
+        @retval 已登记的指标对象
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """
+        @brief  创建或获取计数器
+        @retval Counter: 计数器对象
+        """
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """
+        @brief  创建或获取仪表
+        @retval Gauge: 仪表对象
+        """
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        """
+        @brief  创建或获取直方图
+        @retval Histogram: 直方图对象
+        """
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def callback_gauge(self, name, documentation, callback, labelnames=()):
+        """
+        @brief  创建回调仪表
+        @param  callback: 无参回调，返回数值或标签值元组到数值的字典
+        @retval CallbackGauge: 回调仪表对象
+        """
+        return self._register(CallbackGauge(self, name, documentation, callback, labelnames))
+
+    def rate_gauge(self, name, documentation, window_seconds=10):
+        """
+        @brief  创建以速率计为数据源的仪表
+        @param  window_seconds: 速率统计窗口（秒）
+        @retval RateMeter: 速率计，调用mark()记录事件
+        """
+        meter = RateMeter(window_seconds)
+        self.callback_gauge(name, documentation, meter.rate)
+        return meter
+
+    def collect(self):
+        """
+        @brief  合并所有线程桶中的样本
+        @retval dict: 指标名到(标签值元组 -> 合并值)字典的映射
+        """
+        with self._lock:
+            buckets = list(self._buckets.values())
+            metrics = dict(self._metrics)
+            merged = {name: {} for name in metrics}
+            # 已退出线程的汇总由 _retire() 在锁内修改，也在锁内合并
+            self._merge_samples(merged, metrics, self._retired.items())
+
+        for values in buckets:
+            # 复制一份再遍历，避免其他线程同时写入导致字典大小变化
+            self._merge_samples(merged, metrics, list(values.items()))
+
+        for name, metric in metrics.items():
+            if isinstance(metric, CallbackGauge):
+                merged[name] = metric.collect()
+        return merged
+
+    @staticmethod
+    def _merge_samples(merged, metrics, items):
+        """
+        @brief  把一个桶中的样本合并到各指标的汇总值
+        @param  merged: 指标名到(标签值元组 -> 合并值)字典的映射
+        @param  metrics: 指标名到指标对象的映射
+        @param  items: ((指标名, 标签值元组), 样本)序列
+        @retval None
+        """
+        for (name, label_values), value in items:
+            metric = metrics.get(name)
+            if metric is None:
+                continue
+            samples = merged[name]
+            samples[label_values] = metric._merge(samples.get(label_values), value)
+
+    def render(self):
+        """
+        @brief  生成Prometheus文本导出格式
+        @retval str: 导出文本
+        """
+        merged = self.collect()
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.metric_type}')
+            lines.extend(metric._render(merged.get(name, {})))
+        return '\n'.join(lines) + '\n'
+
+
+class RequestMetrics:
+    """
+    @brief  Flask请求指标
+    @details 通过before_request/after_request/teardown_request钩子记录每个路由的指标
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.latency = registry.histogram(
+            'snake_game_http_request_duration_seconds',
+            'HTTP请求处理耗时（秒）',
+            ('route', 'method')
+        )
+        self.response_size = registry.histogram(
+            'snake_game_http_response_size_bytes',
+            'HTTP响应体大小（字节）',
+            ('route', 'method'),
+            buckets=DEFAULT_SIZE_BUCKETS
+        )
+        self.responses = registry.counter(
+            'snake_game_http_responses_total',
+            'HTTP响应数量（按状态码）',
+            ('route', 'method', 'status')
+        )
+        self.in_flight = registry.gauge(
+            'snake_game_http_requests_in_flight',
+            '正在处理的HTTP请求数',
+            ('route',)
+        )
+
+    def before_request(self):
+        """
+        @brief  请求开始：记录开始时间，并发数加一
+        @retval None
+        """
+        route = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+        g._metrics_route = route
+        g._metrics_start = time.perf_counter()
+        self.in_flight.inc((route,))
+
+    def after_request(self, response):
+        """
+        @brief  请求正常结束：记录延迟、响应大小和状态码
+        @param  response: 响应对象
+        @retval Response: 原响应对象
+        """
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        route = g._metrics_route
+        method = request.method
+        self.latency.observe(time.perf_counter() - start, (route, method))
+        size = response.content_length
+        if size is None and not response.is_streamed:
+            size = response.calculate_content_length()
+        if size is not None:
+            self.response_size.observe(size, (route, method))
+        self.responses.inc((route, method, str(response.status_code)))
+        return response
+
+    def teardown_request(self, exc):
+        """
+        @brief  请求上下文销毁：并发数减一，未经after_request的异常请求按500计
+        @param  exc: 未处理的异常，没有则为None
+        @retval None
+        """
+        route = g.pop('_metrics_route', None)
+        if route is None:
+            return
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            method = request.method
+            self.latency.observe(time.perf_counter() - start, (route, method))
+            self.responses.inc((route, method, '500'))
+        self.in_flight.dec((route,))
+
+
+def init_metrics(app, registry=None):
+    """
+    @brief  为Flask应用启用请求指标采集并注册 /metrics 接口
+    @param  app: Flask应用实例
+    @param  registry: 指标注册表，为None时新建
+    @retval MetricsRegistry: 使用的指标注册表
+    """
+    registry = registry if registry is not None else MetricsRegistry()
+    request_metrics = RequestMetrics(registry)
+
+    app.before_request(request_metrics.before_request)
+    app.after_request(request_metrics.after_request)
+    app.teardown_request(request_metrics.teardown_request)
+
+    def metrics_endpoint():
+        return Response(registry.render(), mimetype=None, content_type=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
+    app.extensions['metrics'] = registry
+    return registry
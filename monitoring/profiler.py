@@ -0,0 +1,352 @@
+"""
+@file    profiler.py
+@brief   按需请求性能剖析模块
+@details 对带有管理员令牌请求头的请求，或按环境变量配置的采样率随机选中的请求，
+         使用cProfile或统计采样方式剖析，结果写入有上限的轮转目录。统计采样直接写出
+         折叠栈（collapsed stack），可用于生成火焰图；cProfile在请求线程中只保存原始
+         .pstats 文件，需要时再用 python -m monitoring.profiler <文件> 转换为折叠栈
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import re
+import sys
+import time
+import hmac
+import random
+import pstats
+import cProfile
+import logging
+import threading
+from flask import g, request
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 触发剖析的管理员令牌请求头
+TOKEN_HEADER = 'X-Profile-Token'
+
+# 指定剖析方式的请求头（cprofile 或 sample）
+MODE_HEADER = 'X-Profile-Mode'
+
+# 返回剖析文件名的响应头
+FILE_HEADER = 'X-Profile-File'
+
+# 支持的剖析方式
+MODE_CPROFILE = 'cprofile'
+MODE_SAMPLE = 'sample'
+
+# 折叠栈最大深度，防止调用图展开过深
+MAX_STACK_DEPTH = 64
+
+# 转换cProfile结果时最多展开的调用路径数，以及忽略的路径耗时占比下限；
+# 同一函数经不同调用者形成的路径数随调用图指数增长，两者共同限制转换的工作量
+MAX_COLLAPSED_PATHS = 20000
+MIN_PATH_FRACTION = 1e-4
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_ROOT, 'profiles')
+
+
+def _frame_label(filename, lineno, funcname):
+    """
+    @brief  生成折叠栈中的帧名称
+    @param  filename: 源文件路径
+    @param  lineno: 函数定义行号
+    @param  funcname: 函数名
+    @retval str: 形如 get_user_by_id (user_dao.py:55) 的帧名称
+    """
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f'{funcname} ({filename}:{lineno})'.replace(';', ':')
+
+
+def cprofile_to_collapsed(profile):
+    """
+    @brief  将cProfile结果转换为折叠栈
+    @details cProfile只记录调用边而非完整调用栈，这里从无调用者的根函数出发，
+             沿调用边按累计耗时比例分摊各函数的自身耗时，得到近似的调用栈。
+             耗时占比低于 MIN_PATH_FRACTION 的路径不再展开，展开的路径数达到
+             MAX_COLLAPSED_PATHS 后停止，被截断部分的耗时计入其父路径
+    @param  profile: 已停止的cProfile.Profile对象、pstats.Stats对象或 .pstats 文件路径
+    @retval dict: 栈元组到耗时（微秒）的映射
+    """
+    stats = (profile if isinstance(profile, pstats.Stats) else pstats.Stats(profile)).stats
+    children = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, caller_stats in callers.items():
+            children.setdefault(caller, []).append((func, caller_stats[3]))
+
+    collapsed = {}
+    roots = [(func, cumulative) for func, (_, _, _, cumulative, callers) in stats.items() if not callers]
+    min_weight = sum(cumulative for _, cumulative in roots) * MIN_PATH_FRACTION
+    budget = [MAX_COLLAPSED_PATHS]
+
+    def add(path, weight):
+        us = int(weight * 1e6)
+        if us > 0:
+            collapsed[path] = collapsed.get(path, 0) + us
+
+    def walk(func, path, weight, depth):
+        total_time = stats[func][3]
+        if total_time <= 0 or weight <= 0:
+            return
+        budget[0] -= 1
+        scale = weight / total_time
+        if depth >= MAX_STACK_DEPTH or budget[0] <= 0:
+            add(path, weight)
+            return
+        own = stats[func][2] * scale
+        for child, edge_time in children.get(func, ()):
+            label = _frame_label(*child)
+            child_weight = edge_time * scale
+            if label in path:
+                continue
+            if child_weight < min_weight or budget[0] <= 0:
+                own += child_weight
+                continue
+            walk(child, path + (label,), child_weight, depth + 1)
+        add(path, own)
+
+    for func, cumulative in roots:
+        walk(func, (_frame_label(*func),), cumulative, 1)
+    return collapsed
+
+
+def convert_pstats(path):
+    """
+    @brief  把保存的 .pstats 文件转换为同名的 .folded 折叠栈文件
+    @param  path: .pstats 文件路径
+    @retval str: 折叠栈文件路径
+    """
+    collapsed = cprofile_to_collapsed(path)
+    output = os.path.splitext(path)[0] + '.folded'
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(''.join(f"{';'.join(stack)} {weight}\n" for stack, weight in collapsed.items()))
+    return output
+
+
+class StackSampler:
+    """
+    @brief  统计采样剖析器
+    @details 后台线程按固定间隔抓取目标线程的调用栈并计数
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        """
+        @brief  启动采样线程
+        @retval None
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        @brief  停止采样并等待线程退出
+        @retval dict: 栈元组到采样次数的映射
+        """
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                key = tuple(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+            self._stop.wait(self.interval)
+
+
+class ProfileStore:
+    """
+    @brief  剖析结果轮转目录
+    @details 文件名以纳秒时间戳开头，超过上限时删除最旧的文件（折叠栈和 .pstats 合计）
+    """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, max_files=200):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def _filename(self, name, suffix):
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'request'
+        return f'{time.time_ns():020d}-{os.getpid()}-{safe_name}{suffix}'
+
+    def write(self, name, collapsed):
+        """
+        @brief  写入折叠栈文件
+        @param  name: 文件名中的描述部分
+        @param  collapsed: 栈元组到权重的映射
+        @retval str: 写入的文件名
+        """
+        filename = self._filename(name, '.folded')
+        lines = [f"{';'.join(stack)} {weight}" for stack, weight in collapsed.items()]
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self._prune()
+        return filename
+
+    def write_stats(self, name, profile):
+        """
+        @brief  保存cProfile原始结果，不在请求线程中转换
+        @param  name: 文件名中的描述部分
+        @param  profile: 已停止的cProfile.Profile对象
+        @retval str: 写入的文件名
+        """
+        filename = self._filename(name, '.pstats')
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, filename))
+            self._prune()
+        return filename
+
+    def _prune(self):
+        files = sorted(name for name in os.listdir(self.directory) if name.endswith(('.folded', '.pstats')))
+        for name in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+class RequestProfiler:
+    """
+    @brief  Flask请求剖析钩子
+    """
+
+    def __init__(self, store, admin_token='', sample_rate=0.0, mode=MODE_CPROFILE, sample_interval=0.001):
+        self.store = store
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.sample_interval = sample_interval
+
+    def _requested_by_admin(self):
+        token = request.headers.get(TOKEN_HEADER)
+        return bool(self.admin_token and token and hmac.compare_digest(token, self.admin_token))
+
+    def before_request(self):
+        """
+        @brief  请求开始：判断是否剖析并启动剖析器
+        @retval None
+        """
+        by_admin = self._requested_by_admin()
+        if not by_admin and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return
+
+        mode = request.headers.get(MODE_HEADER, self.mode) if by_admin else self.mode
+        if mode == MODE_SAMPLE:
+            profiler = StackSampler(threading.get_ident(), self.sample_interval)
+            profiler.start()
+        else:
+            mode = MODE_CPROFILE
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # 当前线程已有其他剖析器在运行
+                return
+        g._profile = (mode, profiler, by_admin)
+
+    def _finish(self):
+        """
+        @brief  停止剖析并写入文件
+        @retval str: 写入的文件名，本请求未剖析时返回None
+        """
+        state = g.pop('_profile', None)
+        if state is None:
+            return None
+        mode, profiler, by_admin = state
+        name = f'{request.endpoint or "unmatched"}-{mode}'
+        try:
+            if mode == MODE_SAMPLE:
+                filename = self.store.write(name, profiler.stop())
+            else:
+                profiler.disable()
+                filename = self.store.write_stats(name, profiler)
+        except OSError as e:
+            logger.error(f"写入剖析文件失败: {str(e)}")
+            return None
+        logger.info(f"请求剖析完成: {request.path} -> {filename}")
+        return filename if by_admin else None
+
+    def after_request(self, response):
+        """
+        @brief  请求结束：停止剖析，管理员请求返回文件名响应头
+        @param  response: 响应对象
+        @retval Response: 原响应对象
+        """
+        filename = self._finish()
+        if filename:
+            response.headers[FILE_HEADER] = filename
+        return response
+
+    def teardown_request(self, exc):
+        """
+        @brief  异常请求兜底停止剖析
+        @param  exc: 未处理的异常
+        @retval None
+        """
+        if g.get('_profile') is not None:
+            self._finish()
+
+
+def init_profiler(app):
+    """
+    @brief  为Flask应用启用按需请求剖析
+    @details 配置项（均可由同名环境变量提供）：
+             PROFILE_ADMIN_TOKEN 管理员令牌，请求头 X-Profile-Token 与之相同时剖析该请求；
+             PROFILE_SAMPLE_RATE 随机采样率（0~1）；PROFILE_MODE 剖析方式；
+             PROFILE_DIR 输出目录；PROFILE_MAX_FILES 保留文件数上限；
+             PROFILE_SAMPLE_INTERVAL_MS 统计采样间隔。
+             令牌和采样率都未配置时不注册任何钩子
+    @param  app: Flask应用实例
+    @retval RequestProfiler: 剖析器实例，未启用时返回None
+    """
+    def setting(name, default):
+        return app.config.get(name, os.environ.get(name, default))
+
+    admin_token = setting('PROFILE_ADMIN_TOKEN', '')
+    sample_rate = float(setting('PROFILE_SAMPLE_RATE', 0))
+    if not admin_token and sample_rate <= 0:
+        return None
+
+    store = ProfileStore(setting('PROFILE_DIR', DEFAULT_PROFILE_DIR), int(setting('PROFILE_MAX_FILES', 200)))
+    profiler = RequestProfiler(
+        store,
+        admin_token=admin_token,
+        sample_rate=sample_rate,
+        mode=setting('PROFILE_MODE', MODE_CPROFILE),
+        sample_interval=float(setting('PROFILE_SAMPLE_INTERVAL_MS', 1)) / 1000.0
+    )
+    app.before_request(profiler.before_request)
+    app.after_request(profiler.after_request)
+    app.teardown_request(profiler.teardown_request)
+    app.extensions['profiler'] = profiler
+    return profiler
+
+
+if __name__ == '__main__':
+    # 用法: python -m monitoring.profiler <文件.pstats> ...
+    for stats_path in sys.argv[1:]:
+        print(convert_pstats(stats_path))
@@ -0,0 +1,213 @@
+"""
+@file    sql_trace.py
+@brief   SQL查询追踪模块
+@details 通过SQLAlchemy引擎事件统计每个请求的查询次数和数据库耗时，
+         记录超过阈值的慢查询及其调用位置，并识别N+1查询模式
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import sys
+import time
+import logging
+from flask import current_app, g, request, has_app_context
+from sqlalchemy import event
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 慢查询阈值默认值（毫秒）
+DEFAULT_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', '100'))
+
+# 同一语句在一个请求内重复执行达到该次数即视为N+1模式
+DEFAULT_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', '3'))
+
+# 调试模式下返回请求SQL摘要的响应头
+SUMMARY_HEADER = 'X-DB-Queries'
+
+# 每请求查询次数直方图桶边界
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+# 查找调用位置时需要跳过的框架代码目录
+_SKIPPED_PATH_PARTS = (
+    os.sep + 'sqlalchemy' + os.sep,
+    os.sep + 'flask_sqlalchemy' + os.sep,
+    os.path.abspath(__file__),
+)
+
+
+def find_call_site():
+    """
+    @brief  查找触发查询的业务代码位置
+    @details 自内向外遍历调用栈，跳过SQLAlchemy和本模块的帧
+    @retval str: 形如 database/user_dao.py:61 in get_user_by_id 的位置描述
+    """
+    frame = sys._getframe(1)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _SKIPPED_PATH_PARTS):
+            if filename.startswith(project_root):
+                filename = os.path.relpath(filename, project_root)
+            return f'{filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return '<unknown>'
+
+
+class RequestSQLStats:
+    """
+    @brief  单个请求的SQL统计
+    """
+    __slots__ = ('count', 'total_seconds', 'slow_count', 'statements', 'repeated')
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slow_count = 0
+        # 语句文本到执行次数的映射
+        self.statements = {}
+        # 被判定为N+1的语句到首次判定时调用位置的映射
+        self.repeated = {}
+
+    def summary(self):
+        """
+        @brief  生成摘要字符串
+        @retval str: 请求SQL摘要
+        """
+        return (f'count={self.count}; time_ms={self.total_seconds * 1000:.2f}; '
+                f'slow={self.slow_count}; repeated={len(self.repeated)}')
+
+
+class SQLTracer:
+    """
+    @brief  SQL查询追踪器
+    @details 挂接引擎的before/after_cursor_execute事件，
+             查询统计写入当前请求的flask.g，请求结束时汇总到指标注册表
+    """
+
+    def __init__(self, registry=None, slow_query_ms=DEFAULT_SLOW_QUERY_MS,
+                 n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD, summary_header=False):
+        self.slow_query_seconds = slow_query_ms / 1000.0
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.summary_header = summary_header
+        self._metrics = None
+        if registry is not None:
+            self._metrics = {
+                'queries': registry.counter(
+                    'snake_game_db_queries_total', 'SQL查询次数', ('route',)),
+                'per_request': registry.histogram(
+                    'snake_game_db_queries_per_request', '每个请求的SQL查询次数', ('route',),
+                    buckets=QUERY_COUNT_BUCKETS),
+                'time': registry.histogram(
+                    'snake_game_db_time_seconds', '每个请求的SQL总耗时（秒）', ('route',)),
+                'slow': registry.counter(
+                    'snake_game_db_slow_queries_total', '慢查询次数', ('route',)),
+                'n_plus_one': registry.counter(
+                    'snake_game_db_n_plus_one_total', '检测到N+1查询模式的次数', ('route',)),
+            }
+
+    def install(self, engine):
+        """
+        @brief  在引擎上注册查询事件监听
+        @param  engine: SQLAlchemy引擎
+        @retval None
+        """
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if elapsed >= self.slow_query_seconds:
+            logger.warning(f"慢查询 {elapsed * 1000:.1f}ms @ {find_call_site()}: {statement}")
+            stats = self._current_stats()
+            if stats is not None:
+                stats.slow_count += 1
+        else:
+            stats = self._current_stats()
+        if stats is None:
+            return
+
+        stats.count += 1
+        stats.total_seconds += elapsed
+        executions = stats.statements.get(statement, 0) + 1
+        stats.statements[statement] = executions
+        if executions == self.n_plus_one_threshold:
+            stats.repeated[statement] = find_call_site()
+
+    @staticmethod
+    def _current_stats():
+        """
+        @brief  获取当前请求的统计对象
+        @retval RequestSQLStats: 不在请求中时返回None
+        """
+        if not has_app_context():
+            return None
+        return g.get('_sql_stats')
+
+    def before_request(self):
+        """
+        @brief  请求开始：创建本请求的统计对象
+        @retval None
+        """
+        g._sql_stats = RequestSQLStats()
+
+    def after_request(self, response):
+        """
+        @brief  请求结束：上报N+1模式、写入指标，调试模式下附加摘要响应头
+        @param  response: 响应对象
+        @retval Response: 原响应对象
+        """
+        stats = g.pop('_sql_stats', None)
+        if stats is None:
+            return response
+
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        for statement, call_site in stats.repeated.items():
+            logger.warning(
+                f"疑似N+1查询：{route} 中同一语句执行 {stats.statements[statement]} 次 "
+                f"@ {call_site}: {statement}"
+            )
+
+        if self._metrics is not None:
+            labels = (route,)
+            self._metrics['queries'].inc(labels, stats.count)
+            self._metrics['per_request'].observe(stats.count, labels)
+            self._metrics['time'].observe(stats.total_seconds, labels)
+            if stats.slow_count:
+                self._metrics['slow'].inc(labels, stats.slow_count)
+            if stats.repeated:
+                self._metrics['n_plus_one'].inc(labels, len(stats.repeated))
+
+        if self.summary_header or current_app.debug:
+            response.headers[SUMMARY_HEADER] = stats.summary()
+        return response
+
+
+def init_sql_trace(app, db, registry=None):
+    """
+    @brief  为Flask应用启用SQL查询追踪
+    @details 慢查询阈值和N+1阈值可通过 SQL_SLOW_QUERY_MS、SQL_N_PLUS_ONE_THRESHOLD
+             配置项覆盖；调试模式或 SQL_TRACE_HEADER 为真时返回摘要响应头
+    @param  app: Flask应用实例
+    @param  db: Flask-SQLAlchemy实例
+    @param  registry: 指标注册表，为None时不导出指标
+    @retval SQLTracer: 追踪器实例
+    """
+    tracer = SQLTracer(
+        registry,
+        slow_query_ms=app.config.get('SQL_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS),
+        n_plus_one_threshold=app.config.get('SQL_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD),
+        summary_header=app.config.get('SQL_TRACE_HEADER', False)
+    )
+    with app.app_context():
+        tracer.install(db.engine)
+
+    app.before_request(tracer.before_request)
+    app.after_request(tracer.after_request)
+    app.extensions['sql_trace'] = tracer
+    return tracer
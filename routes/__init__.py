@@ -0,0 +1,41 @@
+"""
+@file    __init__.py
+@brief   路由模块初始化
+@details 按名称延迟导入并注册蓝图，未启用的蓝图不会被导入
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import importlib
+
+# 蓝图名称到(模块路径, 蓝图变量名)的映射
+BLUEPRINT_MODULES = {
+    'pages': ('routes.pages', 'pages_bp'),
+    'auth': ('routes.auth_api', 'auth_bp'),
+    'social': ('routes.social_api', 'social_bp'),
+    'game': ('routes.game_api', 'game_bp'),
+    # 依赖 game 蓝图创建的游戏存储，须在其后注册
+    'spectate': ('routes.spectate_api', 'spectate_bp'),
+    'analytics': ('routes.analytics_api', 'analytics_bp'),
+    'leaderboard': ('routes.leaderboard_api', 'leaderboard_bp'),
+}
+
+# 默认注册的蓝图
+DEFAULT_BLUEPRINTS = tuple(BLUEPRINT_MODULES)
+
+
+def register_blueprints(app, names=DEFAULT_BLUEPRINTS):
+    """
+    @brief  导入并注册指定的蓝图
+    @param  app: Flask应用实例
+    @param  names: 蓝图名称序列
+    @retval None
+    """
+    for name in names:
+        module_path, attr = BLUEPRINT_MODULES[name]
+        module = importlib.import_module(module_path)
+        app.register_blueprint(getattr(module, attr))
+
+
+__all__ = ['BLUEPRINT_MODULES', 'DEFAULT_BLUEPRINTS', 'register_blueprints']
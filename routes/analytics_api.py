@@ -0,0 +1,129 @@
+"""
+@file    analytics_api.py
+@brief   游戏分析接口路由
+@details 管理员查询死亡位置热力图和每日得分分布，数据来自游戏事件表（需配置 GAME_EVENTS_PATH）。
+         请求头 X-Admin-Token 须与 ANALYTICS_ADMIN_TOKEN（未配置时为 PROFILE_ADMIN_TOKEN）一致；
+         未配置令牌时接口关闭，未安装NumPy或未开启事件记录时返回503
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+import hmac
+import time
+from functools import wraps
+from flask import Blueprint, current_app, jsonify, request
+from game import analytics
+from game.snake_game import GRID_HEIGHT, GRID_WIDTH, MAX_GRID_SIZE, MIN_GRID_SIZE
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# 管理员令牌请求头
+TOKEN_HEADER = 'X-Admin-Token'
+
+# 默认统计最近多少天，以及允许的最大天数
+DEFAULT_DAYS = 7
+MAX_DAYS = 366
+
+
+def admin_token():
+    """
+    @brief  获取管理员令牌配置
+    @retval str: 令牌，未配置时为空字符串
+    """
+    config = current_app.config
+    return (config.get('ANALYTICS_ADMIN_TOKEN') or os.environ.get('ANALYTICS_ADMIN_TOKEN')
+            or config.get('PROFILE_ADMIN_TOKEN') or os.environ.get('PROFILE_ADMIN_TOKEN', ''))
+
+
+def admin_required(f):
+    """
+    @brief  管理员令牌验证装饰器，并检查分析所需的NumPy和事件表
+    @param  f: 被装饰的函数
+    @retval function: 装饰后的函数
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        expected = admin_token()
+        token = request.headers.get(TOKEN_HEADER)
+        if not (expected and token and hmac.compare_digest(token, expected)):
+            return jsonify({'success': False, 'message': '需要管理员令牌'}), 403
+        if not analytics.available():
+            return jsonify({'success': False, 'message': '服务器未安装NumPy，无法进行分析'}), 503
+        path = current_app.config.get('GAME_EVENTS_PATH')
+        if not path or not os.path.exists(path):
+            return jsonify({'success': False, 'message': '未开启游戏事件记录（GAME_EVENTS_PATH）'}), 503
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def int_arg(name, default, minimum, maximum):
+    """
+    @brief  读取整数查询参数并限制在取值范围内
+    @param  name: 参数名
+    @param  default: 默认值
+    @param  minimum: 最小值
+    @param  maximum: 最大值
+    @retval int: 参数值，格式错误时为默认值
+    """
+    value = request.args.get(name, default, type=int)
+    return min(max(value, minimum), maximum)
+
+
+def since_arg():
+    """
+    @brief  由查询参数 days 计算统计起始时间
+    @retval float: Unix时间
+    """
+    return time.time() - int_arg('days', DEFAULT_DAYS, 1, MAX_DAYS) * analytics.SECONDS_PER_DAY
+
+
+def flush_events():
+    """
+    @brief  先写入本进程缓冲区中的事件，使分析包含刚结束的游戏
+    @retval None
+    """
+    writer = current_app.extensions.get('game_events')
+    if writer is not None:
+        writer.flush()
+
+
+@analytics_bp.route('/api/admin/analytics/heatmap', methods=['GET'])
+@admin_required
+def get_death_heatmap():
+    """
+    @brief  获取死亡位置热力图
+    @details 查询参数：grid_width、grid_height 网格尺寸（默认为默认网格），days 最近天数
+    @retval JSON格式的热力图，按行（y）排列的二维计数数组
+    """
+    width = int_arg('grid_width', GRID_WIDTH, MIN_GRID_SIZE, MAX_GRID_SIZE)
+    height = int_arg('grid_height', GRID_HEIGHT, MIN_GRID_SIZE, MAX_GRID_SIZE)
+    flush_events()
+    heatmap = analytics.death_heatmap(current_app.config['GAME_EVENTS_PATH'], width, height, since_arg())
+    return jsonify({
+        'success': True,
+        'grid_width': width,
+        'grid_height': height,
+        'deaths': heatmap['deaths'],
+        'total': heatmap['total'].tolist(),
+        'wall': heatmap['wall'].tolist(),
+        'self': heatmap['self'].tolist()
+    })
+
+
+@analytics_bp.route('/api/admin/analytics/scores', methods=['GET'])
+@admin_required
+def get_score_distribution():
+    """
+    @brief  获取每日得分分布
+    @details 查询参数：days 最近天数。每天返回局数、平均分、最高分、p50/p90/p99 和每个食物一段的直方图
+    @retval JSON格式的每日得分分布
+    """
+    flush_events()
+    days = analytics.score_distribution(current_app.config['GAME_EVENTS_PATH'], since_arg())
+    return jsonify({
+        'success': True,
+        'bin_width': analytics.DEFAULT_BIN_WIDTH,
+        'days': days
+    })
@@ -0,0 +1,189 @@
+"""
+@file    auth_api.py
+@brief   认证接口路由
+@details 处理登录、登出、注册和密码管理请求
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+from flask import Blueprint, jsonify, request, session
+from database.auth_service import AuthService, login_required
+
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/api/auth/login', methods=['POST'])
+def api_login():
+    """
+    @brief  处理用户登录请求
+    @retval JSON格式的登录结果
+    """
+    data = request.get_json()
+    identifier = data.get('username', '').strip()
+    password = data.get('password', '')
+    remember = data.get('remember', False)
+    
+    if not identifier or not password:
+        return jsonify({
+            'success': False,
+            'message': '请输入用户名和密码'
+        }), 400
+    
+    result = AuthService.login_user(identifier, password)
+    
+    if result['success']:
+        session['user_id'] = result.get('user_id')
+        session['username'] = result.get('username')
+        session['user_email'] = result.get('email')
+        if remember:
+            session.permanent = True
+        return jsonify(result), 200
+    else:
+        return jsonify(result), 401
+
+
+@auth_bp.route('/api/auth/logout', methods=['POST'])
+def api_logout():
+    """
+    @brief  处理用户登出请求
+    @retval JSON格式的登出结果
+    """
+    session.clear()
+    return jsonify({
+        'success': True,
+        'message': '已成功登出'
+    }), 200
+
+
+@auth_bp.route('/api/auth/check', methods=['GET'])
+def api_check_auth():
+    """
+    @brief  检查用户登录状态
+    @retval JSON格式的登录状态
+    """
+    if 'user_id' in session:
+        return jsonify({
+            'logged_in': True,
+            'user_id': session.get('user_id'),
+            'username': session.get('username'),
+            'email': session.get('user_email')
+        }), 200
+    else:
+        return jsonify({
+            'logged_in': False
+        }), 200
+
+
+@auth_bp.route('/api/auth/register', methods=['POST'])
+def api_register():
+    """
+    @brief  处理用户注册请求
+    @retval JSON格式的注册结果
+    """
+    data = request.get_json()
+    username = data.get('username', '').strip()
+    email = data.get('email', '').strip()
+    password = data.get('password', '')
+    
+    if not username or not email or not password:
+        return jsonify({
+            'success': False,
+            'message': '请填写所有必填项'
+        }), 400
+    
+    result = AuthService.register_user(username, email, password)
+    
+    if result['success']:
+        return jsonify(result), 201
+    else:
+        return jsonify(result), 400
+
+
+@auth_bp.route('/api/auth/forgot-password', methods=['POST'])
+def api_forgot_password():
+    """
+    @brief  处理忘记密码请求
+    @retval JSON格式的处理结果
+    """
+    data = request.get_json()
+    email = data.get('email', '').strip()
+    
+    if not email:
+        return jsonify({
+            'success': False,
+            'message': '请输入邮箱地址'
+        }), 400
+    
+    result = AuthService.create_reset_token(email)
+    
+    return jsonify({
+        'success': True,
+        'message': '如果该邮箱已注册，重置链接已发送'
+    }), 200
+
+
+@auth_bp.route('/api/auth/reset-password', methods=['POST'])
+def api_reset_password():
+    """
+    @brief  处理重置密码请求
+    @retval JSON格式的处理结果
+    """
+    data = request.get_json()
+    token = data.get('token', '')
+    new_password = data.get('password', '')
+    
+    if not token or not new_password:
+        return jsonify({
+            'success': False,
+            'message': '参数错误'
+        }), 400
+    
+    result = AuthService.reset_password(token, new_password)
+    
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify(result), 400
+
+
+@auth_bp.route('/api/auth/change-password', methods=['POST'])
+@login_required
+def api_change_password():
+    """
+    @brief  处理修改密码请求
+    @retval JSON格式的处理结果
+    """
+    data = request.get_json()
+    old_password = data.get('old_password', '')
+    new_password = data.get('new_password', '')
+    
+    if not old_password or not new_password:
+        return jsonify({
+            'success': False,
+            'message': '请填写所有必填项'
+        }), 400
+    
+    user_id = session.get('user_id')
+    result = AuthService.change_password(user_id, old_password, new_password)
+    
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify(result), 400
+
+
+@auth_bp.route('/api/auth/user-info', methods=['GET'])
+@login_required
+def api_get_user_info():
+    """
+    @brief  获取用户信息
+    @retval JSON格式的用户信息
+    """
+    user_id = session.get('user_id')
+    result = AuthService.get_user_info(user_id)
+    
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify(result), 404
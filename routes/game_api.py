@@ -0,0 +1,239 @@
+"""
+@file    game_api.py
+@brief   游戏接口路由
+@details 处理开始、暂停、方向控制和状态更新等游戏请求
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import logging
+from flask import Blueprint, current_app, jsonify, request, session
+from game.store import create_game_store
+from game.journal import init_checkpoints
+from game.events import init_event_log
+from game.codec import BINARY_MIMETYPE, encode_game_state, encode_game_state_binary
+from game.snake_game import FOOD_SCORE, GAME_SPEED
+from database.auth_service import login_required
+
+game_bp = Blueprint('game', __name__)
+
+logger = logging.getLogger(__name__)
+
+# 游戏状态响应支持的媒体类型，Accept 中优先级相同时使用JSON
+RESPONSE_MIMETYPES = ('application/json', BINARY_MIMETYPE)
+
+# 一次更新请求最多接受的方向输入数
+MAX_BATCHED_INPUTS = 32
+
+
+def get_game_instance():
+    """
+    @brief  获取当前登录用户的游戏实例
+    @details 游戏实例保存在应用的游戏存储中，按会话中的用户ID区分。
+             修改游戏和编码响应时持有游戏的 lock，检查点和观战广播不会读到更新到一半的状态
+    @retval 游戏实例对象
+    """
+    return current_app.extensions['game_store'].get(session['user_id'])
+
+
+def state_response(game):
+    """
+    @brief  生成包含游戏状态的成功响应
+    @details 客户端的 Accept 优先选择 BINARY_MIMETYPE 时返回二进制游戏状态；
+             否则返回由预编码的编码器直接生成的JSON，不经过通用JSON序列化
+    @param  game: 游戏实例
+    @retval Response: 二进制响应，或内容同 {'status': 'success', 'game_state': game.get_state()} 的JSON响应
+    """
+    if request.accept_mimetypes.best_match(RESPONSE_MIMETYPES) == BINARY_MIMETYPE:
+        response = current_app.response_class(encode_game_state_binary(game), mimetype=BINARY_MIMETYPE)
+    else:
+        body = b'{"status":"success","game_state":' + encode_game_state(game) + b'}\n'
+        response = current_app.response_class(body, mimetype='application/json')
+    response.vary.add('Accept')
+    return response
+
+
+def parse_inputs(data):
+    """
+    @brief  解析更新请求中批量提交的方向输入
+    @details 请求体为 {"inputs": [[输入编号, 目标步数, 方向], ...]}，格式不正确的条目被忽略
+    @param  data: 请求JSON，可为None
+    @retval list: (输入编号, 目标步数, 方向) 列表
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('inputs'), list):
+        return []
+    inputs = []
+    for item in data['inputs'][:MAX_BATCHED_INPUTS]:
+        if (isinstance(item, list) and len(item) == 3 and isinstance(item[0], int) and isinstance(item[1], int)
+                and isinstance(item[2], str)):
+            inputs.append((item[0], item[1], item[2]))
+    return inputs
+
+
+def record_game_over(game):
+    """
+    @brief  把结束的一局计入当前用户的统计，并放入成绩写回队列
+    @details 游戏时长按步数乘以更新速度计算，不含暂停时间；两者都只修改内存，由后台线程写入数据库
+    @param  game: 刚结束的游戏实例
+    @retval None
+    """
+    stats = current_app.extensions.get('user_stats')
+    scores = current_app.extensions.get('score_queue')
+    if stats is None and scores is None:
+        return
+    packed = game.get_packed_state()
+    user_id = session['user_id']
+    food_eaten = packed.score // FOOD_SCORE
+    play_time_ms = packed.tick * getattr(game, 'speed', GAME_SPEED)
+    if stats is not None:
+        stats.record(user_id, packed.score, food_eaten, play_time_ms)
+    if scores is not None and not scores.submit(user_id, packed.score, food_eaten, play_time_ms,
+                                                game.grid_width, game.grid_height):
+        logger.warning('成绩队列已满，放弃用户 %s 的成绩 %s', user_id, packed.score)
+
+
+@game_bp.record_once
+def _register_game_store(state):
+    """
+    @brief  蓝图注册时创建游戏存储（按配置开启事件记录、从检查点恢复游戏），并向应用的指标注册表登记游戏引擎指标
+    @param  state: 蓝图注册状态
+    @retval None
+    """
+    store = create_game_store(state.app.config)
+    state.app.extensions['game_store'] = store
+    event_writer = init_event_log(store, state.app.config)
+    if event_writer is not None:
+        state.app.extensions['game_events'] = event_writer
+        # 在处理请求的进程（预加载时为fork出的工作进程）中启动写入线程
+        state.app.before_request(event_writer.start)
+    checkpointer = init_checkpoints(store, state.app.config)
+    if checkpointer is not None:
+        state.app.extensions['game_checkpointer'] = checkpointer
+        # 在处理请求的进程（预加载时为fork出的工作进程）中打开日志并恢复游戏
+        state.app.before_request(checkpointer.start)
+    registry = state.app.extensions.get('metrics')
+    if registry is None:
+        return
+    registry.callback_gauge('snake_game_active_games', '进行中的游戏数量', store.active_count)
+    if hasattr(store, 'hibernated_count'):
+        registry.callback_gauge('snake_game_hibernated_games', '休眠中的游戏数量', store.hibernated_count)
+    if event_writer is not None:
+        ring = event_writer.ring
+        registry.callback_gauge('snake_game_events_pending', '等待写入的游戏事件数', ring.__len__)
+        registry.callback_gauge('snake_game_events_dropped', '缓冲区满时丢弃的游戏事件数', lambda: ring.dropped)
+        registry.callback_gauge('snake_game_events_written', '已写入的游戏事件数', lambda: event_writer.events_written)
+    scores = state.app.extensions.get('score_queue')
+    if scores is not None:
+        registry.callback_gauge('snake_score_queue_pending', '等待写入的游戏成绩数', scores.__len__)
+        registry.callback_gauge('snake_score_queue_rejected', '队列满时放弃的游戏成绩数', lambda: scores.rejected)
+        registry.callback_gauge('snake_score_queue_written', '已写入的游戏成绩数', lambda: scores.scores_written)
+    state.app.extensions['game_tick_meters'] = (
+        registry.counter('snake_game_ticks_total', '游戏更新次数'),
+        registry.rate_gauge('snake_game_ticks_per_second', '最近10秒平均每秒游戏更新次数')
+    )
+
+
+@game_bp.route('/api/game/start', methods=['POST'])
+@login_required
+def start_game():
+    """
+    @brief  开始新游戏
+    @retval JSON格式的游戏状态
+    """
+    game = get_game_instance()
+    with game.lock:
+        game.reset()
+        game.start()
+        return state_response(game)
+
+
+@game_bp.route('/api/game/pause', methods=['POST'])
+@login_required
+def pause_game():
+    """
+    @brief  暂停/继续游戏
+    @retval JSON格式的游戏状态
+    """
+    game = get_game_instance()
+    with game.lock:
+        game.toggle_pause()
+        return state_response(game)
+
+
+@game_bp.route('/api/game/restart', methods=['POST'])
+@login_required
+def restart_game():
+    """
+    @brief  重新开始游戏
+    @retval JSON格式的游戏状态
+    """
+    game = get_game_instance()
+    with game.lock:
+        game.reset()
+        game.start()
+        return state_response(game)
+
+
+@game_bp.route('/api/game/state', methods=['GET'])
+@login_required
+def get_state():
+    """
+    @brief  获取当前游戏状态
+    @retval JSON格式的游戏状态
+    """
+    game = get_game_instance()
+    with game.lock:
+        return state_response(game)
+
+
+@game_bp.route('/api/game/direction', methods=['POST'])
+@login_required
+def change_direction():
+    """
+    @brief  改变蛇的移动方向
+    @retval JSON格式的游戏状态
+    """
+    game = get_game_instance()
+    data = request.get_json()
+    direction = data.get('direction')
+    with game.lock:
+        if direction:
+            game.set_direction(direction)
+        return state_response(game)
+
+
+@game_bp.route('/api/game/update', methods=['POST'])
+@login_required
+def update_game():
+    """
+    @brief  更新游戏状态（移动蛇、检测碰撞等）
+    @details 先应用随请求提交的方向输入，再前进一步；响应中的 tick 和 input_ack 供客户端对账。
+             本步游戏结束时把本局结果计入用户统计（写回缓冲，不在请求中写数据库）。
+             是否结束以 update() 的返回值判断：同一用户的更新请求重叠时，只有使游戏结束的那一次记录本局
+    @retval JSON格式的游戏状态
+    """
+    game = get_game_instance()
+    inputs = parse_inputs(request.get_json(silent=True))
+    meters = current_app.extensions.get('game_tick_meters')
+    if meters is not None:
+        meters[0].inc()
+        meters[1].mark()
+    with game.lock:
+        if inputs:
+            game.apply_inputs(inputs)
+        if game.update():
+            record_game_over(game)
+        return state_response(game)
+
+
+@game_bp.route('/api/game/highscore', methods=['GET'])
+def get_highscore():
+    """
+    @brief  获取历史最高分
+    @retval JSON格式的最高分数据
+    """
+    return jsonify({
+        'status': 'success',
+        'highscore': current_app.extensions['game_store'].get_highscore()
+    })
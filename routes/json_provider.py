@@ -0,0 +1,54 @@
+"""
+@file    json_provider.py
+@brief   快速JSON提供者
+@details 替换Flask默认的JSON提供者：复用一个紧凑、不排序键、不转义非ASCII字符的编码器实例，
+         省去每次 jsonify 时构造编码器和排序键的开销；调试模式下仍输出缩进格式
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import json
+from flask.json.provider import DefaultJSONProvider
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    @brief  快速JSON提供者
+    @details 无额外参数的 dumps() 和非调试模式的 response() 使用预先创建的编码器，
+             其余情况回退到默认实现；无法直接序列化的对象仍按默认规则处理（日期、UUID、数据类等）
+    """
+
+    ensure_ascii = False
+    sort_keys = False
+
+    def __init__(self, app):
+        """
+        @brief  创建提供者和复用的编码器
+        @param  app: Flask应用实例
+        """
+        super().__init__(app)
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, sort_keys=False, separators=(',', ':'), default=self.default
+        )
+
+    def dumps(self, obj, **kwargs):
+        """
+        @brief  序列化为JSON字符串
+        @param  obj: 要序列化的对象
+        @param  kwargs: 传给 json.dumps 的参数，非空时使用默认实现
+        @retval str: JSON字符串
+        """
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encoder.encode(obj)
+
+    def response(self, *args, **kwargs):
+        """
+        @brief  生成JSON响应，用法同 jsonify()
+        @retval Response: 响应对象
+        """
+        if self._app.debug and self.compact is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encoder.encode(obj) + '\n', mimetype=self.mimetype)
@@ -0,0 +1,81 @@
+"""
+@file    leaderboard_api.py
+@brief   排行榜接口路由
+@details 按总榜、日榜、周榜返回每个用户的最高分排名，使用游标分页。
+         排名和渲染好的页面都在进程内（见 database.leaderboard），响应带ETag和Last-Modified，
+         轮询的客户端携带 If-None-Match 或 If-Modified-Since 且页面未变化时返回304
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from database.leaderboard import WINDOWS, decode_cursor, init_leaderboard
+
+leaderboard_bp = Blueprint('leaderboard', __name__)
+
+# 默认每页条数和每页条数上限
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# 每次使用前都向服务器验证，页面未变化时得到304
+LEADERBOARD_CACHE_CONTROL = 'no-cache'
+
+
+@leaderboard_bp.record_once
+def _register_leaderboard(state):
+    """
+    @brief  蓝图注册时创建排行榜，并向应用的指标注册表登记页面缓存指标
+    @param  state: 蓝图注册状态
+    @retval None
+    """
+    leaderboard = init_leaderboard(state.app)
+    registry = state.app.extensions.get('metrics')
+    if registry is None:
+        return
+    registry.callback_gauge('snake_leaderboard_cached_pages', '排行榜缓存的页面数', leaderboard.cached_pages)
+    registry.callback_gauge('snake_leaderboard_cache_hits', '排行榜页面缓存命中次数', lambda: leaderboard.hits)
+    registry.callback_gauge('snake_leaderboard_cache_misses', '排行榜页面缓存未命中次数', lambda: leaderboard.misses)
+    registry.callback_gauge('snake_leaderboard_syncs', '排行榜从数据库同步的次数', lambda: leaderboard.syncs)
+
+
+def not_modified(page):
+    """
+    @brief  判断客户端缓存的页面是否仍然有效
+    @details 有 If-None-Match 时只比较ETag，否则比较 If-Modified-Since
+    @param  page: 当前页面
+    @retval bool: 是否可以返回304
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains(page.etag)
+    since = request.if_modified_since
+    return since is not None and page.last_modified <= since
+
+
+@leaderboard_bp.route('/api/leaderboard', methods=['GET'])
+def get_leaderboard():
+    """
+    @brief  获取排行榜
+    @details 查询参数：window 时间窗口（global、daily、weekly，默认 global），limit 每页条数，
+             cursor 上一页返回的 next_cursor。next_cursor 为null表示已到末尾
+    @retval JSON格式的一页排名，或304
+    """
+    window = request.args.get('window', 'global')
+    if window not in WINDOWS:
+        return jsonify({'success': False, 'message': '时间窗口必须是 global、daily 或 weekly'}), 400
+    limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+    cursor = request.args.get('cursor')
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    page = current_app.extensions['leaderboard'].page(window, after, limit)
+    if not_modified(page):
+        response = Response(status=304)
+    else:
+        response = current_app.response_class(page.body, mimetype='application/json')
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    response.headers['Cache-Control'] = LEADERBOARD_CACHE_CONTROL
+    return response
@@ -0,0 +1,141 @@
+"""
+@file    page_cache.py
+@brief   页面渲染缓存
+@details 页面输出只取决于模板名和少量上下文参数，渲染结果按(模板, 规范化上下文)缓存（含超长参数的页面不缓存），
+         命中时只需一次字典查找；响应带ETag，浏览器携带 If-None-Match 重新验证时返回304。
+         启动时预编译模板并预渲染常见的上下文组合
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import Response, current_app, render_template, request
+
+# 缓存的渲染结果数量上限
+DEFAULT_MAX_ENTRIES = 256
+
+# 可缓存页面的上下文字符串参数最大长度，更长的参数（如任意构造的message）不进入缓存
+MAX_VALUE_LENGTH = 200
+
+# 页面每次使用前都向服务器验证，内容未变化时得到304
+PAGE_CACHE_CONTROL = 'no-cache'
+
+
+def normalize_context(context):
+    """
+    @brief  规范化模板上下文
+    @details 按键排序后作为缓存键，值保持原样，渲染结果相同的上下文才共用缓存
+    @param  context: 上下文字典
+    @retval tuple: 可哈希的规范化上下文；有超长字符串或不可哈希的值时为None，表示不缓存
+    """
+    normalized = []
+    for key in sorted(context):
+        value = context[key]
+        if isinstance(value, str):
+            if len(value) > MAX_VALUE_LENGTH:
+                return None
+        elif value is not None and not isinstance(value, (bool, int, float)):
+            return None
+        normalized.append((key, value))
+    return tuple(normalized)
+
+
+class PageCache:
+    """
+    @brief  有上限的页面渲染缓存
+    @details 超过容量时淘汰最早缓存的页面；模板自动重新加载（调试模式）时不使用缓存
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        @brief  创建页面缓存
+        @param  max_entries: 缓存的渲染结果数量上限
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _render(self, template, context):
+        """
+        @brief  渲染模板并计算ETag
+        @param  template: 模板名
+        @param  context: 模板上下文
+        @retval tuple: (页面字节内容, ETag)
+        """
+        body = render_template(template, **context).encode('utf-8')
+        return body, hashlib.sha256(body).hexdigest()[:20]
+
+    def get(self, template, **context):
+        """
+        @brief  获取渲染结果，未命中时渲染并缓存
+        @details 规范化上下文只用作缓存键，页面总是用原始上下文渲染
+        @param  template: 模板名
+        @param  context: 模板上下文
+        @retval tuple: (页面字节内容, ETag)
+        """
+        normalized = normalize_context(context)
+        if normalized is None or current_app.jinja_env.auto_reload:
+            return self._render(template, context)
+
+        key = (template, normalized)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = self._render(template, context)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def render(self, template, **context):
+        """
+        @brief  返回页面响应，If-None-Match 匹配时返回304
+        @param  template: 模板名
+        @param  context: 模板上下文
+        @retval Response: 响应对象
+        """
+        body, etag = self.get(template, **context)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, content_type='text/html; charset=utf-8')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+        response.vary.add('Cookie')
+        return response
+
+    def warm(self, app, pages):
+        """
+        @brief  预编译模板并预渲染页面
+        @param  app: Flask应用实例
+        @param  pages: (模板名, 上下文字典)序列
+        @retval None
+        """
+        for template, _ in pages:
+            app.jinja_env.get_template(template)
+        if app.jinja_env.auto_reload:
+            return
+        with app.test_request_context():
+            for template, context in pages:
+                self.get(template, **context)
+
+    def clear(self):
+        """
+        @brief  清空缓存
+        @retval None
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        """@brief  缓存的页面数"""
+        return len(self._entries)
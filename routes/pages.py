@@ -0,0 +1,84 @@
+"""
+@file    pages.py
+@brief   页面路由
+@details 渲染游戏主页、登录页和注册页，渲染结果由页面缓存复用
+@author  AI Assistant
+@date    2026-10-19
+@version V1.1.0
+"""
+
+import logging
+from flask import Blueprint, current_app, request, session, redirect, url_for
+from .page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+pages_bp = Blueprint('pages', __name__)
+
+# 启动时预渲染的页面：(模板名, 上下文)
+WARM_PAGES = (
+    ('index.html', {'logged_in': False}),
+    ('index.html', {'logged_in': True}),
+    ('login.html', {'message': ''}),
+    ('login.html', {'message': '请先登录后再开始游戏'}),
+    ('register.html', {}),
+)
+
+
+@pages_bp.record_once
+def _register_page_cache(state):
+    """
+    @brief  蓝图注册时创建页面缓存，预编译模板并预渲染常见页面
+    @param  state: 蓝图注册状态
+    @retval None
+    """
+    app = state.app
+    cache = PageCache(int(app.config.get('PAGE_CACHE_SIZE', 256)))
+    app.extensions['page_cache'] = cache
+    try:
+        cache.warm(app, WARM_PAGES)
+    except Exception as e:
+        # 预渲染只是优化，失败时页面在首次访问时渲染
+        logger.warning(f"页面预渲染失败: {str(e)}")
+
+
+def render_page(template, **context):
+    """
+    @brief  通过页面缓存返回页面
+    @param  template: 模板名
+    @param  context: 模板上下文
+    @retval Response: 响应对象
+    """
+    return current_app.extensions['page_cache'].render(template, **context)
+
+
+@pages_bp.route('/')
+def index():
+    """
+    @brief  渲染游戏主页面
+    @retval HTML页面内容
+    """
+    return render_page('index.html', logged_in='user_id' in session)
+
+
+@pages_bp.route('/login')
+def login_page():
+    """
+    @brief  渲染登录页面
+    @retval HTML页面内容
+    """
+    if 'user_id' in session:
+        return redirect(url_for('pages.index'))
+    message = request.args.get('message', '')
+    return render_page('login.html', message=message)
+
+
+@pages_bp.route('/register')
+def register_page():
+    """
+    @brief  渲染注册页面
+    @retval HTML页面内容
+    """
+    if 'user_id' in session:
+        return redirect(url_for('pages.index'))
+    return render_page('register.html')
@@ -0,0 +1,103 @@
+"""
+@file    social_api.py
+@brief   第三方登录接口路由
+@details 处理微信、QQ授权请求及回调
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+from flask import Blueprint, jsonify, request, redirect
+from auth.social_config import SocialLoginService
+
+social_bp = Blueprint('social', __name__)
+
+
+@social_bp.route('/api/auth/wechat/authorize', methods=['POST'])
+def api_wechat_authorize():
+    """
+    @brief  处理微信注册授权请求
+    @retval JSON格式的授权结果
+    """
+    data = request.get_json() or {}
+    action = data.get('action', 'register')
+    
+    response = SocialLoginService.get_wechat_auth_response(action)
+    
+    if response['success']:
+        return jsonify(response), 200
+    else:
+        return jsonify(response), 400
+
+
+@social_bp.route('/api/auth/qq/authorize', methods=['POST'])
+def api_qq_authorize():
+    """
+    @brief  处理QQ注册授权请求
+    @retval JSON格式的授权结果
+    """
+    data = request.get_json() or {}
+    action = data.get('action', 'register')
+    
+    response = SocialLoginService.get_qq_auth_response(action)
+    
+    if response['success']:
+        return jsonify(response), 200
+    else:
+        return jsonify(response), 400
+
+
+@social_bp.route('/api/auth/social/config', methods=['GET'])
+def api_social_config():
+    """
+    @brief  获取第三方登录配置状态
+    @retval JSON格式的配置状态
+    """
+    status = SocialLoginService.get_config_status()
+    return jsonify({
+        'success': True,
+        'config': status
+    }), 200
+
+
+@social_bp.route('/api/auth/social/status', methods=['GET'])
+def api_social_status():
+    """
+    @brief  检查社交登录状态
+    @retval JSON格式的状态信息
+    """
+    return jsonify({
+        'success': True,
+        'registered': False,
+        'message': '等待用户授权'
+    }), 200
+
+
+@social_bp.route('/api/auth/wechat/callback', methods=['GET'])
+def api_wechat_callback():
+    """
+    @brief  微信授权回调处理
+    @retval 重定向或错误信息
+    """
+    code = request.args.get('code')
+    state = request.args.get('state', '')
+    
+    if not code:
+        return redirect('/register?message=微信授权失败')
+    
+    return redirect('/login?message=微信注册成功，请登录')
+
+
+@social_bp.route('/api/auth/qq/callback', methods=['GET'])
+def api_qq_callback():
+    """
+    @brief  QQ授权回调处理
+    @retval 重定向或错误信息
+    """
+    code = request.args.get('code')
+    state = request.args.get('state', '')
+    
+    if not code:
+        return redirect('/register?message=QQ授权失败')
+    
+    return redirect('/login?message=QQ注册成功，请登录')
@@ -0,0 +1,102 @@
+"""
+@file    spectate_api.py
+@brief   观战接口路由
+@details 列出进行中的游戏，并以 Server-Sent Events 推送被观战玩家的游戏画面。
+         每帧由 game.spectator.SpectatorHub 编码一次后分发给所有观战者。
+         每个观战连接占用一个工作线程，生产环境需设置 GUNICORN_THREADS 大于1
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+from flask import Blueprint, Response, current_app, jsonify
+from game.codec import encode_game_state
+from game.spectator import SpectatorHub
+from database.auth_service import login_required
+from database.models import User
+
+spectate_bp = Blueprint('spectate', __name__)
+
+# 直播列表最多返回的游戏数
+LIVE_GAMES_LIMIT = 20
+
+# 没有新帧时发送心跳注释的间隔（秒），防止代理关闭空闲连接
+HEARTBEAT_SECONDS = 15
+
+# SSE心跳注释
+HEARTBEAT_FRAME = b': keepalive\n\n'
+
+
+def sse_frame(game) -> bytes:
+    """
+    @brief  把游戏状态编码为一条SSE消息
+    @param  game: 游戏实例
+    @retval bytes: data 字段为游戏状态JSON的SSE消息
+    """
+    return b'data: ' + encode_game_state(game) + b'\n\n'
+
+
+@spectate_bp.record_once
+def _register_spectator_hub(state):
+    """
+    @brief  蓝图注册时创建观战广播中心，使用 game 蓝图创建的游戏存储
+    @param  state: 蓝图注册状态
+    @retval None
+    """
+    store = state.app.extensions.get('game_store')
+    if store is None:
+        raise RuntimeError('spectate 蓝图需要在 game 蓝图之后注册')
+    hub = SpectatorHub(store, encode=sse_frame,
+                       queue_size=state.app.config.get('SPECTATOR_QUEUE_SIZE', 8))
+    state.app.extensions['spectator_hub'] = hub
+    registry = state.app.extensions.get('metrics')
+    if registry is not None:
+        registry.callback_gauge('snake_game_spectators', '观战连接数量', hub.subscriber_count)
+
+
+@spectate_bp.route('/api/spectate/live', methods=['GET'])
+@login_required
+def live_games():
+    """
+    @brief  列出进行中的游戏，得分高的在前
+    @retval JSON格式的游戏列表
+    """
+    games = current_app.extensions['game_store'].live_games(LIVE_GAMES_LIMIT)
+    names = {}
+    if games:
+        users = User.query.filter(User.user_id.in_([user_id for user_id, _ in games])).all()
+        names = {user.user_id: user.username for user in users}
+    return jsonify({
+        'status': 'success',
+        'games': [{'user_id': user_id, 'username': names.get(user_id), 'score': score} for user_id, score in games]
+    })
+
+
+@spectate_bp.route('/api/spectate/<int:user_id>/stream', methods=['GET'])
+@login_required
+def stream(user_id):
+    """
+    @brief  推送玩家的游戏画面
+    @details 连接建立后立即发送当前画面，之后每次状态变化发送一帧；跟不上的观战者只收到最新帧，
+             持续落后的观战者被断开
+    @param  user_id: 被观战玩家的用户ID
+    @retval Response: text/event-stream 响应
+    """
+    hub = current_app.extensions['spectator_hub']
+    subscriber = hub.subscribe(user_id)
+
+    def generate():
+        try:
+            while True:
+                frame = subscriber.next_frame(HEARTBEAT_SECONDS)
+                if frame is None and subscriber.closed:
+                    break
+                yield frame if frame is not None else HEARTBEAT_FRAME
+        finally:
+            hub.unsubscribe(subscriber)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 禁止反向代理缓冲事件流
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,44 @@
+"""
+@file    serve.py
+@brief   生产环境启动脚本
+@details 先构建静态资源，再使用 gunicorn.conf.py 中的配置以多进程方式启动服务，
+         额外的命令行参数会原样传给Gunicorn（如 --workers 8）
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+
+用法: python serve.py [Gunicorn参数...]
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    """
+    @brief  主函数
+    @retval None
+    """
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        sys.exit('未安装Gunicorn，请执行 pip install -r requirements.txt（Gunicorn不支持Windows）')
+
+    os.chdir(PROJECT_ROOT)
+    sys.path.insert(0, PROJECT_ROOT)
+    from assets import build_assets
+    build_assets()
+
+    sys.argv = [
+        'gunicorn',
+        '--config', os.path.join(PROJECT_ROOT, 'gunicorn.conf.py'),
+        *sys.argv[1:],
+        'wsgi:app'
+    ]
+    WSGIApplication('%(prog)s [OPTIONS] [APP_MODULE]').run()
+
+
+if __name__ == '__main__':
+    main()
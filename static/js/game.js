@@ -4,9 +4,153 @@
  * @details 处理用户输入、游戏渲染、与服务端通信
  * @author  AI Assistant
  * @date    2026-02-16
- * @version V1.0.0
+ * @version V1.1.0
  */
 
+// 二进制游戏状态的媒体类型，与服务端 game/codec.py 中的 BINARY_MIMETYPE 一致
+const BINARY_STATE_MIMETYPE = 'application/x-snake-state';
+
+// 二进制头部字节数
+const BINARY_HEADER_SIZE = 40;
+
+// 二进制格式中的游戏状态和方向编码表
+const BINARY_STATES = ['idle', 'playing', 'paused', 'game_over'];
+const BINARY_DIRECTIONS = ['up', 'down', 'left', 'right'];
+
+// 蛇身编码方式：逐格索引 / 拐点
+const BODY_CELLS = 0;
+const BODY_TURNS = 1;
+
+// 吃到一个食物的得分，与服务端 game/snake_game.py 中的 FOOD_SCORE 一致（由 tests/test_prediction.py 检查）
+const FOOD_SCORE = 10;
+
+// 解码二进制游戏状态，返回与JSON接口 game_state 字段相同结构的对象
+function decodeGameState(buffer) {
+    // 头部字段均为小端
+    const view = new DataView(buffer);
+    const width = view.getUint16(20, true);
+    const count = view.getUint32(16, true);
+    const food = view.getUint32(12, true);
+    const encoding = view.getUint8(28);
+    const indexSize = view.getUint8(29);
+    
+    // 读取蛇身条目（格子索引或拐点）
+    const entries = new Array(count);
+    for (let i = 0; i < count; i++) {
+        const offset = BINARY_HEADER_SIZE + i * indexSize;
+        entries[i] = indexSize === 2 ? view.getUint16(offset, true) : view.getUint32(offset, true);
+    }
+    
+    // 拐点之间按直线补全为逐格索引
+    let cells = entries;
+    if (encoding === BODY_TURNS) {
+        cells = count ? [entries[0]] : [];
+        for (let i = 1; i < count; i++) {
+            const from = entries[i - 1];
+            const to = entries[i];
+            // 同一行时横向移动，否则纵向移动
+            const unit = Math.floor(from / width) === Math.floor(to / width) ? 1 : width;
+            const step = to > from ? unit : -unit;
+            for (let cell = from + step; cell !== to + step; cell += step) {
+                cells.push(cell);
+            }
+        }
+    }
+    
+    return {
+        seq: view.getUint32(0, true),
+        snake_body: cells.map(cell => [cell % width, Math.floor(cell / width)]),
+        food_position: [food % width, Math.floor(food / width)],
+        direction: BINARY_DIRECTIONS[view.getUint8(27)],
+        score: view.getUint32(4, true),
+        highscore: view.getUint32(8, true),
+        game_state: BINARY_STATES[view.getUint8(26)],
+        tick: view.getUint32(32, true),
+        input_ack: view.getUint32(36, true),
+        grid_width: width,
+        grid_height: view.getUint16(22, true),
+        cell_size: view.getUint16(24, true)
+    };
+}
+
+// 各方向的相反方向，与服务端 SnakeGame.set_direction 一致
+const OPPOSITE_DIRECTIONS = { up: 'down', down: 'up', left: 'right', right: 'left' };
+
+// 各方向的坐标偏移量，与服务端 SnakeGame.update 一致
+const DIRECTION_OFFSETS = { up: [0, -1], down: [0, 1], left: [-1, 0], right: [1, 0] };
+
+// 按 SnakeGame.set_direction 的规则预测一次方向输入：不能掉头到当前方向的反方向
+// 返回新的下一步方向
+function predictDirection(current, next, direction) {
+    if (!(direction in OPPOSITE_DIRECTIONS) || OPPOSITE_DIRECTIONS[direction] === current) {
+        return next;
+    }
+    return direction;
+}
+
+// 按 SnakeGame.update 的规则预测一步，返回新的游戏状态；预测会撞到墙或蛇身时返回 null，等待服务端确认。
+// 吃到食物时蛇身变长，新食物位置由服务端决定，预测状态中暂时没有食物
+function predictStep(state, nextDirection) {
+    const body = state.snake_body;
+    const offset = DIRECTION_OFFSETS[nextDirection];
+    const newHead = [body[0][0] + offset[0], body[0][1] + offset[1]];
+    if (newHead[0] < 0 || newHead[0] >= state.grid_width || newHead[1] < 0 || newHead[1] >= state.grid_height) {
+        return null;
+    }
+    // 蛇尾这一步会移开，不算碰撞
+    for (let i = 0; i < body.length - 1; i++) {
+        if (body[i][0] === newHead[0] && body[i][1] === newHead[1]) {
+            return null;
+        }
+    }
+    const food = state.food_position;
+    const ate = food !== null && food[0] === newHead[0] && food[1] === newHead[1];
+    return Object.assign({}, state, {
+        snake_body: [newHead].concat(ate ? body : body.slice(0, -1)),
+        food_position: ate ? null : food,
+        direction: nextDirection,
+        score: ate ? state.score + FOOD_SCORE : state.score,
+        tick: state.tick + 1
+    });
+}
+
+// 从服务端状态重放未确认的输入，得到本地已预测到 localTick 步时的状态；
+// inputs 为按编号排序的 {id, tick, direction}。返回 {state, nextDirection}
+function replayInputs(serverState, inputs, localTick) {
+    let state = serverState;
+    let next = serverState.direction;
+    let blocked = false;
+    let k = 0;
+    // 目标步数为 t 的输入在第 t 步移动之前应用；最后一轮只应用下一步的输入，不移动
+    for (let tick = serverState.tick + 1; tick <= localTick + 1; tick++) {
+        while (k < inputs.length && inputs[k].tick <= tick) {
+            next = predictDirection(state.direction, next, inputs[k].direction);
+            k++;
+        }
+        if (tick <= localTick && !blocked) {
+            const stepped = predictStep(state, next);
+            blocked = stepped === null;
+            state = stepped || state;
+        }
+    }
+    return { state: state, nextDirection: next };
+}
+
+// 判断两个状态画面上的蛇身和食物是否相同
+function sameBoard(a, b) {
+    const bodyA = a.snake_body;
+    const bodyB = b.snake_body;
+    if (bodyA.length !== bodyB.length || String(a.food_position) !== String(b.food_position)) {
+        return false;
+    }
+    for (let i = 0; i < bodyA.length; i++) {
+        if (bodyA[i][0] !== bodyB[i][0] || bodyA[i][1] !== bodyB[i][1]) {
+            return false;
+        }
+    }
+    return true;
+}
+
 // 定义贪吃蛇游戏客户端类
 class SnakeGameClient {
     // 构造函数，初始化游戏客户端
@@ -87,6 +231,36 @@ class SnakeGameClient {
         this.gameLoop = null;
         // 游戏更新间隔（毫秒）
         this.updateInterval = 150;
+        // 是否请求二进制格式的游戏状态（服务端不支持时自动使用JSON）
+        this.useBinaryState = true;
+        
+        // 渲染循环（requestAnimationFrame）ID，渲染与网络请求解耦
+        this.renderLoop = null;
+        // 上一个服务端状态（蛇身移动一格时），作为头尾插值的起点
+        this.previousState = null;
+        // 画布上已绘制的服务端状态
+        this.renderedState = null;
+        // 当前这一步的头尾动画
+        this.animation = null;
+        // 下一帧是否整体重绘
+        this.fullRedraw = true;
+        // 最近一次蛇身移动的服务端状态到达的时间
+        this.stateTime = 0;
+        // 估计的服务端状态到达间隔（毫秒），即每次插值的时长
+        this.tickDuration = this.updateInterval;
+        // 是否需要重绘画面
+        this.needsRender = false;
+        
+        // 本地已预测到的步数（领先于服务端的步数即在途的更新请求数）
+        this.localTick = 0;
+        // 预测的下一步方向
+        this.nextDirection = 'right';
+        // 未被服务端确认的方向输入 {id, tick, direction}，随每个更新请求重发
+        this.pendingInputs = [];
+        // 本局上一个方向输入的编号
+        this.inputId = 0;
+        // 最近一次采用的服务端状态
+        this.serverState = null;
         
         // 调用初始化方法
         this.init();
@@ -104,6 +278,8 @@ class SnakeGameClient {
         this.loadHighScore();
         // 显示初始覆盖层提示
         this.updateOverlayByAuth();
+        // 启动渲染循环
+        this.startRenderLoop();
     }
     
     // 检查登录状态
@@ -185,6 +361,8 @@ class SnakeGameClient {
         this.canvas.width = this.gridWidth * this.cellSize;
         // 根据网格大小计算并设置Canvas高度
         this.canvas.height = this.gridHeight * this.cellSize;
+        // 预渲染背景网格层和图块
+        this.prerenderLayers();
     }
     
     // 绑定所有事件监听器
@@ -283,6 +461,23 @@ class SnakeGameClient {
         }
     }
     
+    // 异步方法：请求游戏接口，返回 {status, game_state} 结构的数据
+    async requestGame(url, options = {}) {
+        // 声明优先接受二进制游戏状态
+        const headers = Object.assign({}, options.headers);
+        if (this.useBinaryState) {
+            headers['Accept'] = `${BINARY_STATE_MIMETYPE}, application/json;q=0.9`;
+        }
+        const response = await fetch(url, Object.assign({ method: 'POST' }, options, { headers: headers }));
+        // 二进制响应只包含游戏状态
+        const contentType = response.headers.get('Content-Type') || '';
+        if (response.ok && contentType.startsWith(BINARY_STATE_MIMETYPE)) {
+            return { status: 'success', game_state: decodeGameState(await response.arrayBuffer()) };
+        }
+        // 其他响应（包括未登录等错误）为JSON
+        return await response.json();
+    }
+    
     // 异步方法：开始游戏
     async startGame() {
         // 检查是否已登录
@@ -297,12 +492,10 @@ class SnakeGameClient {
         
         try {
             // 发送POST请求到开始游戏API
-            const response = await fetch('/api/game/start', { method: 'POST' });
-            // 解析JSON响应
-            const data = await response.json();
+            const data = await this.requestGame('/api/game/start');
             
             // 检查是否需要登录
-            if (response.status === 401 && data.need_login) {
+            if (data.need_login) {
                 this.isLoggedIn = false;
                 this.showOverlay('请先登录', '登录后即可开始游戏');
                 setTimeout(() => {
@@ -313,8 +506,8 @@ class SnakeGameClient {
             
             // 如果请求成功
             if (data.status === 'success') {
-                // 更新本地游戏状态
-                this.gameState = data.game_state;
+                // 新游戏：清空本地预测，按服务端状态整体重绘
+                this.reconcile(data.game_state, true);
                 // 更新UI界面
                 this.updateUI();
                 // 隐藏覆盖层
@@ -335,14 +528,12 @@ class SnakeGameClient {
     async togglePause() {
         try {
             // 发送POST请求到暂停游戏API
-            const response = await fetch('/api/game/pause', { method: 'POST' });
-            // 解析JSON响应
-            const data = await response.json();
+            const data = await this.requestGame('/api/game/pause');
             
             // 如果请求成功
             if (data.status === 'success') {
                 // 更新本地游戏状态
-                this.gameState = data.game_state;
+                this.reconcile(data.game_state);
                 // 更新UI界面
                 this.updateUI();
                 
@@ -412,55 +603,41 @@ class SnakeGameClient {
         await this.startGame();
     }
     
-    // 异步方法：改变蛇的移动方向
-    async changeDirection(direction) {
+    // 改变蛇的移动方向：本地立即按服务端规则预测，输入标上目标步数，随下一个更新请求提交
+    changeDirection(direction) {
         // 如果游戏不在进行中，忽略方向改变
-        if (this.gameState.game_state !== 'playing') {
+        if (this.gameState.game_state !== 'playing' || !(direction in OPPOSITE_DIRECTIONS)) {
             return;
         }
+        // 输入在下一步移动之前生效
+        this.pendingInputs.push({ id: ++this.inputId, tick: this.localTick + 1, direction: direction });
+        this.nextDirection = predictDirection(this.gameState.direction, this.nextDirection, direction);
+    }
+    
+    // 异步方法：推进一步。本地先预测并显示，再把未确认的输入随更新请求发给服务端
+    async updateGame() {
+        // 本地预测这一步，预测会撞到时保持不动，等待服务端结果
+        this.localTick += 1;
+        const predicted = predictStep(this.gameState, this.nextDirection);
+        if (predicted) {
+            this.applyState(predicted);
+        }
         
         try {
-            // 发送POST请求到改变方向API
-            const response = await fetch('/api/game/direction', {
-                method: 'POST',
-                // 设置请求头为JSON格式
+            // 发送POST请求到更新游戏API，携带所有未确认的输入
+            const data = await this.requestGame('/api/game/update', {
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                // 将方向数据转为JSON字符串发送
-                body: JSON.stringify({ direction: direction })
+                body: JSON.stringify({
+                    inputs: this.pendingInputs.map(input => [input.id, input.tick, input.direction])
+                })
             });
-            // 解析JSON响应
-            const data = await response.json();
-            
-            // 如果请求成功
-            if (data.status === 'success') {
-                // 更新本地游戏状态
-                this.gameState = data.game_state;
-            }
-        // 捕获错误
-        } catch (error) {
-            // 输出错误信息到控制台
-            console.error('Failed to change direction:', error);
-        }
-    }
-    
-    // 异步方法：更新游戏状态
-    async updateGame() {
-        try {
-            // 发送POST请求到更新游戏API
-            const response = await fetch('/api/game/update', { method: 'POST' });
-            // 解析JSON响应
-            const data = await response.json();
             
-            // 如果请求成功
-            if (data.status === 'success') {
-                // 更新本地游戏状态
-                this.gameState = data.game_state;
+            // 如果请求成功，与服务端状态对账（晚到的旧状态被丢弃）
+            if (data.status === 'success' && this.reconcile(data.game_state)) {
                 // 更新UI界面
                 this.updateUI();
-                // 重新渲染游戏画面
-                this.render();
                 
                 // 如果游戏结束
                 if (this.gameState.game_state === 'game_over') {
@@ -477,6 +654,83 @@ class SnakeGameClient {
         }
     }
     
+    // 采用服务端的权威状态：丢弃已确认的输入，从该状态重放未确认的输入得到本地预测状态。
+    // reset 为 true 时（新游戏）清空预测；返回是否采用了该状态
+    reconcile(serverState, reset = false) {
+        if (!reset && this.serverState && serverState.seq < this.serverState.seq) {
+            return false;
+        }
+        this.serverState = serverState;
+        
+        let state = serverState;
+        if (reset || serverState.game_state !== 'playing') {
+            // 游戏未在进行中时服务端不接受输入，本地预测从服务端状态重新开始
+            this.pendingInputs = [];
+            this.localTick = serverState.tick;
+            this.nextDirection = serverState.direction;
+            if (reset) {
+                this.inputId = 0;
+            }
+        } else {
+            this.pendingInputs = this.pendingInputs.filter(input => input.id > serverState.input_ack);
+            this.localTick = Math.max(this.localTick, serverState.tick);
+            const replayed = replayInputs(serverState, this.pendingInputs, this.localTick);
+            state = replayed.state;
+            this.nextDirection = replayed.nextDirection;
+        }
+        
+        // 预测正确时画面不变；预测错误时按对账结果整体重绘
+        this.applyState(state, reset || !sameBoard(state, this.gameState));
+        return true;
+    }
+    
+    // 接收服务端游戏状态，蛇身移动一格时开始头尾的插值动画；
+    // 返回是否采用了该状态（多个请求乱序返回时，序号较小的旧状态被丢弃）
+    applyState(state, reset = false) {
+        if (!reset && state.seq !== undefined && this.gameState.seq !== undefined && state.seq < this.gameState.seq) {
+            return false;
+        }
+        const now = performance.now();
+        const oldHead = this.gameState.snake_body[0];
+        const newHead = state.snake_body[0];
+        // 蛇头恰好移动一格时才插值（新游戏等跳变直接显示）
+        const moved = !reset && oldHead && newHead &&
+            Math.abs(newHead[0] - oldHead[0]) + Math.abs(newHead[1] - oldHead[1]) === 1;
+        
+        if (moved) {
+            // 按蛇身移动状态的到达间隔估计插值时长，平滑网络抖动；暂停等长间隔不计入
+            const gap = now - this.stateTime;
+            if (gap < this.updateInterval * 3) {
+                this.tickDuration += (gap - this.tickDuration) * 0.2;
+            }
+            this.stateTime = now;
+            // 上一个状态还没画出来时（一帧内到达多个状态），只按差异重绘会漏掉中间的格子
+            if (this.renderedState !== this.gameState) {
+                this.fullRedraw = true;
+            }
+            this.previousState = this.gameState;
+        } else if (reset || !oldHead || !newHead || oldHead[0] !== newHead[0] || oldHead[1] !== newHead[1]) {
+            // 蛇身跳变（新游戏等）时整体重绘，不插值
+            this.previousState = null;
+            this.fullRedraw = true;
+        }
+        
+        this.gameState = state;
+        this.needsRender = true;
+        return true;
+    }
+    
+    // 启动渲染循环，每个显示帧按需重绘，与服务端状态的到达时间无关
+    startRenderLoop() {
+        const frame = (now) => {
+            if (this.needsRender) {
+                this.render(now);
+            }
+            this.renderLoop = requestAnimationFrame(frame);
+        };
+        this.renderLoop = requestAnimationFrame(frame);
+    }
+    
     // 启动游戏循环
     startGameLoop() {
         // 如果已存在游戏循环，先清除
@@ -500,119 +754,180 @@ class SnakeGameClient {
     
     // 清空画布
     clearCanvas() {
+        // 清空后不再重绘，直到收到新的游戏状态；之后的第一帧整体重绘
+        this.needsRender = false;
+        this.fullRedraw = true;
         // 设置背景颜色为深黑色
         this.ctx.fillStyle = '#0a0a0a';
         // 填充整个画布
         this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
     }
     
-    // 渲染游戏画面
-    render() {
-        // 设置背景颜色为深黑色
-        this.ctx.fillStyle = '#0a0a0a';
-        // 填充整个画布
-        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+    // 创建离屏画布
+    createLayer(width, height) {
+        const layer = document.createElement('canvas');
+        layer.width = width;
+        layer.height = height;
+        return layer;
+    }
+    
+    // 预渲染背景网格层和蛇身、蛇头、食物的图块，之后每帧只复制图块
+    prerenderLayers() {
+        // 背景和网格线只绘制一次，所有网格线合并为一条路径描边
+        this.gridLayer = this.createLayer(this.canvas.width, this.canvas.height);
+        const grid = this.gridLayer.getContext('2d');
+        grid.fillStyle = '#0a0a0a';
+        grid.fillRect(0, 0, this.canvas.width, this.canvas.height);
+        grid.strokeStyle = 'rgba(255, 255, 255, 0.05)';
+        grid.lineWidth = 1;
+        grid.beginPath();
+        for (let x = 0; x <= this.gridWidth; x++) {
+            grid.moveTo(x * this.cellSize, 0);
+            grid.lineTo(x * this.cellSize, this.canvas.height);
+        }
+        for (let y = 0; y <= this.gridHeight; y++) {
+            grid.moveTo(0, y * this.cellSize);
+            grid.lineTo(this.canvas.width, y * this.cellSize);
+        }
+        grid.stroke();
+        
+        // 蛇身图块
+        this.bodySprite = this.createLayer(this.cellSize, this.cellSize);
+        this.drawSegment(this.bodySprite.getContext('2d'), 'rgba(0, 255, 136, 0.85)', 'rgba(0, 204, 106, 0.85)');
+        
+        // 各方向的蛇头图块
+        this.headSprites = {};
+        ['up', 'down', 'left', 'right'].forEach(direction => {
+            const sprite = this.createLayer(this.cellSize, this.cellSize);
+            const ctx = sprite.getContext('2d');
+            this.drawSegment(ctx, '#00ff88', '#00cc6a');
+            this.drawSnakeHead(ctx, direction);
+            this.headSprites[direction] = sprite;
+        });
+        
+        // 食物图块
+        this.foodSprite = this.createLayer(this.cellSize, this.cellSize);
+        this.drawFood(this.foodSprite.getContext('2d'));
         
-        // 绘制网格线
-        this.drawGrid();
-        // 绘制食物
-        this.drawFood();
-        // 绘制蛇
-        this.drawSnake();
+        this.fullRedraw = true;
     }
     
-    // 绘制网格线
-    drawGrid() {
-        // 设置网格线颜色为半透明白色
-        this.ctx.strokeStyle = 'rgba(255, 255, 255, 0.05)';
-        // 设置线条宽度
-        this.ctx.lineWidth = 1;
+    // 在图块上绘制一节蛇身（圆角矩形渐变）
+    drawSegment(ctx, startColor, endColor) {
+        // 创建线性渐变填充
+        const gradient = ctx.createLinearGradient(0, 0, this.cellSize, this.cellSize);
+        gradient.addColorStop(0, startColor);
+        gradient.addColorStop(1, endColor);
+        // 设置填充样式为渐变
+        ctx.fillStyle = gradient;
+        // 开始新路径
+        ctx.beginPath();
+        // 绘制圆角矩形
+        ctx.roundRect(1, 1, this.cellSize - 2, this.cellSize - 2, 4);
+        // 填充路径
+        ctx.fill();
+    }
+    
+    // 用网格层恢复一个格子的背景
+    restoreCell(cell) {
+        const x = cell[0] * this.cellSize;
+        const y = cell[1] * this.cellSize;
+        this.ctx.drawImage(this.gridLayer, x, y, this.cellSize, this.cellSize, x, y, this.cellSize, this.cellSize);
+    }
+    
+    // 在格子坐标（可为小数）处绘制图块
+    drawSprite(sprite, x, y) {
+        this.ctx.drawImage(sprite, x * this.cellSize, y * this.cellSize);
+    }
+    
+    // 渲染游戏画面，now 为渲染时刻，用于插值头尾位置
+    // 整体重绘只在新游戏、窗口变化等情况下发生；平时每个服务端状态只重绘食物和头尾所在的格子，
+    // 每帧的绘制量与蛇身长度无关
+    render(now = performance.now()) {
+        const state = this.gameState;
+        const body = state.snake_body;
+        const food = state.food_position;
+        const previous = this.previousState;
         
-        // 绘制垂直网格线
-        for (let x = 0; x <= this.gridWidth; x++) {
-            // 开始新路径
-            this.ctx.beginPath();
-            // 移动到起点
-            this.ctx.moveTo(x * this.cellSize, 0);
-            // 画线到终点
-            this.ctx.lineTo(x * this.cellSize, this.canvas.height);
-            // 描边路径
-            this.ctx.stroke();
+        if (this.fullRedraw) {
+            // 背景网格、食物和除蛇头外的蛇身
+            this.ctx.drawImage(this.gridLayer, 0, 0);
+            if (food) {
+                this.drawSprite(this.foodSprite, food[0], food[1]);
+            }
+            for (let i = 1; i < body.length; i++) {
+                this.drawSprite(this.bodySprite, body[i][0], body[i][1]);
+            }
+            this.fullRedraw = false;
+            this.animation = null;
+        } else if (this.renderedState !== state && previous) {
+            // 新的状态：先把上一步的尾部动画画到终点（蛇身未移动的状态会重新得到同一个动画，结果不变）
+            const last = this.animation;
+            if (last && last.tailFrom) {
+                this.restoreCell(last.tailFrom);
+                this.drawSprite(this.bodySprite, last.tailTo[0], last.tailTo[1]);
+            }
+            // 食物移动时擦除旧食物（被吃掉的旧食物在新蛇头格子，由下面的蛇头绘制覆盖）
+            const oldFood = previous.food_position;
+            if (oldFood && food && (oldFood[0] !== food[0] || oldFood[1] !== food[1])) {
+                this.restoreCell(oldFood);
+                this.drawSprite(this.foodSprite, food[0], food[1]);
+            }
         }
         
-        // 绘制水平网格线
-        for (let y = 0; y <= this.gridHeight; y++) {
-            // 开始新路径
-            this.ctx.beginPath();
-            // 移动到起点
-            this.ctx.moveTo(0, y * this.cellSize);
-            // 画线到终点
-            this.ctx.lineTo(this.canvas.width, y * this.cellSize);
-            // 描边路径
-            this.ctx.stroke();
-        }
-    }
-    
-    // 绘制蛇
-    drawSnake() {
-        // 获取蛇身体坐标数组
-        const snakeBody = this.gameState.snake_body;
-        
-        // 遍历蛇身体的每个部分
-        snakeBody.forEach((segment, index) => {
-            // 计算当前部分的像素X坐标
-            const x = segment[0] * this.cellSize;
-            // 计算当前部分的像素Y坐标
-            const y = segment[1] * this.cellSize;
-            
-            // 创建线性渐变填充
-            const gradient = this.ctx.createLinearGradient(x, y, x + this.cellSize, y + this.cellSize);
-            
-            // 如果是蛇头
-            if (index === 0) {
-                // 蛇头使用亮绿色渐变
-                gradient.addColorStop(0, '#00ff88');
-                gradient.addColorStop(1, '#00cc6a');
-            } else {
-                // 蛇身根据位置计算透明度，越靠后越淡
-                const alpha = 1 - (index / snakeBody.length) * 0.5;
-                // 蛇身使用带透明度的绿色渐变
-                gradient.addColorStop(0, `rgba(0, 255, 136, ${alpha})`);
-                gradient.addColorStop(1, `rgba(0, 204, 106, ${alpha})`);
+        if (this.renderedState !== state) {
+            // 这一步的头尾动画：蛇头从上一个蛇头格子移到新格子；没吃到食物时蛇尾从旧尾格子移到新尾格子
+            const grew = !previous || body.length > previous.snake_body.length;
+            this.animation = body.length && previous ? {
+                headFrom: previous.snake_body[0],
+                tailFrom: grew ? null : previous.snake_body[previous.snake_body.length - 1],
+                tailTo: body[body.length - 1]
+            } : null;
+            this.renderedState = state;
+        }
+        
+        const t = Math.min((now - this.stateTime) / this.tickDuration, 1);
+        const animation = this.animation;
+        const head = body[0];
+        if (head) {
+            const from = animation ? animation.headFrom : head;
+            // 蛇尾：恢复经过的两个格子并画出移动中的尾节
+            if (animation && animation.tailFrom) {
+                const tailFrom = animation.tailFrom;
+                const tailTo = animation.tailTo;
+                this.restoreCell(tailFrom);
+                this.restoreCell(tailTo);
+                this.drawSprite(this.bodySprite,
+                    tailFrom[0] + (tailTo[0] - tailFrom[0]) * t, tailFrom[1] + (tailTo[1] - tailFrom[1]) * t);
             }
-            
-            // 设置填充样式为渐变
-            this.ctx.fillStyle = gradient;
-            // 开始新路径
-            this.ctx.beginPath();
-            // 绘制圆角矩形
-            this.ctx.roundRect(x + 1, y + 1, this.cellSize - 2, this.cellSize - 2, 4);
-            // 填充路径
-            this.ctx.fill();
-            
-            // 如果是蛇头，绘制眼睛
-            if (index === 0) {
-                this.drawSnakeHead(x, y);
+            // 蛇头：上一个蛇头格子画成蛇身，再画出移动中的蛇头
+            this.restoreCell(head);
+            if (from !== head) {
+                this.restoreCell(from);
+                this.drawSprite(this.bodySprite, from[0], from[1]);
             }
-        });
+            this.drawSprite(this.headSprites[state.direction] || this.headSprites.right,
+                from[0] + (head[0] - from[0]) * t, from[1] + (head[1] - from[1]) * t);
+        }
+        
+        // 动画完成后停止重绘，直到下一次状态到达
+        this.needsRender = t < 1;
     }
     
-    // 绘制蛇头眼睛
-    drawSnakeHead(x, y) {
+    // 在蛇头图块上绘制眼睛
+    drawSnakeHead(ctx, direction) {
         // 计算蛇头中心X坐标
-        const centerX = x + this.cellSize / 2;
+        const centerX = this.cellSize / 2;
         // 计算蛇头中心Y坐标
-        const centerY = y + this.cellSize / 2;
+        const centerY = this.cellSize / 2;
         // 眼睛半径
         const eyeRadius = 2;
         // 眼睛距中心的偏移量
         const eyeOffset = 4;
         
         // 设置眼睛颜色为黑色
-        this.ctx.fillStyle = '#000';
+        ctx.fillStyle = '#000';
         
-        // 获取当前移动方向
-        const direction = this.gameState.direction;
         // 定义两只眼睛的坐标变量
         let eye1X, eye1Y, eye2X, eye2Y;
         
@@ -650,34 +965,24 @@ class SnakeGameClient {
         }
         
         // 绘制第一只眼睛
-        this.ctx.beginPath();
-        this.ctx.arc(eye1X, eye1Y, eyeRadius, 0, Math.PI * 2);
-        this.ctx.fill();
+        ctx.beginPath();
+        ctx.arc(eye1X, eye1Y, eyeRadius, 0, Math.PI * 2);
+        ctx.fill();
         
         // 绘制第二只眼睛
-        this.ctx.beginPath();
-        this.ctx.arc(eye2X, eye2Y, eyeRadius, 0, Math.PI * 2);
-        this.ctx.fill();
-    }
-    
-    // 绘制食物
-    drawFood() {
-        // 获取食物位置
-        const food = this.gameState.food_position;
-        // 如果没有食物位置，直接返回
-        if (!food) return;
-        
-        // 计算食物的像素X坐标
-        const x = food[0] * this.cellSize;
-        // 计算食物的像素Y坐标
-        const y = food[1] * this.cellSize;
-        // 计算食物中心X坐标
-        const centerX = x + this.cellSize / 2;
-        // 计算食物中心Y坐标
-        const centerY = y + this.cellSize / 2;
+        ctx.beginPath();
+        ctx.arc(eye2X, eye2Y, eyeRadius, 0, Math.PI * 2);
+        ctx.fill();
+    }
+    
+    // 在食物图块上绘制食物
+    drawFood(ctx) {
+        // 计算食物中心坐标
+        const centerX = this.cellSize / 2;
+        const centerY = this.cellSize / 2;
         
         // 创建径向渐变
-        const gradient = this.ctx.createRadialGradient(
+        const gradient = ctx.createRadialGradient(
             centerX, centerY, 0,
             centerX, centerY, this.cellSize / 2
         );
@@ -687,22 +992,22 @@ class SnakeGameClient {
         gradient.addColorStop(1, '#ee5a5a');
         
         // 设置填充样式为渐变
-        this.ctx.fillStyle = gradient;
+        ctx.fillStyle = gradient;
         // 开始新路径
-        this.ctx.beginPath();
+        ctx.beginPath();
         // 绘制圆形食物
-        this.ctx.arc(centerX, centerY, this.cellSize / 2 - 2, 0, Math.PI * 2);
+        ctx.arc(centerX, centerY, this.cellSize / 2 - 2, 0, Math.PI * 2);
         // 填充路径
-        this.ctx.fill();
+        ctx.fill();
         
         // 绘制食物高光效果
-        this.ctx.fillStyle = 'rgba(255, 255, 255, 0.3)';
+        ctx.fillStyle = 'rgba(255, 255, 255, 0.3)';
         // 开始新路径
-        this.ctx.beginPath();
+        ctx.beginPath();
         // 绘制小圆形高光
-        this.ctx.arc(centerX - 2, centerY - 2, 2, 0, Math.PI * 2);
+        ctx.arc(centerX - 2, centerY - 2, 2, 0, Math.PI * 2);
         // 填充路径
-        this.ctx.fill();
+        ctx.fill();
     }
     
     // 更新UI界面元素
@@ -784,7 +1089,8 @@ class SnakeGameClient {
     
     // 处理窗口大小改变事件
     handleResize() {
-        // 重新渲染游戏画面
+        // 整体重新渲染游戏画面
+        this.fullRedraw = true;
         this.render();
     }
 }
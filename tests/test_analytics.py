@@ -0,0 +1,172 @@
+"""
+@file    test_analytics.py
+@brief   游戏事件分析单元测试
+@details 测试死亡热力图、每日得分分布的向量化统计，以及管理员分析接口的令牌和依赖检查
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from game import analytics
+from game.events import CAUSE_SELF, CAUSE_WALL, EVENT_DEATH, EVENT_FOOD, GameEvent, SQLiteEventSink
+
+# 2026-10-19 00:00:00 UTC
+DAY = 20745 * analytics.SECONDS_PER_DAY
+
+
+def death(time, score, cell, cause=CAUSE_WALL, width=10, height=10):
+    """
+    @brief  构造死亡事件
+    @retval GameEvent: 事件
+    """
+    return GameEvent(time, 1, EVENT_DEATH, 0, score, cell, cause, width, height)
+
+
+class EventsTestCase(unittest.TestCase):
+    """创建临时事件数据库"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'events.db')
+
+    def write(self, events):
+        """
+        @brief  写入一批事件
+        @param  events: 事件列表
+        @retval None
+        """
+        sink = SQLiteEventSink(self.path)
+        sink.write(events)
+        sink.close()
+
+
+@unittest.skipUnless(analytics.available(), '未安装NumPy')
+class TestDeathHeatmap(EventsTestCase):
+    """测试死亡热力图"""
+
+    def test_counts_by_cause(self):
+        """测试按格子和死亡原因计数，非死亡事件和其他网格尺寸不计入"""
+        self.write([
+            death(DAY, 0, 0), death(DAY, 0, 0), death(DAY, 0, 23, CAUSE_SELF),
+            death(DAY, 0, 23, width=20),
+            GameEvent(DAY, 1, EVENT_FOOD, 0, 10, 23, 0, 10, 10)
+        ])
+
+        heatmap = analytics.death_heatmap(self.path, 10, 10, chunk_size=2)
+        self.assertEqual(heatmap['deaths'], 3)
+        self.assertEqual(heatmap['total'].shape, (10, 10))
+        self.assertEqual((heatmap['wall'][0, 0], heatmap['self'][2, 3], heatmap['total'][2, 3]), (2, 1, 1))
+
+    def test_since(self):
+        """测试只统计起始时间之后的事件"""
+        self.write([death(DAY - 10, 0, 5), death(DAY + 10, 0, 6)])
+
+        heatmap = analytics.death_heatmap(self.path, 10, 10, since=DAY)
+        self.assertEqual(heatmap['deaths'], 1)
+        self.assertEqual(heatmap['total'][0, 6], 1)
+
+
+@unittest.skipUnless(analytics.available(), '未安装NumPy')
+class TestScoreDistribution(EventsTestCase):
+    """测试每日得分分布"""
+
+    def test_daily_percentiles(self):
+        """测试分块读取时按日期合并直方图并求百分位数"""
+        scores = list(range(0, 1000, 10))
+        self.write([death(DAY + i, score, 0) for i, score in enumerate(scores)]
+                   + [death(DAY + analytics.SECONDS_PER_DAY, 30, 0)])
+
+        days = analytics.score_distribution(self.path, chunk_size=7)
+        self.assertEqual([day['day'] for day in days], ['2026-10-19', '2026-10-20'])
+        first = days[0]
+        self.assertEqual((first['games'], first['mean'], first['max']), (100, 495.0, 990))
+        self.assertEqual(first['percentiles'], {'p50': 490, 'p90': 890, 'p99': 980})
+        self.assertEqual(len(first['histogram']), 100)
+        self.assertEqual(days[1]['histogram'], [0, 0, 0, 1])
+
+    def test_high_scores_in_last_bin(self):
+        """测试超出分数段上限的得分计入最后一段"""
+        self.write([death(DAY, 5000, 0)])
+
+        day = analytics.score_distribution(self.path, max_bins=4)[0]
+        self.assertEqual((day['histogram'], day['max']), ([0, 0, 0, 1], 5000))
+
+    def test_empty(self):
+        """测试没有事件时返回空列表"""
+        self.write([])
+
+        self.assertEqual(analytics.score_distribution(self.path), [])
+
+
+class TestAnalyticsApi(EventsTestCase):
+    """测试管理员分析接口"""
+
+    def create_client(self, **config):
+        """
+        @brief  创建开启分析接口的测试客户端
+        @retval FlaskClient: 测试客户端
+        """
+        config = {'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game', 'analytics'),
+                  'ANALYTICS_ADMIN_TOKEN': 'secret', **config}
+        app = create_app(config)
+        if 'game_events' in app.extensions:
+            self.addCleanup(app.extensions['game_events'].close)
+        return app.test_client()
+
+    def test_requires_token(self):
+        """测试没有或令牌错误时拒绝访问"""
+        client = self.create_client(GAME_EVENTS_PATH=self.path)
+
+        self.assertEqual(client.get('/api/admin/analytics/scores').status_code, 403)
+        self.assertEqual(client.get('/api/admin/analytics/scores',
+                                    headers={'X-Admin-Token': 'wrong'}).status_code, 403)
+
+    def test_events_disabled(self):
+        """测试未开启事件记录时返回503"""
+        client = self.create_client()
+
+        response = client.get('/api/admin/analytics/heatmap', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.status_code, 503)
+
+    def test_numpy_missing(self):
+        """测试未安装NumPy时返回503"""
+        client = self.create_client(GAME_EVENTS_PATH=self.path)
+
+        with mock.patch.object(analytics, '_numpy', return_value=None):
+            response = client.get('/api/admin/analytics/scores', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.status_code, 503)
+
+    @unittest.skipUnless(analytics.available(), '未安装NumPy')
+    def test_heatmap_after_game(self):
+        """测试一局游戏撞墙后热力图包含该局死亡位置"""
+        client = self.create_client(GAME_EVENTS_PATH=self.path)
+        with client.session_transaction() as sess:
+            sess['user_id'] = 4
+        client.post('/api/game/start')
+        state = 'playing'
+        for _ in range(50):
+            state = client.post('/api/game/update').get_json()['game_state']['game_state']
+            if state == 'game_over':
+                break
+        self.assertEqual(state, 'game_over')
+
+        data = client.get('/api/admin/analytics/heatmap', headers={'X-Admin-Token': 'secret'}).get_json()
+        self.assertEqual(data['deaths'], 1)
+        self.assertEqual(sum(map(sum, data['wall'])), 1)
+        scores = client.get('/api/admin/analytics/scores', headers={'X-Admin-Token': 'secret'}).get_json()
+        self.assertEqual(sum(day['games'] for day in scores['days']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
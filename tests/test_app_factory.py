@@ -0,0 +1,135 @@
+"""
+@file    test_app_factory.py
+@brief   应用工厂单元测试
+@details 测试延迟创建应用、按需注册蓝图及表结构版本检查
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import gc
+import weakref
+import shutil
+import tempfile
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import app as app_module
+from app import create_app
+from database import db_config
+
+
+class TestCreateApp(unittest.TestCase):
+    """测试应用工厂"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.database_uri = f"sqlite:///{os.path.join(self.temp_dir, 'test.db')}"
+
+    def tearDown(self):
+        """每个测试后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_import_does_not_load_flask(self):
+        """测试导入app模块不会导入Flask和数据库模块"""
+        output = subprocess.run(
+            [sys.executable, '-c', "import sys, app; print('flask' in sys.modules, 'database' in sys.modules)"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+
+        self.assertEqual(output.strip(), 'False False')
+
+    def test_config_overrides_defaults(self):
+        """测试配置参数覆盖默认值"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': self.database_uri, 'TESTING': True})
+
+        self.assertTrue(app.testing)
+        self.assertEqual(app.config['SQLALCHEMY_DATABASE_URI'], self.database_uri)
+
+    def test_blueprints_selectable(self):
+        """测试只注册指定的蓝图"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': self.database_uri, 'BLUEPRINTS': ('pages',)})
+        rules = {rule.rule for rule in app.url_map.iter_rules()}
+
+        self.assertIn('/', rules)
+        self.assertNotIn('/api/game/update', rules)
+        self.assertNotIn('/api/auth/login', rules)
+
+    def test_default_app_serves_pages(self):
+        """测试默认蓝图组合可以访问页面"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': self.database_uri})
+
+        self.assertEqual(app.test_client().get('/login').status_code, 200)
+
+
+class TestShutdown(unittest.TestCase):
+    """测试进程退出时关闭应用扩展"""
+
+    def test_discarded_app_not_kept_alive(self):
+        """测试丢弃的应用不会因退出钩子常驻内存"""
+        ref = weakref.ref(create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('pages',)}))
+        gc.collect()
+
+        self.assertIsNone(ref())
+
+    def test_close_apps_closes_extensions(self):
+        """测试退出钩子关闭存活应用的扩展，关闭失败不影响其他扩展"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game',)})
+        self.addCleanup(app.extensions.clear)
+        closed = []
+
+        class Extension:
+            def __init__(self, name, fail=False):
+                self.name, self.fail = name, fail
+
+            def close(self):
+                closed.append(self.name)
+                if self.fail:
+                    raise RuntimeError(self.name)
+
+        app.extensions['score_queue'] = Extension('score_queue', fail=True)
+        app.extensions['user_stats'] = Extension('user_stats')
+        with self.assertLogs('app', 'ERROR'):
+            app_module.close_apps()
+
+        self.assertEqual(closed, ['score_queue', 'user_stats'])
+
+
+class TestSchemaVersion(unittest.TestCase):
+    """测试表结构版本检查"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.temp_dir, 'schema.db')}",
+            'BLUEPRINTS': ()
+        })
+
+    def tearDown(self):
+        """每个测试后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_version_is_stable(self):
+        """测试版本号计算结果稳定"""
+        self.assertEqual(db_config.schema_version(), db_config.schema_version())
+
+    def test_second_check_is_cached(self):
+        """测试同一进程内第二次检查直接命中缓存"""
+        self.assertFalse(db_config.ensure_schema(self.app))
+
+    def test_version_persisted_in_database(self):
+        """测试版本号写入数据库，新进程无需create_all"""
+        db_config._checked_schemas.clear()
+
+        self.assertFalse(db_config.ensure_schema(self.app))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
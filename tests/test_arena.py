@@ -0,0 +1,194 @@
+"""
+@file    test_arena.py
+@brief   多人竞技场引擎单元测试
+@details 测试棋盘校验、出生、移动与进食、撞墙、蛇头相撞、撞到蛇身、跟随蛇尾和大棋盘上的多蛇运行
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.arena import (
+    ARENA_MAX_SIZE, DIRECTION_CODES, EMPTY_CELL, FOOD_CELL, FOOD_SCORE,
+    Arena, ArenaFullError, ArenaSnake
+)
+
+
+def place(arena, body, direction):
+    """
+    @brief  在指定格子放置一条蛇（测试用）
+    @param  arena: 竞技场
+    @param  body: 蛇身坐标列表，蛇头在前
+    @param  direction: 方向字符串
+    @retval int: 蛇的编号
+    """
+    snake_id = arena._allocate_id()
+    cells = deque(y * arena.width + x for x, y in body)
+    for cell in cells:
+        arena.grid[cell] = snake_id
+    arena.snakes[snake_id] = ArenaSnake(snake_id, cells, DIRECTION_CODES[direction])
+    return snake_id
+
+
+def put_food(arena, x, y):
+    """
+    @brief  在指定格子放置食物（测试用）
+    @retval None
+    """
+    cell = y * arena.width + x
+    arena.grid[cell] = FOOD_CELL
+    arena.food.add(cell)
+
+
+class TestArenaSetup(unittest.TestCase):
+    """测试竞技场创建和出生"""
+
+    def test_invalid_size(self):
+        """测试棋盘尺寸超出范围时报错"""
+        for width, height in ((0, 10), (10, ARENA_MAX_SIZE + 1)):
+            with self.assertRaises(ValueError):
+                Arena(width, height)
+
+    def test_food_filled(self):
+        """测试创建时补足食物"""
+        arena = Arena(50, 50, food_count=20, seed=1)
+
+        self.assertEqual(len(arena.food), 20)
+        self.assertTrue(all(arena.grid[cell] == FOOD_CELL for cell in arena.food))
+
+    def test_add_snake_marks_grid(self):
+        """测试新蛇占用连续的空格子，蛇头远离墙"""
+        arena = Arena(30, 30, food_count=0, seed=2)
+        snake_id = arena.add_snake()
+        cells = arena.snake_cells(snake_id)
+
+        self.assertEqual(len(cells), arena.initial_length)
+        self.assertTrue(all(arena.grid[cell] == snake_id for cell in cells))
+        self.assertEqual(arena.tick(), [])
+
+    def test_full_arena(self):
+        """测试没有空位时报错"""
+        arena = Arena(3, 1, food_count=0, initial_length=3)
+        arena.add_snake()
+
+        with self.assertRaises(ArenaFullError):
+            arena.add_snake()
+
+
+class TestArenaTick(unittest.TestCase):
+    """测试竞技场的一步"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.arena = Arena(10, 10, food_count=0)
+
+    def test_move_and_eat(self):
+        """测试移动后蛇尾空出，吃到食物时变长并得分"""
+        snake_id = place(self.arena, [(2, 0), (1, 0), (0, 0)], 'right')
+        put_food(self.arena, 4, 0)
+
+        self.arena.tick()
+        self.assertEqual(self.arena.grid[0], EMPTY_CELL)
+        self.arena.tick()
+
+        snake = self.arena.snakes[snake_id]
+        self.assertEqual(self.arena.snake_cells(snake_id), [4, 3, 2, 1])
+        self.assertEqual(snake.score, FOOD_SCORE)
+        self.assertEqual(len(self.arena.food), 0)
+
+    def test_wall_death_clears_body(self):
+        """测试撞墙死亡并清空蛇身"""
+        snake_id = place(self.arena, [(9, 0), (8, 0)], 'right')
+
+        self.assertEqual(self.arena.tick(), [snake_id])
+        self.assertNotIn(snake_id, self.arena.snakes)
+        self.assertEqual(self.arena.grid[8], EMPTY_CELL)
+
+    def test_left_wall_does_not_wrap(self):
+        """测试从最左列向左不会绕到上一行"""
+        snake_id = place(self.arena, [(0, 5), (1, 5)], 'left')
+
+        self.assertEqual(self.arena.tick(), [snake_id])
+
+    def test_head_on_collision(self):
+        """测试两个蛇头进入同一格子时都死亡，即使该格子有食物"""
+        a = place(self.arena, [(3, 5), (2, 5)], 'right')
+        b = place(self.arena, [(5, 5), (6, 5)], 'left')
+        put_food(self.arena, 4, 5)
+
+        self.assertEqual(sorted(self.arena.tick()), sorted([a, b]))
+        self.assertEqual(self.arena.snakes, {})
+
+    def test_body_collision(self):
+        """测试撞到其他蛇的蛇身时死亡，被撞的蛇存活"""
+        a = place(self.arena, [(5, 3), (5, 4), (5, 5), (5, 6)], 'up')
+        b = place(self.arena, [(4, 5), (3, 5)], 'right')
+
+        self.assertEqual(self.arena.tick(), [b])
+        self.assertIn(a, self.arena.snakes)
+        self.assertEqual(self.arena.grid[5 * 10 + 5], a)
+
+    def test_follow_vacating_tail(self):
+        """测试进入本步移开的蛇尾不算碰撞"""
+        a = place(self.arena, [(5, 3), (5, 4), (5, 5)], 'up')
+        b = place(self.arena, [(5, 6), (5, 7)], 'up')
+
+        self.assertEqual(self.arena.tick(), [])
+        self.assertEqual(self.arena.grid[5 * 10 + 5], b)
+        self.assertEqual(self.arena.grid[4 * 10 + 5], a)
+
+    def test_tail_of_growing_snake_blocks(self):
+        """测试吃到食物的蛇的蛇尾不移开"""
+        place(self.arena, [(5, 3), (5, 4), (5, 5)], 'up')
+        b = place(self.arena, [(5, 6), (5, 7)], 'up')
+        put_food(self.arena, 5, 2)
+
+        self.assertEqual(self.arena.tick(), [b])
+
+    def test_set_direction_rejects_reverse(self):
+        """测试不能掉头"""
+        snake_id = place(self.arena, [(5, 5), (4, 5)], 'right')
+        self.arena.set_direction(snake_id, 'left')
+        self.arena.set_direction(snake_id, 'sideways')
+        self.arena.tick()
+
+        self.assertEqual(self.arena.snake_cells(snake_id)[0], 5 * 10 + 6)
+
+    def test_id_reused(self):
+        """测试死亡的蛇的编号被复用"""
+        snake_id = place(self.arena, [(9, 0)], 'right')
+        self.arena.tick()
+
+        self.assertEqual(self.arena.add_snake(), snake_id)
+
+
+class TestLargeArena(unittest.TestCase):
+    """测试大棋盘上的多蛇运行"""
+
+    def test_many_snakes_on_max_board(self):
+        """测试2000x2000棋盘上数百条蛇运行，占用网格与蛇身一致"""
+        arena = Arena(ARENA_MAX_SIZE, ARENA_MAX_SIZE, food_count=1000, seed=3)
+        for _ in range(300):
+            arena.add_snake()
+        directions = list(DIRECTION_CODES)
+        for step in range(20):
+            for snake_id in list(arena.snakes):
+                arena.set_direction(snake_id, directions[(snake_id + step) % 4])
+            arena.tick()
+
+        occupied = sum(len(snake.body) for snake in arena.snakes.values())
+        self.assertGreater(len(arena.snakes), 0)
+        for snake_id, snake in arena.snakes.items():
+            self.assertTrue(all(arena.grid[cell] == snake_id for cell in snake.body))
+        self.assertEqual(len(arena.food), 1000)
+        self.assertEqual(arena.grid.count(EMPTY_CELL), arena.cell_count - occupied - len(arena.food))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
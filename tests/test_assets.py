@@ -0,0 +1,137 @@
+"""
+@file    test_assets.py
+@brief   静态资源构建单元测试
+@details 测试CSS/JS压缩、指纹文件名、预压缩文件及运行时分发
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from flask import Flask, render_template_string
+from assets import minify_css, minify_js, build_assets, init_assets
+from assets.pipeline import DEFAULT_ASSETS, IMMUTABLE_CACHE_CONTROL
+
+
+class TestMinify(unittest.TestCase):
+    """测试压缩"""
+
+    def test_css_keeps_strings_and_calc(self):
+        """测试CSS压缩保留字符串和calc中的空格"""
+        source = "/* 注释 */\nbody {\n    font-family: 'Segoe  UI', sans-serif;\n    width: calc(100% - 2px);\n}\n"
+
+        self.assertEqual(minify_css(source), "body{font-family:'Segoe  UI',sans-serif;width:calc(100% - 2px)}\n")
+
+    def test_js_keeps_strings_regex_and_newlines(self):
+        """测试JS压缩保留字符串、正则字面量和换行"""
+        source = (
+            "// 注释\n"
+            "const re = /^[a-z/]+$/; // 行尾注释\n"
+            "let s = 'a  // b';\n"
+            "let x = a / b + +c;\n"
+            "return `x  ${y}`\n"
+        )
+
+        self.assertEqual(
+            minify_js(source),
+            "const re=/^[a-z/]+$/;\nlet s='a  // b';\nlet x=a/b+ +c;\nreturn`x  ${y}`\n"
+        )
+
+    @unittest.skipUnless(shutil.which('node'), '未安装Node.js')
+    def test_minified_js_is_valid(self):
+        """测试压缩后的项目脚本语法正确"""
+        for asset in DEFAULT_ASSETS:
+            if not asset.endswith('.js'):
+                continue
+            with open(os.path.join(PROJECT_ROOT, 'static', asset), encoding='utf-8') as f:
+                minified = minify_js(f.read())
+            result = subprocess.run(['node', '--check', '--input-type=commonjs'], input=minified,
+                                    capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, f'{asset}: {result.stderr}')
+
+
+class TestAssetPipeline(unittest.TestCase):
+    """测试构建和分发"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.static_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.static_dir, 'css'))
+        self.css_path = os.path.join(self.static_dir, 'css', 'a.css')
+        with open(self.css_path, 'w', encoding='utf-8') as f:
+            f.write('body {\n    color: red;\n}\n' * 50)
+        self.manifest = build_assets(self.static_dir, ('css/a.css',))
+
+        self.app = Flask(__name__)
+        init_assets(self.app, self.static_dir)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """每个测试后的清理"""
+        shutil.rmtree(self.static_dir, ignore_errors=True)
+
+    def _asset_url(self):
+        """渲染模板中的资源地址"""
+        with self.app.test_request_context():
+            return render_template_string("{{ asset_url('css/a.css') }}")
+
+    def test_fingerprinted_output(self):
+        """测试构建产物文件名带内容指纹"""
+        name = self.manifest['css/a.css']['file']
+        dist = os.path.join(self.static_dir, 'dist')
+
+        self.assertRegex(name, r'^css/a\.[0-9a-f]{10}\.css$')
+        with gzip.open(os.path.join(dist, name + '.gz')) as f:
+            self.assertEqual(f.read().decode('utf-8'), 'body{color:red}' * 50 + '\n')
+        self.assertEqual(self._asset_url(), f'/assets/{name}')
+
+    def test_rebuild_removes_stale_files(self):
+        """测试重新构建删除旧版本产物"""
+        old_name = self.manifest['css/a.css']['file']
+        with open(self.css_path, 'w', encoding='utf-8') as f:
+            f.write('p { color: blue; }\n')
+        build_assets(self.static_dir, ('css/a.css',))
+
+        self.assertFalse(os.path.exists(os.path.join(self.static_dir, 'dist', old_name)))
+
+    def test_serves_precompressed_variant(self):
+        """测试按Accept-Encoding返回预压缩内容并设置长期缓存"""
+        url = self._asset_url()
+        compressed = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        plain = self.client.get(url)
+
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed.headers['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertLess(len(compressed.data), len(plain.data))
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+    def test_if_none_match_returns_304(self):
+        """测试ETag匹配时返回304"""
+        url = self._asset_url()
+        etag = self.client.get(url).headers['ETag']
+
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_modified_source_falls_back_to_static(self):
+        """测试源文件在构建后被修改时回退到普通静态地址"""
+        with open(self.css_path, 'a', encoding='utf-8') as f:
+            f.write('p { color: blue; }\n')
+        self.app = Flask(__name__)
+        init_assets(self.app, self.static_dir)
+
+        self.assertEqual(self._asset_url(), '/static/css/a.css')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,198 @@
+"""
+@file    test_codec.py
+@brief   游戏状态编码单元测试
+@details 测试预编码游戏状态编码器与 get_state() 输出一致、二进制编码及前端解码、格式协商，以及快速JSON提供者
+@author  AI Assistant
+@date    2026-10-19
+@version V1.1.0
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import subprocess
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from flask import Flask, jsonify
+from game.snake_game import SnakeGame, PackedState
+from game import codec
+from game.codec import (
+    BINARY_HEADER, BINARY_MIMETYPE, BODY_CELLS, BODY_TURNS,
+    GameStateJSONEncoder, encode_binary, encode_game_state, turn_points
+)
+from routes.json_provider import FastJSONProvider
+from app import create_app
+
+# 调用 static/js/game.js 中的解码函数，输入为base64编码的二进制状态
+NODE_DECODE = """
+const source = require('fs').readFileSync(process.argv[1], 'utf8');
+eval(source.split('// 定义贪吃蛇游戏客户端类')[0] + ';globalThis.decodeGameState = decodeGameState;');
+const bytes = Buffer.from(require('fs').readFileSync(0, 'utf8'), 'base64');
+const buffer = bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.length);
+process.stdout.write(JSON.stringify(decodeGameState(buffer)));
+"""
+
+
+def _roundtrip(state):
+    """把 get_state() 结果转换为JSON解析后的形式（元组变为列表）"""
+    return json.loads(json.dumps(state))
+
+
+class TestGameStateJSONEncoder(unittest.TestCase):
+    """测试游戏状态编码器"""
+
+    def test_matches_get_state(self):
+        """测试编码结果与 get_state() 一致"""
+        game = SnakeGame()
+        self.assertEqual(json.loads(encode_game_state(game)), _roundtrip(game.get_state()))
+
+        game.reset()
+        game.start()
+        game.set_direction('down')
+        game.update()
+        self.assertEqual(json.loads(encode_game_state(game)), _roundtrip(game.get_state()))
+
+    def test_large_grid_without_table(self):
+        """测试超出查找表范围的大网格按需编码坐标"""
+        encoder = GameStateJSONEncoder(1000, 1000, 1)
+        packed = PackedState([999999, 1000], 5, 'up', 30, 40, 'paused', 7, 12, 3)
+        state = json.loads(encoder.encode(packed))
+
+        self.assertEqual(state['snake_body'], [[999, 999], [0, 1]])
+        self.assertEqual(state['food_position'], [5, 0])
+        self.assertEqual((state['direction'], state['score'], state['highscore'], state['game_state']),
+                         ('up', 30, 40, 'paused'))
+        self.assertEqual((state['grid_width'], state['grid_height'], state['cell_size']), (1000, 1000, 1))
+        self.assertEqual((state['tick'], state['input_ack'], state['seq']), (12, 3, 7))
+
+    def test_encoder_cache_bounded(self):
+        """测试按网格尺寸缓存的编码器数量有上限"""
+        for size in range(10, 10 + codec.MAX_ENCODERS + 2):
+            encoder = codec.get_json_encoder(size, size)
+            self.assertIs(codec.get_json_encoder(size, size), encoder)
+        self.assertLessEqual(len(codec._encoders), codec.MAX_ENCODERS)
+        self.assertIn((size, size), codec._encoders)
+
+
+class TestBinaryEncoding(unittest.TestCase):
+    """测试二进制游戏状态编码"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        # 20x20网格上的L形蛇：蛇头(12,5)向左到(10,5)，再向下到(10,9)
+        body = [(12, 5), (11, 5), (10, 5), (10, 6), (10, 7), (10, 8), (10, 9)]
+        self.cells = [y * 20 + x for x, y in body]
+        self.packed = PackedState(self.cells, 3 * 20 + 4, 'left', 50, 120, 'playing', 9, 30, 4)
+
+    def test_turn_points(self):
+        """测试拐点只保留蛇头、拐弯处和蛇尾"""
+        self.assertEqual(turn_points(self.cells), [self.cells[0], self.cells[2], self.cells[-1]])
+        self.assertEqual(turn_points(self.cells[:2]), self.cells[:2])
+
+    def test_header_and_turn_body(self):
+        """测试头部字段和拐点编码"""
+        data = encode_binary(self.packed, 20, 20)
+        header = BINARY_HEADER.unpack_from(data)
+
+        self.assertEqual(header, (9, 50, 120, 64, 3, 20, 20, 20, 1, 2, BODY_TURNS, 2, 0, 30, 4))
+        self.assertEqual(len(data), BINARY_HEADER.size + 3 * 2)
+
+    def test_straight_cells_when_shorter(self):
+        """测试拐点不比逐格索引短时使用逐格索引"""
+        data = encode_binary(self.packed._replace(cells=self.cells[:2]), 20, 20)
+
+        self.assertEqual(BINARY_HEADER.unpack_from(data)[10], BODY_CELLS)
+
+    def test_large_grid_uses_uint32(self):
+        """测试格子数超过65536时使用uint32索引"""
+        data = encode_binary(PackedState([70000], 0, 'up', 0, 0, 'idle', 0, 0, 0), 1000, 1000)
+
+        self.assertEqual(BINARY_HEADER.unpack_from(data)[11], 4)
+        self.assertEqual(int.from_bytes(data[BINARY_HEADER.size:], 'little'), 70000)
+
+    @unittest.skipUnless(shutil.which('node'), '未安装Node.js')
+    def test_javascript_decoder(self):
+        """测试前端解码结果与JSON接口一致"""
+        import base64
+        game = SnakeGame()
+        game.reset()
+        game.start()
+        for packed in (game.get_packed_state(), self.packed):
+            data = encode_binary(packed, 20, 20)
+            output = subprocess.run(
+                ['node', '-e', NODE_DECODE, os.path.join(PROJECT_ROOT, 'static', 'js', 'game.js')],
+                input=base64.b64encode(data).decode(), capture_output=True, text=True, check=True
+            ).stdout
+            decoded = json.loads(output)
+            expected = json.loads(GameStateJSONEncoder(20, 20).encode(packed))
+            self.assertEqual(decoded, expected)
+            self.assertEqual(expected['seq'], packed.seq)
+
+
+class TestStateNegotiation(unittest.TestCase):
+    """测试游戏状态接口的格式协商"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game',)})
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = 1
+
+    def test_json_by_default(self):
+        """测试未声明二进制格式时返回JSON"""
+        response = self.client.get('/api/game/state', headers={'Accept': '*/*'})
+
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_json()['status'], 'success')
+        self.assertIn('Accept', response.vary)
+
+    def test_binary_when_preferred(self):
+        """测试Accept优先二进制格式时返回二进制"""
+        response = self.client.get('/api/game/state', headers={
+            'Accept': BINARY_MIMETYPE + ', application/json;q=0.9'
+        })
+
+        self.assertEqual(response.mimetype, BINARY_MIMETYPE)
+        self.assertEqual(len(response.data), BINARY_HEADER.size)
+
+
+class TestFastJSONProvider(unittest.TestCase):
+    """测试快速JSON提供者"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+
+    def test_compact_unicode_response(self):
+        """测试响应为紧凑格式且不转义中文"""
+        with self.app.app_context():
+            response = jsonify({'message': '成功', 'n': 1})
+
+        self.assertEqual(response.get_data(as_text=True), '{"message":"成功","n":1}\n')
+        self.assertEqual(response.mimetype, 'application/json')
+
+    def test_default_types_supported(self):
+        """测试日期等类型仍按默认规则序列化"""
+        with self.app.app_context():
+            text = self.app.json.dumps({'at': datetime(2026, 1, 2, 3, 4, 5)})
+
+        self.assertEqual(json.loads(text), {'at': 'Fri, 02 Jan 2026 03:04:05 GMT'})
+
+    def test_debug_pretty_prints(self):
+        """测试调试模式下输出缩进格式"""
+        self.app.debug = True
+        with self.app.app_context():
+            response = jsonify({'a': 1})
+
+        self.assertIn('\n  "a": 1', response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,138 @@
+"""
+@file    test_compact_game.py
+@brief   紧凑游戏实例单元测试
+@details 测试 CompactSnakeGame 与 SnakeGame 行为一致、没有 __dict__、每步不保留内存，以及进程内存储选择游戏实现
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.snake_game import SnakeGame, Direction_e, GameState_e
+from game.compact_game import CompactSnakeGame
+from game.store import LocalGameStore, create_game_store
+
+
+def play(engine, seed, steps=300):
+    """
+    @brief  用固定随机种子和随机方向运行一局游戏，记录每步的打包状态
+    @param  engine: 游戏类
+    @param  seed: 随机种子
+    @param  steps: 最多运行的步数
+    @retval list: 每步的打包状态
+    """
+    random.seed(seed)
+    moves = random.Random(seed)
+    game = engine(grid_width=12, grid_height=9)
+    game.reset()
+    game.start()
+    states = []
+    for _ in range(steps):
+        if moves.random() < 0.3:
+            game.set_direction(moves.choice(('up', 'down', 'left', 'right')))
+        game.update()
+        states.append(game.get_packed_state())
+        if game.game_state == GameState_e.GAME_OVER:
+            break
+    return states
+
+
+class TestCompactSnakeGame(unittest.TestCase):
+    """测试紧凑游戏实例"""
+
+    def test_same_behavior_as_snake_game(self):
+        """测试相同随机种子和输入下与 SnakeGame 每步状态一致"""
+        for seed in range(5):
+            self.assertEqual(play(CompactSnakeGame, seed), play(SnakeGame, seed))
+
+    def test_same_state_fields(self):
+        """测试 get_state() 与 SnakeGame 一致"""
+        random.seed(3)
+        compact = CompactSnakeGame()
+        compact.reset()
+        random.seed(3)
+        game = SnakeGame()
+        game.reset()
+
+        self.assertEqual(compact.get_state(), game.get_state())
+
+    def test_update_reports_game_over_once(self):
+        """测试只有使游戏结束的那次 update() 返回True"""
+        game = CompactSnakeGame()
+        game.reset()
+        game.start()
+        results = [game.update() for _ in range(game.grid_width)]
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(game.game_state, GameState_e.GAME_OVER)
+
+    def test_no_instance_dict(self):
+        """测试实例没有 __dict__"""
+        game = CompactSnakeGame()
+
+        self.assertFalse(hasattr(game, '__dict__'))
+        with self.assertRaises(AttributeError):
+            game.extra = 1
+
+    def test_direction_properties(self):
+        """测试方向以枚举值读写"""
+        game = CompactSnakeGame()
+        game.reset()
+        game.start()
+        game.set_direction('left')
+        self.assertEqual(game.next_direction, Direction_e.RIGHT)
+
+        game.set_direction('up')
+        game.update()
+        self.assertEqual(game.current_direction, Direction_e.UP)
+
+        game.current_direction = Direction_e.DOWN
+        self.assertEqual(game.get_packed_state().direction, 'down')
+
+    def test_no_memory_retained_per_tick(self):
+        """测试转圈前进时每步不保留内存"""
+        game = CompactSnakeGame()
+        game.reset()
+        game.start()
+        game.food_position = (0, 0)
+        turns = ('up', 'left', 'down', 'right')
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        before = tracemalloc.get_traced_memory()[0]
+        for step in range(400):
+            game.set_direction(turns[step % 4])
+            game.update()
+
+        self.assertEqual(game.game_state, GameState_e.PLAYING)
+        self.assertLess(tracemalloc.get_traced_memory()[0] - before, 1024)
+
+
+class TestGameEngineConfig(unittest.TestCase):
+    """测试进程内存储选择游戏实现"""
+
+    def test_compact_engine(self):
+        """测试 GAME_ENGINE 为 compact 时创建紧凑实例"""
+        store = create_game_store({'GAME_ENGINE': 'compact'})
+
+        self.assertIsInstance(store.get(1), CompactSnakeGame)
+
+    def test_default_engine(self):
+        """测试默认使用 SnakeGame"""
+        self.assertIsInstance(create_game_store({}).get(1), SnakeGame)
+        self.assertIsInstance(LocalGameStore().get(1), SnakeGame)
+
+    def test_unknown_engine(self):
+        """测试未知的游戏实现报错"""
+        with self.assertRaises(ValueError):
+            create_game_store({'GAME_ENGINE': 'fast'})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
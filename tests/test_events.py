@@ -0,0 +1,256 @@
+"""
+@file    test_events.py
+@brief   游戏事件流单元测试
+@details 测试环形缓冲区、游戏发出的事件、按批写入SQLite（含fork后的连接），以及进程内存储和游戏接口的事件记录
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from game.snake_game import SnakeGame
+from game.compact_game import CompactSnakeGame
+from game.events import (
+    CAUSE_NONE, CAUSE_SELF, CAUSE_WALL, EVENT_DEATH, EVENT_FOOD, EVENT_PAUSE, EVENT_RESUME, EVENT_START,
+    EventRecorder, EventRing, EventWriter, GameEvent, SQLiteEventSink
+)
+from game.hibernate import MemorySnapshotPool
+from game.store import LocalGameStore
+
+
+class ListSink:
+    """测试用事件表，记录每批事件"""
+
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write(self, events):
+        self.batches.append(list(events))
+
+    def close(self):
+        self.closed = True
+
+
+class TestEventRing(unittest.TestCase):
+    """测试事件环形缓冲区"""
+
+    def test_drain_in_order_across_wraparound(self):
+        """测试跨越缓冲区末尾时按写入顺序取出"""
+        ring = EventRing(capacity=4, batch_size=4)
+        for i in range(3):
+            ring.append(i)
+        self.assertEqual(ring.drain(2), [0, 1])
+        for i in range(3, 6):
+            ring.append(i)
+
+        self.assertEqual(ring.drain(10), [2, 3, 4, 5])
+        self.assertEqual(len(ring), 0)
+
+    def test_full_ring_drops(self):
+        """测试缓冲区满时丢弃新事件并计数"""
+        ring = EventRing(capacity=2)
+        self.assertTrue(ring.append(1))
+        self.assertTrue(ring.append(2))
+
+        self.assertFalse(ring.append(3))
+        self.assertEqual(ring.dropped, 1)
+        self.assertEqual(ring.drain(10), [1, 2])
+
+    def test_ready_at_batch_size(self):
+        """测试积压达到一批时置位，取出后复位"""
+        ring = EventRing(capacity=8, batch_size=3)
+        ring.append(1)
+        ring.append(2)
+        self.assertFalse(ring.ready.is_set())
+
+        ring.append(3)
+        self.assertTrue(ring.ready.is_set())
+        ring.drain(3)
+        self.assertFalse(ring.ready.is_set())
+
+
+class TestGameEvents(unittest.TestCase):
+    """测试游戏发出的事件"""
+
+    def play(self, engine):
+        """
+        @brief  开始、暂停、继续一局游戏，吃到一个食物后撞墙
+        @param  engine: 游戏类
+        @retval list: 记录的事件
+        """
+        ring = EventRing()
+        game = engine(grid_width=10, grid_height=10, highscore=0)
+        game.events = EventRecorder(ring, 7)
+        game.reset()
+        game.start()
+        game.toggle_pause()
+        game.toggle_pause()
+        game.food_position = (6, 5)
+        game.update()
+        game.food_position = (0, 0)
+        for _ in range(4):
+            game.update()
+        return ring.drain(100)
+
+    def test_event_sequence(self):
+        """测试两种游戏实现发出相同的事件序列"""
+        for engine in (SnakeGame, CompactSnakeGame):
+            events = self.play(engine)
+
+            self.assertEqual([event.kind for event in events],
+                             [EVENT_START, EVENT_PAUSE, EVENT_RESUME, EVENT_FOOD, EVENT_DEATH])
+            self.assertTrue(all(event.user_id == 7 and event.grid_width == 10 for event in events))
+            food, death = events[3], events[4]
+            self.assertEqual((food.cell, food.score, food.cause), (56, 10, CAUSE_NONE))
+            # 死亡位置为撞墙前蛇头所在的格子
+            self.assertEqual((death.cell, death.cause, death.tick), (59, CAUSE_WALL, 5))
+
+    def test_self_collision_cause(self):
+        """测试撞到自身的死亡原因"""
+        for engine in (SnakeGame, CompactSnakeGame):
+            ring = EventRing()
+            game = engine(highscore=0)
+            game.events = EventRecorder(ring, 1)
+            game.reset()
+            game.start()
+            game.snake_body = [(5, 5), (6, 5), (6, 6), (5, 6), (4, 6)]
+            game.set_direction('down')
+            game.update()
+
+            death = ring.drain(100)[-1]
+            self.assertEqual((death.kind, death.cause), (EVENT_DEATH, CAUSE_SELF))
+            self.assertEqual(death.cell, 5 * game.grid_width + 5)
+
+    def test_no_recorder(self):
+        """测试没有挂接记录器时游戏正常运行"""
+        game = SnakeGame(highscore=0)
+        game.reset()
+        game.start()
+        game.update()
+
+        self.assertIsNone(game.events)
+
+
+class TestEventWriter(unittest.TestCase):
+    """测试事件写入线程"""
+
+    def test_flush_in_batches(self):
+        """测试按批大小分批写入"""
+        ring = EventRing(capacity=16, batch_size=4)
+        sink = ListSink()
+        for i in range(10):
+            ring.append(i)
+
+        self.assertEqual(EventWriter(ring, sink).flush(), 10)
+        self.assertEqual([len(batch) for batch in sink.batches], [4, 4, 2])
+
+    def test_close_writes_remaining(self):
+        """测试关闭时写入剩余事件并关闭事件表"""
+        ring = EventRing(batch_size=100)
+        sink = ListSink()
+        writer = EventWriter(ring, sink, interval=60)
+        writer.start()
+        ring.append(1)
+        writer.close()
+
+        self.assertEqual(sink.batches, [[1]])
+        self.assertTrue(sink.closed)
+
+    def test_sqlite_sink(self):
+        """测试一批事件写入SQLite事件表"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.db')
+            ring = EventRing()
+            game = SnakeGame(highscore=0)
+            game.events = EventRecorder(ring, 3)
+            game.reset()
+            game.start()
+            writer = EventWriter(ring, SQLiteEventSink(path))
+            writer.close()
+
+            with sqlite3.connect(path) as conn:
+                rows = conn.execute('SELECT user_id, kind, grid_width FROM game_events').fetchall()
+            conn.close()
+            self.assertEqual(rows, [(3, EVENT_START, game.grid_width)])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), '需要 os.fork')
+    def test_sqlite_sink_after_fork(self):
+        """测试fork出的子进程打开自己的连接，父进程的连接不受影响"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.db')
+            sink = SQLiteEventSink(path)
+            event = GameEvent(0.0, 1, EVENT_START, 0, 0, 0, 0, 20, 20)
+            sink.write([event])
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    sink.write([event._replace(user_id=2)])
+                    sink.close()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            sink.write([event._replace(user_id=3)])
+            sink.close()
+
+            with sqlite3.connect(path) as conn:
+                rows = conn.execute('SELECT user_id FROM game_events ORDER BY id').fetchall()
+            conn.close()
+            self.assertEqual(rows, [(1,), (2,), (3,)])
+
+
+class TestStoreEvents(unittest.TestCase):
+    """测试进程内存储挂接事件记录器"""
+
+    def test_store_attaches_recorder(self):
+        """测试新建和从快照还原的游戏都挂接记录器"""
+        ring = EventRing()
+        store = LocalGameStore(snapshot_pool=MemorySnapshotPool(), hibernate_after=60)
+        store.event_ring = ring
+        game = store.get(5)
+        game.reset()
+        game.start()
+        store.hibernate_idle(float('inf'))
+        store.get(5).toggle_pause()
+
+        self.assertEqual([(event.user_id, event.kind) for event in ring.drain(10)],
+                         [(5, EVENT_START), (5, EVENT_PAUSE)])
+
+
+class TestEventsApi(unittest.TestCase):
+    """测试开启事件记录时的游戏接口"""
+
+    def test_api_records_events(self):
+        """测试游戏接口的操作写入事件表"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.db')
+            app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game',),
+                              'GAME_EVENTS_PATH': path})
+            writer = app.extensions['game_events']
+            # 创建应用（预加载时在主进程中）不启动写入线程，也不保留数据库连接
+            self.assertIsNone(writer._thread)
+            self.assertIsNone(writer.sink._conn)
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = 2
+            client.post('/api/game/start')
+            self.assertIsNotNone(writer._thread)
+            client.post('/api/game/pause')
+            app.extensions['game_events'].close()
+
+            with sqlite3.connect(path) as conn:
+                rows = conn.execute('SELECT user_id, kind FROM game_events ORDER BY id').fetchall()
+            conn.close()
+            self.assertEqual(rows, [(2, EVENT_START), (2, EVENT_PAUSE)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
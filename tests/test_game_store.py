@@ -0,0 +1,260 @@
+"""
+@file    test_game_store.py
+@brief   游戏存储单元测试
+@details 测试按用户管理游戏实例的进程内存储和共享内存存储
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import json
+import multiprocessing
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import snake_game
+from game.snake_game import GameState_e, INITIAL_SNAKE_LENGTH
+from game.store import LocalGameStore, create_game_store
+from game.shared_store import SharedGameStore, StoreFullError, F_FOOD, F_STATE, STATE_GAME_OVER
+from game.codec import encode_game_state
+
+
+def _advance_in_child(store, user_id, queue):
+    """子进程中推进指定用户的游戏一帧"""
+    game = store.get(user_id)
+    game.update()
+    queue.put(game.get_state()['snake_body'][0])
+
+
+class HighscoreFileMixin:
+    """把最高分文件重定向到临时目录"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        patcher = mock.patch.object(snake_game, 'HIGHSCORE_FILE', os.path.join(self.temp_dir, 'highscore.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+
+
+class TestLocalGameStore(HighscoreFileMixin, unittest.TestCase):
+    """测试进程内存储"""
+
+    def test_games_are_per_user(self):
+        """测试不同用户拥有独立的游戏"""
+        store = LocalGameStore()
+
+        self.assertIs(store.get(1), store.get(1))
+        self.assertIsNot(store.get(1), store.get(2))
+
+    def test_active_count(self):
+        """测试只统计进行中的游戏"""
+        store = LocalGameStore()
+        store.get(1).reset()
+        store.get(1).start()
+        store.get(2).reset()
+
+        self.assertEqual(store.active_count(), 1)
+
+    def test_create_by_config(self):
+        """测试按配置创建存储"""
+        self.assertIsInstance(create_game_store({}), LocalGameStore)
+        with self.assertRaises(ValueError):
+            create_game_store({'GAME_STORE': 'redis'})
+
+
+class TestSharedGameStore(HighscoreFileMixin, unittest.TestCase):
+    """测试共享内存存储"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        super().setUp()
+        self.store = SharedGameStore(slot_count=4)
+        self.addCleanup(self.store.close)
+        self.game = self.store.get(1)
+        self.game.reset()
+        self.game.start()
+
+    def _place_food(self, game, position):
+        """把食物放到指定位置"""
+        header = self.store.read_header(game.slot)
+        header[F_FOOD] = position[1] * self.store.grid_width + position[0]
+        self.store.write_header(game.slot, header)
+
+    def test_state_matches_snake_game(self):
+        """测试状态格式与SnakeGame一致"""
+        state = self.game.get_state()
+        center_x = self.store.grid_width // 2
+        center_y = self.store.grid_height // 2
+
+        self.assertEqual(state['snake_body'], [(center_x - i, center_y) for i in range(INITIAL_SNAKE_LENGTH)])
+        self.assertEqual(state['game_state'], 'playing')
+        self.assertEqual(state['direction'], 'right')
+        self.assertNotIn(state['food_position'], state['snake_body'])
+        self.assertEqual(set(state), set(snake_game.SnakeGame().get_state()))
+
+    def test_encoded_state_matches(self):
+        """测试打包状态的编码结果与 get_state() 一致"""
+        self.game.update()
+
+        self.assertEqual(json.loads(encode_game_state(self.game)), json.loads(json.dumps(self.game.get_state())))
+
+    def test_move_and_eat(self):
+        """测试移动和吃食物"""
+        head_x, head_y = self.game.get_state()['snake_body'][0]
+        self._place_food(self.game, (head_x + 1, head_y))
+
+        self.game.update()
+        state = self.game.get_state()
+
+        self.assertEqual(state['snake_body'][0], (head_x + 1, head_y))
+        self.assertEqual(len(state['snake_body']), INITIAL_SNAKE_LENGTH + 1)
+        self.assertEqual(state['score'], 10)
+
+    def test_cannot_reverse_direction(self):
+        """测试不能直接反向移动"""
+        self.game.set_direction('left')
+        self.game.update()
+
+        self.assertEqual(self.game.get_state()['direction'], 'right')
+
+    def test_find_and_live_games(self):
+        """测试查找游戏不分配槽位，直播列表按得分排序"""
+        other = self.store.get(2)
+        other.reset()
+        other.start()
+        head_x, head_y = other.get_state()['snake_body'][0]
+        self._place_food(other, (head_x + 1, head_y))
+        other.update()
+
+        self.assertIsNone(self.store.find(3))
+        self.assertEqual(self.store.find(2).slot, other.slot)
+        self.assertEqual(self.store.live_games(10), [(2, 10), (1, 0)])
+
+    def test_batched_inputs_match_snake_game(self):
+        """测试批量输入的确认和步数与SnakeGame一致"""
+        local = snake_game.SnakeGame()
+        local.reset()
+        local.start()
+        inputs = [(1, 1, 'up'), (2, 1, 'left'), (3, 3, 'down')]
+        for game in (self.game, local):
+            game.apply_inputs(inputs)
+            game.update()
+            game.apply_inputs(inputs)
+
+        state = self.game.get_state()
+        self.assertEqual((state['tick'], state['input_ack'], state['direction']), (1, 2, 'up'))
+        self.assertEqual((local.tick, local.input_ack, local.current_direction.value), (1, 2, 'up'))
+
+    def test_wall_collision_updates_highscore(self):
+        """测试撞墙结束游戏并更新全局最高分"""
+        head_x, head_y = self.game.get_state()['snake_body'][0]
+        self._place_food(self.game, (head_x + 1, head_y))
+        self.game.update()
+        results = [self.game.update() for _ in range(self.store.grid_width)]
+
+        self.assertEqual(self.game.game_state, GameState_e.GAME_OVER)
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(self.store.get_highscore(), 10)
+        self.assertEqual(snake_game.load_highscore(), 10)
+
+    def test_self_collision(self):
+        """测试撞到自己身体结束游戏"""
+        head_x, head_y = self.game.get_state()['snake_body'][0]
+        for step in range(2):
+            self._place_food(self.game, (head_x + 1 + step, head_y))
+            self.game.update()
+        for direction in ('down', 'left', 'up'):
+            self.game.set_direction(direction)
+            self.game.update()
+
+        self.assertEqual(self.game.game_state, GameState_e.GAME_OVER)
+
+    def test_pause_stops_updates(self):
+        """测试暂停时不推进游戏"""
+        self.game.toggle_pause()
+        before = self.game.get_state()
+        self.game.update()
+
+        self.assertEqual(self.game.get_state(), before)
+        self.assertEqual(self.store.active_count(), 0)
+
+    def test_slots_are_per_user(self):
+        """测试不同用户占用不同槽位"""
+        other = self.store.get(2)
+
+        self.assertEqual(self.store.get(1).slot, self.game.slot)
+        self.assertNotEqual(other.slot, self.game.slot)
+
+    def _end_game(self, game):
+        """把游戏直接置为已结束"""
+        header = self.store.read_header(game.slot)
+        header[F_STATE] = STATE_GAME_OVER
+        self.store.write_header(game.slot, header)
+
+    def _fill(self):
+        """用户2~4开始游戏，占满剩余槽位"""
+        for user_id in (2, 3, 4):
+            game = self.store.get(user_id)
+            game.reset()
+            game.start()
+
+    def test_evicts_finished_slot_when_full(self):
+        """测试槽位用尽时回收已结束的游戏，暂停的游戏不回收，全部进行中或暂停时报错"""
+        self._fill()
+        self.store.get(2).toggle_pause()
+        self._end_game(self.store.get(3))
+        finished_slot = self.store.get(3).slot
+        game = self.store.get(5)
+        game.reset()
+        game.start()
+
+        self.assertEqual(game.slot, finished_slot)
+        self.assertEqual(self.store.get(2).game_state, GameState_e.PAUSED)
+        with self.assertRaises(StoreFullError):
+            self.store.get(6)
+
+    def test_stale_view_rebinds_after_eviction(self):
+        """测试槽位被回收给其他用户后，原用户的操作不会修改新用户的游戏"""
+        self._fill()
+        self._end_game(self.game)
+        other = self.store.get(5)
+        other.reset()
+        other.start()
+        self.assertEqual(other.slot, self.game.slot)
+        before = other.get_state()
+        self._end_game(self.store.get(2))
+
+        self.game.reset()
+        self.game.start()
+        self.game.update()
+
+        self.assertNotEqual(self.game.slot, other.slot)
+        self.assertEqual(other.get_state(), before)
+        self.assertEqual(self.game.game_state, GameState_e.PLAYING)
+        self.assertEqual(self.store.find(1).slot, self.game.slot)
+
+    def test_other_process_advances_game(self):
+        """测试其他进程推进的游戏对本进程可见"""
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        head_x, head_y = self.game.get_state()['snake_body'][0]
+
+        process = context.Process(target=_advance_in_child, args=(self.store, 1, queue))
+        process.start()
+        child_head = queue.get(timeout=10)
+        process.join(10)
+
+        self.assertEqual(child_head, (head_x + 1, head_y))
+        self.assertEqual(self.game.get_state()['snake_body'][0], (head_x + 1, head_y))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
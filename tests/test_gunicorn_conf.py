@@ -0,0 +1,115 @@
+"""
+@file    test_gunicorn_conf.py
+@brief   Gunicorn配置单元测试
+@details 测试按工作进程数选择默认游戏存储，以及启动前拒绝与工作进程数或预加载设置不匹配的游戏存储配置
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import runpy
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+class FakeLog:
+    """测试用日志，记录错误消息"""
+
+    def __init__(self):
+        self.errors = []
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def info(self, message):
+        pass
+
+
+def load_conf(**env):
+    """
+    @brief  在指定环境变量下执行配置文件
+    @param  env: 环境变量
+    @retval tuple: (配置文件的全局变量, 执行后的环境变量)
+    """
+    with mock.patch.dict(os.environ, env, clear=True):
+        conf = runpy.run_path(CONF_PATH)
+        return conf, dict(os.environ)
+
+
+def fake_server(workers, preload=True):
+    """
+    @brief  构造测试用Gunicorn主进程对象
+    @param  workers: 工作进程数
+    @param  preload: 是否预加载
+    @retval SimpleNamespace: 主进程对象
+    """
+    return SimpleNamespace(cfg=SimpleNamespace(workers=workers, preload_app=preload), log=FakeLog())
+
+
+class TestGameStoreDefault(unittest.TestCase):
+    """测试游戏存储默认值"""
+
+    def test_shared_with_multiple_workers(self):
+        """测试多个工作进程时默认使用共享内存存储"""
+        conf, env = load_conf(WEB_CONCURRENCY='4')
+
+        self.assertEqual(conf['workers'], 4)
+        self.assertEqual(env['GAME_STORE'], 'shared')
+
+    def test_local_with_single_worker(self):
+        """测试单个工作进程时默认使用进程内存储"""
+        _, env = load_conf(WEB_CONCURRENCY='1')
+
+        self.assertEqual(env['GAME_STORE'], 'local')
+
+    def test_explicit_setting_kept(self):
+        """测试显式配置的游戏存储不被覆盖"""
+        _, env = load_conf(WEB_CONCURRENCY='4', GAME_STORE='local')
+
+        self.assertEqual(env['GAME_STORE'], 'local')
+
+
+class TestStartupCheck(unittest.TestCase):
+    """测试启动前的配置检查"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.on_starting = load_conf(WEB_CONCURRENCY='1')[0]['on_starting']
+
+    def start(self, server, **env):
+        """
+        @brief  在指定环境变量下执行启动检查
+        @retval None
+        """
+        with mock.patch.dict(os.environ, env, clear=True):
+            self.on_starting(server)
+
+    def test_local_store_with_multiple_workers_refused(self):
+        """测试多个工作进程（如命令行 --workers）配置进程内存储时拒绝启动"""
+        server = fake_server(4)
+        with self.assertRaises(SystemExit):
+            self.start(server, GAME_STORE='local')
+        self.assertIn('GAME_STORE=shared', server.log.errors[0])
+
+    def test_shared_store_without_preload_refused(self):
+        """测试未开启预加载时拒绝使用共享内存存储"""
+        server = fake_server(4, preload=False)
+        with self.assertRaises(SystemExit):
+            self.start(server, GAME_STORE='shared')
+        self.assertIn('GUNICORN_PRELOAD', server.log.errors[0])
+
+    def test_valid_configurations(self):
+        """测试单进程进程内存储和多进程共享内存存储正常启动"""
+        self.start(fake_server(1), GAME_STORE='local')
+        self.start(fake_server(4), GAME_STORE='shared')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
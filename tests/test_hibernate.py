@@ -0,0 +1,186 @@
+"""
+@file    test_hibernate.py
+@brief   游戏休眠单元测试
+@details 测试快照的序列化与还原、内存和磁盘快照池、进程内存储的休眠与透明还原，以及游戏接口
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from game.snake_game import SnakeGame, GameState_e
+from game.compact_game import CompactSnakeGame
+from game.hibernate import (
+    FLAG_COMPRESSED, SNAPSHOT_HEADER, DiskSnapshotPool, MemorySnapshotPool, restore_game, snapshot_game
+)
+from game.store import LocalGameStore
+
+
+def make_game(engine=SnakeGame, length=20, **board):
+    """
+    @brief  构造一局暂停中的游戏，蛇身为一条直线
+    @param  engine: 游戏类
+    @param  length: 蛇身长度
+    @param  board: 网格配置
+    @retval 游戏实例
+    """
+    game = engine(**board)
+    game.reset()
+    game.start()
+    game.set_direction('down')
+    game.update()
+    game.snake_body = [(x, 1) for x in range(length, 0, -1)]
+    game.score = 120
+    game.toggle_pause()
+    return game
+
+
+class TestSnapshot(unittest.TestCase):
+    """测试快照序列化"""
+
+    def test_roundtrip(self):
+        """测试快照还原后状态与原游戏一致"""
+        for engine in (SnakeGame, CompactSnakeGame):
+            for compress in (False, True):
+                game = make_game(engine)
+                restored = restore_game(snapshot_game(game, compress), engine)
+
+                self.assertIsInstance(restored, engine)
+                self.assertEqual(restored.get_packed_state(), game.get_packed_state())
+                self.assertEqual(restored.next_direction, game.next_direction)
+                self.assertEqual(restored.game_state, GameState_e.PAUSED)
+
+    def test_compact_size(self):
+        """测试快照为定长头部加每格两字节，压缩后更短"""
+        game = make_game(length=200, grid_width=250, grid_height=20)
+        plain = snapshot_game(game)
+        compressed = snapshot_game(game, compress=True)
+
+        self.assertEqual(len(plain), SNAPSHOT_HEADER.size + 200 * 2)
+        self.assertLess(len(compressed), len(plain))
+        self.assertEqual(SNAPSHOT_HEADER.unpack_from(compressed)[2], FLAG_COMPRESSED)
+
+    def test_large_board(self):
+        """测试大网格的快照使用uint32格子索引"""
+        game = make_game(length=5, grid_width=1024, grid_height=1024)
+        game.snake_body = [(1000, 1000 - i) for i in range(5)]
+        data = snapshot_game(game)
+
+        self.assertEqual(len(data), SNAPSHOT_HEADER.size + 5 * 4)
+        self.assertEqual(restore_game(data, SnakeGame).snake_body, game.snake_body)
+
+    def test_invalid_snapshot(self):
+        """测试无效快照报错"""
+        data = snapshot_game(make_game())
+        for bad in (b'', b'XXXX' + data[4:], data[:-1]):
+            with self.assertRaises(ValueError):
+                restore_game(bad, SnakeGame)
+
+
+class TestSnapshotPools(unittest.TestCase):
+    """测试快照池"""
+
+    def test_memory_pool(self):
+        """测试内存快照池取出后移除"""
+        pool = MemorySnapshotPool()
+        pool.put(1, b'abc')
+
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(pool.take(1), b'abc')
+        self.assertIsNone(pool.take(1))
+
+    def test_disk_pool(self):
+        """测试磁盘快照池写入文件，取出后删除"""
+        with tempfile.TemporaryDirectory() as directory:
+            pool = DiskSnapshotPool(os.path.join(directory, 'snapshots'))
+            pool.put(7, b'abc')
+
+            self.assertEqual(len(pool), 1)
+            self.assertEqual(pool.take(7), b'abc')
+            self.assertIsNone(pool.take(7))
+            self.assertEqual(os.listdir(pool.directory), [])
+
+
+class TestHibernatingStore(unittest.TestCase):
+    """测试进程内存储的休眠"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.pool = MemorySnapshotPool()
+        self.store = LocalGameStore(snapshot_pool=self.pool, hibernate_after=60)
+
+    def test_idle_game_hibernated_and_restored(self):
+        """测试空闲超时的游戏转为快照，下次获取时透明还原"""
+        game = self.store.get(1)
+        game.reset()
+        game.start()
+        game.toggle_pause()
+        state = game.get_packed_state()
+
+        self.assertEqual(self.store.hibernate_idle(time.monotonic() + 61), 1)
+        self.assertIsNone(self.store.find(1))
+        self.assertEqual(self.store.hibernated_count(), 1)
+
+        restored = self.store.get(1)
+        self.assertIsNot(restored, game)
+        self.assertEqual(restored.get_packed_state(), state)
+        self.assertEqual(self.store.hibernated_count(), 0)
+
+    def test_recent_games_stay(self):
+        """测试只休眠空闲超时的游戏，最近访问的游戏保留"""
+        self.store.get(1)
+        self.store.get(2)
+        now = time.monotonic()
+        self.store._last_used[1] = now - 120
+
+        self.assertEqual(self.store.hibernate_idle(now), 1)
+        self.assertIsNone(self.store.find(1))
+        self.assertIsNotNone(self.store.find(2))
+
+    def test_abandoned_playing_game_not_counted(self):
+        """测试休眠的进行中游戏不计入进行中的游戏"""
+        game = self.store.get(1)
+        game.reset()
+        game.start()
+        self.store.hibernate_idle(time.monotonic() + 61)
+
+        self.assertEqual(self.store.active_count(), 0)
+        self.assertEqual(self.store.get(1).game_state, GameState_e.PLAYING)
+
+    def test_invalid_snapshot_starts_new_game(self):
+        """测试快照无效时重新创建游戏"""
+        self.pool.put(1, b'broken')
+
+        with self.assertLogs('game.store', 'WARNING'):
+            game = self.store.get(1)
+        self.assertEqual(game.game_state, GameState_e.IDLE)
+
+
+class TestHibernateApi(unittest.TestCase):
+    """测试开启休眠时的游戏接口"""
+
+    def test_state_survives_hibernation(self):
+        """测试休眠后游戏接口返回相同的游戏状态"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game',),
+                          'GAME_HIBERNATE_AFTER': 30, 'GAME_HIBERNATE_COMPRESS': True})
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+        client.post('/api/game/start')
+        before = client.post('/api/game/pause').get_json()['game_state']
+
+        store = app.extensions['game_store']
+        self.assertEqual(store.hibernate_idle(time.monotonic() + 31), 1)
+        self.assertEqual(client.get('/api/game/state').get_json()['game_state'], before)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
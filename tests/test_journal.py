@@ -0,0 +1,262 @@
+"""
+@file    test_journal.py
+@brief   游戏检查点日志单元测试
+@details 测试检查点的写入与恢复、写坏的记录回退到上一条、只写入有变化的游戏、不写入更新到一半的游戏、
+         槽位回收、保留休眠游戏的检查点、每个进程独占一个日志文件，以及重启应用后恢复游戏
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from game.snake_game import SnakeGame, GameState_e
+from game.compact_game import CompactSnakeGame
+from game.hibernate import MemorySnapshotPool
+from game.journal import RECORD_HEADER, Checkpointer, GameJournal
+from game.store import LocalGameStore
+
+
+def make_game(engine=SnakeGame):
+    """
+    @brief  构造一局暂停中的游戏
+    @param  engine: 游戏类
+    @retval 游戏实例
+    """
+    game = engine()
+    game.reset()
+    game.start()
+    game.set_direction('down')
+    game.update()
+    game.toggle_pause()
+    return game
+
+
+class TestGameJournal(unittest.TestCase):
+    """测试检查点日志"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'games.journal')
+
+    def open(self, **kwargs):
+        """
+        @brief  打开日志，测试结束时关闭
+        @retval GameJournal: 日志
+        """
+        journal = GameJournal(self.path, **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_roundtrip(self):
+        """测试重新打开日志后恢复相同的游戏状态"""
+        for engine in (SnakeGame, CompactSnakeGame):
+            games = {1: make_game(engine), 2: make_game(engine)}
+            journal = self.open(slot_count=4)
+            self.assertEqual(journal.checkpoint(games.items()), 2)
+            journal.close()
+
+            recovered = self.open(slot_count=4).recover(engine)
+            self.assertEqual(sorted(recovered), [1, 2])
+            for user_id, game in games.items():
+                self.assertIsInstance(recovered[user_id], engine)
+                self.assertEqual(recovered[user_id].get_packed_state(), game.get_packed_state())
+            os.remove(self.path)
+
+    def test_torn_record_falls_back(self):
+        """测试最新记录写坏时恢复到上一次检查点"""
+        game = make_game()
+        journal = self.open(slot_count=2)
+        journal.write(1, game)
+        before = game.get_packed_state()
+        game.toggle_pause()
+        game.update()
+        journal.write(1, game)
+        # 模拟写到一半时崩溃：第二条记录的快照被截断
+        offset = journal._offset(0, 1) + RECORD_HEADER.size
+        journal._mm[offset:offset + 8] = b'\xff' * 8
+        journal.close()
+
+        recovered = self.open(slot_count=2).recover(SnakeGame)
+        self.assertEqual(recovered[1].get_packed_state(), before)
+
+    def test_only_changed_games_written(self):
+        """测试状态序号没有变化的游戏不再写入"""
+        games = {1: make_game(), 2: make_game()}
+        journal = self.open(slot_count=4)
+        journal.checkpoint(games.items())
+
+        self.assertEqual(journal.checkpoint(games.items()), 0)
+        games[2].toggle_pause()
+        self.assertEqual(journal.checkpoint(games.items()), 1)
+
+    def test_snapshot_waits_for_update(self):
+        """测试检查点等待进行中的更新完成，不写入更新到一半的状态"""
+        game = make_game()
+        game.toggle_pause()
+        journal = self.open(slot_count=2)
+        with game.lock:
+            # 模拟 update() 已递增序号、尚未设置游戏结束
+            game.seq += 1
+            worker = threading.Thread(target=journal.checkpoint, args=({1: game}.items(),))
+            worker.start()
+            worker.join(0.05)
+            self.assertTrue(worker.is_alive())
+            game.game_state = GameState_e.GAME_OVER
+        worker.join()
+        journal.close()
+
+        self.assertEqual(self.open(slot_count=2).recover(SnakeGame)[1].game_state, GameState_e.GAME_OVER)
+
+    def test_absent_games_released(self):
+        """测试不在存储中的游戏被清除，槽位可以复用"""
+        journal = self.open(slot_count=1)
+        journal.checkpoint({1: make_game()}.items())
+        journal.checkpoint({2: make_game()}.items())
+        journal.close()
+
+        self.assertEqual(list(self.open(slot_count=1).recover(SnakeGame)), [2])
+
+    def test_hibernated_games_kept(self):
+        """测试休眠中的游戏保留检查点，被移除的游戏才清除"""
+        store = LocalGameStore(snapshot_pool=MemorySnapshotPool(), hibernate_after=60)
+        store.adopt({1: make_game(), 2: make_game()})
+        journal = self.open(slot_count=2)
+        journal.checkpoint(store.games(), store.has_game)
+        store.hibernate_idle(float('inf'))
+        journal.checkpoint(store.games(), store.has_game)
+        journal.close()
+
+        self.assertEqual(sorted(self.open(slot_count=2).recover(SnakeGame)), [1, 2])
+
+    def test_locked_file(self):
+        """测试日志文件被锁定时不能再次打开，关闭后可以重新锁定"""
+        first = GameJournal(self.path, slot_count=2)
+        with self.assertRaises(BlockingIOError):
+            GameJournal(self.path, slot_count=2)
+        first.close()
+
+        self.open(slot_count=2)
+
+    def test_waits_for_previous_worker(self):
+        """测试日志被旧进程锁定时等待其退出后恢复，不覆盖等待期间开始的游戏"""
+        old_store = LocalGameStore()
+        old_store.adopt({1: make_game(), 2: make_game()})
+        old = Checkpointer(old_store, self.path, slot_count=4, interval=0.01)
+        self.addCleanup(old.close)
+        old.start()
+        store = LocalGameStore()
+        store.get(2)
+        checkpointer = Checkpointer(store, self.path, slot_count=4, interval=0.01)
+        self.addCleanup(checkpointer.close)
+        checkpointer.start()
+        self.assertIsNone(checkpointer.journal)
+        self.assertIsNone(store.find(1))
+
+        old.close()
+        deadline = time.monotonic() + 5
+        while checkpointer.journal is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertIsNotNone(checkpointer.journal)
+        self.assertEqual(store.find(1).game_state, GameState_e.PAUSED)
+        self.assertEqual(store.find(2).game_state, GameState_e.IDLE)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), '需要 os.fork')
+    def test_forked_child_starts_own_journal(self):
+        """测试fork出的子进程不使用父进程的日志，父进程关闭日志前等待"""
+        checkpointer = Checkpointer(LocalGameStore(), self.path, slot_count=2, interval=60)
+        self.addCleanup(checkpointer.close)
+        checkpointer.start()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                checkpointer.start()
+                os.write(write, b'waiting' if checkpointer.journal is None else b'opened')
+                checkpointer.close()
+            finally:
+                os._exit(0)
+        os.close(write)
+        os.waitpid(pid, 0)
+        with os.fdopen(read, 'rb') as f:
+            self.assertEqual(f.read(), b'waiting')
+        self.assertEqual(checkpointer.journal.path, self.path)
+        self.assertFalse(checkpointer.journal.closed)
+
+    def test_full_journal(self):
+        """测试槽位用完时不写入"""
+        journal = self.open(slot_count=1)
+
+        self.assertTrue(journal.write(1, make_game()))
+        self.assertFalse(journal.write(2, make_game()))
+
+    def test_format_mismatch_discarded(self):
+        """测试槽位数不一致时丢弃已有内容"""
+        journal = self.open(slot_count=2)
+        journal.write(1, make_game())
+        journal.close()
+
+        with self.assertLogs('game.journal', 'WARNING'):
+            journal = self.open(slot_count=4)
+        self.assertEqual(journal.recover(SnakeGame), {})
+
+    def test_checkpointer_close(self):
+        """测试关闭检查点线程时写入最后一次检查点"""
+        store = LocalGameStore()
+        game = store.get(1)
+        game.reset()
+        game.start()
+        checkpointer = Checkpointer(store, self.path, slot_count=2, interval=60)
+        checkpointer.close()
+        self.assertFalse(os.path.exists(self.path))
+        checkpointer = Checkpointer(store, self.path, slot_count=2, interval=60)
+        checkpointer.start()
+        checkpointer.close()
+
+        recovered = self.open(slot_count=2).recover(SnakeGame)
+        self.assertEqual(recovered[1].game_state, GameState_e.PLAYING)
+
+
+class TestCheckpointApi(unittest.TestCase):
+    """测试开启检查点时重启应用后恢复游戏"""
+
+    def test_game_survives_restart(self):
+        """测试重启应用后游戏接口返回重启前的游戏状态"""
+        with tempfile.TemporaryDirectory() as directory:
+            config = {'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game',),
+                      'GAME_CHECKPOINT_PATH': os.path.join(directory, 'games.journal'),
+                      'GAME_CHECKPOINT_SLOTS': 16, 'GAME_CHECKPOINT_INTERVAL': 60}
+            app = create_app(config)
+            # 创建应用（预加载时在主进程中）不打开日志，由处理请求的进程打开
+            self.assertFalse(os.path.exists(config['GAME_CHECKPOINT_PATH']))
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = 1
+            client.post('/api/game/start')
+            before = client.post('/api/game/pause').get_json()['game_state']
+            app.extensions['game_checkpointer'].close()
+
+            app = create_app(config)
+            self.addCleanup(app.extensions['game_checkpointer'].close)
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = 1
+            after = client.get('/api/game/state').get_json()['game_state']
+
+            self.assertEqual(after, before)
+            self.assertEqual(after['game_state'], 'paused')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
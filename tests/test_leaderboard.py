@@ -0,0 +1,202 @@
+"""
+@file    test_leaderboard.py
+@brief   排行榜单元测试
+@details 测试游标编解码、按用户最高分排名和游标分页、日榜周榜的时间窗口、增量同步和页面缓存失效，
+         以及排行榜接口的参数检查和条件请求
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from database import db, GameScore, UserDAO
+from database.leaderboard import Leaderboard, decode_cursor, encode_cursor, period_start
+
+
+class LeaderboardTestCase(unittest.TestCase):
+    """创建使用内存数据库的应用和三个用户"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game', 'leaderboard')})
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.addCleanup(self.app.extensions['score_queue'].close)
+        self.users = [UserDAO.create_user(name, f'{name}@example.com', 'salt$hash').user_id
+                      for name in ('alice', 'bob', 'carol')]
+
+    def add_scores(self, *scores, finished_at=None):
+        """
+        @brief  直接向成绩表插入成绩
+        @param  scores: (用户ID, 得分) 序列
+        @param  finished_at: 结束时间，默认为当前时间
+        @retval None
+        """
+        for user_id, score in scores:
+            db.session.add(GameScore(user_id=user_id, score=score, grid_width=20, grid_height=20,
+                                     finished_at=finished_at or datetime.utcnow()))
+        db.session.commit()
+
+    def ranking(self, leaderboard, window='global', after=None, limit=20):
+        """
+        @brief  获取一页排名
+        @retval list: (名次, 用户名, 得分) 列表
+        """
+        data = self.app.json.loads(leaderboard.page(window, after, limit).body)
+        return [(entry['rank'], entry['username'], entry['score']) for entry in data['entries']]
+
+
+class TestCursor(unittest.TestCase):
+    """测试分页游标和时间窗口"""
+
+    def test_round_trip(self):
+        """测试游标编码后可以还原排序键"""
+        self.assertEqual(decode_cursor(encode_cursor((-120, 7))), (-120, 7))
+
+    def test_invalid_cursor(self):
+        """测试格式错误的游标"""
+        for cursor in ('!!', 'YWJj', encode_cursor((-1, 1))[:-2]):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_period_start(self):
+        """测试日榜从当天零点、周榜从周一零点开始"""
+        now = datetime(2026, 10, 22, 15, 30)
+        self.assertIsNone(period_start('global', now))
+        self.assertEqual(period_start('daily', now), datetime(2026, 10, 22))
+        self.assertEqual(period_start('weekly', now), datetime(2026, 10, 19))
+
+
+class TestLeaderboard(LeaderboardTestCase):
+    """测试排行榜"""
+
+    def test_best_score_per_user(self):
+        """测试每个用户只按最高分排名，同分按用户ID排序"""
+        alice, bob, carol = self.users
+        self.add_scores((alice, 30), (bob, 50), (alice, 70), (carol, 50))
+
+        self.assertEqual(self.ranking(Leaderboard(self.app)),
+                         [(1, 'alice', 70), (2, 'bob', 50), (3, 'carol', 50)])
+
+    def test_cursor_pagination(self):
+        """测试按游标逐页读取，满页返回下一页游标"""
+        alice, bob, carol = self.users
+        self.add_scores((alice, 10), (bob, 20), (carol, 30))
+        leaderboard = Leaderboard(self.app)
+
+        first = self.app.json.loads(leaderboard.page('global', None, 2).body)
+        self.assertEqual([entry['username'] for entry in first['entries']], ['carol', 'bob'])
+        after = decode_cursor(first['next_cursor'])
+        self.assertEqual(self.ranking(leaderboard, after=after, limit=2), [(3, 'alice', 10)])
+        self.assertIsNone(self.app.json.loads(leaderboard.page('global', after, 2).body)['next_cursor'])
+
+    def test_time_windows(self):
+        """测试日榜和周榜只包含时间段内的成绩"""
+        alice, bob, carol = self.users
+        now = datetime.utcnow()
+        self.add_scores((alice, 90), finished_at=period_start('weekly', now) - timedelta(seconds=1))
+        self.add_scores((bob, 40), finished_at=period_start('daily', now))
+        self.add_scores((carol, 20))
+        leaderboard = Leaderboard(self.app)
+
+        self.assertEqual([name for _, name, _ in self.ranking(leaderboard, 'global')], ['alice', 'bob', 'carol'])
+        self.assertEqual([name for _, name, _ in self.ranking(leaderboard, 'weekly')], ['bob', 'carol'])
+        self.assertEqual([name for _, name, _ in self.ranking(leaderboard, 'daily')], ['bob', 'carol'])
+
+    def test_sync_only_when_stale(self):
+        """测试未标记新成绩且未到同步间隔时不查询数据库，标记后增量同步"""
+        alice, bob, _ = self.users
+        self.add_scores((alice, 10))
+        leaderboard = Leaderboard(self.app, sync_interval=60)
+        self.ranking(leaderboard)
+        self.add_scores((bob, 20))
+
+        self.assertEqual(len(self.ranking(leaderboard)), 1)
+        self.assertEqual(leaderboard.syncs, 1)
+        leaderboard.mark_stale()
+        self.assertEqual(self.ranking(leaderboard), [(1, 'bob', 20), (2, 'alice', 10)])
+        self.assertEqual(leaderboard.syncs, 2)
+
+    def test_unchanged_pages_stay_cached(self):
+        """测试排名变化只使变化位置及之后的页面失效"""
+        alice, bob, carol = self.users
+        self.add_scores((alice, 30), (bob, 20), (carol, 10))
+        leaderboard = Leaderboard(self.app, sync_interval=60)
+        top = leaderboard.page('global', None, 1)
+        rest = leaderboard.page('global', (-30, alice), 2)
+
+        self.add_scores((carol, 25))
+        leaderboard.mark_stale()
+        self.assertIs(leaderboard.page('global', None, 1), top)
+        self.assertEqual(self.ranking(leaderboard, after=(-30, alice), limit=2), [(2, 'carol', 25), (3, 'bob', 20)])
+        self.assertIsNot(leaderboard.page('global', (-30, alice), 2), rest)
+
+        self.add_scores((bob, 40))
+        leaderboard.mark_stale()
+        self.assertEqual(self.ranking(leaderboard, limit=1), [(1, 'bob', 40)])
+
+    def test_lower_score_keeps_pages(self):
+        """测试低于用户最高分的成绩不改变排名和页面"""
+        alice = self.users[0]
+        self.add_scores((alice, 50))
+        leaderboard = Leaderboard(self.app)
+        page = leaderboard.page('global')
+
+        self.add_scores((alice, 10))
+        leaderboard.mark_stale()
+        self.assertIs(leaderboard.page('global'), page)
+        self.assertEqual(leaderboard.syncs, 2)
+
+
+class TestLeaderboardApi(LeaderboardTestCase):
+    """测试排行榜接口"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        super().setUp()
+        self.client = self.app.test_client()
+
+    def test_invalid_params(self):
+        """测试错误的时间窗口和游标返回400"""
+        self.assertEqual(self.client.get('/api/leaderboard?window=monthly').status_code, 400)
+        self.assertEqual(self.client.get('/api/leaderboard?cursor=@@').status_code, 400)
+
+    def test_conditional_get(self):
+        """测试页面未变化时 If-None-Match 和 If-Modified-Since 返回304"""
+        self.add_scores((self.users[0], 10))
+        response = self.client.get('/api/leaderboard?window=daily')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        etag = response.headers['ETag']
+
+        self.assertEqual(self.client.get('/api/leaderboard?window=daily',
+                                         headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.get('/api/leaderboard?window=daily', headers={
+            'If-Modified-Since': response.headers['Last-Modified']}).status_code, 304)
+        self.assertEqual(self.client.get('/api/leaderboard?window=daily',
+                                         headers={'If-None-Match': '"stale"'}).status_code, 200)
+
+    def test_queue_flush_updates_ranking(self):
+        """测试成绩队列写入后排行榜立即包含新成绩，ETag随之变化"""
+        bob = self.users[1]
+        etag = self.client.get('/api/leaderboard').headers['ETag']
+        queue = self.app.extensions['score_queue']
+        queue.submit(bob, 60, 6, 1000, 20, 20)
+        queue.flush()
+
+        response = self.client.get('/api/leaderboard', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['entries'], [{'rank': 1, 'user_id': bob, 'username': 'bob',
+                                                            'score': 60}])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,167 @@
+"""
+@file    test_metrics.py
+@brief   请求指标采集单元测试
+@details 测试指标注册表、文本导出格式以及 /metrics 接口
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from monitoring.metrics import MetricsRegistry, RateMeter
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """测试指标注册表"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.registry = MetricsRegistry()
+
+    def test_counter_merges_thread_buckets(self):
+        """测试多个线程的计数会合并"""
+        counter = self.registry.counter('test_total', '测试计数', ('route',))
+
+        def worker():
+            for _ in range(100):
+                counter.inc(('/a',))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.registry.collect()['test_total'][('/a',)], 400)
+
+    def test_exited_thread_buckets_retired(self):
+        """测试已退出线程的桶合并为一份汇总，桶的数量不随线程数增长"""
+        counter = self.registry.counter('test_total', '测试计数')
+        histogram = self.registry.histogram('test_seconds', '测试直方图', buckets=(0.1, 1.0))
+        histogram.observe(0.5)
+
+        def worker():
+            counter.inc()
+            histogram.observe(0.05)
+
+        for _ in range(200):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        self.assertLessEqual(len(self.registry._buckets), 2)
+        merged = self.registry.collect()
+        self.assertEqual(merged['test_total'][()], 200)
+        self.assertEqual(merged['test_seconds'][()][:3], [200, 1, 0])
+        self.assertEqual(merged['test_seconds'][()][-1], 201)
+
+    def test_gauge_inc_dec(self):
+        """测试仪表增减"""
+        gauge = self.registry.gauge('test_in_flight', '测试仪表')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        self.assertEqual(self.registry.collect()['test_in_flight'][()], 1)
+
+    def test_histogram_render_is_cumulative(self):
+        """测试直方图导出为累计桶"""
+        histogram = self.registry.histogram('test_seconds', '测试直方图', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = self.registry.render()
+
+        self.assertIn('# TYPE test_seconds histogram', text)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('test_seconds_count 3', text)
+
+    def test_label_values_are_escaped(self):
+        """测试标签值转义"""
+        counter = self.registry.counter('test_escape_total', '测试转义', ('route',))
+        counter.inc(('a"b',))
+
+        self.assertIn('test_escape_total{route="a\\"b"} 1', self.registry.render())
+
+    def test_callback_gauge(self):
+        """测试回调仪表"""
+        self.registry.callback_gauge('test_active', '测试回调', lambda: 7)
+
+        self.assertIn('test_active 7', self.registry.render())
+
+    def test_duplicate_registration_returns_same_metric(self):
+        """测试重复登记返回同一指标"""
+        first = self.registry.counter('test_dup_total', '重复')
+        second = self.registry.counter('test_dup_total', '重复')
+
+        self.assertIs(first, second)
+
+    def test_rate_meter_empty(self):
+        """测试无事件时速率为0"""
+        self.assertEqual(RateMeter().rate(), 0)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """测试 /metrics 接口"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_metrics_endpoint_returns_text(self):
+        """测试指标接口返回文本格式"""
+        response = self.app.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+
+    def test_request_is_recorded_per_route(self):
+        """测试请求按路由记录"""
+        self.app.get('/api/auth/social/status')
+
+        text = self.app.get('/metrics').get_data(as_text=True)
+
+        self.assertIn(
+            'snake_game_http_responses_total{route="/api/auth/social/status",method="GET",status="200"}',
+            text
+        )
+        self.assertIn('snake_game_http_request_duration_seconds_bucket{route="/api/auth/social/status"', text)
+        self.assertIn('snake_game_http_response_size_bytes_count{route="/api/auth/social/status"', text)
+
+    def test_unmatched_route_label(self):
+        """测试未匹配路由使用固定标签"""
+        self.app.get('/no/such/path')
+
+        text = self.app.get('/metrics').get_data(as_text=True)
+
+        self.assertIn('route="<unmatched>",method="GET",status="404"', text)
+
+    def test_in_flight_returns_to_zero(self):
+        """测试请求结束后并发数归零"""
+        self.app.get('/api/auth/social/status')
+
+        text = self.app.get('/metrics').get_data(as_text=True)
+
+        self.assertIn('snake_game_http_requests_in_flight{route="/api/auth/social/status"} 0', text)
+
+    def test_engine_gauges_exported(self):
+        """测试导出游戏引擎指标"""
+        text = self.app.get('/metrics').get_data(as_text=True)
+
+        self.assertIn('snake_game_active_games', text)
+        self.assertIn('snake_game_ticks_per_second', text)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,107 @@
+"""
+@file    test_page_cache.py
+@brief   页面渲染缓存单元测试
+@details 测试上下文规范化、缓存命中、容量上限和ETag/304
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from routes.page_cache import PageCache, normalize_context
+
+
+class TestNormalizeContext(unittest.TestCase):
+    """测试上下文规范化"""
+
+    def test_equivalent_contexts_share_key(self):
+        """测试键顺序不同的上下文得到相同的键"""
+        self.assertEqual(normalize_context({'message': 'hi', 'a': None}),
+                         normalize_context({'a': None, 'message': 'hi'}))
+
+    def test_different_values_different_key(self):
+        """测试渲染结果可能不同的值不共用缓存键"""
+        self.assertNotEqual(normalize_context({'message': ' hi '}), normalize_context({'message': 'hi'}))
+        self.assertNotEqual(normalize_context({'message': None}), normalize_context({'message': ''}))
+
+    def test_long_values_not_cached(self):
+        """测试有超长参数的上下文不缓存"""
+        self.assertIsNone(normalize_context({'message': 'x' * 1000}))
+        self.assertIsNotNone(normalize_context({'message': 'x' * 200}))
+
+
+class TestPageCache(unittest.TestCase):
+    """测试页面缓存"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('pages', 'auth')})
+        self.cache = self.app.extensions['page_cache']
+        self.client = self.app.test_client()
+
+    def test_pages_prerendered_at_startup(self):
+        """测试启动时已预渲染常见页面"""
+        misses = self.cache.misses
+        self.client.get('/login')
+        self.client.get('/register')
+        self.client.get('/')
+
+        self.assertEqual(self.cache.misses, misses)
+
+    def test_message_rendered_and_escaped(self):
+        """测试登录页消息参数被渲染并转义"""
+        response = self.client.get('/login?message=<b>hi</b>')
+
+        self.assertIn(b'&lt;b&gt;hi&lt;/b&gt;', response.data)
+
+    def test_long_message_rendered_intact(self):
+        """测试超长消息参数完整渲染且不进入缓存"""
+        entries = len(self.cache)
+        message = 'x' * 300 + 'end'
+        response = self.client.get('/login?message=' + message)
+
+        self.assertIn(message.encode(), response.data)
+        self.assertEqual(len(self.cache), entries)
+
+    def test_if_none_match_returns_304(self):
+        """测试ETag匹配时返回304"""
+        etag = self.client.get('/login').headers['ETag']
+        response = self.client.get('/login', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_different_context_different_etag(self):
+        """测试上下文不同的页面ETag不同"""
+        first = self.client.get('/login').headers['ETag']
+        second = self.client.get('/login?message=hello').headers['ETag']
+
+        self.assertNotEqual(first, second)
+
+    def test_bounded(self):
+        """测试缓存数量不超过上限"""
+        cache = PageCache(max_entries=2)
+        with self.app.test_request_context():
+            for message in ('a', 'b', 'c'):
+                cache.get('login.html', message=message)
+
+        self.assertEqual(len(cache), 2)
+
+    def test_auto_reload_bypasses_cache(self):
+        """测试模板自动重新加载时不使用缓存"""
+        self.app.jinja_env.auto_reload = True
+        misses = self.cache.misses
+        self.client.get('/register')
+
+        self.assertEqual(self.cache.misses, misses)
+        self.assertEqual(self.client.get('/register').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
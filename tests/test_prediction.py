@@ -0,0 +1,129 @@
+"""
+@file    test_prediction.py
+@brief   客户端预测单元测试
+@details 测试 static/js/game.js 中的本地预测与服务端 SnakeGame 的规则和常量一致，
+         以及更新接口批量接收方向输入
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import json
+import re
+import random
+import shutil
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app
+from game.snake_game import FOOD_SCORE, SnakeGame
+
+# 加载 static/js/game.js 中客户端类之前的函数，按标准输入中的命令调用并输出JSON结果
+NODE_PREDICT = """
+const source = require('fs').readFileSync(process.argv[1], 'utf8');
+eval(source.split('// 定义贪吃蛇游戏客户端类')[0] + ';globalThis.replayInputs = replayInputs;');
+const request = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify(request.map(r => replayInputs(r.state, r.inputs, r.local_tick))));
+"""
+
+
+def _state(game):
+    """把 get_state() 结果转换为JSON解析后的形式（元组变为列表）"""
+    return json.loads(json.dumps(game.get_state()))
+
+
+@unittest.skipUnless(shutil.which('node'), '未安装Node.js')
+class TestReplayMatchesServer(unittest.TestCase):
+    """测试客户端重放输入的结果与服务端一致"""
+
+    def test_random_games(self):
+        """测试随机输入下本地预测与服务端逐步更新的结果相同"""
+        rng = random.Random(7)
+        requests, expected = [], []
+        for _ in range(40):
+            game = SnakeGame()
+            game.reset()
+            game.start()
+            # 食物放在预测范围之外，避免服务端随机生成的新食物影响比较
+            game.food_position = (0, 0)
+            start = _state(game)
+            inputs, input_id = [], 0
+            steps = rng.randint(1, 8)
+            for tick in range(1, steps + 1):
+                for _ in range(rng.randint(0, 2)):
+                    input_id += 1
+                    inputs.append({'id': input_id, 'tick': tick, 'direction': rng.choice(['up', 'down', 'left', 'right'])})
+            for tick in range(1, steps + 1):
+                game.apply_inputs([(i['id'], i['tick'], i['direction']) for i in inputs])
+                if game.game_state.value != 'playing':
+                    break
+                game.update()
+            requests.append({'state': start, 'inputs': inputs, 'local_tick': steps})
+            expected.append(_state(game))
+
+        output = subprocess.run(
+            ['node', '-e', NODE_PREDICT, os.path.join(PROJECT_ROOT, 'static', 'js', 'game.js')],
+            input=json.dumps(requests), capture_output=True, text=True, check=True
+        ).stdout
+        for result, server in zip(json.loads(output), expected):
+            if server['game_state'] == 'game_over':
+                # 预测撞到时停在撞前的位置
+                self.assertEqual(result['state']['snake_body'], server['snake_body'])
+                continue
+            self.assertEqual(result['state']['snake_body'], server['snake_body'])
+            self.assertEqual(result['state']['direction'], server['direction'])
+            self.assertEqual(result['state']['tick'], server['tick'])
+
+
+class TestUpdateInputs(unittest.TestCase):
+    """测试更新接口批量接收方向输入"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game',)})
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = 1
+        self.client.post('/api/game/start')
+
+    def test_inputs_applied_before_update(self):
+        """测试输入在这一步移动之前生效，并返回确认编号"""
+        head = self.client.get('/api/game/state').get_json()['game_state']['snake_body'][0]
+        state = self.client.post('/api/game/update', json={'inputs': [[1, 1, 'up']]}).get_json()['game_state']
+
+        self.assertEqual(state['snake_body'][0], [head[0], head[1] - 1])
+        self.assertEqual((state['tick'], state['input_ack']), (1, 1))
+
+    def test_malformed_inputs_ignored(self):
+        """测试格式不正确的输入被忽略"""
+        response = self.client.post('/api/game/update', json={'inputs': [['x', 1, 'up'], [1, 1], 5]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['game_state']['input_ack'], 0)
+
+    def test_update_without_body(self):
+        """测试不带请求体的更新仍然有效"""
+        state = self.client.post('/api/game/update').get_json()['game_state']
+
+        self.assertEqual(state['tick'], 1)
+
+
+
+class TestSharedConstants(unittest.TestCase):
+    """测试客户端常量与服务端一致"""
+
+    def test_food_score(self):
+        """测试 game.js 中的 FOOD_SCORE 与服务端相同"""
+        with open(os.path.join(PROJECT_ROOT, 'static', 'js', 'game.js'), encoding='utf-8') as f:
+            match = re.search(r'^const FOOD_SCORE = (\d+);$', f.read(), re.M)
+
+        self.assertIsNotNone(match)
+        self.assertEqual(int(match.group(1)), FOOD_SCORE)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,160 @@
+"""
+@file    test_profiler.py
+@brief   按需请求剖析单元测试
+@details 测试管理员令牌触发、两种剖析方式的折叠栈输出及目录轮转
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import time
+import shutil
+import pstats
+import cProfile
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from monitoring.profiler import (
+    init_profiler, cprofile_to_collapsed, convert_pstats, ProfileStore,
+    TOKEN_HEADER, MODE_HEADER, FILE_HEADER, MAX_COLLAPSED_PATHS
+)
+
+
+def _busy_work():
+    """制造可被剖析到的耗时"""
+    total = 0
+    for i in range(20000):
+        total += i * i
+    return total
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """测试请求剖析钩子"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.profile_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            PROFILE_ADMIN_TOKEN='secret',
+            PROFILE_DIR=self.profile_dir,
+            PROFILE_MAX_FILES=2
+        )
+
+        @self.app.route('/work')
+        def work():
+            _busy_work()
+            time.sleep(0.01)
+            return 'ok'
+
+        self.profiler = init_profiler(self.app)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """每个测试后的清理"""
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def _read(self, filename):
+        with open(os.path.join(self.profile_dir, filename), encoding='utf-8') as f:
+            return f.read()
+
+    def test_disabled_without_configuration(self):
+        """测试未配置时不启用"""
+        self.assertIsNone(init_profiler(Flask(__name__)))
+
+    def test_request_without_token_not_profiled(self):
+        """测试无令牌请求不剖析"""
+        response = self.client.get('/work')
+
+        self.assertNotIn(FILE_HEADER, response.headers)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_wrong_token_not_profiled(self):
+        """测试错误令牌不剖析"""
+        response = self.client.get('/work', headers={TOKEN_HEADER: 'wrong'})
+
+        self.assertNotIn(FILE_HEADER, response.headers)
+
+    def test_cprofile_saves_stats_for_conversion(self):
+        """测试cProfile方式在请求中只保存 .pstats，之后转换为折叠栈"""
+        response = self.client.get('/work', headers={TOKEN_HEADER: 'secret'})
+
+        filename = response.headers[FILE_HEADER]
+        self.assertTrue(filename.endswith('-work-cprofile.pstats'))
+        folded = convert_pstats(os.path.join(self.profile_dir, filename))
+        self.assertTrue(folded.endswith('-work-cprofile.folded'))
+        content = self._read(os.path.basename(folded))
+        self.assertIn('_busy_work', content)
+        for line in content.strip().splitlines():
+            stack, weight = line.rsplit(' ', 1)
+            self.assertTrue(weight.isdigit())
+
+    def test_sample_mode_writes_collapsed_stacks(self):
+        """测试统计采样方式输出折叠栈"""
+        response = self.client.get('/work', headers={TOKEN_HEADER: 'secret', MODE_HEADER: 'sample'})
+
+        filename = response.headers[FILE_HEADER]
+        self.assertTrue(filename.endswith('-work-sample.folded'))
+        self.assertIn('work (tests/test_profiler.py', self._read(filename))
+
+    def test_directory_is_bounded(self):
+        """测试输出目录文件数有上限"""
+        for _ in range(4):
+            self.client.get('/work', headers={TOKEN_HEADER: 'secret'})
+
+        self.assertEqual(len(os.listdir(self.profile_dir)), 2)
+
+
+class TestCollapsedConversion(unittest.TestCase):
+    """测试cProfile结果转换"""
+
+    def test_nested_calls_form_stack(self):
+        """测试嵌套调用形成完整栈"""
+        profile = cProfile.Profile()
+        profile.enable()
+        _busy_work()
+        profile.disable()
+
+        collapsed = cprofile_to_collapsed(profile)
+
+        self.assertTrue(any(stack[-1].startswith('_busy_work') for stack in collapsed))
+
+    def test_dense_call_graph_is_bounded(self):
+        """测试调用路径随调用图指数增长时转换仍很快结束，总耗时基本不丢失"""
+        # 40个函数，每个函数调用编号比它大的所有函数，根到叶的路径数为 2^38
+        count = 40
+        funcs = [('module.py', i, f'f{i}') for i in range(count)]
+        cumulative = [0.0] * count
+        entries = {}
+        for i in reversed(range(count)):
+            cumulative[i] = 0.001 + sum(cumulative[j] / j for j in range(i + 1, count))
+        for j, func in enumerate(funcs):
+            callers = {funcs[i]: (1, 1, 0.0, cumulative[j] / j) for i in range(j)}
+            entries[func] = (1, 1, 0.001, cumulative[j], callers)
+        stats = pstats.Stats()
+        stats.stats = entries
+
+        start = time.perf_counter()
+        collapsed = cprofile_to_collapsed(stats)
+
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertLessEqual(len(collapsed), MAX_COLLAPSED_PATHS)
+        self.assertAlmostEqual(sum(collapsed.values()) / 1e6, cumulative[0], delta=cumulative[0] * 0.05)
+
+    def test_store_sanitizes_name(self):
+        """测试文件名中的非法字符被替换"""
+        directory = tempfile.mkdtemp()
+        try:
+            filename = ProfileStore(directory).write('a/b c', {('f',): 1})
+            self.assertTrue(filename.endswith('-a_b_c.folded'))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,159 @@
+"""
+@file    test_score_queue.py
+@brief   游戏成绩写回队列单元测试
+@details 测试成绩按批插入、同一用户的写入顺序、队列满时的等待和放弃、写入失败后的重试，
+         以及游戏结束后成绩经队列写入 game_scores 表
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from database import db, GameScore
+from database.score_queue import ScoreQueue
+
+
+class ScoreQueueTestCase(unittest.TestCase):
+    """创建使用内存数据库的应用"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('auth', 'game')})
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.addCleanup(self.app.extensions['score_queue'].close)
+
+    def create_queue(self, **kwargs):
+        """
+        @brief  创建不自动写入的成绩队列
+        @retval ScoreQueue: 成绩队列
+        """
+        kwargs.setdefault('flush_interval', 60)
+        queue = ScoreQueue(self.app, **kwargs)
+        self.addCleanup(queue.close)
+        return queue
+
+    def rows(self):
+        """
+        @brief  按成绩ID顺序读取成绩表
+        @retval list: (用户ID, 得分) 列表
+        """
+        db.session.rollback()
+        return [(row.user_id, row.score) for row in GameScore.query.order_by(GameScore.score_id)]
+
+
+class TestScoreQueue(ScoreQueueTestCase):
+    """测试成绩写回队列"""
+
+    def test_flush_in_batches_in_order(self):
+        """测试按批大小分事务写入，同一用户的成绩ID与入队顺序一致"""
+        queue = self.create_queue(batch_size=3, capacity=100)
+        for score in range(7):
+            queue.submit(score % 2 + 1, score * 10, score, 100, 20, 20)
+
+        self.assertEqual(queue.flush(), 7)
+        self.assertEqual(queue.batches_written, 3)
+        self.assertEqual(self.rows(), [(score % 2 + 1, score * 10) for score in range(7)])
+        self.assertEqual(len(queue), 0)
+
+    def test_full_queue_rejects_after_timeout(self):
+        """测试队列满且写入线程未腾出空位时等待超时后放弃"""
+        queue = self.create_queue(capacity=2, batch_size=100, put_timeout=0.01)
+        with mock.patch.object(queue, '_take', return_value=[]):
+            self.assertTrue(queue.submit(1, 10, 1, 100, 20, 20))
+            self.assertTrue(queue.submit(1, 20, 2, 100, 20, 20))
+            self.assertFalse(queue.submit(1, 30, 3, 100, 20, 20))
+
+        self.assertEqual((queue.rejected, len(queue)), (1, 2))
+
+    def test_full_queue_waits_for_writer(self):
+        """测试队列满时唤醒写入线程，腾出空位后入队成功"""
+        queue = self.create_queue(capacity=2, batch_size=100, put_timeout=5)
+        results = [queue.submit(1, score, 0, 100, 20, 20) for score in range(5)]
+
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual(queue.rejected, 0)
+        queue.close()
+        self.assertEqual(self.rows(), [(1, score) for score in range(5)])
+
+    def test_failed_batch_requeued(self):
+        """测试写入失败时该批按原顺序放回队首"""
+        queue = self.create_queue(batch_size=2)
+        for score in (1, 2, 3):
+            queue.submit(1, score, 0, 100, 20, 20)
+        with mock.patch.object(queue, '_write', side_effect=OperationalError('INSERT', {}, Exception('locked'))):
+            with self.assertRaises(OperationalError):
+                queue.flush()
+        self.assertEqual(len(queue), 3)
+
+        queue.flush()
+        self.assertEqual(self.rows(), [(1, 1), (1, 2), (1, 3)])
+
+    def test_close_writes_remaining(self):
+        """测试关闭时写入剩余成绩"""
+        queue = self.create_queue()
+        queue.submit(4, 50, 5, 100, 20, 20)
+        queue.close()
+
+        self.assertEqual(self.rows(), [(4, 50)])
+
+    def test_concurrent_submitters(self):
+        """测试多个线程同时提交时每个用户的成绩按各自的提交顺序写入"""
+        queue = self.create_queue(capacity=8, batch_size=4, flush_interval=0.01, put_timeout=5)
+
+        def submit(user_id):
+            for score in range(50):
+                queue.submit(user_id, score, 0, 100, 20, 20)
+
+        threads = [threading.Thread(target=submit, args=(user_id,)) for user_id in (1, 2, 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        queue.close()
+
+        rows = self.rows()
+        self.assertEqual(len(rows), 150)
+        for user_id in (1, 2, 3):
+            self.assertEqual([score for uid, score in rows if uid == user_id], list(range(50)))
+
+
+class TestScoreQueueApi(ScoreQueueTestCase):
+    """测试游戏结束后写入成绩"""
+
+    def test_game_over_submits_score(self):
+        """测试一局游戏撞墙结束后成绩经队列写入成绩表"""
+        client = self.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 6
+        client.post('/api/game/start')
+        state = 'playing'
+        for _ in range(50):
+            state = client.post('/api/game/update').get_json()['game_state']['game_state']
+            if state == 'game_over':
+                break
+        self.assertEqual(state, 'game_over')
+        queue = self.app.extensions['score_queue']
+        for _ in range(200):
+            if queue.scores_written:
+                break
+            time.sleep(0.01)
+
+        row = GameScore.query.one()
+        self.assertEqual((row.user_id, row.score, row.grid_width), (6, 0, 20))
+        self.assertGreater(row.play_time_ms, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
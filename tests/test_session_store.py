@@ -0,0 +1,189 @@
+"""
+@file    test_session_store.py
+@brief   服务端会话存储单元测试
+@details 测试内存LRU、SQLite持久层、惰性刷新以及会话接口的Cookie行为
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session
+from database.session_store import (
+    MemorySessionStore, SQLiteSessionSpill, ServerSessionInterface, init_session_store
+)
+
+
+class TestMemorySessionStore(unittest.TestCase):
+    """测试进程内会话存储"""
+
+    def test_save_and_get(self):
+        """测试保存后读取"""
+        store = MemorySessionStore()
+        store.save('a', {'user_id': 1}, False)
+
+        self.assertEqual(store.get('a').data, {'user_id': 1})
+        self.assertIsNone(store.get('missing'))
+
+    def test_evicts_least_recently_refreshed(self):
+        """测试超过容量时淘汰最久未刷新的会话"""
+        store = MemorySessionStore(max_entries=2, refresh_seconds=0)
+        store.save('a', {}, False)
+        store.save('b', {}, False)
+        store.get('a')
+        store.save('c', {}, False)
+
+        self.assertIsNotNone(store.get('a'))
+        self.assertIsNone(store.get('b'))
+
+    def test_lazy_refresh_extends_expiry(self):
+        """测试只在刷新间隔到期后才延长过期时间"""
+        store = MemorySessionStore(refresh_seconds=60, idle_timeout=100)
+        with mock.patch('database.session_store.time.time', return_value=1000.0):
+            store.save('a', {}, False)
+        with mock.patch('database.session_store.time.time', return_value=1030.0):
+            self.assertEqual(store.get('a').expires, 1100.0)
+        with mock.patch('database.session_store.time.time', return_value=1070.0):
+            self.assertEqual(store.get('a').expires, 1170.0)
+
+    def test_expired_session_discarded(self):
+        """测试过期会话不再返回"""
+        store = MemorySessionStore(refresh_seconds=10, idle_timeout=20)
+        with mock.patch('database.session_store.time.time', return_value=1000.0):
+            store.save('a', {}, False)
+        with mock.patch('database.session_store.time.time', return_value=1021.0):
+            self.assertIsNone(store.get('a'))
+        self.assertEqual(len(store), 0)
+
+
+class TestSQLiteSessionSpill(unittest.TestCase):
+    """测试SQLite持久层"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'sessions.db')
+
+    def tearDown(self):
+        """每个测试后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_shared_between_stores(self):
+        """测试两个存储（模拟两个工作进程）通过SQLite共享会话"""
+        first = MemorySessionStore(refresh_seconds=0, spill=SQLiteSessionSpill(self.path))
+        second = MemorySessionStore(refresh_seconds=0, spill=SQLiteSessionSpill(self.path))
+        first.save('a', {'user_id': 7}, True)
+
+        entry = second.get('a')
+        self.assertEqual(entry.data, {'user_id': 7})
+        self.assertTrue(entry.permanent)
+
+        first.delete('a')
+        self.assertIsNone(second.get('a'))
+
+    def test_expired_rows_purged(self):
+        """测试每保存 purge_every 个会话删除一次SQLite中已过期的会话"""
+        spill = SQLiteSessionSpill(self.path)
+        store = MemorySessionStore(idle_timeout=10, spill=spill, purge_every=3)
+        with mock.patch('database.session_store.time.time', return_value=1000.0):
+            store.save('a', {}, False)
+            store.save('b', {}, False)
+        with mock.patch('database.session_store.time.time', return_value=1020.0):
+            store.save('c', {}, False)
+
+        with sqlite3.connect(self.path) as conn:
+            rows = conn.execute('SELECT sid FROM sessions').fetchall()
+        conn.close()
+        self.assertEqual(rows, [('c',)])
+        self.assertEqual(store.purged, 2)
+
+    def test_evicted_session_reloaded(self):
+        """测试被淘汰出内存的会话可以从SQLite重新加载"""
+        store = MemorySessionStore(max_entries=1, spill=SQLiteSessionSpill(self.path))
+        store.save('a', {'user_id': 1}, False)
+        store.save('b', {'user_id': 2}, False)
+
+        self.assertEqual(store.get('a').data, {'user_id': 1})
+
+
+class TestServerSessionInterface(unittest.TestCase):
+    """测试会话接口"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = Flask(__name__)
+        self.app.config['SECRET_KEY'] = 'test'
+        self.store = init_session_store(self.app)
+
+        @self.app.route('/login', methods=['POST'])
+        def login():
+            session['user_id'] = 1
+            session.permanent = True
+            return 'ok'
+
+        @self.app.route('/whoami')
+        def whoami():
+            return str(session.get('user_id'))
+
+        @self.app.route('/logout', methods=['POST'])
+        def logout():
+            session.clear()
+            return 'ok'
+
+        self.client = self.app.test_client()
+
+    def test_cookie_holds_short_id(self):
+        """测试Cookie中只保存短会话ID"""
+        self.client.post('/login')
+        sid = self.client.get_cookie('session').value
+
+        self.assertEqual(len(sid), 22)
+        self.assertEqual(self.store.get(sid).data, {'user_id': 1})
+
+    def test_unmodified_session_not_rewritten(self):
+        """测试未修改会话的请求不重写Cookie"""
+        self.client.post('/login')
+        response = self.client.get('/whoami')
+
+        self.assertEqual(response.get_data(as_text=True), '1')
+        self.assertNotIn('Set-Cookie', response.headers)
+
+    def test_login_rotates_session_id(self):
+        """测试修改会话时更换会话ID"""
+        self.client.post('/login')
+        old_sid = self.client.get_cookie('session').value
+        self.client.post('/login')
+
+        self.assertNotEqual(self.client.get_cookie('session').value, old_sid)
+        self.assertIsNone(self.store.get(old_sid))
+
+    def test_logout_deletes_session(self):
+        """测试登出删除会话和Cookie"""
+        self.client.post('/login')
+        sid = self.client.get_cookie('session').value
+        self.client.post('/logout')
+
+        self.assertIsNone(self.store.get(sid))
+        self.assertIsNone(self.client.get_cookie('session'))
+        self.assertEqual(self.client.get('/whoami').get_data(as_text=True), 'None')
+
+    def test_cookie_backend_opt_out(self):
+        """测试配置为cookie时保留Flask默认会话"""
+        app = Flask(__name__)
+        app.config['SESSION_BACKEND'] = 'cookie'
+
+        self.assertIsNone(init_session_store(app))
+        self.assertNotIsInstance(app.session_interface, ServerSessionInterface)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,21 +1,22 @@
 """
 @file    test_snake_game.py
 @brief   贪吃蛇游戏单元测试
-@details 测试游戏核心逻辑，包括暂停功能测试
+@details 测试游戏核心逻辑，包括暂停功能测试和可配置网格
 @author  AI Assistant
-@date    2026-02-16
-@version V1.0.0
+@date    2026-10-19
+@version V1.1.0
 """
 
 import unittest
 import os
 import json
 import sys
+import tracemalloc
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from game.snake_game import SnakeGame, Direction_e, GameState_e
+from game.snake_game import SnakeGame, Direction_e, GameState_e, PackedBody
 
 
 class TestSnakeGameInit(unittest.TestCase):
@@ -284,6 +285,58 @@ class TestSnakeGameDirection(unittest.TestCase):
         self.assertEqual(self.game.next_direction, Direction_e.RIGHT)
 
 
+class TestSnakeGameInputs(unittest.TestCase):
+    """测试批量方向输入"""
+    
+    def setUp(self):
+        """每个测试前的设置"""
+        self.game = SnakeGame()
+        self.game.reset()
+        self.game.start()
+    
+    def test_tick_counts_updates(self):
+        """测试步数随更新递增，重置后归零"""
+        self.game.update()
+        self.game.update()
+        self.assertEqual(self.game.get_state()['tick'], 2)
+        
+        self.game.reset()
+        self.assertEqual((self.game.tick, self.game.input_ack), (0, 0))
+    
+    def test_inputs_applied_in_order(self):
+        """测试输入按顺序应用并确认最大编号"""
+        self.game.apply_inputs([(1, 1, 'up'), (2, 1, 'down')])
+        
+        self.assertEqual(self.game.next_direction, Direction_e.DOWN)
+        self.assertEqual(self.game.input_ack, 2)
+    
+    def test_resent_inputs_skipped(self):
+        """测试已确认的重发输入被跳过"""
+        self.game.apply_inputs([(1, 1, 'up')])
+        self.game.update()
+        self.game.apply_inputs([(1, 1, 'up'), (2, 2, 'right')])
+        
+        self.assertEqual(self.game.next_direction, Direction_e.RIGHT)
+        self.assertEqual(self.game.input_ack, 2)
+    
+    def test_future_inputs_held(self):
+        """测试目标步数晚于下一步的输入留到之后再应用"""
+        self.game.apply_inputs([(1, 1, 'up'), (2, 3, 'left')])
+        self.assertEqual((self.game.next_direction, self.game.input_ack), (Direction_e.UP, 1))
+        
+        self.game.update()
+        self.game.update()
+        self.game.apply_inputs([(2, 3, 'left')])
+        self.assertEqual((self.game.next_direction, self.game.input_ack), (Direction_e.LEFT, 2))
+    
+    def test_inputs_ignored_when_paused(self):
+        """测试暂停时不接受输入"""
+        self.game.toggle_pause()
+        self.game.apply_inputs([(1, 1, 'up')])
+        
+        self.assertEqual((self.game.next_direction, self.game.input_ack), (Direction_e.RIGHT, 0))
+
+
 class TestSnakeGameCollision(unittest.TestCase):
     """测试碰撞检测"""
     
@@ -312,6 +365,15 @@ class TestSnakeGameCollision(unittest.TestCase):
         """测试有效位置无碰撞"""
         self.assertFalse(self.game._check_collision((5, 5)))
 
+    def test_update_reports_game_over_once(self):
+        """测试只有使游戏结束的那次 update() 返回True"""
+        self.game.start()
+        results = [self.game.update() for _ in range(self.game.grid_width)]
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(self.game.game_state, GameState_e.GAME_OVER)
+        self.assertFalse(self.game.update())
+
 
 class TestSnakeGameScore(unittest.TestCase):
     """测试得分系统"""
@@ -386,6 +448,75 @@ class TestSnakeGameGetState(unittest.TestCase):
             self.assertIn(field, state)
 
 
+class TestSnakeGameBoard(unittest.TestCase):
+    """测试可配置网格和紧凑表示"""
+    
+    def test_invalid_config_rejected(self):
+        """测试无效的网格配置被拒绝"""
+        for kwargs in ({'grid_width': 4}, {'grid_height': 2000}, {'speed': 5},
+                       {'initial_length': 0}, {'grid_width': 10, 'initial_length': 7}, {'grid_width': 20.0}):
+            with self.assertRaises(ValueError):
+                SnakeGame(**kwargs)
+    
+    def test_custom_board(self):
+        """测试自定义网格尺寸和初始长度"""
+        game = SnakeGame(grid_width=30, grid_height=10, speed=100, initial_length=5)
+        game.reset()
+        state = game.get_state()
+        
+        self.assertEqual(state['snake_body'], [(15 - i, 5) for i in range(5)])
+        self.assertEqual((state['grid_width'], state['grid_height'], game.speed), (30, 10, 100))
+        self.assertNotIn(state['food_position'], state['snake_body'])
+    
+    def test_large_board_memory(self):
+        """测试1024x1024网格的游戏实例只占几KB内存"""
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        before = tracemalloc.get_traced_memory()[0]
+        game = SnakeGame(grid_width=1024, grid_height=1024)
+        game.reset()
+        game.start()
+        for _ in range(50):
+            game.update()
+        
+        self.assertEqual(game.game_state, GameState_e.PLAYING)
+        self.assertLess(tracemalloc.get_traced_memory()[0] - before, 8 * 1024)
+    
+    def test_food_on_nearly_full_board(self):
+        """测试网格几乎占满时食物放在唯一的空格子"""
+        game = SnakeGame(grid_width=5, grid_height=5)
+        game.snake_body = [(x, y) for y in range(5) for x in range(5)][:-1]
+        game._spawn_food()
+        
+        self.assertEqual(game.food_position, (4, 4))
+    
+    def test_follow_own_tail(self):
+        """测试蛇头进入本步移开的蛇尾不算碰撞"""
+        game = SnakeGame()
+        game.reset()
+        game.start()
+        game.snake_body = [(5, 5), (5, 6), (6, 6), (6, 5)]
+        game.food_position = (0, 0)
+        game.set_direction('right')
+        game.update()
+        
+        self.assertEqual(game.game_state, GameState_e.PLAYING)
+        self.assertEqual(game.snake_body, [(6, 5), (5, 5), (5, 6), (6, 6)])
+    
+    def test_body_grows_past_capacity(self):
+        """测试蛇身超过环形缓冲区容量后保持顺序"""
+        body = PackedBody([3, 2, 1])
+        for cell in range(4, 40):
+            body.push_head(cell)
+            if cell % 3 == 0:
+                body.pop_tail()
+        
+        expected = list(range(39, 0, -1))[:len(body)]
+        self.assertEqual(body.to_list(), expected)
+        self.assertEqual((body.head(), body.tail()), (39, expected[-1]))
+        self.assertNotIn(1, body)
+
+
 if __name__ == '__main__':
     # 运行测试
     unittest.main(verbosity=2)
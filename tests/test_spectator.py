@@ -0,0 +1,196 @@
+"""
+@file    test_spectator.py
+@brief   观战广播单元测试
+@details 测试观战者有界队列的降级与断开、每帧只编码一次的扇出、不编码更新到一半的状态，以及观战接口
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import json
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from game.snake_game import GameState_e
+from game.store import LocalGameStore
+from game.spectator import SpectatorHub, Subscriber
+
+
+class TestSubscriber(unittest.TestCase):
+    """测试观战者帧队列"""
+
+    def test_frames_in_order(self):
+        """测试未积压时逐帧接收"""
+        subscriber = Subscriber(1, max_queue=4)
+        for frame in (b'a', b'b'):
+            subscriber.offer(frame)
+
+        self.assertEqual([subscriber.next_frame(0), subscriber.next_frame(0)], [b'a', b'b'])
+        self.assertIsNone(subscriber.next_frame(0))
+
+    def test_downgrade_to_latest_frame(self):
+        """测试队列满时降级为只保留最新帧"""
+        subscriber = Subscriber(1, max_queue=2)
+        for frame in (b'a', b'b', b'c', b'd'):
+            self.assertTrue(subscriber.offer(frame))
+
+        self.assertTrue(subscriber.keyframes_only)
+        self.assertEqual(subscriber.next_frame(0), b'd')
+        self.assertIsNone(subscriber.next_frame(0))
+
+    def test_recover_after_catching_up(self):
+        """测试取走积压帧后恢复逐帧接收"""
+        subscriber = Subscriber(1, max_queue=1)
+        subscriber.offer(b'a')
+        subscriber.offer(b'b')
+        subscriber.next_frame(0)
+        subscriber.offer(b'c')
+
+        self.assertFalse(subscriber.keyframes_only)
+        self.assertEqual(subscriber.skipped, 0)
+
+    def test_drop_persistent_laggard(self):
+        """测试降级后仍持续落后的观战者被断开"""
+        subscriber = Subscriber(1, max_queue=1, max_skipped=3)
+        results = [subscriber.offer(bytes([i])) for i in range(6)]
+
+        self.assertFalse(results[-1])
+        self.assertTrue(subscriber.closed)
+        self.assertIsNone(subscriber.next_frame(1))
+
+
+class TestSpectatorHub(unittest.TestCase):
+    """测试观战广播中心"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.store = LocalGameStore()
+        self.game = self.store.get(1)
+        self.game.reset()
+        self.game.start()
+        self.encoded = 0
+
+        def encode(game):
+            self.encoded += 1
+            return b'frame %d' % game.seq
+
+        # 广播间隔很长，由测试手动调用 poll_once()
+        self.hub = SpectatorHub(self.store, encode=encode, poll_interval=3600)
+        self.addCleanup(self.hub.close)
+
+    def test_subscriber_gets_current_frame(self):
+        """测试订阅后立即收到当前画面"""
+        subscriber = self.hub.subscribe(1)
+
+        self.assertEqual(subscriber.next_frame(0), b'frame %d' % self.game.seq)
+
+    def test_encode_once_for_all_subscribers(self):
+        """测试每个新帧只编码一次，所有观战者收到同一个对象"""
+        subscribers = [self.hub.subscribe(1) for _ in range(5)]
+        for subscriber in subscribers:
+            subscriber.next_frame(0)
+        self.game.update()
+        encoded = self.encoded
+
+        self.assertEqual(self.hub.poll_once(), 1)
+        frames = [subscriber.next_frame(0) for subscriber in subscribers]
+        self.assertEqual(self.encoded, encoded + 1)
+        self.assertTrue(all(frame is frames[0] for frame in frames))
+
+    def test_no_frame_without_change(self):
+        """测试状态未变化时不编码"""
+        self.hub.subscribe(1)
+        encoded = self.encoded
+
+        self.assertEqual(self.hub.poll_once(), 0)
+        self.assertEqual(self.encoded, encoded)
+
+    def test_frame_waits_for_update(self):
+        """测试广播等待进行中的更新完成，不编码更新到一半的状态"""
+        subscriber = self.hub.subscribe(1)
+        subscriber.next_frame(0)
+        self.hub.encode = lambda game: game.game_state.value.encode()
+        with self.game.lock:
+            # 模拟 update() 已递增序号、尚未设置游戏结束
+            self.game.seq += 1
+            worker = threading.Thread(target=self.hub.poll_once)
+            worker.start()
+            worker.join(0.05)
+            self.assertTrue(worker.is_alive())
+            self.game.game_state = GameState_e.GAME_OVER
+        worker.join()
+
+        self.assertEqual(subscriber.next_frame(0), b'game_over')
+
+    def test_slow_subscriber_does_not_block_others(self):
+        """测试慢观战者被断开，不影响其他观战者"""
+        self.hub.max_skipped = 2
+        slow = self.hub.subscribe(1)
+        fast = self.hub.subscribe(1)
+        for _ in range(self.hub.queue_size + 4):
+            fast.next_frame(0)
+            self.game.update()
+            self.hub.poll_once()
+
+        self.assertTrue(slow.closed)
+        self.assertFalse(fast.closed)
+        self.assertEqual(self.hub.subscriber_count(), 1)
+
+    def test_unknown_player_not_created(self):
+        """测试观战不存在的玩家不会创建游戏"""
+        subscriber = self.hub.subscribe(2)
+
+        self.assertIsNone(self.store.find(2))
+        self.assertIsNone(subscriber.next_frame(0))
+
+    def test_unsubscribe_removes_channel(self):
+        """测试最后一个观战者离开后移除频道"""
+        subscriber = self.hub.subscribe(1)
+        self.hub.unsubscribe(subscriber)
+
+        self.assertEqual(self.hub.subscriber_count(), 0)
+        self.assertEqual(self.hub.poll_once(), 0)
+
+
+class TestSpectateApi(unittest.TestCase):
+    """测试观战接口"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('game', 'spectate')})
+        self.addCleanup(self.app.extensions['spectator_hub'].close)
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = 1
+        self.client.post('/api/game/start')
+
+    def test_live_games(self):
+        """测试直播列表包含进行中的游戏"""
+        data = self.client.get('/api/spectate/live').get_json()
+
+        self.assertEqual([game['user_id'] for game in data['games']], [1])
+
+    def test_stream_sends_current_state(self):
+        """测试事件流的第一帧是当前游戏状态"""
+        response = self.client.get('/api/spectate/1/stream', buffered=False)
+        first = next(response.response)
+        response.close()
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertTrue(first.startswith(b'data: '))
+        self.assertEqual(json.loads(first[len(b'data: '):])['game_state'], 'playing')
+        self.assertEqual(self.app.extensions['spectator_hub'].subscriber_count(), 0)
+
+    def test_requires_game_blueprint(self):
+        """测试未注册 game 蓝图时报错"""
+        with self.assertRaises(RuntimeError):
+            create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('spectate',)})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,118 @@
+"""
+@file    test_sql_trace.py
+@brief   SQL查询追踪单元测试
+@details 测试每请求查询计数、慢查询记录、N+1识别及指标导出
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+from monitoring.metrics import MetricsRegistry
+from monitoring.sql_trace import SQLTracer, SUMMARY_HEADER
+
+
+def _build_app(tracer, repeat):
+    """
+    @brief  构建执行指定次数相同查询的测试应用
+    @param  tracer: SQL追踪器
+    @param  repeat: 查询重复次数
+    @retval tuple: (Flask应用, 引擎)
+    """
+    engine = create_engine('sqlite://')
+    tracer.install(engine)
+
+    app = Flask(__name__)
+    app.before_request(tracer.before_request)
+    app.after_request(tracer.after_request)
+
+    @app.route('/repeat')
+    def repeat_query():
+        with engine.connect() as conn:
+            for i in range(repeat):
+                conn.execute(text('SELECT :value'), {'value': i})
+        return 'ok'
+
+    return app, engine
+
+
+class TestSQLTracer(unittest.TestCase):
+    """测试SQL查询追踪"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.registry = MetricsRegistry()
+
+    def test_summary_header_counts_queries(self):
+        """测试摘要响应头统计查询次数"""
+        tracer = SQLTracer(self.registry, summary_header=True)
+        app, _ = _build_app(tracer, 2)
+
+        response = app.test_client().get('/repeat')
+
+        self.assertIn('count=2;', response.headers[SUMMARY_HEADER])
+        self.assertIn('repeated=0', response.headers[SUMMARY_HEADER])
+
+    def test_no_header_outside_debug(self):
+        """测试非调试模式不返回摘要响应头"""
+        tracer = SQLTracer(self.registry)
+        app, _ = _build_app(tracer, 1)
+
+        response = app.test_client().get('/repeat')
+
+        self.assertNotIn(SUMMARY_HEADER, response.headers)
+
+    def test_repeated_statement_flagged(self):
+        """测试重复语句被识别为N+1模式"""
+        tracer = SQLTracer(self.registry, n_plus_one_threshold=3, summary_header=True)
+        app, _ = _build_app(tracer, 4)
+
+        with self.assertLogs('monitoring.sql_trace', level='WARNING') as logs:
+            response = app.test_client().get('/repeat')
+
+        self.assertIn('repeated=1', response.headers[SUMMARY_HEADER])
+        self.assertTrue(any('N+1' in line for line in logs.output))
+        self.assertTrue(any('tests/test_sql_trace.py' in line for line in logs.output))
+
+    def test_slow_query_logged_with_call_site(self):
+        """测试慢查询记录调用位置"""
+        tracer = SQLTracer(self.registry, slow_query_ms=0, summary_header=True)
+        app, _ = _build_app(tracer, 1)
+
+        with self.assertLogs('monitoring.sql_trace', level='WARNING') as logs:
+            response = app.test_client().get('/repeat')
+
+        self.assertIn('slow=1', response.headers[SUMMARY_HEADER])
+        self.assertTrue(any('repeat_query' in line for line in logs.output))
+
+    def test_queries_outside_request_ignored(self):
+        """测试请求外的查询不计入统计"""
+        tracer = SQLTracer(self.registry)
+        _, engine = _build_app(tracer, 0)
+
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+        self.assertEqual(self.registry.collect()['snake_game_db_queries_total'], {})
+
+    def test_metrics_aggregated_per_route(self):
+        """测试按路由汇总到指标"""
+        tracer = SQLTracer(self.registry)
+        app, _ = _build_app(tracer, 3)
+
+        app.test_client().get('/repeat')
+
+        collected = self.registry.collect()
+        self.assertEqual(collected['snake_game_db_queries_total'][('/repeat',)], 3)
+        self.assertEqual(collected['snake_game_db_n_plus_one_total'][('/repeat',)], 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
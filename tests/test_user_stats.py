@@ -0,0 +1,161 @@
+"""
+@file    test_user_stats.py
+@brief   用户游戏统计单元测试
+@details 测试统计增量的合并与批量写入、资料缓存的命中、过期与失效，以及游戏结束后用户信息接口返回统计值
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import unittest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from database import db, UserStats, UserDAO
+from database.user_stats import StatsCounters, UserStatsBuffer
+
+
+class UserStatsTestCase(unittest.TestCase):
+    """创建使用内存数据库的应用和一个用户"""
+
+    def setUp(self):
+        """每个测试前的设置"""
+        self.app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLUEPRINTS': ('auth', 'game')})
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.user_id = UserDAO.create_user('alice', 'alice@example.com', 'salt$hash').user_id
+        self.buffer = self.app.extensions['user_stats']
+        self.addCleanup(self.buffer.close)
+
+
+class TestStatsCounters(unittest.TestCase):
+    """测试统计值"""
+
+    def test_add_and_average(self):
+        """测试累加时最高分取较大值，平均分按局数计算"""
+        stats = StatsCounters(1, 3, 30, 30, 1500)
+        stats.add(StatsCounters(2, 1, 20, 15, 500))
+
+        self.assertEqual(stats.to_dict(), {'games_played': 3, 'food_eaten': 4, 'best_score': 30,
+                                           'average_score': 16.7, 'play_time_seconds': 2.0})
+
+    def test_empty_average(self):
+        """测试没有游戏时平均分为0"""
+        self.assertEqual(StatsCounters().to_dict()['average_score'], 0)
+
+
+class TestUserStatsBuffer(UserStatsTestCase):
+    """测试统计写回缓冲"""
+
+    def test_unwritten_games_visible(self):
+        """测试尚未写入的增量在读取时叠加"""
+        self.buffer.record(self.user_id, 50, 5, 3000)
+        self.buffer.record(self.user_id, 10, 1, 1000)
+
+        stats = self.buffer.get_user_info(self.user_id)['stats']
+        self.assertEqual((stats['games_played'], stats['best_score'], stats['average_score']), (2, 50, 30.0))
+        self.assertIsNone(db.session.get(UserStats, self.user_id))
+
+    def test_flush_merges_per_user(self):
+        """测试同一用户多局合并为一行写入，写入后不重复计算"""
+        self.buffer.get_user_info(self.user_id)
+        self.buffer.record(self.user_id, 50, 5, 3000)
+        self.buffer.record(self.user_id, 70, 7, 4000)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        row = db.session.get(UserStats, self.user_id)
+        self.assertEqual((row.games_played, row.food_eaten, row.total_score, row.best_score, row.play_time_ms),
+                         (2, 12, 120, 70, 7000))
+        self.assertEqual(self.buffer.get_user_info(self.user_id)['stats']['games_played'], 2)
+
+        self.buffer.record(self.user_id, 10, 1, 500)
+        self.buffer.flush()
+        db.session.expire_all()
+        row = db.session.get(UserStats, self.user_id)
+        self.assertEqual((row.games_played, row.best_score), (3, 70))
+
+    def test_cold_cache_reads_table(self):
+        """测试缓存为空时从统计表读取"""
+        self.buffer.record(self.user_id, 40, 4, 2000)
+        self.buffer.flush()
+        cold = UserStatsBuffer(self.app)
+
+        self.assertEqual(cold.get_user_info(self.user_id)['stats']['best_score'], 40)
+
+    def test_cache_hit(self):
+        """测试第二次读取命中缓存"""
+        self.buffer.get_user_info(self.user_id)
+        self.buffer.get_user_info(self.user_id)
+
+        self.assertEqual((self.buffer.misses, self.buffer.hits), (1, 1))
+
+    def test_cache_expires(self):
+        """测试缓存过期后读取其他进程写入的统计"""
+        buffer = UserStatsBuffer(self.app, cache_ttl=0)
+        self.addCleanup(buffer.close)
+        buffer.get_user_info(self.user_id)
+        # 模拟另一个工作进程写入的统计
+        self.buffer.record(self.user_id, 40, 4, 2000)
+        self.buffer.flush()
+
+        self.assertEqual(buffer.get_user_info(self.user_id)['stats']['best_score'], 40)
+        self.assertEqual((buffer.misses, buffer.hits), (2, 0))
+
+    def test_user_update_invalidates_cache(self):
+        """测试用户信息更新并提交后缓存失效"""
+        self.buffer.get_user_info(self.user_id)
+        UserDAO.update_user(self.user_id, email='alice@example.org')
+
+        self.assertEqual(self.buffer.get_user_info(self.user_id)['user']['email'], 'alice@example.org')
+
+    def test_unknown_user(self):
+        """测试用户不存在时返回None"""
+        self.assertIsNone(self.buffer.get_user_info(9999))
+
+    def test_max_pending_wakes_writer(self):
+        """测试待写用户数达到上限时唤醒写入线程"""
+        buffer = UserStatsBuffer(self.app, flush_interval=60, max_pending=2)
+        self.addCleanup(buffer.close)
+        buffer.record(1, 10, 1, 100)
+        buffer.record(2, 10, 1, 100)
+        for _ in range(200):
+            if UserStats.query.count() == 2:
+                break
+            db.session.rollback()
+            time.sleep(0.01)
+
+        self.assertEqual(UserStats.query.count(), 2)
+
+
+class TestUserInfoApi(UserStatsTestCase):
+    """测试用户信息接口返回游戏统计"""
+
+    def test_stats_after_game_over(self):
+        """测试一局游戏撞墙结束后用户信息包含该局统计"""
+        client = self.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = self.user_id
+        client.post('/api/game/start')
+        state = 'playing'
+        for _ in range(50):
+            state = client.post('/api/game/update').get_json()['game_state']['game_state']
+            if state == 'game_over':
+                break
+        self.assertEqual(state, 'game_over')
+        # 再次更新不会重复计入
+        client.post('/api/game/update')
+
+        data = client.get('/api/auth/user-info').get_json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['user']['username'], 'alice')
+        self.assertEqual(data['stats']['games_played'], 1)
+        self.assertGreater(data['stats']['play_time_seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,22 @@
+"""
+@file    wsgi.py
+@brief   WSGI入口
+@details 供生产服务器加载的应用对象，开启预加载时在主进程创建，
+         各工作进程fork后以写时复制方式共享已导入的模块和应用
+@author  AI Assistant
+@date    2026-10-19
+@version V1.0.0
+"""
+
+import os
+
+from app import create_app
+
+# 多个工作进程通过SQLite共享服务端会话
+SESSION_SQLITE_PATH = os.environ.get(
+    'SESSION_SQLITE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db')
+)
+
+app = create_app({'SESSION_SQLITE_PATH': SESSION_SQLITE_PATH})
+
+application = app